@@ -3,15 +3,18 @@ Advanced Analytics API for SSL Monitor Pro
 Provides detailed analytics, charts data, and insights
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, text
+from sqlalchemy import func, text, select
 from pydantic import BaseModel
-from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Any
+from datetime import date, datetime, timedelta
 import logging
 
-from database import get_db
+from database import get_db, SessionLocal
+from models import Domain, SSLCheck, SSLDomainDay
+from services import ssl_analytics
 
 logger = logging.getLogger(__name__)
 
@@ -237,16 +240,28 @@ async def get_insights(
 @router.get("/export")
 async def export_analytics(
     period: str = Query("30d", description="Time period: 1d, 7d, 30d, 90d"),
-    format: str = Query("json", description="Export format: json, csv"),
+    format: str = Query("json", description="Export format: json (summary), csv or ndjson (full check history)"),
     db: Session = Depends(get_db)
 ):
     """
     Export analytics data in various formats
+
+    csv and ndjson stream every SSL check in the period through a
+    server-side cursor; json returns the summary analytics.
     """
     try:
         days = parse_period(period)
         start_date = datetime.utcnow() - timedelta(days=days)
         
+        if format.lower() in EXPORT_MEDIA_TYPES:
+            return StreamingResponse(
+                stream_check_history(start_date, format.lower()),
+                media_type=EXPORT_MEDIA_TYPES[format.lower()],
+                headers={
+                    "Content-Disposition": f'attachment; filename="ssl_checks_{period}.{format.lower()}"'
+                }
+            )
+
         # Get all analytics data
         ssl_trends = await get_ssl_trends(start_date, db)
         alert_analytics = await get_alert_analytics(start_date, db)
@@ -254,18 +269,15 @@ async def export_analytics(
         domain_analytics = await get_domain_analytics(db)
         performance_metrics = await get_performance_metrics(start_date, db)
         
-        if format.lower() == "csv":
-            return export_to_csv(ssl_trends, alert_analytics, user_engagement, domain_analytics, performance_metrics)
-        else:
-            return {
-                "period": period,
-                "exported_at": datetime.utcnow(),
-                "ssl_trends": ssl_trends,
-                "alert_analytics": alert_analytics,
-                "user_engagement": user_engagement,
-                "domain_analytics": domain_analytics,
-                "performance_metrics": performance_metrics
-            }
+        return {
+            "period": period,
+            "exported_at": datetime.utcnow(),
+            "ssl_trends": ssl_trends,
+            "alert_analytics": alert_analytics,
+            "user_engagement": user_engagement,
+            "domain_analytics": domain_analytics,
+            "performance_metrics": performance_metrics
+        }
         
     except Exception as e:
         logger.error(f"Error exporting analytics: {e}")
@@ -286,22 +298,43 @@ def parse_period(period: str) -> int:
     }
     return period_map.get(period, 30)
 
+def _trend(previous: float, current: float, tolerance: float = 0.05) -> str:
+    """Direction of change between two values ('up', 'down', 'stable')"""
+    if previous == current or abs(current - previous) <= tolerance * max(abs(previous), abs(current)):
+        return "stable"
+    return "up" if current > previous else "down"
+
+def _period_days(start_date: datetime) -> List[date]:
+    """UTC days from start_date through today"""
+    start_day = start_date.date()
+    return [start_day + timedelta(days=offset) for offset in range((datetime.utcnow().date() - start_day).days + 1)]
+
+def _split_totals(series: Dict[date, Dict[str, Any]], days: List[date]):
+    """Per-key totals for the first and second half of a period"""
+    middle = len(days) // 2
+    halves = ({}, {})
+    for index, day in enumerate(days):
+        half = halves[0] if index < middle else halves[1]
+        for key, (count, _) in series.get(day, {}).items():
+            half[key] = half.get(key, 0) + count
+    return halves
+
 async def get_ssl_trends(start_date: datetime, db: Session) -> List[SSLTrendData]:
-    """Get SSL certificate trends over time"""
+    """Get SSL certificate trends over time (domain states per day)"""
     try:
-        # This would query the actual database
-        # For now, return mock data
-        trends = []
+        days = _period_days(start_date)
+        series = ssl_analytics.get_series(db, "state", days[0])
         
-        for i in range(30):  # Last 30 days
-            date = start_date + timedelta(days=i)
+        trends = []
+        for day in days:
+            counts = {state: count for state, (count, _) in series.get(day, {}).items()}
             trends.append(SSLTrendData(
-                date=date.strftime("%Y-%m-%d"),
-                healthy_domains=50 + i % 10,
-                warning_domains=5 + i % 3,
-                critical_domains=2 + i % 2,
-                expired_domains=1 if i % 7 == 0 else 0,
-                error_domains=1 if i % 10 == 0 else 0
+                date=day.strftime("%Y-%m-%d"),
+                healthy_domains=counts.get("healthy", 0),
+                warning_domains=counts.get("warning", 0),
+                critical_domains=counts.get("critical", 0),
+                expired_domains=counts.get("expired", 0),
+                error_domains=counts.get("error", 0)
             ))
         
         return trends
@@ -310,36 +343,33 @@ async def get_ssl_trends(start_date: datetime, db: Session) -> List[SSLTrendData
         logger.error(f"Error getting SSL trends: {e}")
         return []
 
+ALERT_TYPES = {
+    "warning": "SSL Warning",
+    "critical": "SSL Critical",
+    "expired": "SSL Expired",
+    "error": "System Error",
+}
+
 async def get_alert_analytics(start_date: datetime, db: Session) -> List[AlertAnalytics]:
-    """Get alert analytics"""
+    """Get alert analytics (checks that raised an alert, by type)"""
     try:
-        # This would query the actual database
-        # For now, return mock data
+        days = _period_days(start_date)
+        first_half, second_half = _split_totals(ssl_analytics.get_series(db, "checks", days[0]), days)
+        
+        counts = {
+            state: first_half.get(state, 0) + second_half.get(state, 0)
+            for state in ALERT_TYPES
+        }
+        total = sum(counts.values())
+        
         return [
             AlertAnalytics(
-                alert_type="SSL Warning",
-                count=45,
-                percentage=60.0,
-                trend="stable"
-            ),
-            AlertAnalytics(
-                alert_type="SSL Critical",
-                count=15,
-                percentage=20.0,
-                trend="down"
-            ),
-            AlertAnalytics(
-                alert_type="SSL Expired",
-                count=5,
-                percentage=6.7,
-                trend="up"
-            ),
-            AlertAnalytics(
-                alert_type="System Error",
-                count=10,
-                percentage=13.3,
-                trend="stable"
+                alert_type=alert_type,
+                count=counts[state],
+                percentage=round(counts[state] / total * 100, 1) if total else 0.0,
+                trend=_trend(first_half.get(state, 0), second_half.get(state, 0))
             )
+            for state, alert_type in ALERT_TYPES.items()
         ]
         
     except Exception as e:
@@ -383,28 +413,50 @@ async def get_user_engagement(start_date: datetime, db: Session) -> List[UserEng
         return []
 
 async def get_domain_analytics(db: Session) -> DomainAnalytics:
-    """Get domain analytics"""
+    """Get domain analytics from the latest daily snapshot"""
     try:
-        # This would query the actual database
-        # For now, return mock data
-        return DomainAnalytics(
-            total_domains=200,
-            active_domains=185,
-            average_days_until_expiry=45.2,
-            domains_expiring_soon=25,
-            domains_expired=3,
-            top_issuers=[
-                {"name": "Let's Encrypt", "count": 120, "percentage": 60.0},
-                {"name": "DigiCert", "count": 45, "percentage": 22.5},
-                {"name": "Sectigo", "count": 20, "percentage": 10.0},
-                {"name": "GoDaddy", "count": 15, "percentage": 7.5}
-            ],
-            top_domains=[
-                {"domain": "example.com", "days_left": 89, "status": "healthy"},
-                {"domain": "test.com", "days_left": 15, "status": "warning"},
-                {"domain": "demo.com", "days_left": 3, "status": "critical"},
-                {"domain": "sample.com", "days_left": 0, "status": "expired"}
+        total_domains = db.query(func.count(Domain.id)).scalar() or 0
+        active_domains = db.query(func.count(Domain.id)).filter(Domain.is_active == True).scalar() or 0
+        
+        day = ssl_analytics.latest_day(db)
+        if day is None:
+            states, issuers, expiry = {}, {}, {}
+        else:
+            states = ssl_analytics.get_series(db, "state", day, day).get(day, {})
+            issuers = ssl_analytics.get_series(db, "issuer", day, day).get(day, {})
+            expiry = ssl_analytics.get_series(db, "expiry", day, day).get(day, {})
+        
+        # Only buckets with a known expiry contribute to the average
+        dated = [(count, value) for key, (count, value) in expiry.items() if key not in ("unknown", "expired")]
+        dated_count = sum(count for count, _ in dated)
+        average_days = sum(value for _, value in dated) / dated_count if dated_count else 0
+        
+        issuer_total = sum(count for count, _ in issuers.values())
+        top_issuers = [
+            {"name": name, "count": count, "percentage": round(count / issuer_total * 100, 1)}
+            for name, (count, _) in sorted(issuers.items(), key=lambda item: item[1][0], reverse=True)[:5]
+        ]
+        
+        top_domains = []
+        if day is not None:
+            rows = db.query(Domain.name, SSLDomainDay.expires_in, SSLDomainDay.state)\
+                .join(Domain, Domain.id == SSLDomainDay.domain_id)\
+                .filter(SSLDomainDay.day == day)\
+                .order_by(SSLDomainDay.expires_in.asc().nullsfirst())\
+                .limit(10)
+            top_domains = [
+                {"domain": name, "days_left": expires_in or 0, "status": state}
+                for name, expires_in, state in rows
             ]
+        
+        return DomainAnalytics(
+            total_domains=total_domains,
+            active_domains=active_domains,
+            average_days_until_expiry=round(average_days, 1),
+            domains_expiring_soon=sum(states.get(state, (0, 0))[0] for state in ("warning", "critical")),
+            domains_expired=states.get("expired", (0, 0))[0],
+            top_issuers=top_issuers,
+            top_domains=top_domains
         )
         
     except Exception as e:
@@ -420,38 +472,57 @@ async def get_domain_analytics(db: Session) -> DomainAnalytics:
         )
 
 async def get_performance_metrics(start_date: datetime, db: Session) -> List[PerformanceMetrics]:
-    """Get performance metrics"""
+    """Get check performance metrics for the period"""
     try:
-        # This would query the actual database
-        # For now, return mock data
+        days = _period_days(start_date)
+        first_half, second_half = _split_totals(ssl_analytics.get_series(db, "checks", days[0]), days)
+        
+        def rates(counts: Dict[str, int]):
+            total = sum(counts.values())
+            if not total:
+                return 0, 100.0, 0.0
+            failed = counts.get("error", 0) + counts.get("expired", 0)
+            return total, (total - failed) / total * 100, counts.get("error", 0) / total * 100
+        
+        first_total, first_uptime, first_errors = rates(first_half)
+        second_total, second_uptime, second_errors = rates(second_half)
+        total, uptime, error_rate = rates({
+            state: first_half.get(state, 0) + second_half.get(state, 0) for state in ssl_analytics.STATES
+        })
+        
+        states = ssl_analytics.get_series(db, "state", days[0])
+        def healthy_share(day: date) -> float:
+            counts = states.get(day, {})
+            domains = sum(count for count, _ in counts.values())
+            return counts.get("healthy", (0, 0))[0] / domains * 100 if domains else 0.0
+        
         return [
             PerformanceMetrics(
-                metric="Average Response Time",
-                value=245.5,
-                unit="ms",
-                trend="down",
-                target=300.0
-            ),
-            PerformanceMetrics(
-                metric="SSL Check Time",
-                value=1.2,
-                unit="s",
-                trend="stable",
-                target=2.0
+                metric="SSL Checks Performed",
+                value=float(total),
+                unit="checks",
+                trend=_trend(first_total, second_total)
             ),
             PerformanceMetrics(
                 metric="Uptime",
-                value=99.95,
+                value=round(uptime, 2),
                 unit="%",
-                trend="up",
+                trend=_trend(first_uptime, second_uptime, tolerance=0.001),
                 target=99.9
             ),
             PerformanceMetrics(
                 metric="Error Rate",
-                value=0.05,
+                value=round(error_rate, 2),
                 unit="%",
-                trend="down",
+                trend=_trend(first_errors, second_errors),
                 target=0.1
+            ),
+            PerformanceMetrics(
+                metric="Healthy Certificates",
+                value=round(healthy_share(days[-1]), 1),
+                unit="%",
+                trend=_trend(healthy_share(days[0]), healthy_share(days[-1]), tolerance=0.01),
+                target=95.0
             )
         ]
         
@@ -505,32 +576,56 @@ def generate_insights(
     
     return insights
 
-def export_to_csv(ssl_trends, alert_analytics, user_engagement, domain_analytics, performance_metrics):
-    """Export data to CSV format"""
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+EXPORT_COLUMNS = [
+    "domain", "checked_at", "is_valid", "expires_in", "issuer", "subject",
+    "not_valid_before", "not_valid_after", "error_message"
+]
+EXPORT_BATCH_SIZE = 5000
+
+def stream_check_history(start_date: datetime, format: str) -> Iterator[bytes]:
+    """Stream SSL checks since start_date as CSV or NDJSON, one chunk per cursor batch"""
     import csv
     import io
-    
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write SSL trends
-    writer.writerow(["SSL Trends"])
-    writer.writerow(["Date", "Healthy", "Warning", "Critical", "Expired", "Error"])
-    for trend in ssl_trends:
-        writer.writerow([
-            trend.date,
-            trend.healthy_domains,
-            trend.warning_domains,
-            trend.critical_domains,
-            trend.expired_domains,
-            trend.error_domains
-        ])
-    
-    # Write alert analytics
-    writer.writerow([])
-    writer.writerow(["Alert Analytics"])
-    writer.writerow(["Type", "Count", "Percentage", "Trend"])
-    for alert in alert_analytics:
-        writer.writerow([alert.alert_type, alert.count, alert.percentage, alert.trend])
-    
-    return output.getvalue()
+    import json
+
+    # Own session: the stream outlives the request handler
+    db = SessionLocal()
+    try:
+        query = select(
+            Domain.name.label("domain"),
+            SSLCheck.checked_at,
+            SSLCheck.is_valid,
+            SSLCheck.expires_in,
+            SSLCheck.issuer,
+            SSLCheck.subject,
+            SSLCheck.not_valid_before,
+            SSLCheck.not_valid_after,
+            SSLCheck.error_message
+        ).join(
+            Domain, SSLCheck.domain_id == Domain.id
+        ).where(
+            SSLCheck.checked_at >= start_date
+        ).order_by(SSLCheck.domain_id, SSLCheck.checked_at)
+        result = db.execute(query.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE))
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if format == "csv":
+            writer.writerow(EXPORT_COLUMNS)
+        for partition in result.partitions():
+            for row in partition:
+                if format == "csv":
+                    writer.writerow([
+                        value.isoformat() if isinstance(value, datetime) else value
+                        for value in row
+                    ])
+                else:
+                    buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=str) + "\n")
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+    finally:
+        db.close()
@@ -9,167 +9,41 @@ import redis
 import os
 import logging
 from datetime import datetime, timezone
-import requests
 import json
 
+from services.health_prober import health_prober
+
 logger = logging.getLogger(__name__)
 
+def _probe_result(name):
+    """Latest background probe result in this module's format"""
+    result = health_prober.result(name)
+    formatted = {"status": result["status"]}
+    if result["error"]:
+        formatted["error"] = result["error"]
+    if result["details"]:
+        formatted["details"] = {**result["details"], "response_time_ms": result["latency_ms"]}
+    formatted["checked_at"] = result["checked_at"]
+    return formatted
+
 def check_database():
-    """Check PostgreSQL database connectivity"""
-    try:
-        conn = psycopg2.connect(os.getenv('DATABASE_URL'))
-        cur = conn.cursor()
-        
-        # Test basic query
-        cur.execute('SELECT 1')
-        result = cur.fetchone()
-        
-        # Check database size
-        cur.execute("""
-            SELECT pg_size_pretty(pg_database_size(current_database()))
-        """)
-        db_size = cur.fetchone()[0]
-        
-        # Check active connections
-        cur.execute("""
-            SELECT count(*) FROM pg_stat_activity 
-            WHERE state = 'active'
-        """)
-        active_connections = cur.fetchone()[0]
-        
-        conn.close()
-        
-        return {
-            "status": "healthy",
-            "details": {
-                "database_size": db_size,
-                "active_connections": active_connections,
-                "response_time_ms": 0  # Could add timing if needed
-            }
-        }
-    except Exception as e:
-        logger.error(f"Database health check failed: {e}")
-        return {
-            "status": "unhealthy",
-            "error": str(e)
-        }
+    """Check PostgreSQL database connectivity (latest probe result)"""
+    return _probe_result("database")
 
 def check_redis():
-    """Check Redis connectivity"""
-    try:
-        r = redis.from_url(os.getenv('UPSTASH_REDIS_REST_URL'))
-        
-        # Test ping
-        r.ping()
-        
-        # Get Redis info
-        info = r.info()
-        
-        return {
-            "status": "healthy",
-            "details": {
-                "redis_version": info.get('redis_version', 'unknown'),
-                "used_memory_human": info.get('used_memory_human', 'unknown'),
-                "connected_clients": info.get('connected_clients', 0),
-                "response_time_ms": 0
-            }
-        }
-    except Exception as e:
-        logger.error(f"Redis health check failed: {e}")
-        return {
-            "status": "unhealthy",
-            "error": str(e)
-        }
+    """Check Redis connectivity (latest probe result)"""
+    return _probe_result("redis")
 
 def check_telegram():
-    """Check Telegram Bot API connectivity"""
-    try:
-        bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
-        if not bot_token:
-            return {
-                "status": "not_configured",
-                "error": "TELEGRAM_BOT_TOKEN not set"
-            }
-        
-        # Test bot API
-        url = f"https://api.telegram.org/bot{bot_token}/getMe"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        
-        bot_info = response.json()
-        
-        return {
-            "status": "healthy",
-            "details": {
-                "bot_username": bot_info.get('result', {}).get('username', 'unknown'),
-                "response_time_ms": int(response.elapsed.total_seconds() * 1000)
-            }
-        }
-    except Exception as e:
-        logger.error(f"Telegram health check failed: {e}")
-        return {
-            "status": "unhealthy",
-            "error": str(e)
-        }
+    """Check Telegram Bot API connectivity (latest probe result)"""
+    return _probe_result("telegram")
 
 def check_external_services():
-    """Check external service dependencies"""
-    services = {}
-    
-    # Check Stripe API
-    try:
-        stripe_key = os.getenv('STRIPE_SECRET_KEY')
-        if stripe_key:
-            # Simple test - check if key format is valid
-            if stripe_key.startswith('sk_'):
-                services['stripe'] = {
-                    "status": "healthy",
-                    "details": {"key_format": "valid"}
-                }
-            else:
-                services['stripe'] = {
-                    "status": "unhealthy",
-                    "error": "Invalid key format"
-                }
-        else:
-            services['stripe'] = {
-                "status": "not_configured",
-                "error": "STRIPE_SECRET_KEY not set"
-            }
-    except Exception as e:
-        services['stripe'] = {
-            "status": "unhealthy",
-            "error": str(e)
-        }
-    
-    # Check N8N (if configured)
-    try:
-        n8n_webhook = os.getenv('N8N_WEBHOOK_URL')
-        if n8n_webhook:
-            # Test N8N webhook endpoint
-            response = requests.get(n8n_webhook.replace('/webhook/', '/health/'), timeout=5)
-            if response.status_code == 200:
-                services['n8n'] = {
-                    "status": "healthy",
-                    "details": {"response_time_ms": int(response.elapsed.total_seconds() * 1000)}
-                }
-            else:
-                services['n8n'] = {
-                    "status": "unhealthy",
-                    "error": f"HTTP {response.status_code}"
-                }
-        else:
-            services['n8n'] = {
-                "status": "not_configured",
-                "error": "N8N_WEBHOOK_URL not set"
-            }
-    except Exception as e:
-        services['n8n'] = {
-            "status": "unhealthy",
-            "error": str(e)
-        }
-    
-    return services
+    """Check external service dependencies (latest probe results)"""
+    return {
+        "stripe": _probe_result("stripe"),
+        "n8n": _probe_result("n8n")
+    }
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -234,29 +108,18 @@ def readiness_check():
     Kubernetes-style readiness probe
     Check if the application is ready to serve traffic
     """
-    try:
-        # Quick database check
-        conn = psycopg2.connect(os.getenv('DATABASE_URL'))
-        cur = conn.cursor()
-        cur.execute('SELECT 1')
-        conn.close()
-        
-        # Quick Redis check
-        r = redis.from_url(os.getenv('UPSTASH_REDIS_REST_URL'))
-        r.ping()
-        
-        return jsonify({
-            "status": "ready",
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        }), 200
-        
-    except Exception as e:
-        logger.error(f"Readiness check failed: {e}")
+    unhealthy = health_prober.unhealthy_critical()
+    if unhealthy:
         return jsonify({
             "status": "not_ready",
-            "error": str(e),
+            "error": f"Unhealthy: {', '.join(unhealthy)}",
             "timestamp": datetime.now(timezone.utc).isoformat()
         }), 503
+    
+    return jsonify({
+        "status": "ready",
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }), 200
 
 @app.route('/health/startup', methods=['GET'])
 def startup_check():
@@ -284,37 +147,21 @@ def metrics():
     metrics.append("# TYPE ssl_monitor_info gauge")
     metrics.append(f'ssl_monitor_info{{version="1.0.0",environment="{os.getenv("FLASK_ENV", "development")}"}} 1')
     
-    # Health status
-    health_status = 1 if health_check()[1] == 200 else 0
-    metrics.append("# HELP ssl_monitor_health_status Health status (1=healthy, 0=unhealthy)")
-    metrics.append("# TYPE ssl_monitor_health_status gauge")
-    metrics.append(f"ssl_monitor_health_status {health_status}")
+    # Dependency probes and health status
+    metrics.append(health_prober.metrics_text())
     
-    # Database connections (if available)
-    try:
-        conn = psycopg2.connect(os.getenv('DATABASE_URL'))
-        cur = conn.cursor()
-        cur.execute("SELECT count(*) FROM pg_stat_activity WHERE state = 'active'")
-        active_connections = cur.fetchone()[0]
-        conn.close()
-        
+    # Database connections and Redis clients from the latest probes
+    database = health_prober.result("database")["details"]
+    if "active_connections" in database:
         metrics.append("# HELP ssl_monitor_db_connections_active Active database connections")
         metrics.append("# TYPE ssl_monitor_db_connections_active gauge")
-        metrics.append(f"ssl_monitor_db_connections_active {active_connections}")
-    except Exception:
-        pass
+        metrics.append(f"ssl_monitor_db_connections_active {database['active_connections']}")
     
-    # Redis info (if available)
-    try:
-        r = redis.from_url(os.getenv('UPSTASH_REDIS_REST_URL'))
-        info = r.info()
-        connected_clients = info.get('connected_clients', 0)
-        
+    redis_info = health_prober.result("redis")["details"]
+    if "connected_clients" in redis_info:
         metrics.append("# HELP ssl_monitor_redis_connected_clients Redis connected clients")
         metrics.append("# TYPE ssl_monitor_redis_connected_clients gauge")
-        metrics.append(f"ssl_monitor_redis_connected_clients {connected_clients}")
-    except Exception:
-        pass
+        metrics.append(f"ssl_monitor_redis_connected_clients {redis_info['connected_clients']}")
     
     return "\n".join(metrics), 200, {'Content-Type': 'text/plain'}
 
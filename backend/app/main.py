@@ -1,5 +1,6 @@
 from fastapi import FastAPI, Depends, HTTPException, status, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime
@@ -7,6 +8,9 @@ import sys
 import os
 import logging
 import time
+import anyio
+
+_boot_started = time.perf_counter()
 
 # Sentry integration
 try:
@@ -50,21 +54,21 @@ import models
 import schemas
 from database import engine, get_db
 from services import ssl_service
-from app import billing
-from app.user_profile import router as user_profile_router  # PostgreSQL version
-from app.user_redis import router as user_redis_router  # NEW: Redis version (no migration needed!)
-from app.notifications import router as notifications_router  # NEW: Notifications API
-from app.trial import router as trial_router  # NEW: Trial API
-from app.health import *  # NEW: Health checks
-from app.rate_limit import *  # NEW: Rate limiting
-from app.telegram_monitoring import *  # NEW: Telegram monitoring
+from services.redis_client import redis_client as upstash_client
 from app.security import init_security  # NEW: Security middleware
-from app.migrate import run_migrations  # Auto migration
+from app.migrate import run_migrations, ensure_schema  # Auto migration
+from app.startup import startup_timer, include_router
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Fast startup: routers are imported on first use and schema setup only
+# runs when the schema fingerprint changed (see app/migrate.py)
+FAST_STARTUP = os.getenv("FAST_STARTUP", "false").lower() == "true"
+
+startup_timer.record("imports", time.perf_counter() - _boot_started)
+
 # Create FastAPI app
 app = FastAPI(
     title="SSL Certificate Monitor API",
@@ -116,39 +120,59 @@ async def startup_event():
     """Run on application startup"""
     logger.info("🚀 Starting SSL Monitor Pro API...")
     
-    # Run database migrations
-    logger.info("🔄 Running database migrations...")
-    migration_success = run_migrations()
-    
-    if migration_success:
-        logger.info("✅ Database migrations completed")
-    else:
-        logger.warning("⚠️  Migration check failed, but continuing startup")
-    
-    # Create other tables via SQLAlchemy
-    logger.info("🔄 Creating SQLAlchemy tables...")
-    models.Base.metadata.create_all(bind=engine)
-    
+    with startup_timer.phase("schema"):
+        if FAST_STARTUP:
+            # Schema setup only if pending (normally done by `python -m app.migrate`)
+            schema_state = ensure_schema(engine, models.Base.metadata)
+            if schema_state == "failed":
+                logger.warning("⚠️  Migration check failed, but continuing startup")
+            else:
+                logger.info(f"✅ Database schema {schema_state}")
+        else:
+            # Run database migrations
+            logger.info("🔄 Running database migrations...")
+            migration_success = run_migrations(engine)
+            
+            if migration_success:
+                logger.info("✅ Database migrations completed")
+            else:
+                logger.warning("⚠️  Migration check failed, but continuing startup")
+            
+            # Create other tables via SQLAlchemy
+            logger.info("🔄 Creating SQLAlchemy tables...")
+            models.Base.metadata.create_all(bind=engine)
+    
+    # Dependency probes for /health, /ready and /metrics (Telegram included)
+    with startup_timer.phase("probes"):
+        from services.health_prober import health_prober
+        health_prober.start()
+    
+    startup_timer.complete()
     logger.info("✅ Application started successfully")
 
+# Shutdown event - release pooled connections
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Run on application shutdown"""
+    # These are imported on first use; only shut down what was loaded
+    if "services.health_prober" in sys.modules:
+        await sys.modules["services.health_prober"].health_prober.stop()
+    await upstash_client.close()
+    if "services.cache" in sys.modules:
+        await sys.modules["services.cache"].cache.close()
+    if "services.notification_store" in sys.modules:
+        await sys.modules["services.notification_store"].notification_store.close()
+
 # Initialize security middleware
 init_security(app)
 
 # Include routers
-app.include_router(billing.router)
-# app.include_router(user_profile_router)  # PostgreSQL version (commented out - needs migration)
-app.include_router(user_redis_router)  # Redis version (works immediately!)
-app.include_router(notifications_router)  # Notifications API (works immediately!)
-app.include_router(trial_router)  # Trial API (works immediately!)
-
-# Test Telegram bot connection on startup
-@app.on_event("startup")
-async def test_telegram_bot():
-    """Test Telegram bot connection on startup"""
-    if test_telegram_bot():
-        logger.info("✅ Telegram bot connection successful")
-    else:
-        logger.warning("⚠️ Telegram bot connection failed")
+with startup_timer.phase("routers"):
+    include_router(app, "/billing", "app.billing:router", lazy=FAST_STARTUP)
+    # include_router(app, "/api/user", "app.user_profile:router")  # PostgreSQL version (commented out - needs migration)
+    include_router(app, "/api/user", "app.user_redis:router", lazy=FAST_STARTUP)  # Redis version (works immediately!)
+    include_router(app, "/api/notifications", "app.notifications:router", lazy=FAST_STARTUP)  # Notifications API (works immediately!)
+    include_router(app, "/api/trial", "app.trial:router", lazy=FAST_STARTUP)  # Trial API (works immediately!)
 
 # CORS configuration
 app.add_middleware(
@@ -176,65 +200,20 @@ def root():
     }
 
 @app.get("/health")
-def health_check(db: Session = Depends(get_db)):
-    """Comprehensive health check endpoint"""
+async def health_check():
+    """Comprehensive health check endpoint (reads background probe results)"""
+    from services.health_prober import health_prober
+    checks = health_prober.snapshot()
+    unhealthy = health_prober.unhealthy_critical()
     health_status = {
-        "status": "healthy",
+        "status": "unhealthy" if unhealthy else "healthy",
         "timestamp": datetime.utcnow().isoformat(),
         "version": "1.0.0",
-        "checks": {}
+        "checks": checks
     }
     
-    # Check database
-    try:
-        from sqlalchemy import text
-        db.execute(text("SELECT 1"))
-        health_status["checks"]["database"] = "connected"
-    except Exception as e:
-        health_status["checks"]["database"] = f"error: {str(e)}"
-        health_status["status"] = "unhealthy"
-    
-    # Check Redis
-    try:
-        import redis
-        import os
-        redis_url = os.getenv('REDIS_URL')
-        if redis_url:
-            r = redis.from_url(redis_url)
-            r.ping()
-            health_status["checks"]["redis"] = "connected"
-        else:
-            health_status["checks"]["redis"] = "not_configured"
-    except Exception as e:
-        health_status["checks"]["redis"] = f"error: {str(e)}"
-    
-    # Check Telegram
-    try:
-        from utils.telegram import test_telegram_connection
-        telegram_result = test_telegram_connection()
-        if telegram_result.get('ok'):
-            bot_username = telegram_result.get('bot', {}).get('username', 'unknown')
-            health_status["checks"]["telegram"] = f"connected (@{bot_username})"
-        else:
-            health_status["checks"]["telegram"] = "not_configured"
-    except Exception as e:
-        health_status["checks"]["telegram"] = "not_configured"
-    
-    # Check Stripe
-    try:
-        import stripe
-        import os
-        stripe.api_key = os.getenv('STRIPE_SECRET_KEY')
-        if stripe.api_key and stripe.api_key.startswith('sk_'):
-            # Just check if key is present, don't make API call
-            health_status["checks"]["stripe"] = "configured"
-        else:
-            health_status["checks"]["stripe"] = "not_configured"
-    except Exception as e:
-        health_status["checks"]["stripe"] = "not_configured"
-    
     # Return appropriate status code
-    if health_status["status"] == "unhealthy":
+    if unhealthy:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=health_status
@@ -248,8 +227,20 @@ async def readiness_check():
     Kubernetes/Docker readiness probe
     Checks if the application is ready to receive traffic
     """
+    from services.health_prober import health_prober
+    unhealthy = health_prober.unhealthy_critical()
+    if unhealthy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"ready": False, "unhealthy": unhealthy, "timestamp": datetime.utcnow().isoformat()}
+        )
     return {"ready": True, "timestamp": datetime.utcnow().isoformat()}
 
+@app.get("/startup")
+async def startup_timings():
+    """Per-phase startup timings and first-use router load times"""
+    return {"fast_startup": FAST_STARTUP, **startup_timer.as_dict()}
+
 @app.get("/live")
 async def liveness_check():
     """
@@ -261,22 +252,17 @@ async def liveness_check():
 @app.get("/metrics")
 async def prometheus_metrics():
     """
-    Prometheus metrics endpoint (if enabled)
+    Dependency probe metrics when the Prometheus instrumentator is not
+    installed (otherwise it serves /metrics, including the probe gauges)
     """
-    if not PROMETHEUS_ENABLED:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Prometheus metrics not enabled"
-        )
-    
-    # This will be handled by the Prometheus instrumentator
-    # The endpoint is automatically exposed at /metrics
-    return {"message": "Prometheus metrics available at /metrics"}
+    from services.health_prober import health_prober
+    return PlainTextResponse(health_prober.metrics_text())
 
 # Domain Endpoints
 @app.post("/domains/", status_code=status.HTTP_201_CREATED)
 def create_domain(domain: schemas.DomainCreate, db: Session = Depends(get_db)):
     """Add a new domain to monitor"""
+    from services import cached_queries
     try:
         # Check if domain already exists
         existing = db.query(models.Domain).filter(models.Domain.name == domain.name).first()
@@ -290,6 +276,7 @@ def create_domain(domain: schemas.DomainCreate, db: Session = Depends(get_db)):
         db.add(db_domain)
         db.commit()
         db.refresh(db_domain)
+        anyio.from_thread.run(cached_queries.on_domain_changed)
         return {"id": db_domain.id, "name": db_domain.name, "created_at": db_domain.created_at.isoformat(), "is_active": db_domain.is_active, "alert_threshold_days": db_domain.alert_threshold_days}
     except HTTPException:
         raise  # Re-raise HTTP exceptions
@@ -335,6 +322,7 @@ def get_domain(domain_id: int, db: Session = Depends(get_db)):
 @app.patch("/domains/{domain_id}", response_model=schemas.Domain)
 def update_domain(domain_id: int, domain_update: schemas.DomainUpdate, db: Session = Depends(get_db)):
     """Update domain settings"""
+    from services import cached_queries
     domain = db.query(models.Domain).filter(models.Domain.id == domain_id).first()
     if not domain:
         raise HTTPException(
@@ -348,11 +336,13 @@ def update_domain(domain_id: int, domain_update: schemas.DomainUpdate, db: Sessi
     
     db.commit()
     db.refresh(domain)
+    anyio.from_thread.run(cached_queries.on_domain_changed, domain_id)
     return domain
 
 @app.delete("/domains/{domain_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_domain(domain_id: int, db: Session = Depends(get_db)):
     """Delete a domain"""
+    from services import cached_queries
     domain = db.query(models.Domain).filter(models.Domain.id == domain_id).first()
     if not domain:
         raise HTTPException(
@@ -362,12 +352,14 @@ def delete_domain(domain_id: int, db: Session = Depends(get_db)):
     
     db.delete(domain)
     db.commit()
+    anyio.from_thread.run(cached_queries.on_domain_changed, domain_id)
     return None
 
 # SSL Check Endpoints
 @app.post("/domains/{domain_id}/check", response_model=schemas.SSLStatus)
 def check_domain_ssl(domain_id: int, db: Session = Depends(get_db)):
     """Manually trigger SSL check for a domain"""
+    from services import ssl_analytics, cached_queries
     domain = db.query(models.Domain).filter(models.Domain.id == domain_id).first()
     if not domain:
         raise HTTPException(
@@ -391,6 +383,14 @@ def check_domain_ssl(domain_id: int, db: Session = Depends(get_db)):
     )
     db.add(ssl_check)
     db.commit()
+    ssl_analytics.record_check(db, domain, ssl_check)
+    
+    # Write the new status through to the cache
+    anyio.from_thread.run(
+        cached_queries.on_check_recorded,
+        domain_id,
+        cached_queries.ssl_status_payload(domain.name, domain.alert_threshold_days, ssl_check)
+    )
     
     # Determine status
     status_value = "error"
@@ -414,31 +414,27 @@ def check_domain_ssl(domain_id: int, db: Session = Depends(get_db)):
     )
 
 @app.get("/domains/{domain_id}/ssl-status", response_model=schemas.SSLStatus)
-def get_ssl_status(domain_id: int, db: Session = Depends(get_db)):
+async def get_ssl_status(domain_id: int, db: Session = Depends(get_db)):
     """Get latest SSL status for a domain (from cache)"""
-    domain = db.query(models.Domain).filter(models.Domain.id == domain_id).first()
-    if not domain:
+    from services import cached_queries
+    ssl_status = await cached_queries.get_domain_ssl_status(db, domain_id)
+    if not ssl_status:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Domain with id {domain_id} not found"
         )
     
-    latest_check = db.query(models.SSLCheck)\
-        .filter(models.SSLCheck.domain_id == domain_id)\
-        .order_by(models.SSLCheck.checked_at.desc())\
-        .first()
-    
-    if not latest_check:
+    if not ssl_status["checked_at"]:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"No SSL checks found for domain '{domain.name}'. Try checking manually first."
+            detail=f"No SSL checks found for domain '{ssl_status['domain_name']}'. Try checking manually first."
         )
     
     # Determine status
     status_value = "error"
-    if latest_check.is_valid:
-        expires_in = latest_check.expires_in or 0
-        if expires_in > domain.alert_threshold_days:
+    if ssl_status["is_valid"]:
+        expires_in = ssl_status["expires_in"] or 0
+        if expires_in > ssl_status["alert_threshold_days"]:
             status_value = "healthy"
         elif expires_in > 0:
             status_value = "warning"
@@ -446,12 +442,12 @@ def get_ssl_status(domain_id: int, db: Session = Depends(get_db)):
             status_value = "critical"
     
     return schemas.SSLStatus(
-        domain_name=domain.name,
-        is_valid=latest_check.is_valid,
-        expires_in=latest_check.expires_in,
-        not_valid_after=latest_check.not_valid_after,
-        last_checked=latest_check.checked_at,
-        error_message=latest_check.error_message,
+        domain_name=ssl_status["domain_name"],
+        is_valid=ssl_status["is_valid"],
+        expires_in=ssl_status["expires_in"],
+        not_valid_after=ssl_status["not_valid_after"],
+        last_checked=ssl_status["checked_at"],
+        error_message=ssl_status["error_message"],
         status=status_value
     )
 
@@ -475,40 +471,16 @@ def get_domain_checks(domain_id: int, limit: int = 50, db: Session = Depends(get
 
 # Statistics Endpoint
 @app.get("/statistics", response_model=schemas.Statistics)
-def get_statistics(db: Session = Depends(get_db)):
+async def get_statistics(db: Session = Depends(get_db)):
     """Get monitoring statistics"""
-    total_domains = db.query(models.Domain).count()
-    active_domains = db.query(models.Domain).filter(models.Domain.is_active == True).count()
-    
-    # Get latest checks for each domain and calculate statistics
-    from sqlalchemy import func
-    subquery = db.query(
-        models.SSLCheck.domain_id,
-        func.max(models.SSLCheck.checked_at).label('max_checked_at')
-    ).group_by(models.SSLCheck.domain_id).subquery()
-    
-    latest_checks = db.query(models.SSLCheck).join(
-        subquery,
-        (models.SSLCheck.domain_id == subquery.c.domain_id) &
-        (models.SSLCheck.checked_at == subquery.c.max_checked_at)
-    ).all()
-    
-    domains_with_errors = sum(1 for check in latest_checks if not check.is_valid)
-    domains_expiring_soon = sum(
-        1 for check in latest_checks 
-        if check.is_valid and check.expires_in is not None and 0 < check.expires_in <= 30
-    )
-    domains_expired = sum(
-        1 for check in latest_checks 
-        if check.expires_in is not None and check.expires_in <= 0
-    )
-    
+    from services import cached_queries
+    stats = await cached_queries.get_statistics(db)
     return schemas.Statistics(
-        total_domains=total_domains,
-        active_domains=active_domains,
-        domains_with_errors=domains_with_errors,
-        domains_expiring_soon=domains_expiring_soon,
-        domains_expired=domains_expired
+        total_domains=stats["total_domains"],
+        active_domains=stats["active_domains"],
+        domains_with_errors=stats["domains_with_errors"],
+        domains_expiring_soon=stats["domains_expiring_soon"],
+        domains_expired=stats["domains_expired"]
     )
 
 if __name__ == "__main__":
@@ -1,8 +1,17 @@
 """
 Automatic Database Migration Script
 Runs migrations on application startup without requiring Shell access
+
+Schema setup (migrations + create_all) records a fingerprint of the
+schema it produced in schema_state. With fast startup, instances only
+compare that fingerprint and run setup when it differs, under an
+advisory lock so one instance does the work. Run this module as a
+release/deploy job to set up the schema before instances start:
+
+    python -m app.migrate
 """
 
+import hashlib
 import logging
 from sqlalchemy import create_engine, text, inspect
 from app.config import DATABASE_URL
@@ -10,13 +19,20 @@ from app.config import DATABASE_URL
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def run_migrations():
+# Bump when run_migrations changes
+MIGRATIONS_VERSION = "1"
+SCHEMA_LOCK_ID = 72817001
+
+def run_migrations(engine=None):
     """
     Run database migrations automatically
     Safe to run multiple times - checks if tables exist first
+
+    Args:
+        engine: Engine to use (a new one is created if not given)
     """
     try:
-        engine = create_engine(DATABASE_URL)
+        engine = engine or create_engine(DATABASE_URL)
         inspector = inspect(engine)
         
         # Check if user_profiles table already exists
@@ -160,9 +176,85 @@ def run_migrations():
         logger.exception("Full error:")
         return False
 
+def schema_fingerprint(metadata):
+    """Hash of the tables, columns, indexes and constraints in metadata plus MIGRATIONS_VERSION"""
+    digest = hashlib.sha256(f"migrations:{MIGRATIONS_VERSION}".encode())
+    for table in sorted(metadata.tables.values(), key=lambda t: t.name):
+        digest.update(f"table:{table.name}".encode())
+        for column in table.columns:
+            digest.update(f"column:{column.name}:{column.type}:{column.nullable}:{column.primary_key}".encode())
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            digest.update(f"index:{index.name}:{[c.name for c in index.columns]}:{index.unique}".encode())
+        for constraint in sorted(table.constraints, key=lambda c: c.name or ""):
+            digest.update(f"constraint:{type(constraint).__name__}:{constraint.name}:{[c.name for c in constraint.columns]}".encode())
+    return digest.hexdigest()
+
+def _read_fingerprint(engine):
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT fingerprint FROM schema_state WHERE id = 1")).scalar()
+    except Exception:
+        return None  # No schema_state table yet
+
+def _write_fingerprint(engine, fingerprint):
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS schema_state (
+                id INTEGER PRIMARY KEY,
+                fingerprint VARCHAR(64) NOT NULL,
+                applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+        conn.execute(text("""
+            INSERT INTO schema_state (id, fingerprint, applied_at)
+            VALUES (1, :fingerprint, CURRENT_TIMESTAMP)
+            ON CONFLICT (id) DO UPDATE SET fingerprint = EXCLUDED.fingerprint, applied_at = EXCLUDED.applied_at
+        """), {"fingerprint": fingerprint})
+
+def setup_schema(engine, metadata):
+    """
+    Run migrations and create_all, then record the schema fingerprint
+
+    Returns:
+        True if migrations succeeded
+    """
+    success = run_migrations(engine)
+    metadata.create_all(bind=engine)
+    if success:
+        _write_fingerprint(engine, schema_fingerprint(metadata))
+    return success
+
+def ensure_schema(engine, metadata):
+    """
+    Set up the schema only if its fingerprint changed (fast startup)
+
+    Returns:
+        "current" if nothing was pending, "migrated" or "failed"
+    """
+    fingerprint = schema_fingerprint(metadata)
+    if _read_fingerprint(engine) == fingerprint:
+        return "current"
+
+    with engine.connect() as lock_conn:
+        # Instances starting together wait here; the first one does the work
+        lock_conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": SCHEMA_LOCK_ID})
+        try:
+            if _read_fingerprint(engine) == fingerprint:
+                return "current"
+            logger.info("🔄 Schema changes pending, running schema setup...")
+            return "migrated" if setup_schema(engine, metadata) else "failed"
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": SCHEMA_LOCK_ID})
+
 if __name__ == "__main__":
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import models
+    from database import engine
+
     logger.info("Running migrations standalone...")
-    success = run_migrations()
+    success = setup_schema(engine, models.Base.metadata)
     if success:
         logger.info("✅ Migration successful!")
     else:
@@ -5,10 +5,11 @@ SSL Monitor Pro - Notification Management API
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, EmailStr
 from typing import Dict, List, Optional, Any
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 
 from services.notification_service import notification_service
+from services.notification_store import notification_store
 
 logger = logging.getLogger(__name__)
 
@@ -39,27 +40,10 @@ class NotificationTestRequest(BaseModel):
     test_domain: str = "example.com"
     test_days_left: int = 7
 
-# In-memory storage (replace with database in production)
-notification_settings_db = {}
-notification_history_db = []
-
 @router.get("/settings/{user_email}")
 async def get_notification_settings(user_email: str):
     """Get notification settings for a user"""
-    settings = notification_settings_db.get(user_email, {
-        "email_enabled": True,
-        "telegram_enabled": False,
-        "webhook_enabled": False,
-        "webhook_url": None,
-        "telegram_chat_id": None,
-        "email_expiring_30_days": True,
-        "email_expiring_7_days": True,
-        "email_expiring_3_days": True,
-        "email_expiring_1_day": True,
-        "email_expired": True,
-        "email_check_failed": True,
-        "email_weekly_report": True
-    })
+    settings = await notification_store.get_settings(user_email)
     
     return {
         "success": True,
@@ -72,7 +56,7 @@ async def update_notification_settings(
     settings: NotificationSettings
 ):
     """Update notification settings for a user"""
-    notification_settings_db[user_email] = settings.dict()
+    await notification_store.save_settings(user_email, settings.dict())
     
     logger.info(f"Updated notification settings for {user_email}")
     
@@ -116,12 +100,10 @@ async def test_notification(request: NotificationTestRequest):
         )
         
         # Log the test
-        notification_history_db.append({
-            "id": len(notification_history_db) + 1,
+        await notification_store.add_history(request.recipient_email, {
             "notification_type": f"test_{request.notification_type}",
             "domain_name": request.test_domain,
             "recipient_email": request.recipient_email,
-            "sent_at": datetime.now(),
             "channels": results,
             "status": "success" if any(results.values()) else "failed"
         })
@@ -142,14 +124,8 @@ async def test_notification(request: NotificationTestRequest):
 @router.get("/history/{user_email}")
 async def get_notification_history(user_email: str, limit: int = 50):
     """Get notification history for a user"""
-    user_history = [
-        notification for notification in notification_history_db
-        if notification["recipient_email"] == user_email
-    ]
-    
-    # Sort by sent_at descending and limit
-    user_history.sort(key=lambda x: x["sent_at"], reverse=True)
-    user_history = user_history[:limit]
+    # Newest first, bounded per user by the store
+    user_history = await notification_store.get_history(user_email, limit)
     
     return {
         "success": True,
@@ -21,6 +21,47 @@ except Exception as e:
     logger.error(f"Failed to connect to Redis: {e}")
     redis_client = None
 
+# Atomic fixed-window counter: KEYS[1] = key, ARGV[1] = limit, ARGV[2] = window (ms)
+# Denied requests are not counted. Returns {allowed, current, ttl_ms}
+FIXED_WINDOW_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+if current >= tonumber(ARGV[1]) then
+    return {0, current, redis.call('PTTL', KEYS[1])}
+end
+current = redis.call('INCR', KEYS[1])
+if current == 1 then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return {1, current, redis.call('PTTL', KEYS[1])}
+"""
+_window_script = redis_client.register_script(FIXED_WINDOW_SCRIPT) if redis_client else None
+
+# Identifiers denied recently, rejected locally until their window resets
+_blocked_until = {}
+_MAX_BLOCKED = 10000
+
+def _consume(key, max_requests, window):
+    """
+    Count a request in one atomic round-trip
+
+    Returns:
+        Tuple of (allowed, current, retry_after_seconds)
+    """
+    blocked_until = _blocked_until.get(key)
+    if blocked_until is not None:
+        now = time.monotonic()
+        if blocked_until > now:
+            return False, max_requests, max(int(blocked_until - now), 1)
+        del _blocked_until[key]
+
+    allowed, current, ttl_ms = _window_script(keys=[key], args=[max_requests, window * 1000])
+    retry_after = max(int(ttl_ms) // 1000, 1) if ttl_ms > 0 else window
+    if not allowed:
+        if len(_blocked_until) >= _MAX_BLOCKED:
+            _blocked_until.clear()
+        _blocked_until[key] = time.monotonic() + retry_after
+    return bool(allowed), int(current), retry_after
+
 class RateLimitExceeded(Exception):
     """Custom exception for rate limit exceeded"""
     def __init__(self, message, retry_after=None):
@@ -84,31 +125,17 @@ def rate_limit(max_requests=60, window=60, per='ip', skip_successful=False):
             key = f"rate_limit:{identifier}:{window}"
             
             try:
-                # Get current count
-                current = redis_client.get(key)
-                if current is None:
-                    # First request in window
-                    redis_client.setex(key, window, 1)
-                    current = 1
-                else:
-                    current = int(current)
-                    if current >= max_requests:
-                        # Rate limit exceeded
-                        ttl = redis_client.ttl(key)
-                        retry_after = ttl if ttl > 0 else window
-                        
-                        logger.warning(f"Rate limit exceeded for {identifier}: {current}/{max_requests}")
-                        
-                        return jsonify({
-                            "error": "Rate limit exceeded",
-                            "limit": max_requests,
-                            "window": window,
-                            "retry_after": retry_after,
-                            "message": f"Too many requests. Try again in {retry_after} seconds."
-                        }), 429
-                    else:
-                        # Increment counter
-                        redis_client.incr(key)
+                allowed, current, retry_after = _consume(key, max_requests, window)
+                if not allowed:
+                    logger.warning(f"Rate limit exceeded for {identifier}: {current}/{max_requests}")
+                    
+                    return jsonify({
+                        "error": "Rate limit exceeded",
+                        "limit": max_requests,
+                        "window": window,
+                        "retry_after": retry_after,
+                        "message": f"Too many requests. Try again in {retry_after} seconds."
+                    }), 429
                 
                 # Execute the function
                 response = f(*args, **kwargs)
@@ -121,8 +148,8 @@ def rate_limit(max_requests=60, window=60, per='ip', skip_successful=False):
                 # Add rate limit headers
                 if hasattr(response, 'headers'):
                     response[0].headers['X-RateLimit-Limit'] = max_requests
-                    response[0].headers['X-RateLimit-Remaining'] = max_requests - current - 1
-                    response[0].headers['X-RateLimit-Reset'] = int(time.time()) + redis_client.ttl(key)
+                    response[0].headers['X-RateLimit-Remaining'] = max_requests - current
+                    response[0].headers['X-RateLimit-Reset'] = int(time.time()) + retry_after
                 
                 return response
                 
@@ -145,18 +172,8 @@ def check_rate_limit(identifier, max_requests=60, window=60):
     key = f"rate_limit:{identifier}:{window}"
     
     try:
-        current = redis_client.get(key)
-        if current is None:
-            redis_client.setex(key, window, 1)
-            return True, 1, max_requests - 1
-        else:
-            current = int(current)
-            if current >= max_requests:
-                ttl = redis_client.ttl(key)
-                return False, current, 0
-            else:
-                redis_client.incr(key)
-                return True, current + 1, max_requests - current - 1
+        allowed, current, _ = _consume(key, max_requests, window)
+        return allowed, current, max(max_requests - current, 0)
     except redis.RedisError as e:
         logger.error(f"Rate limiting error: {e}")
         return True, 0, max_requests
@@ -173,6 +190,7 @@ def reset_rate_limit(identifier, window=60):
     
     try:
         redis_client.delete(key)
+        _blocked_until.pop(key, None)
         return True
     except redis.RedisError as e:
         logger.error(f"Failed to reset rate limit: {e}")
@@ -0,0 +1,128 @@
+"""
+Application startup helpers
+
+Per-phase startup timings and lazily imported routers. A lazy router
+is registered as a placeholder route covering its prefix; the module is
+imported on the first request under that prefix and its real routes
+replace the placeholder.
+"""
+
+import time
+import importlib
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from fastapi import FastAPI
+from starlette.routing import BaseRoute, Match, NoMatchFound
+from starlette.types import Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """Records how long each startup phase took"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.lazy_loads: Dict[str, float] = {}
+        self.completed_ms = None
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases[name] = round(seconds * 1000, 2)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a block as a named phase"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def complete(self) -> None:
+        """Mark startup finished and log the breakdown"""
+        self.completed_ms = round((time.perf_counter() - self.started) * 1000, 2)
+        breakdown = ", ".join(f"{name}={ms}ms" for name, ms in self.phases.items())
+        logger.info(f"⏱️  Startup completed in {self.completed_ms}ms ({breakdown})")
+
+    def as_dict(self) -> Dict:
+        return {
+            "total_ms": self.completed_ms,
+            "phases_ms": dict(self.phases),
+            "lazy_router_loads_ms": dict(self.lazy_loads)
+        }
+
+
+# Global startup timer instance
+startup_timer = StartupTimer()
+
+
+class LazyRouter(BaseRoute):
+    """Placeholder route that imports a router on the first request under its prefix"""
+
+    def __init__(self, app: FastAPI, prefix: str, target: str):
+        """
+        Args:
+            app: Application to install the router into
+            prefix: Path prefix the router serves (e.g. "/billing")
+            target: "module:attribute" of the APIRouter
+        """
+        self.app = app
+        self.prefix = prefix.rstrip("/")
+        self.target = target
+
+    def matches(self, scope: Scope):
+        if scope["type"] == "http":
+            path = scope["path"]
+            if path == self.prefix or path.startswith(self.prefix + "/"):
+                return Match.FULL, {}
+        return Match.NONE, {}
+
+    def url_path_for(self, name: str, **path_params):
+        raise NoMatchFound(name, path_params)
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.load()
+        # Route again, now against the real routes
+        await self.app.router(scope, receive, send)
+
+    def load(self) -> None:
+        """Import the router and put its routes in place of this placeholder"""
+        routes = self.app.router.routes
+        if self not in routes:
+            return  # Already loaded
+
+        started = time.perf_counter()
+        module_name, attribute = self.target.split(":")
+        router = getattr(importlib.import_module(module_name), attribute)
+
+        count = len(routes)
+        self.app.include_router(router)
+        loaded = routes[count:]
+        del routes[count:]
+        index = routes.index(self)
+        routes[index:index + 1] = loaded
+        self.app.openapi_schema = None
+
+        elapsed = time.perf_counter() - started
+        startup_timer.lazy_loads[module_name] = round(elapsed * 1000, 2)
+        logger.info(f"Loaded router {self.target} on first use in {elapsed * 1000:.1f}ms")
+
+
+def include_router(app: FastAPI, prefix: str, target: str, lazy: bool = False) -> None:
+    """
+    Include a router now, or lazily on its first request
+
+    Args:
+        app: Application
+        prefix: Path prefix the router serves
+        target: "module:attribute" of the APIRouter
+        lazy: Defer the import until the first request under prefix
+    """
+    if lazy:
+        app.router.routes.append(LazyRouter(app, prefix, target))
+        return
+    module_name, attribute = target.split(":")
+    app.include_router(getattr(importlib.import_module(module_name), attribute))
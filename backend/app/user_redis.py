@@ -3,7 +3,7 @@ User Profile API with Upstash Redis (Simplified)
 Fast deployment without PostgreSQL migrations
 """
 
-from fastapi import APIRouter, HTTPException, Header, Request
+from fastapi import APIRouter, HTTPException, Header, Request, Query
 from pydantic import BaseModel, EmailStr
 from typing import Optional
 from datetime import datetime
@@ -85,7 +85,7 @@ async def quick_register(request: QuickRegisterRequest):
     """
     
     # Register user
-    user = UserRedis.register(
+    user = await UserRedis.register(
         email=request.email,
         password=request.password,
         preferred_language=request.preferred_language,
@@ -119,7 +119,7 @@ async def quick_login(request: LoginRequest):
     - User profile with language preference
     """
     
-    user = UserRedis.login(request.email, request.password)
+    user = await UserRedis.login(request.email, request.password)
     
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
@@ -145,7 +145,7 @@ async def get_profile(email: str):
     Returns user profile with language preference
     """
     
-    user = UserRedis.get_profile(email)
+    user = await UserRedis.get_profile(email)
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -177,7 +177,7 @@ async def update_language(
     elif 'tablet' in user_agent.lower():
         device_type = 'tablet'
     
-    success = UserRedis.update_language(
+    success = await UserRedis.update_language(
         email=request.email,
         language=request.language,
         device_type=device_type
@@ -201,7 +201,7 @@ async def get_language_distribution():
     Returns analytics data for monitoring
     """
     
-    distribution = UserRedis.get_language_distribution()
+    distribution = await UserRedis.get_language_distribution()
     total_users = sum(distribution.values())
     
     return {
@@ -215,13 +215,18 @@ async def get_language_distribution():
 
 
 @router.get("/analytics/all-users")
-async def get_all_users():
-    """Get all registered user emails (for admin)"""
+async def get_all_users(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """Get registered user emails, newest first, one page at a time (for admin)"""
     
-    emails = UserRedis.get_all_users()
+    page = await UserRedis.get_all_users(offset=offset, limit=limit)
     
     return {
-        "total": len(emails),
-        "users": emails[:100]  # Limit to first 100
+        "total": page['total'],
+        "offset": offset,
+        "limit": limit,
+        "users": page['users']
     }
 
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 import os
 import sys
+import asyncio
 import logging
 
 # Add current directory to path
@@ -11,7 +12,8 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from database import SessionLocal
 import models
-from services import ssl_service
+from services import ssl_service, ssl_analytics, cached_queries
+from services.cache import cache
 from services.telegram_bot import send_telegram_alert
 
 logging.basicConfig(level=logging.INFO)
@@ -41,8 +43,38 @@ celery_app.conf.beat_schedule = {
         'task': 'celery_worker.cleanup_old_checks',
         'schedule': crontab(hour=2, minute=0),  # Daily at 2 AM
     },
+    'carry-forward-ssl-analytics': {
+        'task': 'celery_worker.carry_forward_ssl_analytics',
+        'schedule': crontab(hour=0, minute=30),  # Daily after midnight, between hourly checks
+    },
+    'rebuild-ssl-analytics': {
+        'task': 'celery_worker.rebuild_ssl_analytics',
+        'schedule': crontab(hour=2, minute=30),  # Daily at 2:30 AM
+    },
+    'reconcile-user-counters': {
+        'task': 'celery_worker.reconcile_user_counters',
+        'schedule': crontab(hour=3, minute=0),  # Daily at 3 AM
+    },
 }
 
+def publish_check_result(domain_id: int, ssl_status: dict):
+    """
+    Update cached SSL status and aggregates after a check is committed
+    
+    Cache failures are logged and never fail the check.
+    """
+    async def _publish():
+        try:
+            await cached_queries.on_check_recorded(domain_id, ssl_status)
+        finally:
+            # The connection pool is bound to this task's event loop
+            await cache.close()
+    
+    try:
+        asyncio.run(_publish())
+    except Exception as e:
+        logger.warning(f"Failed to update cache for domain {domain_id}: {str(e)}")
+
 @celery_app.task(name='celery_worker.check_domain_ssl')
 def check_domain_ssl(domain_id: int, domain_name: str):
     """
@@ -79,6 +111,13 @@ def check_domain_ssl(domain_id: int, domain_name: str):
         
         db.add(ssl_check)
         db.commit()
+        ssl_analytics.record_check(db, domain, ssl_check)
+        
+        # Write the new status through to the API cache
+        publish_check_result(
+            domain_id,
+            cached_queries.ssl_status_payload(domain.name, domain.alert_threshold_days, ssl_check)
+        )
         
         logger.info(f"SSL check saved for {domain_name}: valid={result.get('is_valid')}, expires_in={result.get('expires_in')}")
         
@@ -185,6 +224,73 @@ def cleanup_old_checks(days_to_keep: int = 90):
     finally:
         db.close()
 
+@celery_app.task(name='celery_worker.carry_forward_ssl_analytics')
+def carry_forward_ssl_analytics():
+    """
+    Seed today's analytics buckets with each domain's last known state (Celery task)
+    """
+    db = SessionLocal()
+    try:
+        today = datetime.utcnow().date()
+        carried = ssl_analytics.carry_forward(db, today)
+        logger.info(f"Carried {carried} domain states forward into {today}")
+        return {"status": "success", "day": today.isoformat(), "carried": carried}
+        
+    except Exception as e:
+        logger.error(f"Error carrying SSL analytics forward: {str(e)}")
+        db.rollback()
+        return {"status": "error", "error": str(e)}
+    finally:
+        db.close()
+
+@celery_app.task(name='celery_worker.rebuild_ssl_analytics')
+def rebuild_ssl_analytics(days: int = 2):
+    """
+    Rebuild recent analytics buckets from raw SSL checks (Celery task)
+    
+    Args:
+        days: Number of days to rebuild, ending today (use a large value to backfill)
+    """
+    db = SessionLocal()
+    try:
+        from datetime import timedelta
+        end_day = datetime.utcnow().date()
+        start_day = end_day - timedelta(days=days - 1)
+        processed = ssl_analytics.rebuild(db, start_day, end_day)
+        logger.info(f"Rebuilt SSL analytics for {start_day}..{end_day} from {processed} checks")
+        return {"status": "success", "start_day": start_day.isoformat(), "checks": processed}
+        
+    except Exception as e:
+        logger.error(f"Error rebuilding SSL analytics: {str(e)}")
+        db.rollback()
+        return {"status": "error", "error": str(e)}
+    finally:
+        db.close()
+
+@celery_app.task(name='celery_worker.reconcile_user_counters')
+def reconcile_user_counters():
+    """
+    Rebuild Redis user language counters and signup index from profiles (Celery task)
+    """
+    from services.user_redis import UserRedis
+    from services.redis_client import redis_client
+    
+    async def _reconcile():
+        try:
+            return await UserRedis.reconcile_counters()
+        finally:
+            # The HTTP session is bound to this task's event loop
+            await redis_client.close()
+    
+    try:
+        result = asyncio.run(_reconcile())
+        logger.info(f"Reconciled user counters: {result['users']} users, {result['distribution']}")
+        return {"status": "success", **result}
+        
+    except Exception as e:
+        logger.error(f"Error reconciling user counters: {str(e)}")
+        return {"status": "error", "error": str(e)}
+
 def send_alert(domain: str, days_left: int, alert_type: str = "expiring", error_msg: str = None):
     """
     Send alert notifications for SSL certificate issues
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, Float, Text, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -38,3 +38,34 @@ class SSLCheck(Base):
     def __repr__(self):
         return f"<SSLCheck(id={self.id}, domain_id={self.domain_id}, expires_in={self.expires_in})>"
 
+
+class SSLDomainDay(Base):
+    """Last known SSL state of a domain on a UTC day (carried forward until the next check)"""
+    __tablename__ = "ssl_domain_days"
+    __table_args__ = (UniqueConstraint("domain_id", "day", name="uq_ssl_domain_days_domain_day"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    domain_id = Column(Integer, ForeignKey("domains.id", ondelete="CASCADE"), nullable=False, index=True)
+    day = Column(Date, nullable=False, index=True)
+    state = Column(String(20), nullable=False)  # healthy, warning, critical, expired, error
+    issuer = Column(String(255), nullable=True)  # Issuer organization
+    expires_in = Column(Integer, nullable=True)
+    checked_at = Column(DateTime, nullable=True)  # Check the state comes from
+    
+    def __repr__(self):
+        return f"<SSLDomainDay(domain_id={self.domain_id}, day={self.day}, state='{self.state}')>"
+
+class SSLAnalyticsBucket(Base):
+    """Per-day counter for one value of one analytics dimension (state, issuer, expiry, checks)"""
+    __tablename__ = "ssl_analytics_buckets"
+    __table_args__ = (UniqueConstraint("day", "dimension", "key", name="uq_ssl_analytics_buckets_day_dimension_key"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False, index=True)
+    dimension = Column(String(20), nullable=False)
+    key = Column(String(255), nullable=False)
+    count = Column(Integer, default=0, nullable=False)
+    value_sum = Column(Float, default=0, nullable=False)  # e.g. summed expires_in for expiry buckets
+    
+    def __repr__(self):
+        return f"<SSLAnalyticsBucket(day={self.day}, dimension='{self.dimension}', key='{self.key}', count={self.count})>"
@@ -0,0 +1,338 @@
+"""
+Two-tier cache for SSL Monitor Pro
+
+An in-process LRU in front of Redis (async client with a connection
+pool), msgpack-encoded values, tag-based invalidation and per-namespace
+hit/miss metrics.
+
+Keys live in namespaces ("ssl_status", "domain_list", ...) and may carry
+tags. Invalidating a tag drops every key tagged with it in both tiers,
+e.g. invalidate_tags("domain:42") when a check for domain 42 lands.
+Every key is also tagged with its namespace ("ns:<namespace>").
+
+Other processes only learn about an invalidation through Redis, so the
+local tier keeps entries for at most CACHE_LOCAL_TTL seconds.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+import msgpack
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def _encode(value: Any) -> Any:
+    """msgpack fallback for types it does not know"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+
+def _pack(value: Any) -> bytes:
+    return msgpack.packb(value, default=_encode, use_bin_type=True)
+
+
+def _unpack(raw: bytes) -> Any:
+    return msgpack.unpackb(raw, raw=False)
+
+
+class _NamespaceMetrics:
+    """Hit/miss counters for one namespace"""
+
+    __slots__ = ("local_hits", "redis_hits", "misses", "sets", "invalidations", "errors")
+
+    def __init__(self):
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "sets": self.sets,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            "hit_rate": round((self.local_hits + self.redis_hits) / lookups * 100, 2) if lookups else 0.0,
+        }
+
+
+class TwoTierCache:
+    """In-process LRU + Redis cache with tags"""
+
+    def __init__(self):
+        self.redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        self.max_connections = int(os.getenv("CACHE_REDIS_MAX_CONNECTIONS", "20"))
+        self.local_ttl = float(os.getenv("CACHE_LOCAL_TTL", "5"))
+        self.local_max_entries = int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", "2048"))
+        self.key_prefix = "cache"
+
+        self._redis: Optional[aioredis.Redis] = None
+        # key -> (expires_at, value, tags)
+        self._local: "OrderedDict[str, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._local_tags: Dict[str, Set[str]] = defaultdict(set)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._metrics: Dict[str, _NamespaceMetrics] = defaultdict(_NamespaceMetrics)
+
+    @property
+    def redis(self) -> aioredis.Redis:
+        """Async Redis client over a shared connection pool (created lazily)"""
+        if self._redis is None:
+            pool = aioredis.ConnectionPool.from_url(self.redis_url, max_connections=self.max_connections)
+            self._redis = aioredis.Redis(connection_pool=pool)
+        return self._redis
+
+    async def close(self) -> None:
+        """Release the Redis connection pool (application shutdown)"""
+        if self._redis is not None:
+            await self._redis.close()
+            await self._redis.connection_pool.disconnect()
+            self._redis = None
+
+    def _key(self, namespace: str, key: Any) -> str:
+        return f"{self.key_prefix}:{namespace}:{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.key_prefix}:tag:{tag}"
+
+    # Local tier
+    def _local_get(self, full_key: str) -> Any:
+        entry = self._local.get(full_key)
+        if entry is None:
+            return _MISSING
+        if entry[0] < time.monotonic():
+            self._local_drop(full_key)
+            return _MISSING
+        self._local.move_to_end(full_key)
+        return entry[1]
+
+    def _local_set(self, full_key: str, value: Any, ttl: float, tags: Tuple[str, ...]) -> None:
+        self._local_drop(full_key)
+        self._local[full_key] = (time.monotonic() + min(ttl, self.local_ttl), value, tags)
+        for tag in tags:
+            self._local_tags[tag].add(full_key)
+        while len(self._local) > self.local_max_entries:
+            self._local_drop(next(iter(self._local)))
+
+    def _local_drop(self, full_key: str) -> None:
+        entry = self._local.pop(full_key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._local_tags.get(tag)
+            if keys is not None:
+                keys.discard(full_key)
+                if not keys:
+                    del self._local_tags[tag]
+
+    # Public API
+    async def get(self, namespace: str, key: Any) -> Any:
+        """
+        Get a cached value
+
+        Returns:
+            The value, or None on a miss
+        """
+        value = await self._lookup(namespace, self._key(namespace, key))
+        return None if value is _MISSING else value
+
+    async def _lookup(self, namespace: str, full_key: str) -> Any:
+        metrics = self._metrics[namespace]
+        value = self._local_get(full_key)
+        if value is not _MISSING:
+            metrics.local_hits += 1
+            return value
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.get(full_key)
+            pipe.ttl(full_key)
+            raw, ttl = await pipe.execute()
+        except Exception as e:
+            metrics.errors += 1
+            logger.warning(f"Cache read failed for {full_key}: {e}")
+            raw, ttl = None, 0
+
+        if raw is None:
+            metrics.misses += 1
+            return _MISSING
+
+        metrics.redis_hits += 1
+        stored = _unpack(raw)
+        value, tags = stored["v"], tuple(stored["t"])
+        if ttl and ttl > 0:
+            self._local_set(full_key, value, ttl, tags)
+        return value
+
+    async def set(
+        self,
+        namespace: str,
+        key: Any,
+        value: Any,
+        ttl: int,
+        tags: Iterable[str] = ()
+    ) -> None:
+        """
+        Store a value in both tiers
+
+        Args:
+            namespace: Cache namespace
+            key: Key within the namespace
+            value: msgpack-serializable value (datetimes become ISO strings)
+            ttl: Time to live in seconds
+            tags: Tags to invalidate the value by
+        """
+        full_key = self._key(namespace, key)
+        tags = tuple(dict.fromkeys((f"ns:{namespace}", *tags)))
+        metrics = self._metrics[namespace]
+        metrics.sets += 1
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.set(full_key, _pack({"v": value, "t": list(tags)}), ex=ttl)
+            for tag in tags:
+                tag_key = self._tag_key(tag)
+                pipe.sadd(tag_key, full_key)
+                # Tag set outlives its longest-lived member
+                pipe.expire(tag_key, ttl, nx=True)
+                pipe.expire(tag_key, ttl, gt=True)
+            await pipe.execute()
+        except Exception as e:
+            metrics.errors += 1
+            logger.warning(f"Cache write failed for {full_key}: {e}")
+
+        self._local_set(full_key, value, ttl, tags)
+
+    async def get_or_set(
+        self,
+        namespace: str,
+        key: Any,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        tags: Iterable[str] = (),
+        tags_for: Optional[Callable[[Any], Iterable[str]]] = None
+    ) -> Any:
+        """
+        Get a value, loading and caching it on a miss
+
+        Concurrent misses for the same key in this process share one load.
+        None results are not cached.
+
+        Args:
+            loader: Coroutine factory producing the value
+            tags: Static tags for the value
+            tags_for: Derives extra tags from the loaded value
+        """
+        full_key = self._key(namespace, key)
+        value = await self._lookup(namespace, full_key)
+        if value is not _MISSING:
+            return value
+
+        future = self._inflight.get(full_key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = future
+        try:
+            value = await loader()
+            if value is not None:
+                all_tags = list(tags) + (list(tags_for(value)) if tags_for else [])
+                await self.set(namespace, key, value, ttl, all_tags)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a failure nobody waited on is not logged as unhandled
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(full_key, None)
+
+    async def delete(self, namespace: str, key: Any) -> None:
+        """Drop one key from both tiers"""
+        full_key = self._key(namespace, key)
+        self._local_drop(full_key)
+        try:
+            await self.redis.delete(full_key)
+        except Exception as e:
+            self._metrics[namespace].errors += 1
+            logger.warning(f"Cache delete failed for {full_key}: {e}")
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        """
+        Drop every key carrying any of the tags from both tiers
+
+        Returns:
+            Number of Redis keys deleted
+        """
+        for tag in tags:
+            for full_key in list(self._local_tags.get(tag, ())):
+                self._local_drop(full_key)
+
+        try:
+            tag_keys = [self._tag_key(tag) for tag in tags]
+            pipe = self.redis.pipeline(transaction=False)
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            members = set()
+            for result in await pipe.execute():
+                members.update(result)
+            pipe = self.redis.pipeline(transaction=False)
+            if members:
+                pipe.delete(*members)
+            pipe.delete(*tag_keys)
+            results = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Cache invalidation failed for tags {tags}: {e}")
+            return 0
+
+        for full_key in members:
+            namespace = (full_key.decode() if isinstance(full_key, bytes) else full_key).split(":")[1]
+            self._metrics[namespace].invalidations += 1
+        return results[0] if members else 0
+
+    async def invalidate_namespace(self, namespace: str) -> int:
+        """Drop every key in a namespace"""
+        return await self.invalidate_tags(f"ns:{namespace}")
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-namespace hit/miss counters for this process"""
+        return {namespace: counters.as_dict() for namespace, counters in self._metrics.items()}
+
+    async def stats(self) -> Dict[str, Any]:
+        """Cache status, local tier size and per-namespace metrics"""
+        result = {
+            "local_entries": len(self._local),
+            "local_max_entries": self.local_max_entries,
+            "namespaces": self.metrics(),
+        }
+        try:
+            info = await self.redis.info("memory")
+            result["status"] = "enabled"
+            result["redis_used_memory"] = info.get("used_memory_human", "0B")
+        except Exception as e:
+            result["status"] = "degraded"
+            result["error"] = str(e)
+        return result
+
+
+# Global cache instance
+cache = TwoTierCache()
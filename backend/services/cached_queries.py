@@ -0,0 +1,273 @@
+"""
+Cached read paths for SSL Monitor Pro
+
+Expensive dashboard queries served through the two-tier cache. Entries
+are tagged so writes can invalidate exactly what they affect:
+
+- "domain:<id>": anything that includes that domain's data
+- "domains": anything aggregated over all domains
+
+Writers keep entries current instead of waiting for TTL expiry: after a
+check result is committed its SSL status is written through and the
+aggregates are invalidated (on_check_recorded), and domain CRUD drops
+what depends on the domain (on_domain_changed). That is why the TTLs
+below can be long.
+
+Database work runs in a worker thread so the event loop is never blocked
+by the synchronous session.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+import models
+from services import fleet_analytics
+from services.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Cache TTL settings (in seconds)
+CACHE_TTL = {
+    'ssl_status': 86400,    # 24 hours (written through on every check)
+    'domain_list': 3600,    # 1 hour
+    'statistics': 3600,     # 1 hour
+    'analytics': 3600,      # 1 hour
+}
+
+
+def domain_tags(domain_id: int) -> List[str]:
+    """Tags to invalidate when a domain or one of its checks changes"""
+    return [f"domain:{domain_id}", "domains"]
+
+
+async def invalidate_domain(domain_id: int) -> int:
+    """Drop every cached result that depends on a domain"""
+    return await cache.invalidate_tags(*domain_tags(domain_id))
+
+
+def ssl_status_payload(domain_name: str, alert_threshold_days: int, check: Any) -> Dict[str, Any]:
+    """SSL status entry from a domain and its latest check (row or SSLCheck)"""
+    return {
+        "domain_name": domain_name,
+        "alert_threshold_days": alert_threshold_days,
+        "expires_in": check.expires_in,
+        "is_valid": check.is_valid,
+        "checked_at": check.checked_at.isoformat() if check.checked_at else None,
+        "issuer": check.issuer,
+        "subject": check.subject,
+        "not_valid_after": check.not_valid_after.isoformat() if check.not_valid_after else None,
+        "error_message": check.error_message
+    }
+
+
+async def on_check_recorded(domain_id: int, ssl_status: Dict[str, Any]) -> None:
+    """
+    Write-through after a check result is committed
+
+    Replaces the domain's cached SSL status with the new result and drops
+    the aggregates (domain list, statistics, analytics) that include it.
+
+    Args:
+        domain_id: Checked domain
+        ssl_status: New status from ssl_status_payload (built by the caller,
+            so no ORM attribute is loaded on the event loop)
+    """
+    await cache.set(
+        'ssl_status',
+        domain_id,
+        ssl_status,
+        ttl=CACHE_TTL['ssl_status'],
+        tags=[f"domain:{domain_id}"]
+    )
+    await cache.invalidate_tags("domains")
+
+
+async def on_domain_changed(domain_id: Optional[int] = None) -> None:
+    """
+    Invalidate after a domain is created, updated or deleted
+
+    Args:
+        domain_id: Changed domain (None for a new domain, which has no
+            entries of its own yet)
+    """
+    if domain_id is None:
+        await cache.invalidate_tags("domains")
+    else:
+        await invalidate_domain(domain_id)
+
+
+def _load_domain_ssl_status(db: Session, domain_id: int) -> Optional[Dict[str, Any]]:
+    result = db.execute(text("""
+        SELECT d.name, d.alert_threshold_days, sc.expires_in, sc.is_valid, sc.checked_at,
+               sc.issuer, sc.subject, sc.not_valid_after, sc.error_message
+        FROM domains d
+        LEFT JOIN LATERAL (
+            SELECT expires_in, is_valid, checked_at, issuer, subject, not_valid_after, error_message
+            FROM ssl_checks
+            WHERE domain_id = d.id
+            ORDER BY checked_at DESC
+            LIMIT 1
+        ) sc ON true
+        WHERE d.id = :domain_id
+    """), {"domain_id": domain_id}).fetchone()
+
+    if not result:
+        return None
+    return ssl_status_payload(result.name, result.alert_threshold_days, result)
+
+
+async def get_domain_ssl_status(db: Session, domain_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Get the latest SSL status of a domain
+
+    Returns:
+        Status dict (check fields are None if never checked), or None if
+        the domain does not exist
+    """
+    return await cache.get_or_set(
+        'ssl_status',
+        domain_id,
+        lambda: asyncio.to_thread(_load_domain_ssl_status, db, domain_id),
+        ttl=CACHE_TTL['ssl_status'],
+        tags=[f"domain:{domain_id}"]
+    )
+
+
+def _load_domain_list(db: Session, limit: int) -> List[Dict[str, Any]]:
+    results = db.execute(text("""
+        SELECT d.id, d.name, d.is_active, d.alert_threshold_days, d.created_at,
+               sc.expires_in, sc.is_valid, sc.checked_at
+        FROM (
+            SELECT * FROM domains ORDER BY created_at DESC LIMIT :limit
+        ) d
+        LEFT JOIN LATERAL (
+            SELECT expires_in, is_valid, checked_at
+            FROM ssl_checks
+            WHERE domain_id = d.id
+            ORDER BY checked_at DESC
+            LIMIT 1
+        ) sc ON true
+        ORDER BY d.created_at DESC
+    """), {"limit": limit}).fetchall()
+
+    return [
+        {
+            "id": result.id,
+            "name": result.name,
+            "is_active": result.is_active,
+            "alert_threshold_days": result.alert_threshold_days,
+            "created_at": result.created_at.isoformat(),
+            "ssl_status": {
+                "expires_in": result.expires_in,
+                "is_valid": result.is_valid,
+                "checked_at": result.checked_at.isoformat() if result.checked_at else None
+            }
+        }
+        for result in results
+    ]
+
+
+async def get_domain_list(db: Session, user_id: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+    """Get the newest domains with their latest SSL status"""
+    return await cache.get_or_set(
+        'domain_list',
+        f"{user_id}:{limit}",
+        lambda: asyncio.to_thread(_load_domain_list, db, limit),
+        ttl=CACHE_TTL['domain_list'],
+        tags=["domains"],
+        tags_for=lambda domains: [f"domain:{domain['id']}" for domain in domains]
+    )
+
+
+def _load_statistics(db: Session) -> Dict[str, Any]:
+    total_domains = db.query(models.Domain).count()
+    active_domains = db.query(models.Domain).filter(models.Domain.is_active == True).count()
+
+    # Latest check of each domain as arrays; counts are vectorized
+    latest = fleet_analytics.fetch_latest_checks(db, active_only=False)
+    expires_in = latest.expires_in
+
+    return {
+        "total_domains": total_domains,
+        "active_domains": active_domains,
+        "domains_with_errors": int(np.count_nonzero(~latest.is_valid)),
+        "domains_expiring_soon": int(np.count_nonzero(latest.is_valid & (expires_in > 0) & (expires_in <= 30))),
+        "domains_expired": int(np.count_nonzero(expires_in <= 0)),
+        "generated_at": datetime.utcnow().isoformat()
+    }
+
+
+async def get_statistics(db: Session) -> Dict[str, Any]:
+    """Get fleet-wide monitoring statistics"""
+    return await cache.get_or_set(
+        'statistics',
+        'all',
+        lambda: asyncio.to_thread(_load_statistics, db),
+        ttl=CACHE_TTL['statistics'],
+        tags=["domains"]
+    )
+
+
+def _parse_period(period: str) -> int:
+    """Parse period string to days"""
+    period_map = {
+        '1d': 1,
+        '7d': 7,
+        '30d': 30,
+        '90d': 90,
+        '1y': 365
+    }
+    return period_map.get(period, 30)
+
+
+def _load_analytics_data(db: Session, period: str) -> Dict[str, Any]:
+    start_date = datetime.utcnow() - timedelta(days=_parse_period(period))
+    results = db.execute(text("""
+        SELECT DATE(checked_at) as date,
+               COUNT(CASE WHEN is_valid = true AND expires_in > 30 THEN 1 END) as healthy,
+               COUNT(CASE WHEN is_valid = true AND expires_in <= 30 AND expires_in > 7 THEN 1 END) as warning,
+               COUNT(CASE WHEN is_valid = true AND expires_in <= 7 AND expires_in > 0 THEN 1 END) as critical,
+               COUNT(CASE WHEN expires_in <= 0 THEN 1 END) as expired
+        FROM ssl_checks
+        WHERE checked_at >= :start_date
+        GROUP BY DATE(checked_at)
+        ORDER BY date
+    """), {"start_date": start_date}).fetchall()
+
+    return {
+        "ssl_trends": [
+            {
+                "date": result.date.isoformat(),
+                "healthy_domains": result.healthy,
+                "warning_domains": result.warning,
+                "critical_domains": result.critical,
+                "expired_domains": result.expired,
+                "error_domains": 0
+            }
+            for result in results
+        ],
+        "period": period,
+        "generated_at": datetime.utcnow().isoformat()
+    }
+
+
+async def get_analytics_data(db: Session, period: str = '30d') -> Dict[str, Any]:
+    """Get daily check trends for a period"""
+    return await cache.get_or_set(
+        'analytics',
+        period,
+        lambda: asyncio.to_thread(_load_analytics_data, db, period),
+        ttl=CACHE_TTL['analytics'],
+        tags=["domains"]
+    )
+
+
+async def get_cache_stats() -> Dict[str, Any]:
+    """Cache status and per-namespace hit/miss metrics"""
+    return await cache.stats()
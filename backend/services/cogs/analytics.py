@@ -5,7 +5,7 @@ Analytics Cog - Analytics and statistics commands
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import Dict
 
 import discord
 from discord.ext import commands
@@ -13,6 +13,7 @@ from sqlalchemy.orm import Session
 
 from ...database import get_db
 from ...models import Domain, NotificationSettings
+from ..fleet_analytics import FleetColumns, analyze, fetch_latest_checks, urgent_domains
 
 logger = logging.getLogger(__name__)
 
@@ -138,9 +139,9 @@ class AnalyticsCog(commands.Cog):
         try:
             db: Session = next(get_db())
             
-            domains = db.query(Domain).filter(Domain.is_active == True).all()
+            latest = fetch_latest_checks(db, active_only=True)
             
-            if not domains:
+            if not len(latest):
                 embed = discord.Embed(
                     title="🏥 SSL Health Summary",
                     description="No domains are currently being monitored.",
@@ -150,7 +151,7 @@ class AnalyticsCog(commands.Cog):
                 return
             
             # Analyze SSL health
-            health_data = self.analyze_ssl_health(domains)
+            health_data = self.analyze_ssl_health(latest)
             
             embed = discord.Embed(
                 title="🏥 SSL Health Summary",
@@ -176,6 +177,17 @@ class AnalyticsCog(commands.Cog):
                 inline=True
             )
             
+            forecast = health_data['expiry_forecast']
+            embed.add_field(
+                name="⏳ Expiry Forecast",
+                value=(
+                    f"**Next 7 days:** {forecast['7d']}\n"
+                    f"**Next 30 days:** {forecast['30d']}\n"
+                    f"**Next 90 days:** {forecast['90d']}"
+                ),
+                inline=True
+            )
+            
             # Add recommendations
             if health_data['recommendations']:
                 embed.add_field(
@@ -352,38 +364,29 @@ class AnalyticsCog(commands.Cog):
         finally:
             db.close()
     
-    def analyze_ssl_health(self, domains: List[Domain]) -> Dict:
-        """Analyze SSL health across all domains"""
-        total_domains = len(domains)
-        healthy_count = 0
-        warning_count = 0
-        critical_count = 0
-        expired_count = 0
-        
-        recommendations = []
+    def analyze_ssl_health(self, latest: FleetColumns) -> Dict:
+        """Analyze SSL health across all domains (latest check per domain)"""
+        analysis = analyze(latest, threshold_days=30)
+        counts = analysis['state_counts']
+        total_domains = analysis['total_domains']
+        healthy_count = counts['healthy']
+        warning_count = counts['warning']
+        critical_count = counts['critical']
+        expired_count = counts['expired'] + counts['error']
         
-        for domain in domains:
-            if domain.ssl_status:
-                ssl_info = json.loads(domain.ssl_status)
-                expires_in = ssl_info.get('expires_in', 0)
-                
-                if expires_in <= 0:
-                    expired_count += 1
-                    recommendations.append(f"Renew certificate for {domain.name}")
-                elif expires_in <= 7:
-                    critical_count += 1
-                    recommendations.append(f"Urgent: Renew certificate for {domain.name}")
-                elif expires_in <= 30:
-                    warning_count += 1
-                    recommendations.append(f"Plan renewal for {domain.name}")
-                else:
-                    healthy_count += 1
+        # Most urgent first; only the top few are ever shown
+        actions = {
+            'expired': "Renew certificate for {}",
+            'error': "Renew certificate for {}",
+            'critical': "Urgent: Renew certificate for {}",
+            'warning': "Plan renewal for {}",
+        }
+        recommendations = [
+            actions[domain['state']].format(domain['domain'])
+            for domain in urgent_domains(latest, analysis, limit=10)
+        ]
         
-        # Calculate overall health score
-        if total_domains > 0:
-            overall_score = ((healthy_count + warning_count) / total_domains) * 100
-        else:
-            overall_score = 0
+        overall_score = analysis['health_score']
         
         # Determine health status
         if overall_score >= 90:
@@ -408,7 +411,8 @@ class AnalyticsCog(commands.Cog):
             'overall_score': overall_score,
             'health_status': health_status,
             'recommendations': recommendations,
-            'trend': trend
+            'trend': trend,
+            'expiry_forecast': analysis['expiry_forecast']
         }
     
     def get_status_emoji(self, expires_in: int) -> str:
@@ -1,20 +1,32 @@
 """
 Discord Bot Service for SSL Monitor Pro
+
+Not wired up in this tree: nothing starts the bot, discord.py is not a
+dependency, the cogs in services/cogs are loaded as 'cogs.*' (which does
+not resolve from backend/) and still use relative imports, and there is no
+NotificationSettings model (per-domain Discord channel, role and
+discord_enabled), so the module does not import as is.
 """
 
+import os
 import asyncio
-import json
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 import discord
 from discord.ext import commands, tasks
 import aiohttp
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from ..database import get_db
-from ..models import Domain, User, NotificationSettings
-from ..config import settings
+from database import SessionLocal
+from models import Domain, SSLCheck, NotificationSettings
+from services.ssl_service import check_ssl_certificate
+
+# Sweep tuning: reuse pipeline results younger than the max age (the
+# pipeline checks hourly); only domains without one are scanned here
+SWEEP_CONCURRENCY = int(os.getenv("DISCORD_SWEEP_CONCURRENCY", "10"))
+SWEEP_MAX_RESULT_AGE = timedelta(minutes=int(os.getenv("DISCORD_SWEEP_MAX_RESULT_AGE_MINUTES", "90")))
 
 logger = logging.getLogger(__name__)
 
@@ -34,13 +46,15 @@ class SSLMonitorBot(commands.Bot):
             description="SSL Monitor Pro - Professional SSL certificate monitoring bot"
         )
         
-        self.db_session = next(get_db())
         self.initial_extensions = [
             'cogs.ssl_monitor',
             'cogs.server_management',
             'cogs.analytics',
             'cogs.notifications'
         ]
+        
+        # Domain id -> checked_at of the last result notifications were sent for
+        self._notified_results: Dict[int, datetime] = {}
     
     async def setup_hook(self):
         """Called when the bot is starting up"""
@@ -141,94 +155,181 @@ class SSLMonitorBot(commands.Bot):
             logger.error(f"Error in cleanup task: {e}")
     
     async def check_ssl_certificates(self):
-        """Check SSL certificates for all monitored domains"""
+        """
+        Check SSL certificates for all monitored domains
+        
+        Reuses the latest result of the main check pipeline for each domain;
+        only domains without a recent result are scanned, in worker threads
+        with bounded concurrency. Database work uses a session per sweep in
+        a worker thread, so the event loop (commands, gateway heartbeats)
+        is never blocked.
+        """
         try:
-            domains = self.db_session.query(Domain).filter(Domain.is_active == True).all()
+            domains, latest, settings_by_domain = await asyncio.to_thread(self._load_sweep)
             
-            for domain in domains:
-                try:
-                    # Check SSL certificate
-                    ssl_info = await self.get_ssl_info(domain.name)
-                    
+            # Scan domains the pipeline has no recent result for
+            cutoff = datetime.utcnow() - SWEEP_MAX_RESULT_AGE
+            stale = [domain for domain in domains if domain.id not in latest or latest[domain.id]['checked_at'] < cutoff]
+            if stale:
+                semaphore = asyncio.Semaphore(SWEEP_CONCURRENCY)
+                
+                async def scan(domain: Domain):
+                    async with semaphore:
+                        return domain.id, await self.get_ssl_info(domain.name)
+                
+                for domain_id, ssl_info in await asyncio.gather(*(scan(domain) for domain in stale)):
                     if ssl_info:
-                        # Update domain with new SSL info
-                        domain.ssl_status = json.dumps(ssl_info)
-                        domain.last_checked = datetime.utcnow()
-                        
-                        # Check if we need to send notifications
-                        await self.check_notification_triggers(domain, ssl_info)
-                    
-                except Exception as e:
-                    logger.error(f"Error checking domain {domain.name}: {e}")
+                        ssl_info['checked_at'] = datetime.fromisoformat(ssl_info['checked_at'])
+                        latest[domain_id] = ssl_info
+                    else:
+                        latest.pop(domain_id, None)
             
-            self.db_session.commit()
+            # Forget domains that are gone or inactive
+            active_ids = {domain.id for domain in domains}
+            self._notified_results = {
+                domain_id: checked_at for domain_id, checked_at in self._notified_results.items()
+                if domain_id in active_ids
+            }
+            
+            for domain in domains:
+                ssl_info = latest.get(domain.id)
+                # Failed checks carry no certificate data to alert on
+                if not ssl_info or ssl_info.get('error') or not ssl_info.get('not_valid_after'):
+                    continue
+                
+                # Notify once per check result, not on every sweep
+                checked_at = ssl_info['checked_at']
+                if self._notified_results.get(domain.id) == checked_at:
+                    continue
+                self._notified_results[domain.id] = checked_at
+                
+                await self.check_notification_triggers(
+                    domain,
+                    {**ssl_info, 'checked_at': checked_at.isoformat()},
+                    settings_by_domain.get(domain.id)
+                )
+            
+            logger.info(f"SSL sweep: {len(domains)} domains, {len(stale)} scanned, {len(domains) - len(stale)} reused")
             
         except Exception as e:
             logger.error(f"Error in SSL certificate check: {e}")
     
+    def _load_sweep(self):
+        """
+        Load active domains, their latest pipeline results and notification
+        settings in one short-lived session (runs in a worker thread)
+        
+        Returns:
+            Tuple of (domains, latest results by domain id, settings by domain id)
+        """
+        db: Session = SessionLocal()
+        try:
+            domains = db.query(Domain).filter(Domain.is_active == True).all()
+            
+            rows = db.execute(
+                select(SSLCheck).join(
+                    Domain, Domain.id == SSLCheck.domain_id
+                ).where(
+                    Domain.is_active == True
+                ).distinct(
+                    SSLCheck.domain_id
+                ).order_by(SSLCheck.domain_id, SSLCheck.checked_at.desc())
+            ).scalars().all()
+            latest = {
+                check.domain_id: {
+                    'is_valid': check.is_valid,
+                    'expires_in': check.expires_in,
+                    'issuer': check.issuer,
+                    'subject': check.subject,
+                    'not_valid_after': check.not_valid_after.isoformat() if check.not_valid_after else None,
+                    'not_valid_before': check.not_valid_before.isoformat() if check.not_valid_before else None,
+                    'checked_at': check.checked_at,
+                    'error': check.error_message
+                }
+                for check in rows
+            }
+            
+            settings_by_domain = {
+                notification_settings.domain_id: notification_settings
+                for notification_settings in db.query(NotificationSettings).filter(
+                    NotificationSettings.domain_id.in_([domain.id for domain in domains])
+                )
+            }
+            
+            # Detach so the objects stay readable after the session closes
+            db.expunge_all()
+            return domains, latest, settings_by_domain
+        finally:
+            db.close()
+    
     async def get_ssl_info(self, domain: str) -> Optional[Dict]:
-        """Get SSL certificate information for a domain"""
+        """Get SSL certificate information for a domain (blocking work runs in a thread)"""
         try:
-            import ssl
-            import socket
-            from cryptography import x509
-            from cryptography.hazmat.backends import default_backend
+            result = await asyncio.to_thread(check_ssl_certificate, domain)
+            if result.get('error'):
+                logger.error(f"Error getting SSL info for {domain}: {result['error']}")
+                return None
             
-            # Connect to domain
-            context = ssl.create_default_context()
-            with socket.create_connection((domain, 443), timeout=10) as sock:
-                with context.wrap_socket(sock, server_hostname=domain) as ssock:
-                    cert_der = ssock.getpeercert_chain()[0]
-                    cert = x509.load_der_x509_certificate(cert_der, default_backend())
-                    
-                    # Extract certificate information
-                    not_after = cert.not_valid_after
-                    not_before = cert.not_valid_before
-                    issuer = cert.issuer.rfc4514_string()
-                    subject = cert.subject.rfc4514_string()
-                    
-                    # Calculate days until expiry
-                    days_until_expiry = (not_after - datetime.utcnow()).days
-                    
-                    return {
-                        'is_valid': days_until_expiry > 0,
-                        'expires_in': days_until_expiry,
-                        'issuer': issuer,
-                        'subject': subject,
-                        'not_valid_after': not_after.isoformat(),
-                        'not_valid_before': not_before.isoformat(),
-                        'checked_at': datetime.utcnow().isoformat()
-                    }
+            return {
+                'is_valid': result['expires_in'] > 0,
+                'expires_in': result['expires_in'],
+                'issuer': result['issuer'],
+                'subject': result['subject'],
+                'not_valid_after': result['not_valid_after'].isoformat(),
+                'not_valid_before': result['not_valid_before'].isoformat(),
+                'checked_at': datetime.utcnow().isoformat()
+            }
                     
         except Exception as e:
             logger.error(f"Error getting SSL info for {domain}: {e}")
             return None
     
-    async def check_notification_triggers(self, domain: Domain, ssl_info: Dict):
-        """Check if we need to send notifications for a domain"""
+    async def check_notification_triggers(self, domain: Domain, ssl_info: Dict,
+                                          notification_settings: Optional[NotificationSettings] = None):
+        """
+        Check if we need to send notifications for a domain
+        
+        Args:
+            domain: Domain the result belongs to
+            ssl_info: Certificate information
+            notification_settings: Preloaded settings (looked up if not given)
+        """
         try:
             expires_in = ssl_info.get('expires_in', 0)
             
             # Get notification settings for this domain
-            notification_settings = self.db_session.query(NotificationSettings).filter(
-                NotificationSettings.domain_id == domain.id
-            ).first()
+            if notification_settings is None:
+                notification_settings = await asyncio.to_thread(self._load_notification_settings, domain.id)
             
             if not notification_settings:
                 return
             
             # Check notification triggers
             if expires_in <= 0:
-                await self.send_ssl_expired_notification(domain, ssl_info)
+                await self.send_ssl_expired_notification(domain, ssl_info, notification_settings)
             elif expires_in <= 7:
-                await self.send_ssl_critical_notification(domain, ssl_info)
+                await self.send_ssl_critical_notification(domain, ssl_info, notification_settings)
             elif expires_in <= 30:
-                await self.send_ssl_warning_notification(domain, ssl_info)
+                await self.send_ssl_warning_notification(domain, ssl_info, notification_settings)
             
         except Exception as e:
             logger.error(f"Error checking notification triggers for {domain.name}: {e}")
     
-    async def send_ssl_expired_notification(self, domain: Domain, ssl_info: Dict):
+    def _load_notification_settings(self, domain_id: int) -> Optional[NotificationSettings]:
+        """Load a domain's notification settings in a short-lived session (worker thread)"""
+        db: Session = SessionLocal()
+        try:
+            notification_settings = db.query(NotificationSettings).filter(
+                NotificationSettings.domain_id == domain_id
+            ).first()
+            if notification_settings is not None:
+                db.expunge(notification_settings)
+            return notification_settings
+        finally:
+            db.close()
+    
+    async def send_ssl_expired_notification(self, domain: Domain, ssl_info: Dict,
+                                            notification_settings: Optional[NotificationSettings] = None):
         """Send SSL expired notification"""
         embed = self.create_ssl_alert_embed(
             title="🚨 SSL Certificate Expired",
@@ -238,9 +339,10 @@ class SSLMonitorBot(commands.Bot):
             ssl_info=ssl_info
         )
         
-        await self.send_notification(domain, embed, priority="critical")
+        await self.send_notification(domain, embed, priority="critical", notification_settings=notification_settings)
     
-    async def send_ssl_critical_notification(self, domain: Domain, ssl_info: Dict):
+    async def send_ssl_critical_notification(self, domain: Domain, ssl_info: Dict,
+                                             notification_settings: Optional[NotificationSettings] = None):
         """Send SSL critical notification"""
         expires_in = ssl_info.get('expires_in', 0)
         
@@ -252,9 +354,10 @@ class SSLMonitorBot(commands.Bot):
             ssl_info=ssl_info
         )
         
-        await self.send_notification(domain, embed, priority="high")
+        await self.send_notification(domain, embed, priority="high", notification_settings=notification_settings)
     
-    async def send_ssl_warning_notification(self, domain: Domain, ssl_info: Dict):
+    async def send_ssl_warning_notification(self, domain: Domain, ssl_info: Dict,
+                                            notification_settings: Optional[NotificationSettings] = None):
         """Send SSL warning notification"""
         expires_in = ssl_info.get('expires_in', 0)
         
@@ -266,7 +369,7 @@ class SSLMonitorBot(commands.Bot):
             ssl_info=ssl_info
         )
         
-        await self.send_notification(domain, embed, priority="medium")
+        await self.send_notification(domain, embed, priority="medium", notification_settings=notification_settings)
     
     def create_ssl_alert_embed(self, title: str, description: str, color: int, 
                               domain: Domain, ssl_info: Dict) -> discord.Embed:
@@ -312,13 +415,13 @@ class SSLMonitorBot(commands.Bot):
         
         return embed
     
-    async def send_notification(self, domain: Domain, embed: discord.Embed, priority: str = "medium"):
+    async def send_notification(self, domain: Domain, embed: discord.Embed, priority: str = "medium",
+                                notification_settings: Optional[NotificationSettings] = None):
         """Send notification to configured Discord channel"""
         try:
             # Get notification settings
-            notification_settings = self.db_session.query(NotificationSettings).filter(
-                NotificationSettings.domain_id == domain.id
-            ).first()
+            if notification_settings is None:
+                notification_settings = await asyncio.to_thread(self._load_notification_settings, domain.id)
             
             if not notification_settings or not notification_settings.discord_enabled:
                 return
@@ -371,9 +474,6 @@ class SSLMonitorBot(commands.Bot):
         self.ssl_monitor_task.cancel()
         self.cleanup_task.cancel()
         
-        # Close database session
-        self.db_session.close()
-        
         await super().close()
 
 # Create bot instance
@@ -382,7 +482,7 @@ bot = SSLMonitorBot()
 async def start_bot():
     """Start the Discord bot"""
     try:
-        await bot.start(settings.DISCORD_BOT_TOKEN)
+        await bot.start(os.getenv("DISCORD_BOT_TOKEN"))
     except Exception as e:
         logger.error(f"Failed to start Discord bot: {e}")
 
@@ -17,6 +17,8 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 from sqlalchemy.orm import Session
 
+from services.template_registry import template_registry
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -66,8 +68,8 @@ class EnhancedSlackIntegration:
             'cs': 'Čeština'
         }
         
-        # Notification templates by language
-        self.templates = self._load_templates()
+        # Notification templates by language (loaded and compiled once per process)
+        self.templates = template_registry.load_channel('slack', self._load_templates)
         
         if not all([self.client_id, self.client_secret, self.signing_secret]):
             logger.warning("Slack integration disabled: Missing configuration")
@@ -150,7 +152,7 @@ class EnhancedSlackIntegration:
     ) -> bool:
         """Send rich Slack notification with blocks"""
         try:
-            template = self.templates.get(language, self.templates['en']).get(notification_type)
+            template = template_registry.get('slack', notification_type, language)
             if not template:
                 logger.warning(f"No template found for {notification_type} in language {language}")
                 return False
@@ -166,8 +168,8 @@ class EnhancedSlackIntegration:
                 'currency': kwargs.get('currency', 'EUR')
             }
             
-            # Create rich message
-            blocks = self._create_notification_blocks(template, message_data)
+            # Render rich message (static header/footer blocks are shared)
+            blocks = template.render(**message_data)
             
             # Send message
             return await self._send_slack_message(channel, blocks)
@@ -176,59 +178,6 @@ class EnhancedSlackIntegration:
             logger.error(f"Error sending rich Slack notification: {e}")
             return False
     
-    def _create_notification_blocks(self, template: Dict[str, Any], data: Dict[str, str]) -> List[Dict[str, Any]]:
-        """Create Slack blocks for notification"""
-        blocks = [
-            {
-                "type": "header",
-                "text": {
-                    "type": "plain_text",
-                    "text": template['title']
-                }
-            },
-            {
-                "type": "section",
-                "fields": []
-            }
-        ]
-        
-        # Add fields
-        for field in template['fields']:
-            field_value = field['value'].format(**data)
-            blocks[1]['fields'].append({
-                "type": "mrkdwn",
-                "text": f"*{field['title']}:*\n{field_value}"
-            })
-        
-        # Add divider
-        blocks.append({"type": "divider"})
-        
-        # Add action buttons
-        blocks.append({
-            "type": "actions",
-            "elements": [
-                {
-                    "type": "button",
-                    "text": {
-                        "type": "plain_text",
-                        "text": "View Dashboard"
-                    },
-                    "url": "https://cloudsre.xyz/dashboard",
-                    "style": "primary"
-                },
-                {
-                    "type": "button",
-                    "text": {
-                        "type": "plain_text",
-                        "text": "Manage Domains"
-                    },
-                    "url": "https://cloudsre.xyz/dashboard#domains"
-                }
-            ]
-        })
-        
-        return blocks
-    
     async def send_interactive_notification(
         self,
         channel: str,
@@ -18,6 +18,8 @@ from dataclasses import dataclass
 import requests
 from sqlalchemy.orm import Session
 
+from services.template_registry import template_registry
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -57,8 +59,8 @@ class EnhancedTelegramBot:
             'cs': 'Čeština'
         }
         
-        # Notification templates by language
-        self.templates = self._load_templates()
+        # Notification templates by language (loaded and compiled once per process)
+        self.templates = template_registry.load_channel('telegram', self._load_templates)
         
         if not self.enabled:
             logger.warning("Enhanced Telegram bot disabled: TELEGRAM_BOT_TOKEN not set")
@@ -252,7 +254,7 @@ Use the dashboard to manage domains:
         await self._update_user_language(user_id, language)
         
         language_name = self.languages[language]
-        message = self.templates.get(language, self.templates['en'])['language_changed'].format(language=language_name)
+        message = template_registry.render('telegram', 'language_changed', language, language=language_name)
         await self._send_message(chat_id, message)
     
     async def _toggle_notifications(self, chat_id: int, user_id: int):
@@ -393,14 +395,10 @@ Use the dashboard to manage domains:
         if self._is_quiet_time(user):
             return False  # Skip notification during quiet hours
         
-        language = user.language
-        template = self.templates.get(language, self.templates['en']).get(notification_type)
-        
-        if not template:
-            logger.warning(f"No template found for {notification_type} in language {language}")
+        message = template_registry.render('telegram', notification_type, user.language, **kwargs)
+        if message is None:
             return False
         
-        message = template.format(**kwargs)
         return await self._send_message(user.telegram_id, message)
     
     def _is_quiet_time(self, user: TelegramUser) -> bool:
@@ -0,0 +1,170 @@
+"""
+Fleet analytics core
+
+Pulls the latest check of every domain as column arrays and computes
+state counts, expiry histograms, percentiles, health scores and expiry
+forecasts with NumPy in one pass, instead of looping over ORM objects.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+import logging
+
+from models import Domain, SSLCheck
+
+logger = logging.getLogger(__name__)
+
+STATES = np.array(["healthy", "warning", "critical", "expired", "error"])
+HEALTHY, WARNING, CRITICAL, EXPIRED, ERROR = range(len(STATES))
+
+# Expiry histogram edges in days: [<=0, 1-7, 8-14, 15-30, 31-60, 61-90, 91+]
+EXPIRY_EDGES = np.array([0, 7, 14, 30, 60, 90])
+EXPIRY_LABELS = ["expired", "1-7d", "8-14d", "15-30d", "31-60d", "61-90d", "90d+"]
+FORECAST_DAYS = np.array([7, 14, 30, 60, 90])
+PERCENTILES = np.array([5, 25, 50, 75, 95])
+
+
+@dataclass
+class FleetColumns:
+    """Latest check of each domain, column-wise"""
+    domain_ids: np.ndarray
+    names: np.ndarray
+    expires_in: np.ndarray  # float days, NaN when unknown
+    is_valid: np.ndarray  # bool
+    has_error: np.ndarray  # bool
+    checked_at: np.ndarray  # datetime64[s]
+    threshold_days: np.ndarray  # per-domain alert threshold
+    response_time_ms: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.domain_ids)
+
+
+def fetch_latest_checks(db: Session, active_only: bool = True) -> FleetColumns:
+    """
+    Fetch the latest check per domain as arrays
+
+    Args:
+        db: Database session
+        active_only: Only include active domains
+
+    Returns:
+        FleetColumns (domains never checked are not included)
+    """
+    query = select(
+        SSLCheck.domain_id,
+        Domain.name,
+        SSLCheck.expires_in,
+        SSLCheck.is_valid,
+        SSLCheck.error_message.isnot(None),
+        SSLCheck.checked_at,
+        Domain.alert_threshold_days
+    ).join(
+        Domain, Domain.id == SSLCheck.domain_id
+    ).distinct(
+        SSLCheck.domain_id
+    ).order_by(SSLCheck.domain_id, SSLCheck.checked_at.desc())
+    if active_only:
+        query = query.where(Domain.is_active == True)
+
+    rows = db.execute(query).all()
+    if not rows:
+        return FleetColumns(
+            domain_ids=np.empty(0, dtype=np.int64),
+            names=np.empty(0, dtype=object),
+            expires_in=np.empty(0, dtype=np.float64),
+            is_valid=np.empty(0, dtype=bool),
+            has_error=np.empty(0, dtype=bool),
+            checked_at=np.empty(0, dtype="datetime64[s]"),
+            threshold_days=np.empty(0, dtype=np.float64)
+        )
+
+    domain_ids, names, expires_in, is_valid, has_error, checked_at, thresholds = zip(*rows)
+    return FleetColumns(
+        domain_ids=np.asarray(domain_ids, dtype=np.int64),
+        names=np.asarray(names, dtype=object),
+        expires_in=np.asarray([np.nan if value is None else value for value in expires_in], dtype=np.float64),
+        is_valid=np.asarray(is_valid, dtype=bool),
+        has_error=np.asarray(has_error, dtype=bool),
+        checked_at=np.asarray(checked_at, dtype="datetime64[s]"),
+        threshold_days=np.asarray([30 if value is None else value for value in thresholds], dtype=np.float64)
+    )
+
+
+def classify(expires_in: np.ndarray, is_valid: np.ndarray, has_error: np.ndarray, threshold_days) -> np.ndarray:
+    """Per-domain state index (HEALTHY..ERROR)"""
+    known = ~np.isnan(expires_in)
+    days = np.where(known, expires_in, 0)
+    return np.select(
+        [has_error, ~is_valid | ~known | (days <= 0), days > threshold_days, days > 7],
+        [ERROR, EXPIRED, HEALTHY, WARNING],
+        default=CRITICAL
+    )
+
+
+def analyze(columns: FleetColumns, threshold_days=None) -> Dict:
+    """
+    Compute fleet-wide analytics in one vectorized pass
+
+    Args:
+        columns: Latest checks from fetch_latest_checks
+        threshold_days: Override the per-domain alert threshold
+
+    Returns:
+        Dictionary with state counts, expiry histogram and forecast,
+        expiry/response-time percentiles, health score and the most urgent domains
+    """
+    total = len(columns)
+    if threshold_days is None:
+        threshold_days = columns.threshold_days
+    states = classify(columns.expires_in, columns.is_valid, columns.has_error, threshold_days)
+    counts = np.bincount(states.astype(np.int64), minlength=len(STATES))
+
+    dated = columns.expires_in[~np.isnan(columns.expires_in) & ~columns.has_error]
+    histogram = np.bincount(np.searchsorted(EXPIRY_EDGES, dated, side="left"), minlength=len(EXPIRY_LABELS))
+    remaining = np.sort(dated[dated > 0])
+    forecast = np.searchsorted(remaining, FORECAST_DAYS, side="right")
+
+    # Score: share of domains that are healthy or only warning
+    score = (counts[HEALTHY] + counts[WARNING]) / total * 100 if total else 0.0
+
+    # Most urgent first: expired/error, then fewest days left
+    urgency = np.where(np.isin(states, (EXPIRED, ERROR)), -np.inf, np.nan_to_num(columns.expires_in, nan=np.inf))
+    at_risk = np.flatnonzero(states != HEALTHY)
+    urgent = at_risk[np.argsort(urgency[at_risk], kind="stable")]
+
+    result = {
+        "total_domains": total,
+        "state_counts": dict(zip(STATES.tolist(), counts.tolist())),
+        "expiry_histogram": dict(zip(EXPIRY_LABELS, histogram.tolist())),
+        "expiry_forecast": dict(zip((f"{days}d" for days in FORECAST_DAYS), forecast.tolist())),
+        "expiry_percentiles": _percentiles(remaining),
+        "average_days_until_expiry": float(remaining.mean()) if remaining.size else 0.0,
+        "health_score": float(score),
+        "urgent_indices": urgent,
+        "states": states,
+    }
+    if columns.response_time_ms is not None:
+        result["response_time_percentiles"] = _percentiles(columns.response_time_ms)
+    return result
+
+
+def _percentiles(values: np.ndarray) -> Dict[str, float]:
+    values = values[~np.isnan(values)]
+    if not values.size:
+        return {}
+    return {f"p{int(p)}": float(v) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+
+def urgent_domains(columns: FleetColumns, analysis: Dict, limit: int = 10) -> List[Dict]:
+    """Most urgent at-risk domains from an analysis, with state and days left"""
+    return [
+        {
+            "domain": columns.names[index],
+            "state": str(STATES[analysis["states"][index]]),
+            "expires_in": None if np.isnan(columns.expires_in[index]) else int(columns.expires_in[index]),
+        }
+        for index in analysis["urgent_indices"][:limit]
+    ]
@@ -0,0 +1,282 @@
+"""
+Background dependency prober
+
+Each dependency (database, Redis, Telegram, ...) is checked by its own
+asyncio task on its own interval. The latest result of every probe is
+kept in memory with its timestamp, so health, readiness and metrics
+endpoints read state instead of opening connections on every request.
+
+Probe functions are synchronous and run in a worker thread with a
+timeout. They return a details dict (healthy), None (not configured) or
+raise (unhealthy).
+"""
+
+import os
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+HEALTHY = "healthy"
+UNHEALTHY = "unhealthy"
+NOT_CONFIGURED = "not_configured"
+PENDING = "pending"
+STALE = "stale"
+
+# Prometheus gauges when prometheus_client is available
+try:
+    from prometheus_client import Gauge
+    PROBE_UP = Gauge("ssl_monitor_dependency_up", "Dependency probe result (1=healthy)", ["dependency"])
+    PROBE_LATENCY = Gauge("ssl_monitor_dependency_latency_ms", "Dependency probe latency", ["dependency"])
+    PROMETHEUS_ENABLED = True
+except ImportError:
+    PROMETHEUS_ENABLED = False
+
+
+@dataclass
+class ProbeResult:
+    """Latest outcome of a probe"""
+    status: str = PENDING
+    details: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    checked_at: Optional[datetime] = None
+    latency_ms: Optional[float] = None
+    checked_monotonic: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "details": self.details,
+            "error": self.error,
+            "checked_at": self.checked_at.isoformat() if self.checked_at else None,
+            "latency_ms": self.latency_ms
+        }
+
+
+@dataclass
+class Probe:
+    """A dependency check and its schedule"""
+    name: str
+    check: Callable[[], Optional[Dict[str, Any]]]
+    interval: float
+    timeout: float = 5.0
+    critical: bool = False
+    result: ProbeResult = field(default_factory=ProbeResult)
+
+
+class HealthProber:
+    """Runs dependency probes in the background and serves their results"""
+
+    def __init__(self):
+        self.probes: Dict[str, Probe] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def register(
+        self,
+        name: str,
+        check: Callable[[], Optional[Dict[str, Any]]],
+        interval: float,
+        timeout: float = 5.0,
+        critical: bool = False
+    ) -> None:
+        """
+        Add a probe
+
+        Args:
+            name: Dependency name
+            check: Blocking check function
+            interval: Seconds between checks
+            timeout: Seconds before a check counts as failed
+            critical: Whether the service is not ready without it
+        """
+        self.probes[name] = Probe(name, check, interval, timeout, critical)
+
+    def start(self) -> None:
+        """Start one probe loop per dependency (inside the event loop)"""
+        if self._tasks:
+            return
+        for probe in self.probes.values():
+            self._tasks.append(asyncio.create_task(self._run(probe), name=f"probe:{probe.name}"))
+
+    async def stop(self) -> None:
+        """Cancel the probe loops (application shutdown)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self, probe: Probe) -> None:
+        while True:
+            await self.probe_now(probe.name)
+            await asyncio.sleep(probe.interval)
+
+    async def probe_now(self, name: str) -> ProbeResult:
+        """Run one probe immediately and store its result"""
+        probe = self.probes[name]
+        started = time.monotonic()
+        try:
+            details = await asyncio.wait_for(asyncio.to_thread(probe.check), probe.timeout)
+            status = NOT_CONFIGURED if details is None else HEALTHY
+            error = None
+        except asyncio.TimeoutError:
+            details, status, error = None, UNHEALTHY, f"timed out after {probe.timeout}s"
+        except Exception as e:
+            details, status, error = None, UNHEALTHY, str(e)
+
+        if status == UNHEALTHY and probe.result.status != UNHEALTHY:
+            logger.warning(f"Health probe {name} failed: {error}")
+        elif status == HEALTHY and probe.result.status == UNHEALTHY:
+            logger.info(f"Health probe {name} recovered")
+
+        now = time.monotonic()
+        probe.result = ProbeResult(
+            status=status,
+            details=details or {},
+            error=error,
+            checked_at=datetime.now(timezone.utc),
+            latency_ms=round((now - started) * 1000, 2),
+            checked_monotonic=now
+        )
+        if PROMETHEUS_ENABLED:
+            PROBE_UP.labels(name).set(1 if status == HEALTHY else 0)
+            PROBE_LATENCY.labels(name).set(probe.result.latency_ms)
+        return probe.result
+
+    def status(self, name: str) -> str:
+        """Current status of a probe; results older than three intervals are stale"""
+        probe = self.probes[name]
+        result = probe.result
+        if result.status != PENDING and time.monotonic() - result.checked_monotonic > 3 * probe.interval:
+            return STALE
+        return result.status
+
+    def result(self, name: str) -> Dict[str, Any]:
+        """Latest result of a probe as a dict"""
+        result = self.probes[name].result.as_dict()
+        result["status"] = self.status(name)
+        return result
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Latest result of every probe"""
+        return {name: self.result(name) for name in self.probes}
+
+    def unhealthy_critical(self) -> List[str]:
+        """Critical probes that are not currently healthy"""
+        return [
+            name for name, probe in self.probes.items()
+            if probe.critical and self.status(name) != HEALTHY
+        ]
+
+    @property
+    def ready(self) -> bool:
+        """All critical dependencies are healthy"""
+        return not self.unhealthy_critical()
+
+    def metrics_text(self) -> str:
+        """Prometheus text exposition of the probe results"""
+        lines = [
+            "# HELP ssl_monitor_dependency_up Dependency probe result (1=healthy)",
+            "# TYPE ssl_monitor_dependency_up gauge"
+        ]
+        for name in self.probes:
+            lines.append(f'ssl_monitor_dependency_up{{dependency="{name}"}} {1 if self.status(name) == HEALTHY else 0}')
+        lines += [
+            "# HELP ssl_monitor_dependency_latency_ms Dependency probe latency",
+            "# TYPE ssl_monitor_dependency_latency_ms gauge"
+        ]
+        for name, probe in self.probes.items():
+            if probe.result.latency_ms is not None:
+                lines.append(f'ssl_monitor_dependency_latency_ms{{dependency="{name}"}} {probe.result.latency_ms}')
+        lines += [
+            "# HELP ssl_monitor_health_status Health status (1=healthy, 0=unhealthy)",
+            "# TYPE ssl_monitor_health_status gauge",
+            f"ssl_monitor_health_status {1 if self.ready else 0}"
+        ]
+        return "\n".join(lines) + "\n"
+
+
+# Probes
+def probe_database() -> Dict[str, Any]:
+    """SELECT 1 plus active connection count over the pooled engine"""
+    from database import engine
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        active_connections = conn.execute(
+            text("SELECT count(*) FROM pg_stat_activity WHERE state = 'active'")
+        ).scalar()
+    return {"active_connections": active_connections}
+
+
+_redis = None
+
+
+def probe_redis() -> Optional[Dict[str, Any]]:
+    """PING and INFO over one long-lived client"""
+    global _redis
+    redis_url = os.getenv("REDIS_URL")
+    if not redis_url:
+        return None
+    if _redis is None:
+        import redis
+        _redis = redis.from_url(redis_url, socket_timeout=3, socket_connect_timeout=3)
+    _redis.ping()
+    info = _redis.info()
+    return {
+        "redis_version": info.get("redis_version", "unknown"),
+        "used_memory_human": info.get("used_memory_human", "unknown"),
+        "connected_clients": info.get("connected_clients", 0)
+    }
+
+
+def probe_telegram() -> Optional[Dict[str, Any]]:
+    """Bot API getMe (no test message is sent)"""
+    bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
+    if not bot_token:
+        return None
+    response = requests.get(f"https://api.telegram.org/bot{bot_token}/getMe", timeout=10)
+    response.raise_for_status()
+    return {"bot_username": response.json().get("result", {}).get("username", "unknown")}
+
+
+def probe_stripe() -> Optional[Dict[str, Any]]:
+    """Key presence and format only, no API call"""
+    stripe_key = os.getenv("STRIPE_SECRET_KEY")
+    if not stripe_key:
+        return None
+    if not stripe_key.startswith("sk_"):
+        raise ValueError("Invalid key format")
+    return {"key_format": "valid"}
+
+
+def probe_n8n() -> Optional[Dict[str, Any]]:
+    """n8n health endpoint next to the configured webhook"""
+    n8n_webhook = os.getenv("N8N_WEBHOOK_URL")
+    if not n8n_webhook:
+        return None
+    response = requests.get(n8n_webhook.replace("/webhook/", "/health/"), timeout=5)
+    if response.status_code != 200:
+        raise RuntimeError(f"HTTP {response.status_code}")
+    return {"response_time_ms": int(response.elapsed.total_seconds() * 1000)}
+
+
+def create_health_prober() -> HealthProber:
+    """Prober with the default dependency probes"""
+    prober = HealthProber()
+    prober.register("database", probe_database, float(os.getenv("HEALTH_PROBE_DB_INTERVAL", "15")), critical=True)
+    prober.register("redis", probe_redis, float(os.getenv("HEALTH_PROBE_REDIS_INTERVAL", "15")))
+    prober.register("telegram", probe_telegram, float(os.getenv("HEALTH_PROBE_TELEGRAM_INTERVAL", "300")), timeout=15)
+    prober.register("stripe", probe_stripe, 3600)
+    prober.register("n8n", probe_n8n, float(os.getenv("HEALTH_PROBE_N8N_INTERVAL", "60")), timeout=10)
+    return prober
+
+
+# Global health prober instance
+health_prober = create_health_prober()
@@ -15,8 +15,57 @@ import json
 import logging
 from jinja2 import Template
 
+from services.template_registry import template_registry
+
 logger = logging.getLogger(__name__)
 
+EXPIRING_SOON_EMAIL_TEMPLATE = """
+            <!DOCTYPE html>
+            <html>
+            <head>
+                <style>
+                    body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+                    .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+                    .header { background: #f8f9fa; padding: 20px; border-radius: 8px; margin-bottom: 20px; }
+                    .alert { background: #fff3cd; border: 1px solid #ffeaa7; padding: 15px; border-radius: 5px; margin: 20px 0; }
+                    .button { display: inline-block; background: #007bff; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; margin: 10px 0; }
+                    .footer { margin-top: 30px; padding-top: 20px; border-top: 1px solid #eee; font-size: 12px; color: #666; }
+                </style>
+            </head>
+            <body>
+                <div class="container">
+                    <div class="header">
+                        <h1>🔔 SSL Certificate Alert</h1>
+                        <p>Hello {{ user_name }},</p>
+                    </div>
+                    
+                    <div class="alert">
+                        <h2>⚠️ Certificate Expiring Soon</h2>
+                        <p><strong>Domain:</strong> {{ domain_name }}</p>
+                        <p><strong>Days until expiry:</strong> {{ days_left }} days</p>
+                        <p><strong>Expiry date:</strong> {{ expiry_date }}</p>
+                    </div>
+                    
+                    <p>Your SSL certificate for <strong>{{ domain_name }}</strong> will expire in {{ days_left }} days.</p>
+                    
+                    <p><strong>Recommended actions:</strong></p>
+                    <ul>
+                        <li>Renew your SSL certificate immediately</li>
+                        <li>Update your domain's SSL certificate</li>
+                        <li>Test your website after renewal</li>
+                    </ul>
+                    
+                    <a href="{{ dashboard_url }}" class="button">View Dashboard</a>
+                    
+                    <div class="footer">
+                        <p>This is an automated message from SSL Monitor Pro.</p>
+                        <p>If you no longer wish to receive these notifications, you can update your preferences in the dashboard.</p>
+                    </div>
+                </div>
+            </body>
+            </html>
+            """
+
 class NotificationService:
     def __init__(self):
         # Email settings
@@ -187,57 +236,9 @@ class NotificationService:
             return False
 
     def get_email_template(self, notification_type: str) -> Template:
-        """Get email template for notification type"""
-        templates = {
-            'expiring_soon': Template("""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <style>
-                    body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
-                    .container { max-width: 600px; margin: 0 auto; padding: 20px; }
-                    .header { background: #f8f9fa; padding: 20px; border-radius: 8px; margin-bottom: 20px; }
-                    .alert { background: #fff3cd; border: 1px solid #ffeaa7; padding: 15px; border-radius: 5px; margin: 20px 0; }
-                    .button { display: inline-block; background: #007bff; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; margin: 10px 0; }
-                    .footer { margin-top: 30px; padding-top: 20px; border-top: 1px solid #eee; font-size: 12px; color: #666; }
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <div class="header">
-                        <h1>🔔 SSL Certificate Alert</h1>
-                        <p>Hello {{ user_name }},</p>
-                    </div>
-                    
-                    <div class="alert">
-                        <h2>⚠️ Certificate Expiring Soon</h2>
-                        <p><strong>Domain:</strong> {{ domain_name }}</p>
-                        <p><strong>Days until expiry:</strong> {{ days_left }} days</p>
-                        <p><strong>Expiry date:</strong> {{ expiry_date }}</p>
-                    </div>
-                    
-                    <p>Your SSL certificate for <strong>{{ domain_name }}</strong> will expire in {{ days_left }} days.</p>
-                    
-                    <p><strong>Recommended actions:</strong></p>
-                    <ul>
-                        <li>Renew your SSL certificate immediately</li>
-                        <li>Update your domain's SSL certificate</li>
-                        <li>Test your website after renewal</li>
-                    </ul>
-                    
-                    <a href="{{ dashboard_url }}" class="button">View Dashboard</a>
-                    
-                    <div class="footer">
-                        <p>This is an automated message from SSL Monitor Pro.</p>
-                        <p>If you no longer wish to receive these notifications, you can update your preferences in the dashboard.</p>
-                    </div>
-                </div>
-            </body>
-            </html>
-            """)
-        }
-        
-        return templates.get(notification_type, templates['expiring_soon'])
+        """Get compiled email template for notification type"""
+        return (template_registry.get('email', notification_type)
+                or template_registry.get('email', 'expiring_soon'))
 
     def get_email_subject(self, notification_type: str, domain_info: Dict[str, Any]) -> str:
         """Get email subject for notification type"""
@@ -288,5 +289,8 @@ class NotificationService:
         
         return keyboard
 
+# Compiled once per process, shared by all NotificationService instances
+template_registry.load_channel('email', lambda: {'en': {'expiring_soon': EXPIRING_SOON_EMAIL_TEMPLATE}})
+
 # Global instance
 notification_service = NotificationService()
\ No newline at end of file
@@ -0,0 +1,193 @@
+"""
+Notification settings and history storage
+
+Two interchangeable stores, selected with NOTIFICATION_STORE:
+
+- "memory" (default): per-process, bounded. Settings are kept for the most
+  recently used NOTIFICATION_SETTINGS_MAX_USERS users (LRU), history is a
+  ring buffer of NOTIFICATION_HISTORY_PER_USER entries for the most
+  recently active NOTIFICATION_HISTORY_MAX_USERS users.
+- "redis": shared by all workers (REDIS_URL). Settings are one JSON value
+  per user, history a capped list per user (LPUSH + LTRIM).
+"""
+
+import os
+import json
+import itertools
+import logging
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    "email_enabled": True,
+    "telegram_enabled": False,
+    "webhook_enabled": False,
+    "webhook_url": None,
+    "telegram_chat_id": None,
+    "email_expiring_30_days": True,
+    "email_expiring_7_days": True,
+    "email_expiring_3_days": True,
+    "email_expiring_1_day": True,
+    "email_expired": True,
+    "email_check_failed": True,
+    "email_weekly_report": True
+}
+
+
+class NotificationStore(ABC):
+    """Interface for notification settings and history storage"""
+
+    @abstractmethod
+    async def get_settings(self, user_email: str) -> Dict[str, Any]:
+        """Get a user's settings (DEFAULT_SETTINGS if none were saved)"""
+
+    @abstractmethod
+    async def save_settings(self, user_email: str, settings: Dict[str, Any]) -> None:
+        """Replace a user's settings"""
+
+    @abstractmethod
+    async def add_history(self, user_email: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Record a sent notification
+
+        Args:
+            user_email: Recipient
+            entry: Notification fields; "id" and "sent_at" are filled in
+
+        Returns:
+            The stored entry
+        """
+
+    @abstractmethod
+    async def get_history(self, user_email: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get a user's most recent notifications, newest first"""
+
+    async def close(self) -> None:
+        """Release connections (application shutdown)"""
+
+
+class InMemoryNotificationStore(NotificationStore):
+    """Bounded per-process store (LRU settings, ring-buffer history)"""
+
+    def __init__(
+        self,
+        max_settings_users: int = 10000,
+        history_per_user: int = 100,
+        max_history_users: int = 10000
+    ):
+        self.max_settings_users = max_settings_users
+        self.history_per_user = history_per_user
+        self.max_history_users = max_history_users
+        self._settings: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._history: "OrderedDict[str, Deque[Dict[str, Any]]]" = OrderedDict()
+        self._ids = itertools.count(1)
+
+    async def get_settings(self, user_email: str) -> Dict[str, Any]:
+        settings = self._settings.get(user_email)
+        if settings is None:
+            return dict(DEFAULT_SETTINGS)
+        self._settings.move_to_end(user_email)
+        return dict(settings)
+
+    async def save_settings(self, user_email: str, settings: Dict[str, Any]) -> None:
+        self._settings[user_email] = dict(settings)
+        self._settings.move_to_end(user_email)
+        while len(self._settings) > self.max_settings_users:
+            self._settings.popitem(last=False)
+
+    async def add_history(self, user_email: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        entry = {**entry, "id": next(self._ids), "sent_at": datetime.now().isoformat()}
+        history = self._history.get(user_email)
+        if history is None:
+            history = self._history[user_email] = deque(maxlen=self.history_per_user)
+        self._history.move_to_end(user_email)
+        history.appendleft(entry)
+        while len(self._history) > self.max_history_users:
+            self._history.popitem(last=False)
+        return entry
+
+    async def get_history(self, user_email: str, limit: int = 50) -> List[Dict[str, Any]]:
+        history = self._history.get(user_email)
+        if not history:
+            return []
+        return list(itertools.islice(history, max(limit, 0)))
+
+
+class RedisNotificationStore(NotificationStore):
+    """Store shared by all workers through Redis"""
+
+    def __init__(self, redis_url: str, history_per_user: int = 100):
+        self.redis_url = redis_url
+        self.history_per_user = history_per_user
+        self.key_prefix = "notifications"
+        self._redis: Optional[aioredis.Redis] = None
+
+    @property
+    def redis(self) -> aioredis.Redis:
+        """Async Redis client (created lazily)"""
+        if self._redis is None:
+            self._redis = aioredis.from_url(self.redis_url, decode_responses=True)
+        return self._redis
+
+    def _settings_key(self, user_email: str) -> str:
+        return f"{self.key_prefix}:settings:{user_email}"
+
+    def _history_key(self, user_email: str) -> str:
+        return f"{self.key_prefix}:history:{user_email}"
+
+    async def get_settings(self, user_email: str) -> Dict[str, Any]:
+        raw = await self.redis.get(self._settings_key(user_email))
+        return json.loads(raw) if raw else dict(DEFAULT_SETTINGS)
+
+    async def save_settings(self, user_email: str, settings: Dict[str, Any]) -> None:
+        await self.redis.set(self._settings_key(user_email), json.dumps(settings))
+
+    async def add_history(self, user_email: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        entry_id = await self.redis.incr(f"{self.key_prefix}:history_id")
+        entry = {**entry, "id": entry_id, "sent_at": datetime.now().isoformat()}
+        key = self._history_key(user_email)
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.lpush(key, json.dumps(entry, default=str))
+        pipe.ltrim(key, 0, self.history_per_user - 1)
+        await pipe.execute()
+        return entry
+
+    async def get_history(self, user_email: str, limit: int = 50) -> List[Dict[str, Any]]:
+        if limit <= 0:
+            return []
+        raw = await self.redis.lrange(self._history_key(user_email), 0, limit - 1)
+        return [json.loads(item) for item in raw]
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+
+def create_notification_store() -> NotificationStore:
+    """Build the store selected by NOTIFICATION_STORE"""
+    backend = os.getenv("NOTIFICATION_STORE", "memory").lower()
+    history_per_user = int(os.getenv("NOTIFICATION_HISTORY_PER_USER", "100"))
+
+    if backend == "redis":
+        return RedisNotificationStore(
+            os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            history_per_user=history_per_user
+        )
+    if backend != "memory":
+        logger.warning(f"Unknown NOTIFICATION_STORE '{backend}', using memory")
+    return InMemoryNotificationStore(
+        max_settings_users=int(os.getenv("NOTIFICATION_SETTINGS_MAX_USERS", "10000")),
+        history_per_user=history_per_user,
+        max_history_users=int(os.getenv("NOTIFICATION_HISTORY_MAX_USERS", "10000"))
+    )
+
+
+# Global notification store instance
+notification_store = create_notification_store()
@@ -1,23 +1,117 @@
 """
 Upstash Redis Client for User Profiles
 Fast, serverless, and free tier (10k commands/day)
+
+Async client over a pooled keep-alive HTTP session. Commands can be
+batched through Upstash's /pipeline (one round-trip, no atomicity) and
+/multi-exec (one round-trip, atomic) endpoints, and hot hashes can be
+served from a small local TTL cache.
 """
 
 import os
-import requests
-import json
-import hashlib
-from typing import Optional, Dict, Any
-from datetime import datetime, timedelta
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Optional, Dict, Any, AsyncIterator, List, Callable, Tuple
+
+import aiohttp
+
+
+def _to_dict(result: Optional[list]) -> Optional[dict]:
+    """Convert array [k1, v1, k2, v2] to dict {k1: v1, k2: v2}"""
+    if not result:
+        return None
+    return {result[i]: result[i+1] for i in range(0, len(result), 2)}
+
+
+def _hset_command(key: str, data: dict) -> list:
+    """Flatten dict to HSET format: HSET key field1 value1 field2 value2 ..."""
+    command = ["HSET", key]
+    for field, value in data.items():
+        command.extend([field, str(value)])
+    return command
+
+
+class Pipeline:
+    """
+    Batch of commands sent in one HTTP request
+
+    Usage:
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.hset("user:a", {...})
+        pipe.expire("user:a", 60)
+        hset_ok, expire_ok = await pipe.execute()
+    """
+
+    def __init__(self, client: "UpstashRedis", transaction: bool = False):
+        self.client = client
+        self.transaction = transaction
+        self._commands: List[list] = []
+        self._parsers: List[Callable[[Any], Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._commands)
+
+    def command(self, command: list, parser: Callable[[Any], Any] = lambda result: result) -> "Pipeline":
+        """Queue a raw command with an optional result parser"""
+        self._commands.append(command)
+        self._parsers.append(parser)
+        return self
+
+    def hset(self, key: str, data: dict) -> "Pipeline":
+        return self.command(_hset_command(key, data), lambda result: result is not None)
+
+    def hsetnx(self, key: str, field: str, value: Any) -> "Pipeline":
+        return self.command(["HSETNX", key, field, str(value)], lambda result: result == 1)
+
+    def hgetall(self, key: str) -> "Pipeline":
+        return self.command(["HGETALL", key], _to_dict)
+
+    def hget(self, key: str, field: str) -> "Pipeline":
+        return self.command(["HGET", key, field])
+
+    def exists(self, key: str) -> "Pipeline":
+        return self.command(["EXISTS", key], lambda result: result == 1)
+
+    def delete(self, key: str) -> "Pipeline":
+        return self.command(["DEL", key], lambda result: result == 1)
+
+    def expire(self, key: str, seconds: int) -> "Pipeline":
+        return self.command(["EXPIRE", key, seconds], lambda result: result == 1)
+
+    def hincrby(self, key: str, field: str, amount: int = 1) -> "Pipeline":
+        return self.command(["HINCRBY", key, field, amount])
+
+    def zadd(self, key: str, mapping: Dict[str, float]) -> "Pipeline":
+        command = ["ZADD", key]
+        for member, score in mapping.items():
+            command.extend([score, member])
+        return self.command(command)
+
+    async def execute(self) -> List[Any]:
+        """Send all queued commands; failed commands yield None"""
+        if not self._commands:
+            return []
+        commands, parsers = self._commands, self._parsers
+        self._commands, self._parsers = [], []
+
+        results = await self.client._batch(commands, self.transaction)
+        for command in commands:
+            if command[0] in self.client.WRITE_COMMANDS:
+                self.client._invalidate(command[1])
+        return [parser(result) for parser, result in zip(parsers, results)]
+
 
 class UpstashRedis:
     """Upstash Redis HTTP client for user management"""
-    
+
+    WRITE_COMMANDS = {"HSET", "HSETNX", "HDEL", "HINCRBY", "DEL", "EXPIRE", "SET", "ZADD"}
+
     def __init__(self):
         self.base_url = os.getenv(
             "UPSTASH_REDIS_REST_URL",
             "https://helping-snapper-23185.upstash.io"
-        )
+        ).rstrip("/")
         self.token = os.getenv(
             "UPSTASH_REDIS_REST_TOKEN",
             "AVqRAAIncDJmNjNiOGQ4MzRiY2I0MWU2OTIyMzEyMzM2OWMzM2FmY3AyMjMxODU"
@@ -26,70 +120,187 @@ class UpstashRedis:
             "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json"
         }
-    
-    def _execute(self, command: list) -> Any:
-        """Execute Redis command via REST API"""
-        try:
-            response = requests.post(
-                self.base_url,
+        self.pool_size = int(os.getenv("UPSTASH_POOL_SIZE", "20"))
+        self.timeout = aiohttp.ClientTimeout(total=5)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        # Local read cache: key -> (expires_at, value)
+        self.cache_ttl = float(os.getenv("UPSTASH_LOCAL_CACHE_TTL", "5"))
+        self.cache_max_entries = int(os.getenv("UPSTASH_LOCAL_CACHE_MAX_ENTRIES", "1024"))
+        self._cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Shared keep-alive session (created lazily inside the event loop)"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
                 headers=self.headers,
-                json=command,
-                timeout=5
+                timeout=self.timeout,
+                connector=aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
             )
-            if response.status_code == 200:
-                data = response.json()
-                return data.get('result')
-            else:
-                print(f"Redis error: {response.status_code} - {response.text}")
+        return self._session
+
+    async def close(self) -> None:
+        """Close the HTTP session (application shutdown)"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _post(self, path: str, payload: list) -> Any:
+        try:
+            async with self._get_session().post(f"{self.base_url}{path}", json=payload) as response:
+                if response.status == 200:
+                    return await response.json()
+                print(f"Redis error: {response.status} - {await response.text()}")
                 return None
-        except Exception as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             print(f"Redis connection error: {e}")
             return None
-    
+
+    async def _execute(self, command: list) -> Any:
+        """Execute Redis command via REST API"""
+        data = await self._post("", command)
+        if command[0] in self.WRITE_COMMANDS:
+            self._invalidate(command[1])
+        return data.get('result') if data else None
+
+    async def _batch(self, commands: List[list], transaction: bool) -> List[Any]:
+        """Execute commands in one request via /pipeline or /multi-exec"""
+        data = await self._post("/multi-exec" if transaction else "/pipeline", commands)
+        if not isinstance(data, list):
+            return [None] * len(commands)
+        results = []
+        for item in data:
+            if "error" in item:
+                print(f"Redis command error: {item['error']}")
+                results.append(None)
+            else:
+                results.append(item.get('result'))
+        return results
+
+    def pipeline(self, transaction: bool = False) -> Pipeline:
+        """Start a command batch (transaction=True uses MULTI/EXEC)"""
+        return Pipeline(self, transaction)
+
+    # Local read cache
+    def _cache_get(self, key: str) -> Tuple[bool, Any]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] < time.monotonic():
+            self._cache.pop(key, None)
+            return False, None
+        return True, entry[1]
+
+    def _cache_set(self, key: str, value: Any) -> None:
+        self._cache[key] = (time.monotonic() + self.cache_ttl, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_max_entries:
+            self._cache.popitem(last=False)
+
+    def _invalidate(self, key: str) -> None:
+        self._cache.pop(key, None)
+
     # Basic Redis commands
-    def hset(self, key: str, data: dict) -> bool:
+    async def hset(self, key: str, data: dict) -> bool:
         """Set hash fields"""
-        # Flatten dict to HSET format: HSET key field1 value1 field2 value2 ...
-        command = ["HSET", key]
-        for field, value in data.items():
-            command.extend([field, str(value)])
-        
-        result = self._execute(command)
+        result = await self._execute(_hset_command(key, data))
         return result is not None
-    
-    def hgetall(self, key: str) -> Optional[dict]:
-        """Get all hash fields"""
-        result = self._execute(["HGETALL", key])
-        
-        if not result:
-            return None
-        
-        # Convert array [k1, v1, k2, v2] to dict {k1: v1, k2: v2}
-        return {result[i]: result[i+1] for i in range(0, len(result), 2)}
-    
-    def hget(self, key: str, field: str) -> Optional[str]:
+
+    async def hsetnx(self, key: str, field: str, value: Any) -> bool:
+        """Set a hash field only if it does not exist"""
+        result = await self._execute(["HSETNX", key, field, str(value)])
+        return result == 1
+
+    async def hgetall(self, key: str, cached: bool = False) -> Optional[dict]:
+        """
+        Get all hash fields
+
+        Args:
+            key: Hash key
+            cached: Serve from / fill the local read cache (for hot,
+                read-mostly hashes; writes through this client invalidate it)
+        """
+        if cached and self.cache_ttl > 0:
+            hit, value = self._cache_get(key)
+            if hit:
+                return dict(value) if value else value
+
+        result = _to_dict(await self._execute(["HGETALL", key]))
+
+        if cached and self.cache_ttl > 0:
+            self._cache_set(key, result)
+        return result
+
+    async def hget(self, key: str, field: str) -> Optional[str]:
         """Get single hash field"""
-        return self._execute(["HGET", key, field])
-    
-    def exists(self, key: str) -> bool:
+        return await self._execute(["HGET", key, field])
+
+    async def exists(self, key: str) -> bool:
         """Check if key exists"""
-        result = self._execute(["EXISTS", key])
+        result = await self._execute(["EXISTS", key])
         return result == 1
-    
-    def delete(self, key: str) -> bool:
+
+    async def delete(self, key: str) -> bool:
         """Delete key"""
-        result = self._execute(["DEL", key])
+        result = await self._execute(["DEL", key])
         return result == 1
-    
-    def expire(self, key: str, seconds: int) -> bool:
+
+    async def expire(self, key: str, seconds: int) -> bool:
         """Set key expiration"""
-        result = self._execute(["EXPIRE", key, seconds])
+        result = await self._execute(["EXPIRE", key, seconds])
         return result == 1
-    
-    def keys(self, pattern: str) -> list:
-        """Get keys matching pattern"""
-        result = self._execute(["KEYS", pattern])
-        return result if result else []
+
+    async def hincrby(self, key: str, field: str, amount: int = 1) -> int:
+        """Increment a hash field"""
+        return await self._execute(["HINCRBY", key, field, amount]) or 0
+
+    async def hscan_iter(self, key: str, count: int = 500) -> AsyncIterator[Tuple[List[str], List[str]]]:
+        """Iterate a hash in pages of (fields, values) with HSCAN"""
+        cursor = "0"
+        while True:
+            result = await self._execute(["HSCAN", key, cursor, "COUNT", count])
+            if not result:
+                return
+            cursor, flat = result
+            if flat:
+                yield flat[0::2], flat[1::2]
+            if str(cursor) == "0":
+                return
+
+    async def zrange(self, key: str, start: int, stop: int, desc: bool = False) -> list:
+        """Get sorted set members by rank"""
+        command = ["ZRANGE", key, start, stop]
+        if desc:
+            command.append("REV")
+        return await self._execute(command) or []
+
+    async def zcard(self, key: str) -> int:
+        """Get sorted set size"""
+        return await self._execute(["ZCARD", key]) or 0
+
+    async def eval(self, script: str, keys: List[str], args: List[Any]) -> Any:
+        """Run a Lua script atomically (EVAL)"""
+        result = await self._execute(["EVAL", script, len(keys), *keys, *[str(arg) for arg in args]])
+        for key in keys:
+            self._invalidate(key)
+        return result
+
+    async def scan_iter(self, pattern: str, count: int = 500) -> AsyncIterator[str]:
+        """Iterate keys matching pattern with incremental SCAN (never blocks Redis)"""
+        cursor = "0"
+        while True:
+            result = await self._execute(["SCAN", cursor, "MATCH", pattern, "COUNT", count])
+            if not result:
+                return
+            cursor, batch = result
+            for key in batch:
+                yield key
+            if str(cursor) == "0":
+                return
+
+    async def keys(self, pattern: str) -> list:
+        """Get keys matching pattern (SCAN, not KEYS)"""
+        return [key async for key in self.scan_iter(pattern)]
 
 
 # Global Redis client
@@ -0,0 +1,335 @@
+"""
+SSL analytics buckets
+
+Maintains per-day aggregates of SSL check data so analytics for any period
+are read from a few hundred bucket rows instead of scanning ssl_checks:
+
+- ssl_domain_days holds the last known state of each domain per UTC day
+- ssl_analytics_buckets holds per-day counters for the dimensions
+  "state", "issuer" and "expiry" (one count per domain per day) and
+  "checks" (one count per check, keyed by the check's state)
+
+Buckets are updated incrementally as checks are recorded. A nightly job
+carries each domain's state forward into the new day and rebuilds recent
+days from raw checks, which also reconciles any drift.
+"""
+import re
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import select, delete, update, func, literal, Date
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+import logging
+
+from models import Domain, SSLCheck, SSLDomainDay, SSLAnalyticsBucket
+
+logger = logging.getLogger(__name__)
+
+STATES = ["healthy", "warning", "critical", "expired", "error"]
+CRITICAL_DAYS = 7
+
+# Expiry histogram: (inclusive upper bound in days, label)
+EXPIRY_BUCKETS = [
+    (7, "0-7d"),
+    (14, "8-14d"),
+    (30, "15-30d"),
+    (60, "31-60d"),
+    (90, "61-90d"),
+]
+EXPIRY_OVERFLOW = "90d+"
+
+_ISSUER_ORG = re.compile(r"(?:^|,)O=((?:\\.|[^,])+)")
+
+BucketSeries = Dict[date, Dict[str, Tuple[int, float]]]
+
+
+def classify_state(is_valid: Optional[bool], expires_in: Optional[int], error: Optional[str], threshold_days: int) -> str:
+    """Classify one check the same way the API reports domain status"""
+    if error:
+        return "error"
+    if not is_valid or expires_in is None or expires_in <= 0:
+        return "expired"
+    if expires_in > threshold_days:
+        return "healthy"
+    if expires_in > CRITICAL_DAYS:
+        return "warning"
+    return "critical"
+
+
+def expiry_bucket(state: str, expires_in: Optional[int]) -> str:
+    """Expiry histogram label for a domain state"""
+    if state == "error" or expires_in is None:
+        return "unknown"
+    if state == "expired":
+        return "expired"
+    for upper, label in EXPIRY_BUCKETS:
+        if expires_in <= upper:
+            return label
+    return EXPIRY_OVERFLOW
+
+
+def issuer_name(issuer: Optional[str]) -> str:
+    """Issuer organization from an RFC 4514 issuer string"""
+    if not issuer:
+        return "Unknown"
+    match = _ISSUER_ORG.search(issuer)
+    name = match.group(1).replace("\\", "") if match else issuer
+    return name[:255]
+
+
+Deltas = Dict[Tuple[str, str], list]
+
+
+def _add_snapshot(deltas: Deltas, state: str, issuer: str, expires_in: Optional[int], sign: int) -> None:
+    """Add (sign=1) or remove (sign=-1) one domain's state from a day's snapshot deltas"""
+    deltas[("state", state)][0] += sign
+    deltas[("issuer", issuer)][0] += sign
+    bucket = deltas[("expiry", expiry_bucket(state, expires_in))]
+    bucket[0] += sign
+    if expires_in is not None and state not in ("error", "expired"):
+        bucket[1] += sign * expires_in
+
+
+def _apply(db: Session, day: date, deltas: Deltas) -> None:
+    """Upsert a day's bucket deltas in key order, skipping ones that cancel out"""
+    rows = [
+        {"day": day, "dimension": dimension, "key": key, "count": count, "value_sum": value}
+        for (dimension, key), (count, value) in sorted(deltas.items())
+        if count or value
+    ]
+    if not rows:
+        return
+    statement = insert(SSLAnalyticsBucket).values(rows)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=["day", "dimension", "key"],
+        set_={
+            "count": SSLAnalyticsBucket.count + statement.excluded.count,
+            "value_sum": SSLAnalyticsBucket.value_sum + statement.excluded.value_sum,
+        }
+    ))
+
+
+def record_check(db: Session, domain: Domain, ssl_check: SSLCheck) -> None:
+    """
+    Fold a saved SSL check into the day's buckets in its own transaction
+
+    Call after the check is committed. Every check of a domain locks that
+    domain's day row first and the shared bucket rows in key order, so
+    concurrent checks cannot deadlock. Failures are logged and left to the
+    nightly rebuild.
+
+    Args:
+        db: Session the check was saved in
+        domain: Checked domain
+        ssl_check: The committed check row
+    """
+    try:
+        checked_at = ssl_check.checked_at or datetime.utcnow()
+        day = checked_at.date()
+        state = classify_state(ssl_check.is_valid, ssl_check.expires_in, ssl_check.error_message, domain.alert_threshold_days)
+        issuer = issuer_name(ssl_check.issuer)
+        expires_in = ssl_check.expires_in if state not in ("error", "expired") else None
+
+        deltas: Deltas = defaultdict(lambda: [0, 0])
+        deltas[("checks", state)][0] += 1
+
+        inserted = db.execute(
+            insert(SSLDomainDay)
+            .values(domain_id=domain.id, day=day, state=state, issuer=issuer, expires_in=expires_in, checked_at=checked_at)
+            .on_conflict_do_nothing(index_elements=["domain_id", "day"])
+            .returning(SSLDomainDay.id)
+        ).first()
+        if inserted is None:
+            row = db.execute(
+                select(SSLDomainDay)
+                .where(SSLDomainDay.domain_id == domain.id, SSLDomainDay.day == day)
+                .with_for_update()
+            ).scalar_one()
+            if row.checked_at and row.checked_at > checked_at:
+                # Out-of-order result; the newer state stays
+                _apply(db, day, deltas)
+                db.commit()
+                return
+            _add_snapshot(deltas, row.state, row.issuer, row.expires_in, -1)
+            row.state, row.issuer, row.expires_in, row.checked_at = state, issuer, expires_in, checked_at
+
+        _add_snapshot(deltas, state, issuer, expires_in, 1)
+        _apply(db, day, deltas)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to record SSL analytics for domain {domain.id}: {e}")
+
+
+def _rebuild_snapshot_buckets(db: Session, days: Iterable[date]) -> None:
+    """Recompute state/issuer/expiry buckets for whole days from ssl_domain_days"""
+    days = list(days)
+    db.execute(delete(SSLAnalyticsBucket).where(
+        SSLAnalyticsBucket.day.in_(days),
+        SSLAnalyticsBucket.dimension.in_(["state", "issuer", "expiry"])
+    ))
+    counts: Dict[Tuple[date, str, str], list] = defaultdict(lambda: [0, 0.0])
+    rows = db.execute(
+        select(SSLDomainDay.day, SSLDomainDay.state, SSLDomainDay.issuer, SSLDomainDay.expires_in)
+        .where(SSLDomainDay.day.in_(days))
+    )
+    for day, state, issuer, expires_in in rows:
+        counts[(day, "state", state)][0] += 1
+        counts[(day, "issuer", issuer or "Unknown")][0] += 1
+        bucket = counts[(day, "expiry", expiry_bucket(state, expires_in))]
+        bucket[0] += 1
+        bucket[1] += expires_in or 0
+    if counts:
+        db.execute(insert(SSLAnalyticsBucket), [
+            {"day": day, "dimension": dimension, "key": key, "count": count, "value_sum": value}
+            for (day, dimension, key), (count, value) in counts.items()
+        ])
+
+
+def _carry_forward(db: Session, day: date) -> int:
+    """
+    Seed a day with each active domain's latest earlier state
+
+    Rows already carried into the day (their check is from an earlier day)
+    are refreshed too, so they follow a rebuilt previous day.
+
+    Returns:
+        Number of domains newly carried forward
+    """
+    latest = (
+        select(SSLDomainDay)
+        .join(Domain, Domain.id == SSLDomainDay.domain_id)
+        .where(Domain.is_active == True, SSLDomainDay.day < day)
+        .distinct(SSLDomainDay.domain_id)
+        .order_by(SSLDomainDay.domain_id, SSLDomainDay.day.desc())
+        .subquery()
+    )
+    result = db.execute(
+        insert(SSLDomainDay)
+        .from_select(
+            ["domain_id", "day", "state", "issuer", "expires_in", "checked_at"],
+            select(latest.c.domain_id, literal(day, Date), latest.c.state,
+                   latest.c.issuer, latest.c.expires_in, latest.c.checked_at)
+        )
+        .on_conflict_do_nothing(index_elements=["domain_id", "day"])
+    )
+    db.execute(
+        update(SSLDomainDay)
+        .where(
+            SSLDomainDay.domain_id == latest.c.domain_id,
+            SSLDomainDay.day == day,
+            SSLDomainDay.checked_at < datetime.combine(day, datetime.min.time())
+        )
+        .values(state=latest.c.state, issuer=latest.c.issuer,
+                expires_in=latest.c.expires_in, checked_at=latest.c.checked_at)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def carry_forward(db: Session, day: date) -> int:
+    """
+    Seed a day with each active domain's last known state
+
+    Domains that are not checked on a day keep their previous state, so
+    every day's snapshot covers all active domains.
+
+    Returns:
+        Number of domains carried forward
+    """
+    carried = _carry_forward(db, day)
+    _rebuild_snapshot_buckets(db, [day])
+    db.commit()
+    return carried
+
+
+def rebuild(db: Session, start_day: date, end_day: date) -> int:
+    """
+    Recompute domain days and buckets for a day range from raw ssl_checks
+
+    Only days still covered by raw check retention can be rebuilt; older
+    buckets are kept as they are. States carried into later days of the
+    range are re-derived from the rebuilt days.
+
+    Returns:
+        Number of checks processed
+    """
+    start = datetime.combine(start_day, datetime.min.time())
+    end = datetime.combine(end_day + timedelta(days=1), datetime.min.time())
+
+    check_counts: Dict[Tuple[date, str], int] = defaultdict(int)
+    last: Dict[Tuple[int, date], dict] = {}
+    processed = 0
+    rows = db.execute(
+        select(
+            SSLCheck.domain_id, SSLCheck.checked_at, SSLCheck.is_valid, SSLCheck.expires_in,
+            SSLCheck.error_message, SSLCheck.issuer, Domain.alert_threshold_days
+        )
+        .join(Domain, Domain.id == SSLCheck.domain_id)
+        .where(SSLCheck.checked_at >= start, SSLCheck.checked_at < end)
+        .order_by(SSLCheck.checked_at)
+        .execution_options(stream_results=True, yield_per=5000)
+    )
+    for domain_id, checked_at, is_valid, expires_in, error, issuer, threshold in rows:
+        processed += 1
+        day = checked_at.date()
+        state = classify_state(is_valid, expires_in, error, threshold or 30)
+        check_counts[(day, state)] += 1
+        last[(domain_id, day)] = {
+            "domain_id": domain_id,
+            "day": day,
+            "state": state,
+            "issuer": issuer_name(issuer),
+            "expires_in": expires_in if state not in ("error", "expired") else None,
+            "checked_at": checked_at,
+        }
+
+    if last:
+        statement = insert(SSLDomainDay).values(list(last.values()))
+        db.execute(statement.on_conflict_do_update(
+            index_elements=["domain_id", "day"],
+            set_={column: statement.excluded[column] for column in ("state", "issuer", "expires_in", "checked_at")}
+        ))
+
+    days = [start_day + timedelta(days=offset) for offset in range((end_day - start_day).days + 1)]
+    for day in days[1:]:
+        _carry_forward(db, day)
+    db.execute(delete(SSLAnalyticsBucket).where(
+        SSLAnalyticsBucket.day.in_(days), SSLAnalyticsBucket.dimension == "checks"
+    ))
+    if check_counts:
+        db.execute(insert(SSLAnalyticsBucket), [
+            {"day": day, "dimension": "checks", "key": state, "count": count, "value_sum": 0}
+            for (day, state), count in check_counts.items()
+        ])
+    _rebuild_snapshot_buckets(db, days)
+    db.commit()
+    return processed
+
+
+def get_series(db: Session, dimension: str, start_day: date, end_day: Optional[date] = None) -> BucketSeries:
+    """
+    Read one dimension's buckets for a day range
+
+    Returns:
+        {day: {key: (count, value_sum)}}
+    """
+    query = select(
+        SSLAnalyticsBucket.day, SSLAnalyticsBucket.key, SSLAnalyticsBucket.count, SSLAnalyticsBucket.value_sum
+    ).where(SSLAnalyticsBucket.dimension == dimension, SSLAnalyticsBucket.day >= start_day)
+    if end_day is not None:
+        query = query.where(SSLAnalyticsBucket.day <= end_day)
+
+    series: BucketSeries = defaultdict(dict)
+    for day, key, count, value in db.execute(query):
+        if count:
+            series[day][key] = (count, value)
+    return series
+
+
+def latest_day(db: Session) -> Optional[date]:
+    """Most recent day that has snapshot buckets"""
+    return db.execute(
+        select(func.max(SSLAnalyticsBucket.day)).where(SSLAnalyticsBucket.dimension == "state")
+    ).scalar()
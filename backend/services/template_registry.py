@@ -0,0 +1,158 @@
+"""
+SSL Monitor Pro - Message Template Registry
+Compiles each (channel, trigger, language) template once and reuses it
+across all senders (email, Telegram, Slack)
+"""
+
+import copy
+import logging
+import threading
+from string import Formatter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from jinja2 import Environment
+
+logger = logging.getLogger(__name__)
+
+_formatter = Formatter()
+
+
+class FormatTemplate:
+    """str.format-style template pre-split into literal and field fragments"""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.fragments: List[Tuple[str, Optional[str], str, Optional[str]]] = list(_formatter.parse(source))
+        self.is_static = all(field is None for _, field, _, _ in self.fragments)
+        # Rendered once so escaped braces ({{ }}) come out as in str.format
+        self.static_text = source.format() if self.is_static else None
+
+    def render(self, **kwargs) -> str:
+        if self.is_static:
+            return self.static_text
+
+        parts = []
+        for literal, field, spec, conversion in self.fragments:
+            if literal:
+                parts.append(literal)
+            if field is None:
+                continue
+            if field in kwargs:
+                value = kwargs[field]
+            else:
+                # Dotted/indexed names and positional fields (raises KeyError like str.format)
+                value, _ = _formatter.get_field(field, (), kwargs)
+            if conversion:
+                value = _formatter.convert_field(value, conversion)
+            parts.append(format(value, spec) if spec else str(value))
+        return "".join(parts)
+
+
+class SlackBlocksTemplate:
+    """Block Kit template whose static blocks are built once and shared"""
+
+    def __init__(self, template: Dict[str, Any]):
+        self.title = template['title']
+        self.color = template.get('color')
+        self.header = {
+            "type": "header",
+            "text": {"type": "plain_text", "text": self.title}
+        }
+        # Field titles are static; escape them so only the value is formatted
+        self.fields = [
+            FormatTemplate(
+                "*" + field['title'].replace('{', '{{').replace('}', '}}') + ":*\n" + field['value']
+            )
+            for field in template['fields']
+        ]
+        self.footer = [
+            {"type": "divider"},
+            {
+                "type": "actions",
+                "elements": [
+                    {
+                        "type": "button",
+                        "text": {"type": "plain_text", "text": "View Dashboard"},
+                        "url": "https://cloudsre.xyz/dashboard",
+                        "style": "primary"
+                    },
+                    {
+                        "type": "button",
+                        "text": {"type": "plain_text", "text": "Manage Domains"},
+                        "url": "https://cloudsre.xyz/dashboard#domains"
+                    }
+                ]
+            }
+        ]
+
+    def render(self, **kwargs) -> List[Dict[str, Any]]:
+        section = {
+            "type": "section",
+            "fields": [{"type": "mrkdwn", "text": field.render(**kwargs)} for field in self.fields]
+        }
+        # Copies, so callers can amend the blocks without touching the template
+        return [copy.deepcopy(self.header), section, *copy.deepcopy(self.footer)]
+
+
+class TemplateRegistry:
+    """Process-wide cache of compiled message templates"""
+
+    def __init__(self, default_language: str = 'en'):
+        self.default_language = default_language
+        self._sources: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._compiled: Dict[Tuple[str, str, str], Any] = {}
+        self._lock = threading.Lock()
+        self._jinja = Environment()
+        self._compilers: Dict[str, Callable[[Any], Any]] = {
+            'email': self._jinja.from_string,
+            'telegram': FormatTemplate,
+            'slack': SlackBlocksTemplate,
+        }
+
+    def load_channel(self, channel: str, loader: Callable[[], Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Register a channel's templates ({language: {trigger: source}}) once
+
+        The loader runs only on first use per process; later calls return the
+        already registered sources.
+        """
+        with self._lock:
+            if channel not in self._sources:
+                self._sources[channel] = loader()
+            return self._sources[channel]
+
+    def register(self, channel: str, trigger: str, source: Any, language: str = 'en') -> None:
+        """Register (or replace) a single template source"""
+        with self._lock:
+            self._sources.setdefault(channel, {}).setdefault(language, {})[trigger] = source
+            self._compiled.pop((channel, trigger, language), None)
+
+    def get(self, channel: str, trigger: str, language: str = 'en') -> Optional[Any]:
+        """Get the compiled template, falling back to the default language"""
+        key = (channel, trigger, language)
+        compiled = self._compiled.get(key)
+        if compiled is not None:
+            return compiled
+
+        languages = self._sources.get(channel, {})
+        source = languages.get(language, {}).get(trigger)
+        if source is None:
+            source = languages.get(self.default_language, {}).get(trigger)
+        if source is None:
+            return None
+
+        compiled = self._compilers[channel](source)
+        self._compiled[key] = compiled
+        return compiled
+
+    def render(self, channel: str, trigger: str, language: str = 'en', **kwargs) -> Optional[Any]:
+        """Render a template; returns None if no template is registered"""
+        template = self.get(channel, trigger, language)
+        if template is None:
+            logger.warning(f"No {channel} template found for {trigger} in language {language}")
+            return None
+        return template.render(**kwargs)
+
+
+# Global instance
+template_registry = TemplateRegistry()
@@ -4,11 +4,45 @@ Simple, fast, serverless user profiles
 """
 
 import json
+import asyncio
 import bcrypt
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict
 from services.redis_client import redis_client
 
+PIPELINE_CHUNK_SIZE = 500
+
+# Aggregates maintained on register/update_language (rebuilt by reconcile_counters)
+LANGUAGE_COUNTS_KEY = 'users:languages'  # hash: language -> user count
+USERS_BY_SIGNUP_KEY = 'users:by_signup'  # sorted set: email scored by signup time
+
+
+# Claim the email and save the profile, index entry and aggregates in one
+# step. A hash without password_hash (left by an interrupted registration
+# before this was atomic) does not count as an existing user.
+# KEYS: user hash, users:index, language counts, users by signup
+# ARGV: email, language, signup score, profile field/value pairs...
+REGISTER_SCRIPT = """
+if redis.call('HEXISTS', KEYS[1], 'password_hash') == 1 then
+    return 0
+end
+for i = 4, #ARGV, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[1])
+redis.call('HINCRBY', KEYS[3], ARGV[2], 1)
+redis.call('ZADD', KEYS[4], ARGV[3], ARGV[1])
+return 1
+"""
+
+
+def _signup_score(created_at: Optional[str]) -> float:
+    """Sort score for a stored (naive UTC) ISO timestamp"""
+    try:
+        return datetime.fromisoformat(created_at).replace(tzinfo=timezone.utc).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
 
 class UserRedis:
     """User management via Upstash Redis"""
@@ -28,7 +62,7 @@ class UserRedis:
         )
     
     @staticmethod
-    def register(
+    async def register(
         email: str,
         password: str,
         preferred_language: str = 'en',
@@ -36,17 +70,17 @@ class UserRedis:
     ) -> Optional[Dict]:
         """Register new user"""
         
-        # Check if user exists
+        # Cheap early exit before hashing; the script below decides
         user_key = f"user:{email}"
-        if redis_client.exists(user_key):
+        if await redis_client.hget(user_key, 'password_hash'):
             return None  # User already exists
         
         # Validate language
         if preferred_language not in ['en', 'de', 'fr', 'es', 'it', 'ru']:
             preferred_language = 'en'
         
-        # Hash password
-        password_hash = UserRedis._hash_password(password)
+        # Hash password (bcrypt is slow; keep it off the event loop)
+        password_hash = await asyncio.to_thread(UserRedis._hash_password, password)
         
         # Calculate trial end date (7 days)
         trial_ends_at = (datetime.utcnow() + timedelta(days=7)).isoformat()
@@ -71,41 +105,42 @@ class UserRedis:
             })
         }
         
-        # Save to Redis
-        success = redis_client.hset(user_key, user_data)
+        # Claim the email and save everything in one atomic script
+        profile = [item for field_value in user_data.items() for item in field_value]
+        registered = await redis_client.eval(
+            REGISTER_SCRIPT,
+            [user_key, 'users:index', LANGUAGE_COUNTS_KEY, USERS_BY_SIGNUP_KEY],
+            [email, preferred_language, _signup_score(user_data['created_at']), *profile]
+        )
+        if registered != 1:
+            return None  # User already exists (or Redis is unavailable)
         
-        if success:
-            # Add to email index
-            redis_client.hset('users:index', {email: email})
-            
-            # Log registration
-            print(f"✅ User registered: {email} ({preferred_language})")
-            
-            return {
-                'email': email,
-                'preferred_language': preferred_language,
-                'trial_ends_at': trial_ends_at,
-                'is_active': True
-            }
-        
-        return None
+        # Log registration
+        print(f"✅ User registered: {email} ({preferred_language})")
+        
+        return {
+            'email': email,
+            'preferred_language': preferred_language,
+            'trial_ends_at': trial_ends_at,
+            'is_active': True
+        }
     
     @staticmethod
-    def login(email: str, password: str) -> Optional[Dict]:
+    async def login(email: str, password: str) -> Optional[Dict]:
         """Login user"""
         
         user_key = f"user:{email}"
-        user_data = redis_client.hgetall(user_key)
+        user_data = await redis_client.hgetall(user_key)
         
-        if not user_data or 'email' not in user_data:
+        if not user_data or 'password_hash' not in user_data:
             return None  # User not found
         
         # Verify password
-        if not UserRedis._verify_password(password, user_data['password_hash']):
+        if not await asyncio.to_thread(UserRedis._verify_password, password, user_data['password_hash']):
             return None  # Invalid password
         
         # Update last login
-        redis_client.hset(user_key, {
+        await redis_client.hset(user_key, {
             'last_login': datetime.utcnow().isoformat()
         })
         
@@ -122,13 +157,13 @@ class UserRedis:
         }
     
     @staticmethod
-    def get_profile(email: str) -> Optional[Dict]:
-        """Get user profile"""
+    async def get_profile(email: str) -> Optional[Dict]:
+        """Get user profile (served from the local read cache when hot)"""
         
         user_key = f"user:{email}"
-        user_data = redis_client.hgetall(user_key)
+        user_data = await redis_client.hgetall(user_key, cached=True)
         
-        if not user_data or 'email' not in user_data:
+        if not user_data or 'password_hash' not in user_data:
             return None
         
         return {
@@ -145,7 +180,7 @@ class UserRedis:
         }
     
     @staticmethod
-    def update_language(email: str, language: str, device_type: str = 'unknown') -> bool:
+    async def update_language(email: str, language: str, device_type: str = 'unknown') -> bool:
         """Update user's preferred language"""
         
         if language not in ['en', 'de', 'fr', 'es', 'it', 'ru']:
@@ -153,47 +188,92 @@ class UserRedis:
         
         user_key = f"user:{email}"
         
-        if not redis_client.exists(user_key):
+        current_language = await redis_client.hget(user_key, 'preferred_language')
+        if current_language is None:
             return False
         
-        # Update language
-        success = redis_client.hset(user_key, {
+        # Update language, counters and the change log in one atomic request
+        log_key = f"lang_log:{email}:{datetime.utcnow().timestamp()}"
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.hset(user_key, {
             'preferred_language': language
         })
+        if current_language != language:
+            pipe.hincrby(LANGUAGE_COUNTS_KEY, current_language, -1)
+            pipe.hincrby(LANGUAGE_COUNTS_KEY, language, 1)
+        pipe.hset(log_key, {
+            'email': email,
+            'new_language': language,
+            'device_type': device_type,
+            'changed_at': datetime.utcnow().isoformat()
+        })
+        pipe.expire(log_key, 86400 * 30)  # Keep logs for 30 days
+        success = (await pipe.execute())[0]
         
         if success:
-            # Log language change
-            log_key = f"lang_log:{email}:{datetime.utcnow().timestamp()}"
-            redis_client.hset(log_key, {
-                'email': email,
-                'new_language': language,
-                'device_type': device_type,
-                'changed_at': datetime.utcnow().isoformat()
-            })
-            redis_client.expire(log_key, 86400 * 30)  # Keep logs for 30 days
-            
             print(f"✅ Language updated: {email} → {language}")
         
         return success
     
     @staticmethod
-    def get_all_users() -> list:
-        """Get all user emails (for analytics)"""
-        users_index = redis_client.hgetall('users:index')
-        return list(users_index.keys()) if users_index else []
+    async def get_all_users(offset: int = 0, limit: int = 100) -> Dict:
+        """
+        Get a page of user emails, newest signups first (for analytics)
+        
+        Returns:
+            {'total': user count, 'users': emails in the page}
+        """
+        pipe = redis_client.pipeline()
+        pipe.command(["ZCARD", USERS_BY_SIGNUP_KEY])
+        pipe.command(["ZRANGE", USERS_BY_SIGNUP_KEY, offset, offset + limit - 1, "REV"])
+        total, users = await pipe.execute()
+        return {'total': total or 0, 'users': users or []}
+    
+    @staticmethod
+    async def get_language_distribution() -> Dict[str, int]:
+        """Get distribution of languages among users (one read of the counters)"""
+        counts = await redis_client.hgetall(LANGUAGE_COUNTS_KEY) or {}
+        return {lang: int(count) for lang, count in counts.items() if int(count) > 0}
     
     @staticmethod
-    def get_language_distribution() -> Dict[str, int]:
-        """Get distribution of languages among users"""
-        distribution = {}
+    async def reconcile_counters() -> Dict:
+        """
+        Rebuild the language counters and signup index from user profiles
         
-        all_emails = UserRedis.get_all_users()
+        Walks users:index with HSCAN and reads languages with pipelined
+        HGETs, so it never loads the whole index or one profile per request.
+        Updates that land while it runs may be overwritten; the next run
+        corrects them.
+        """
+        distribution: Dict[str, int] = {}
+        scores: Dict[str, float] = {}
         
-        for email in all_emails:
-            user = UserRedis.get_profile(email)
-            if user:
-                lang = user.get('preferred_language', 'en')
-                distribution[lang] = distribution.get(lang, 0) + 1
+        async for emails, _ in redis_client.hscan_iter('users:index', count=PIPELINE_CHUNK_SIZE):
+            pipe = redis_client.pipeline()
+            for email in emails:
+                pipe.command(["HMGET", f"user:{email}", 'preferred_language', 'created_at'])
+            for email, fields in zip(emails, await pipe.execute()):
+                if not fields or fields[0] is None:
+                    continue
+                distribution[fields[0]] = distribution.get(fields[0], 0) + 1
+                scores[email] = _signup_score(fields[1])
         
-        return distribution
-
+        # Build the signup index aside in chunks, then swap everything in atomically
+        rebuild_key = f"{USERS_BY_SIGNUP_KEY}:rebuild"
+        await redis_client.delete(rebuild_key)
+        emails = list(scores)
+        for start in range(0, len(emails), PIPELINE_CHUNK_SIZE):
+            chunk = emails[start:start + PIPELINE_CHUNK_SIZE]
+            await redis_client.pipeline().zadd(rebuild_key, {email: scores[email] for email in chunk}).execute()
+        
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.delete(LANGUAGE_COUNTS_KEY)
+        if distribution:
+            pipe.hset(LANGUAGE_COUNTS_KEY, distribution)
+        if emails:
+            pipe.command(["RENAME", rebuild_key, USERS_BY_SIGNUP_KEY])
+        else:
+            pipe.delete(USERS_BY_SIGNUP_KEY)
+        await pipe.execute()
+        
+        return {'users': len(scores), 'distribution': distribution}
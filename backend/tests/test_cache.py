@@ -0,0 +1,105 @@
+"""
+Tests for the two-tier cache
+"""
+
+import os
+import sys
+import asyncio
+from datetime import datetime
+
+import pytest
+from fakeredis import FakeServer, aioredis
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.cache import TwoTierCache
+
+
+@pytest.fixture
+def cache():
+    cache = TwoTierCache()
+    cache._redis = aioredis.FakeRedis(server=FakeServer())
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_values_round_trip_through_redis(cache):
+    checked_at = datetime(2026, 10, 19, 9, 30)
+    await cache.set("ssl_status", 42, {"domain": "example.com", "checked_at": checked_at}, ttl=60)
+    cache._local.clear()
+
+    assert await cache.get("ssl_status", 42) == {"domain": "example.com", "checked_at": checked_at.isoformat()}
+    assert await cache.get("ssl_status", 43) is None
+    assert cache.metrics()["ssl_status"] == {
+        "local_hits": 0, "redis_hits": 1, "misses": 1, "sets": 1,
+        "invalidations": 0, "errors": 0, "hit_rate": 50.0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_invalidate_tags_drops_both_tiers(cache):
+    await cache.set("ssl_status", 42, {"ok": True}, ttl=60, tags=["domain:42"])
+    await cache.set("domain_list", "all", [42, 43], ttl=60, tags=["domain:42", "domain:43"])
+    await cache.set("ssl_status", 43, {"ok": True}, ttl=60, tags=["domain:43"])
+
+    assert await cache.invalidate_tags("domain:42") == 2
+
+    assert await cache.get("ssl_status", 42) is None
+    assert await cache.get("domain_list", "all") is None
+    assert await cache.get("ssl_status", 43) == {"ok": True}
+
+
+@pytest.mark.asyncio
+async def test_invalidate_namespace(cache):
+    await cache.set("ssl_status", 42, 1, ttl=60)
+    await cache.set("domain_list", "all", 2, ttl=60)
+
+    await cache.invalidate_namespace("ssl_status")
+
+    assert await cache.get("ssl_status", 42) is None
+    assert await cache.get("domain_list", "all") == 2
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_coalesces_concurrent_misses(cache):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"domain_id": 42}
+
+    results = await asyncio.gather(*[
+        cache.get_or_set("ssl_status", 42, load, ttl=60, tags_for=lambda value: [f"domain:{value['domain_id']}"])
+        for _ in range(5)
+    ])
+
+    assert results == [{"domain_id": 42}] * 5
+    assert len(calls) == 1
+    await cache.invalidate_tags("domain:42")
+    assert await cache.get("ssl_status", 42) is None
+
+
+@pytest.mark.asyncio
+async def test_none_is_not_cached(cache):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return None
+
+    await cache.get_or_set("ssl_status", 42, load, ttl=60)
+    await cache.get_or_set("ssl_status", 42, load, ttl=60)
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_local_tier_is_bounded(cache):
+    cache.local_max_entries = 2
+    for key in range(3):
+        await cache.set("ssl_status", key, key, ttl=60, tags=[f"domain:{key}"])
+
+    assert list(cache._local) == ["cache:ssl_status:1", "cache:ssl_status:2"]
+    assert "domain:0" not in cache._local_tags
@@ -0,0 +1,83 @@
+"""
+Tests for cached read paths and their write-through invalidation
+"""
+
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fakeredis import FakeServer, aioredis
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import cached_queries
+from services.cache import TwoTierCache
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = TwoTierCache()
+    cache._redis = aioredis.FakeRedis(server=FakeServer())
+    monkeypatch.setattr(cached_queries, "cache", cache)
+    return cache
+
+
+def _check(expires_in):
+    return SimpleNamespace(
+        expires_in=expires_in,
+        is_valid=True,
+        checked_at=datetime(2026, 10, 19, 9, 0),
+        issuer="Let's Encrypt",
+        subject="CN=example.com",
+        not_valid_after=None,
+        error_message=None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_check_result_is_written_through(cache, monkeypatch):
+    loads = []
+
+    def load(db, domain_id):
+        loads.append(domain_id)
+        return cached_queries.ssl_status_payload("example.com", 30, _check(60))
+
+    monkeypatch.setattr(cached_queries, "_load_domain_ssl_status", load)
+    assert (await cached_queries.get_domain_ssl_status(None, 42))["expires_in"] == 60
+    await cache.set("statistics", "global", {"total_domains": 1}, ttl=60, tags=["domains"])
+
+    await cached_queries.on_check_recorded(42, cached_queries.ssl_status_payload("example.com", 30, _check(59)))
+
+    # New status served without reloading; aggregates dropped
+    status = await cached_queries.get_domain_ssl_status(None, 42)
+    assert status["expires_in"] == 59
+    assert status["checked_at"] == "2026-10-19T09:00:00"
+    assert loads == [42]
+    assert await cache.get("statistics", "global") is None
+
+
+@pytest.mark.asyncio
+async def test_domain_change_drops_its_entries_and_aggregates(cache):
+    await cache.set("ssl_status", 42, {"expires_in": 60}, ttl=60, tags=["domain:42"])
+    await cache.set("ssl_status", 43, {"expires_in": 60}, ttl=60, tags=["domain:43"])
+    await cache.set("domain_list", "all:100", [], ttl=60, tags=["domains"])
+
+    await cached_queries.on_domain_changed(42)
+
+    assert await cache.get("ssl_status", 42) is None
+    assert await cache.get("domain_list", "all:100") is None
+    assert await cache.get("ssl_status", 43) == {"expires_in": 60}
+
+
+@pytest.mark.asyncio
+async def test_new_domain_drops_only_aggregates(cache):
+    await cache.set("ssl_status", 42, {"expires_in": 60}, ttl=60, tags=["domain:42"])
+    await cache.set("domain_list", "all:100", [], ttl=60, tags=["domains"])
+
+    await cached_queries.on_domain_changed()
+
+    assert await cache.get("domain_list", "all:100") is None
+    assert await cache.get("ssl_status", 42) == {"expires_in": 60}
@@ -0,0 +1,103 @@
+"""
+Tests for the vectorized fleet analytics core
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.fleet_analytics import FleetColumns, analyze, classify, urgent_domains
+from services.ssl_analytics import classify_state
+
+
+def _columns(rows):
+    """rows: (name, expires_in, is_valid, error)"""
+    names, expires_in, is_valid, errors = zip(*rows)
+    return FleetColumns(
+        domain_ids=np.arange(len(rows), dtype=np.int64),
+        names=np.asarray(names, dtype=object),
+        expires_in=np.asarray([np.nan if value is None else value for value in expires_in], dtype=np.float64),
+        is_valid=np.asarray(is_valid, dtype=bool),
+        has_error=np.asarray([error is not None for error in errors], dtype=bool),
+        checked_at=np.full(len(rows), np.datetime64("2026-10-19T09:00:00", "s")),
+        threshold_days=np.full(len(rows), 30.0)
+    )
+
+
+ROWS = [
+    ("healthy.com", 120, True, None),
+    ("warning.com", 20, True, None),
+    ("critical.com", 3, True, None),
+    ("expired.com", -2, False, None),
+    ("error.com", None, False, "timeout"),
+    ("boundary.com", 30, True, None),
+]
+
+
+def test_classify_matches_the_scalar_classifier():
+    columns = _columns(ROWS)
+    states = classify(columns.expires_in, columns.is_valid, columns.has_error, columns.threshold_days)
+
+    expected = [classify_state(valid, days, error, 30) for _, days, valid, error in ROWS]
+    assert [["healthy", "warning", "critical", "expired", "error"][s] for s in states] == expected
+
+
+def test_analyze_counts_histogram_and_forecast():
+    analysis = analyze(_columns(ROWS))
+
+    assert analysis["total_domains"] == 6
+    assert analysis["state_counts"] == {"healthy": 1, "warning": 2, "critical": 1, "expired": 1, "error": 1}
+    assert analysis["expiry_histogram"] == {
+        "expired": 1, "1-7d": 1, "8-14d": 0, "15-30d": 2, "31-60d": 0, "61-90d": 0, "90d+": 1
+    }
+    assert analysis["expiry_forecast"] == {"7d": 1, "14d": 1, "30d": 3, "60d": 3, "90d": 3}
+    assert analysis["average_days_until_expiry"] == pytest.approx((120 + 20 + 3 + 30) / 4)
+    assert analysis["health_score"] == pytest.approx((1 + 2) / 6 * 100)
+
+
+def test_health_score_does_not_count_critical_domains():
+    analysis = analyze(_columns([
+        ("healthy.com", 120, True, None),
+        ("critical.com", 3, True, None),
+    ]))
+
+    assert analysis["state_counts"]["critical"] == 1
+    assert analysis["health_score"] == pytest.approx(50.0)
+
+
+def test_threshold_override():
+    analysis = analyze(_columns(ROWS), threshold_days=14)
+
+    assert analysis["state_counts"]["healthy"] == 3
+    assert analysis["state_counts"]["warning"] == 0
+
+
+def test_urgent_domains_are_ordered_by_risk():
+    columns = _columns(ROWS)
+    analysis = analyze(columns)
+
+    urgent = urgent_domains(columns, analysis, limit=4)
+    assert [entry["domain"] for entry in urgent] == ["expired.com", "error.com", "critical.com", "warning.com"]
+    assert urgent[1] == {"domain": "error.com", "state": "error", "expires_in": None}
+
+
+def test_empty_fleet():
+    columns = FleetColumns(
+        domain_ids=np.empty(0, dtype=np.int64),
+        names=np.empty(0, dtype=object),
+        expires_in=np.empty(0, dtype=np.float64),
+        is_valid=np.empty(0, dtype=bool),
+        has_error=np.empty(0, dtype=bool),
+        checked_at=np.empty(0, dtype="datetime64[s]"),
+        threshold_days=np.empty(0, dtype=np.float64)
+    )
+    analysis = analyze(columns)
+
+    assert analysis["total_domains"] == 0
+    assert analysis["health_score"] == 0.0
+    assert analysis["expiry_percentiles"] == {}
@@ -0,0 +1,84 @@
+"""
+Tests for the background dependency prober
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.health_prober import HEALTHY, NOT_CONFIGURED, PENDING, STALE, UNHEALTHY, HealthProber
+
+
+def _failing():
+    raise ConnectionError("connection refused")
+
+
+def _slow():
+    time.sleep(0.5)
+    return {}
+
+
+@pytest.mark.asyncio
+async def test_probe_results_are_stored():
+    prober = HealthProber()
+    prober.register("database", lambda: {"active_connections": 3}, interval=15, critical=True)
+    prober.register("telegram", lambda: None, interval=300)
+    prober.register("redis", _failing, interval=15)
+
+    assert prober.status("database") == PENDING
+    assert not prober.ready
+    for name in prober.probes:
+        await prober.probe_now(name)
+
+    snapshot = prober.snapshot()
+    assert snapshot["database"]["status"] == HEALTHY
+    assert snapshot["database"]["details"] == {"active_connections": 3}
+    assert snapshot["telegram"]["status"] == NOT_CONFIGURED
+    assert snapshot["redis"]["status"] == UNHEALTHY
+    assert snapshot["redis"]["error"] == "connection refused"
+    # Only critical probes decide readiness
+    assert prober.ready
+
+
+@pytest.mark.asyncio
+async def test_probe_timeout_is_unhealthy():
+    prober = HealthProber()
+    prober.register("n8n", _slow, interval=60, timeout=0.05, critical=True)
+
+    result = await prober.probe_now("n8n")
+
+    assert result.status == UNHEALTHY
+    assert "timed out" in result.error
+    assert prober.unhealthy_critical() == ["n8n"]
+
+
+@pytest.mark.asyncio
+async def test_old_results_are_stale():
+    prober = HealthProber()
+    prober.register("database", lambda: {}, interval=1, critical=True)
+    await prober.probe_now("database")
+
+    prober.probes["database"].result.checked_monotonic -= 10
+
+    assert prober.status("database") == STALE
+    assert not prober.ready
+
+
+@pytest.mark.asyncio
+async def test_metrics_text():
+    prober = HealthProber()
+    prober.register("database", lambda: {}, interval=15, critical=True)
+    prober.register("redis", _failing, interval=15)
+    await prober.probe_now("database")
+    await prober.probe_now("redis")
+
+    lines = prober.metrics_text().splitlines()
+
+    assert 'ssl_monitor_dependency_up{dependency="database"} 1' in lines
+    assert 'ssl_monitor_dependency_up{dependency="redis"} 0' in lines
+    assert "ssl_monitor_health_status 1" in lines
@@ -0,0 +1,87 @@
+"""
+Tests for notification settings and history storage
+"""
+
+import os
+import sys
+
+import pytest
+from fakeredis import FakeServer, aioredis
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.notification_store import (
+    DEFAULT_SETTINGS,
+    InMemoryNotificationStore,
+    NotificationStore,
+    RedisNotificationStore,
+)
+
+
+def _redis_store(history_per_user=3):
+    store = RedisNotificationStore("redis://unused", history_per_user=history_per_user)
+    store._redis = aioredis.FakeRedis(server=FakeServer(), decode_responses=True)
+    return store
+
+
+@pytest.fixture(params=["memory", "redis"])
+def store(request):
+    if request.param == "memory":
+        return InMemoryNotificationStore(history_per_user=3)
+    return _redis_store(history_per_user=3)
+
+
+def test_interface_cannot_be_instantiated():
+    with pytest.raises(TypeError):
+        NotificationStore()
+
+    class Partial(NotificationStore):
+        async def get_settings(self, user_email):
+            return {}
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+@pytest.mark.asyncio
+async def test_settings_default_and_round_trip(store):
+    settings = await store.get_settings("a@example.com")
+    assert settings == DEFAULT_SETTINGS
+    settings["telegram_enabled"] = True
+    # Callers get copies
+    assert (await store.get_settings("a@example.com"))["telegram_enabled"] is False
+
+    await store.save_settings("a@example.com", settings)
+    assert (await store.get_settings("a@example.com"))["telegram_enabled"] is True
+
+
+@pytest.mark.asyncio
+async def test_history_is_capped_and_newest_first(store):
+    for index in range(5):
+        await store.add_history("a@example.com", {"subject": f"alert {index}"})
+
+    history = await store.get_history("a@example.com")
+    assert [entry["subject"] for entry in history] == ["alert 4", "alert 3", "alert 2"]
+    assert history[0]["id"] > history[1]["id"]
+    assert "sent_at" in history[0]
+    assert len(await store.get_history("a@example.com", limit=1)) == 1
+    assert await store.get_history("a@example.com", limit=0) == []
+    assert await store.get_history("b@example.com") == []
+
+
+@pytest.mark.asyncio
+async def test_memory_store_evicts_least_recently_used_users():
+    store = InMemoryNotificationStore(max_settings_users=2, max_history_users=2)
+    await store.save_settings("a@example.com", {"email_enabled": False})
+    await store.save_settings("b@example.com", {"email_enabled": False})
+    await store.get_settings("a@example.com")  # a is now the most recent
+    await store.save_settings("c@example.com", {"email_enabled": False})
+
+    assert (await store.get_settings("a@example.com"))["email_enabled"] is False
+    assert (await store.get_settings("b@example.com")) == DEFAULT_SETTINGS
+
+    for email in ("a@example.com", "b@example.com", "c@example.com"):
+        await store.add_history(email, {"subject": "alert"})
+    assert await store.get_history("a@example.com") == []
+    assert len(await store.get_history("c@example.com")) == 1
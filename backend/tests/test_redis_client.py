@@ -0,0 +1,30 @@
+"""
+Tests for the Upstash Redis client
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.redis_client import UpstashRedis
+
+
+@pytest.mark.asyncio
+async def test_keys_pages_through_scan(monkeypatch):
+    client = UpstashRedis()
+    pages = {"0": ["17", ["user:a", "user:b"]], "17": ["0", ["user:c"]]}
+    commands = []
+
+    async def execute(command):
+        commands.append(command)
+        return pages[command[1]]
+
+    monkeypatch.setattr(client, "_execute", execute)
+
+    assert await client.keys("user:*") == ["user:a", "user:b", "user:c"]
+    assert [command[0] for command in commands] == ["SCAN", "SCAN"]
+    assert commands[0][2:4] == ["MATCH", "user:*"]
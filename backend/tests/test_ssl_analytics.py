@@ -0,0 +1,156 @@
+"""
+Tests for the SSL analytics buckets
+"""
+
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import ssl_analytics
+from services.ssl_analytics import classify_state, expiry_bucket, issuer_name
+
+
+class FakeResult:
+    def __init__(self, first=None, row=None):
+        self._first = first
+        self._row = row
+
+    def first(self):
+        return self._first
+
+    def scalar_one(self):
+        return self._row
+
+
+class FakeSession:
+    """Records statements; the domain day row exists when existing is given"""
+
+    def __init__(self, existing=None, fail=False):
+        self.existing = existing
+        self.fail = fail
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def execute(self, statement):
+        if self.fail:
+            raise RuntimeError("deadlock detected")
+        self.statements.append(statement)
+        if len(self.statements) == 1:
+            return FakeResult(first=None if self.existing else (1,))
+        return FakeResult(row=self.existing)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+DOMAIN = SimpleNamespace(id=1, alert_threshold_days=30)
+
+
+def _check(expires_in=45, is_valid=True, error=None, hour=9):
+    return SimpleNamespace(
+        checked_at=datetime(2026, 10, 19, hour),
+        is_valid=is_valid,
+        expires_in=expires_in,
+        error_message=error,
+        issuer="C=US,O=Let's Encrypt,CN=R3",
+    )
+
+
+@pytest.mark.parametrize("is_valid, expires_in, error, expected", [
+    (True, 45, None, "healthy"),
+    (True, 30, None, "warning"),
+    (True, 8, None, "warning"),
+    (True, 7, None, "critical"),
+    (True, 0, None, "expired"),
+    (False, 45, None, "expired"),
+    (True, None, None, "expired"),
+    (True, 45, "timeout", "error"),
+])
+def test_classify_state(is_valid, expires_in, error, expected):
+    assert classify_state(is_valid, expires_in, error, 30) == expected
+
+
+@pytest.mark.parametrize("state, expires_in, expected", [
+    ("critical", 7, "0-7d"),
+    ("warning", 8, "8-14d"),
+    ("healthy", 90, "61-90d"),
+    ("healthy", 91, "90d+"),
+    ("expired", 0, "expired"),
+    ("error", None, "unknown"),
+])
+def test_expiry_bucket(state, expires_in, expected):
+    assert expiry_bucket(state, expires_in) == expected
+
+
+def test_issuer_name():
+    assert issuer_name("C=US,O=Let's Encrypt,CN=R3") == "Let's Encrypt"
+    assert issuer_name("C=US,O=Example\\, Inc.,CN=CA") == "Example, Inc."
+    assert issuer_name("CN=Self Signed") == "CN=Self Signed"
+    assert issuer_name(None) == "Unknown"
+
+
+def _deltas(session):
+    values = session.statements[-1].compile().params
+    rows = len([key for key in values if key.startswith("dimension")])
+    return [
+        (values[f"dimension_m{i}"], values[f"key_m{i}"], values[f"count_m{i}"], values[f"value_sum_m{i}"])
+        for i in range(rows)
+    ]
+
+
+def test_record_check_first_of_day_upserts_sorted_buckets():
+    session = FakeSession()
+    ssl_analytics.record_check(session, DOMAIN, _check(expires_in=45))
+
+    assert session.commits == 1
+    assert _deltas(session) == [
+        ("checks", "healthy", 1, 0),
+        ("expiry", "31-60d", 1, 45),
+        ("issuer", "Let's Encrypt", 1, 0),
+        ("state", "healthy", 1, 0),
+    ]
+
+
+def test_record_check_replaces_the_days_state_and_skips_unchanged_buckets():
+    existing = SimpleNamespace(
+        state="healthy", issuer="Let's Encrypt", expires_in=45, checked_at=datetime(2026, 10, 19, 8)
+    )
+    session = FakeSession(existing=existing)
+    ssl_analytics.record_check(session, DOMAIN, _check(expires_in=44))
+
+    # Same state and issuer cancel out; only the expiry sum moves
+    assert _deltas(session) == [
+        ("checks", "healthy", 1, 0),
+        ("expiry", "31-60d", 0, -1),
+    ]
+    assert existing.expires_in == 44
+
+
+def test_record_check_keeps_a_newer_state():
+    existing = SimpleNamespace(
+        state="healthy", issuer="Let's Encrypt", expires_in=45, checked_at=datetime(2026, 10, 19, 10)
+    )
+    session = FakeSession(existing=existing)
+    ssl_analytics.record_check(session, DOMAIN, _check(error="timeout"))
+
+    assert _deltas(session) == [("checks", "error", 1, 0)]
+    assert existing.state == "healthy"
+    assert session.commits == 1
+
+
+def test_record_check_failure_is_rolled_back_not_raised():
+    session = FakeSession(fail=True)
+    ssl_analytics.record_check(session, DOMAIN, _check())
+
+    assert session.rollbacks == 1
+    assert session.commits == 0
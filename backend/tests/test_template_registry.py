@@ -0,0 +1,89 @@
+"""
+Tests for the compiled message template registry
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.template_registry import FormatTemplate, SlackBlocksTemplate, TemplateRegistry
+
+
+CONTEXT = {
+    "domain": "example.com",
+    "days": 7,
+    "ratio": 0.98765,
+    "user": SimpleNamespace(name="Ann"),
+    "items": ["first", "second"],
+}
+
+
+@pytest.mark.parametrize("source", [
+    "",
+    "plain text",
+    "a {{b}} c",
+    "{{}} {{{{",
+    "{domain}",
+    "Domain {domain} expires in {days} days",
+    "{days:>5}|{ratio:.2f}|{domain!r}",
+    "{user.name} / {items[1]}",
+    "{{literal}} {domain} {{again}}",
+])
+def test_format_template_matches_str_format(source):
+    assert FormatTemplate(source).render(**CONTEXT) == source.format(**CONTEXT)
+
+
+def test_static_template_unescapes_braces():
+    template = FormatTemplate("a {{b}} c")
+    assert template.is_static
+    assert template.render() == "a {b} c"
+
+
+def test_missing_field_raises_key_error():
+    with pytest.raises(KeyError):
+        FormatTemplate("{domain} {missing}").render(domain="example.com")
+
+
+def test_slack_blocks_are_fresh_per_render():
+    template = SlackBlocksTemplate({
+        "title": "Certificate expiring",
+        "fields": [{"title": "Domain {x}", "value": "{domain}"}],
+    })
+    first = template.render(domain="example.com")
+    first[0]["text"]["text"] = "changed"
+    first[-1]["elements"].clear()
+
+    second = template.render(domain="example.com")
+    assert second[0]["text"]["text"] == "Certificate expiring"
+    assert len(second[-1]["elements"]) == 2
+    # The field title is literal text, only the value is formatted
+    assert second[1]["fields"][0]["text"] == "*Domain {x}:*\nexample.com"
+
+
+def test_registry_falls_back_to_default_language_and_recompiles_on_register():
+    registry = TemplateRegistry()
+    registry.load_channel("telegram", lambda: {"en": {"expired": "{domain} expired"}})
+
+    assert registry.render("telegram", "expired", "de", domain="example.com") == "example.com expired"
+    assert registry.render("telegram", "unknown", domain="example.com") is None
+
+    registry.register("telegram", "expired", "{domain} ist abgelaufen", language="de")
+    assert registry.render("telegram", "expired", "de", domain="example.com") == "example.com ist abgelaufen"
+
+
+def test_load_channel_runs_loader_once():
+    registry = TemplateRegistry()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return {"en": {}}
+
+    registry.load_channel("telegram", loader)
+    registry.load_channel("telegram", loader)
+    assert len(calls) == 1
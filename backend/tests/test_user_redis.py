@@ -0,0 +1,135 @@
+"""
+Tests for Redis user registration
+"""
+
+import os
+import sys
+
+import fakeredis
+import pytest
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import user_redis
+from services.redis_client import UpstashRedis
+from services.user_redis import LANGUAGE_COUNTS_KEY, USERS_BY_SIGNUP_KEY, UserRedis
+
+
+class FakeUpstash(UpstashRedis):
+    """UpstashRedis whose REST calls run against an in-memory Redis"""
+
+    def __init__(self, server):
+        super().__init__()
+        self.redis = fakeredis.FakeRedis(server=server, decode_responses=True)
+        # Raw replies, as the REST API returns them
+        self.redis.response_callbacks = {}
+
+    async def _execute(self, command):
+        if command[0] in self.WRITE_COMMANDS:
+            self._invalidate(command[1])
+        try:
+            return self.redis.execute_command(*command)
+        except fakeredis.ResponseError:
+            return None
+
+    async def _batch(self, commands, transaction):
+        pipe = self.redis.pipeline(transaction=transaction)
+        for command in commands:
+            pipe.execute_command(*command)
+        results = pipe.execute(raise_on_error=False)
+        return [None if isinstance(result, Exception) else result for result in results]
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(user_redis, "redis_client", FakeUpstash(server))
+    return fakeredis.FakeRedis(server=server, decode_responses=True)
+
+
+@pytest.mark.asyncio
+async def test_register_writes_profile_index_and_aggregates(redis):
+    user = await UserRedis.register("a@example.com", "secret", preferred_language="de")
+
+    assert user["preferred_language"] == "de"
+    profile = redis.hgetall("user:a@example.com")
+    assert profile["plan"] == "trial"
+    assert UserRedis._verify_password("secret", profile["password_hash"])
+    assert redis.hget("users:index", "a@example.com") == "a@example.com"
+    assert redis.hget(LANGUAGE_COUNTS_KEY, "de") == "1"
+    assert redis.zscore(USERS_BY_SIGNUP_KEY, "a@example.com") > 0
+
+
+@pytest.mark.asyncio
+async def test_register_twice_is_rejected_without_touching_aggregates(redis):
+    await UserRedis.register("a@example.com", "secret")
+    password_hash = redis.hget("user:a@example.com", "password_hash")
+
+    assert await UserRedis.register("a@example.com", "other") is None
+    assert redis.hget("user:a@example.com", "password_hash") == password_hash
+    assert redis.hget(LANGUAGE_COUNTS_KEY, "en") == "1"
+
+
+@pytest.mark.asyncio
+async def test_interrupted_claim_does_not_lock_the_email(redis):
+    # Left behind by a registration that died between claim and save
+    redis.hset("user:a@example.com", "email", "a@example.com")
+
+    assert await UserRedis.register("a@example.com", "secret") is not None
+    assert "password_hash" in redis.hgetall("user:a@example.com")
+
+
+@pytest.mark.asyncio
+async def test_claim_is_checked_inside_the_script(redis, monkeypatch):
+    # Both requests pass the early check before either one saves
+    async def missing(key, field):
+        return None
+
+    monkeypatch.setattr(user_redis.redis_client, "hget", missing)
+    first = await UserRedis.register("a@example.com", "secret")
+    second = await UserRedis.register("a@example.com", "other")
+
+    assert first is not None
+    assert second is None
+    assert UserRedis._verify_password("secret", redis.hget("user:a@example.com", "password_hash"))
+
+
+@pytest.mark.asyncio
+async def test_update_language_moves_the_counters(redis):
+    await UserRedis.register("a@example.com", "secret", preferred_language="en")
+    await UserRedis.register("b@example.com", "secret", preferred_language="en")
+
+    assert await UserRedis.update_language("a@example.com", "fr")
+    assert await UserRedis.update_language("a@example.com", "fr")  # No change the second time
+
+    assert await UserRedis.get_language_distribution() == {"en": 1, "fr": 1}
+    assert not await UserRedis.update_language("missing@example.com", "fr")
+
+
+@pytest.mark.asyncio
+async def test_get_all_users_pages_newest_first(redis):
+    for email, score in (("old@example.com", 1), ("mid@example.com", 2), ("new@example.com", 3)):
+        await UserRedis.register(email, "secret")
+        redis.zadd(USERS_BY_SIGNUP_KEY, {email: score})
+
+    assert await UserRedis.get_all_users(limit=2) == {
+        "total": 3, "users": ["new@example.com", "mid@example.com"]
+    }
+    assert (await UserRedis.get_all_users(offset=2, limit=2))["users"] == ["old@example.com"]
+
+
+@pytest.mark.asyncio
+async def test_reconcile_counters_rebuilds_from_profiles(redis):
+    await UserRedis.register("a@example.com", "secret", preferred_language="de")
+    await UserRedis.register("b@example.com", "secret", preferred_language="en")
+    # Drifted aggregates
+    redis.hset(LANGUAGE_COUNTS_KEY, mapping={"de": 5, "ru": 2})
+    redis.zrem(USERS_BY_SIGNUP_KEY, "b@example.com")
+
+    result = await UserRedis.reconcile_counters()
+
+    assert result == {"users": 2, "distribution": {"de": 1, "en": 1}}
+    assert redis.hgetall(LANGUAGE_COUNTS_KEY) == {"de": "1", "en": "1"}
+    assert set(redis.zrange(USERS_BY_SIGNUP_KEY, 0, -1)) == {"a@example.com", "b@example.com"}
+    assert not redis.exists(f"{USERS_BY_SIGNUP_KEY}:rebuild")
@@ -0,0 +1,50 @@
+"""notification log payload hash and new notification triggers
+
+Databases created by init_db (Base.metadata.create_all) before these
+changes keep their old notification_logs table and notificationtrigger
+type, because create_all only creates missing tables. This revision
+adds what is missing and is a no-op on databases created afterwards.
+
+Revision ID: 3f1c9a7d2b64
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c9a7d2b64'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# NotificationTrigger members added after the type was first created
+# (SQLAlchemy stores enum member names)
+NEW_TRIGGERS = ("SSL_CHECK_SUCCESS", "SSL_CHECK_ERROR", "DIGEST")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if "notification_logs" in sa.inspect(bind).get_table_names():
+        op.execute("ALTER TABLE notification_logs ADD COLUMN IF NOT EXISTS payload_hash VARCHAR(64)")
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_notification_logs_payload_hash "
+            "ON notification_logs (payload_hash)"
+        )
+
+    has_trigger_type = bind.execute(
+        sa.text("SELECT 1 FROM pg_type WHERE typname = 'notificationtrigger'")
+    ).scalar()
+    if has_trigger_type:
+        # ALTER TYPE ... ADD VALUE cannot run inside a transaction block on PostgreSQL < 12
+        with op.get_context().autocommit_block():
+            for value in NEW_TRIGGERS:
+                op.execute(f"ALTER TYPE notificationtrigger ADD VALUE IF NOT EXISTS '{value}'")
+
+
+def downgrade() -> None:
+    # PostgreSQL cannot drop enum values; the trigger values stay
+    op.execute("DROP INDEX IF EXISTS ix_notification_logs_payload_hash")
+    op.execute("ALTER TABLE notification_logs DROP COLUMN IF EXISTS payload_hash")
@@ -3,15 +3,17 @@ Analytics Dashboard API endpoints
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any, Optional
 from pydantic import BaseModel, Field
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 
-from app.core.database import get_db, async_session_maker
+from app.core.database import get_db
 from app.core.security import get_current_user
 from app.models.user import User
 from app.services.analytics import analytics_service
+from app.services.check_export import check_history_exporter, EXPORT_FORMATS, PARQUET_ENABLED
 import logging
 
 logger = logging.getLogger(__name__)
@@ -85,16 +87,15 @@ async def get_monitor_overview(
 ):
     """Get monitor overview metrics"""
     try:
-        async with async_session_maker() as db:
-            metrics = await analytics_service._get_monitor_metrics(db, current_user.id)
-            
-            if "error" in metrics:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Failed to get monitor metrics: {metrics['error']}"
-                )
-            
-            return metrics
+        metrics = await analytics_service.get_dashboard_section(current_user.id, "monitor_overview")
+        
+        if "error" in metrics:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to get monitor metrics: {metrics['error']}"
+            )
+        
+        return metrics
             
     except HTTPException:
         raise
@@ -113,16 +114,15 @@ async def get_ssl_health_metrics(
 ):
     """Get SSL health metrics"""
     try:
-        async with async_session_maker() as db:
-            metrics = await analytics_service._get_ssl_health_metrics(db, current_user.id, days)
-            
-            if "error" in metrics:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Failed to get SSL health metrics: {metrics['error']}"
-                )
-            
-            return metrics
+        metrics = await analytics_service.get_dashboard_section(current_user.id, "ssl_health", days)
+        
+        if "error" in metrics:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to get SSL health metrics: {metrics['error']}"
+            )
+        
+        return metrics
             
     except HTTPException:
         raise
@@ -141,16 +141,15 @@ async def get_notification_metrics(
 ):
     """Get notification metrics"""
     try:
-        async with async_session_maker() as db:
-            metrics = await analytics_service._get_notification_metrics(db, current_user.id, days)
-            
-            if "error" in metrics:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Failed to get notification metrics: {metrics['error']}"
-                )
-            
-            return metrics
+        metrics = await analytics_service.get_dashboard_section(current_user.id, "notifications", days)
+        
+        if "error" in metrics:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to get notification metrics: {metrics['error']}"
+            )
+        
+        return metrics
             
     except HTTPException:
         raise
@@ -169,16 +168,15 @@ async def get_uptime_metrics(
 ):
     """Get uptime and availability metrics"""
     try:
-        async with async_session_maker() as db:
-            metrics = await analytics_service._get_uptime_metrics(db, current_user.id, days)
-            
-            if "error" in metrics:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Failed to get uptime metrics: {metrics['error']}"
-                )
-            
-            return metrics
+        metrics = await analytics_service.get_dashboard_section(current_user.id, "uptime", days)
+        
+        if "error" in metrics:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to get uptime metrics: {metrics['error']}"
+            )
+        
+        return metrics
             
     except HTTPException:
         raise
@@ -197,16 +195,15 @@ async def get_cost_savings_metrics(
 ):
     """Get cost savings and ROI metrics"""
     try:
-        async with async_session_maker() as db:
-            metrics = await analytics_service._get_cost_savings_metrics(db, current_user.id, days)
-            
-            if "error" in metrics:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Failed to get cost savings metrics: {metrics['error']}"
-                )
-            
-            return metrics
+        metrics = await analytics_service.get_dashboard_section(current_user.id, "cost_savings", days)
+        
+        if "error" in metrics:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to get cost savings metrics: {metrics['error']}"
+            )
+        
+        return metrics
             
     except HTTPException:
         raise
@@ -225,16 +222,15 @@ async def get_trends_metrics(
 ):
     """Get trends and insights"""
     try:
-        async with async_session_maker() as db:
-            metrics = await analytics_service._get_trends_metrics(db, current_user.id, days)
-            
-            if "error" in metrics:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Failed to get trends metrics: {metrics['error']}"
-                )
-            
-            return metrics
+        metrics = await analytics_service.get_dashboard_section(current_user.id, "trends", days)
+        
+        if "error" in metrics:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to get trends metrics: {metrics['error']}"
+            )
+        
+        return metrics
             
     except HTTPException:
         raise
@@ -294,34 +290,33 @@ async def get_insights(
 ):
     """Get actionable insights and recommendations"""
     try:
-        async with async_session_maker() as db:
-            # Get trends for insights generation
-            trends = await analytics_service._get_trends_metrics(db, current_user.id, 30)
-            
-            if "error" in trends:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Failed to get insights: {trends['error']}"
-                )
-            
-            # Get monitor overview for additional insights
-            monitor_overview = await analytics_service._get_monitor_metrics(db, current_user.id)
-            
-            insights = trends.get("insights", [])
-            
-            # Add monitor-specific insights
-            if monitor_overview.get("expiring_soon", 0) > 0:
-                insights.append(f"⚠️ {monitor_overview['expiring_soon']} certificates expiring soon - take action now")
-            
-            if monitor_overview.get("inactive_monitors", 0) > 0:
-                insights.append(f"🔧 {monitor_overview['inactive_monitors']} inactive monitors - consider cleaning up")
-            
-            return {
-                "insights": insights[:10],  # Return top 10 insights
-                "generated_at": datetime.now(timezone.utc).isoformat(),
-                "total_insights": len(insights)
-            }
-            
+        # Get trends for insights generation
+        trends = await analytics_service.get_dashboard_section(current_user.id, "trends", 30)
+        
+        if "error" in trends:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to get insights: {trends['error']}"
+            )
+        
+        # Get monitor overview for additional insights
+        monitor_overview = await analytics_service.get_dashboard_section(current_user.id, "monitor_overview", 30)
+        
+        insights = list(trends.get("insights", []))
+        
+        # Add monitor-specific insights
+        if monitor_overview.get("expiring_soon", 0) > 0:
+            insights.append(f"⚠️ {monitor_overview['expiring_soon']} certificates expiring soon - take action now")
+        
+        if monitor_overview.get("inactive_monitors", 0) > 0:
+            insights.append(f"🔧 {monitor_overview['inactive_monitors']} inactive monitors - consider cleaning up")
+        
+        return {
+            "insights": insights[:10],  # Return top 10 insights
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "total_insights": len(insights)
+        }
+        
     except HTTPException:
         raise
     except Exception as e:
@@ -353,7 +348,7 @@ async def export_analytics_data(
         
         if format.lower() == "csv":
             # Convert to CSV format (simplified)
-            csv_data = self._convert_to_csv(metrics)
+            csv_data = _convert_to_csv(metrics)
             return {
                 "data": csv_data,
                 "format": "csv",
@@ -379,6 +374,43 @@ async def export_analytics_data(
         )
 
 
+@router.get("/export/checks")
+async def export_check_history(
+    format: str = Query(default="csv", description="Export format: csv, ndjson, parquet"),
+    days: int = Query(default=30, ge=1, le=3650, description="Number of days of history to export"),
+    monitor_id: Optional[int] = Query(default=None, description="Restrict the export to one monitor"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream the full check history for the user's monitors
+
+    Rows are read through a server-side cursor and encoded batch by batch,
+    so memory use does not grow with the export range.
+    """
+    format = format.lower()
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format. Must be one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    if format == "parquet" and not PARQUET_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Parquet export is not available on this server"
+        )
+
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(days=days)
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f"ssl_checks_{current_user.id}_{days}days.{extension}"
+
+    return StreamingResponse(
+        check_history_exporter.stream(format, current_user.id, start, end, monitor_id),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 def _convert_to_csv(metrics: Dict[str, Any]) -> str:
     """Convert metrics to CSV format"""
     # Simplified CSV conversion - in production, use pandas or similar
@@ -11,6 +11,7 @@ from app.core.database import get_db
 from app.core.security import verify_password, get_password_hash, create_tokens, verify_token
 from app.core.config import settings
 from app.models.user import User, UserRole
+from app.services.api_key_service import api_key_service
 from app.schemas.user import (
     UserCreate, UserLogin, User as UserSchema, Token, 
     PasswordChange, PasswordReset, PasswordResetConfirm
@@ -242,6 +243,9 @@ async def delete_account(
     current_user.is_active = False
     await db.commit()
     
+    # Cached API key auth info still says the owner is active
+    await api_key_service.invalidate_user_keys(db, current_user.id)
+    
     logger.info(f"Account deleted for user: {current_user.email}")
     
     return {"message": "Account deleted successfully"}
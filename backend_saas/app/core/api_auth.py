@@ -6,10 +6,11 @@ from fastapi import HTTPException, status, Depends, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, Dict, Any
-from datetime import datetime, timezone
+import math
 import time
 
-from app.core.database import get_db, async_session_maker
+from app.core.database import get_db
+from app.core.permissions import compile_permissions
 from app.services.api_key_service import api_key_service
 from app.models.user import User
 import logging
@@ -20,6 +21,18 @@ logger = logging.getLogger(__name__)
 security = HTTPBearer(auto_error=False)
 
 
+def route_template(request: Request) -> str:
+    """
+    Route path template of a request ("/api/v1/monitors/{id}")
+
+    Usage rows and rollups are keyed by endpoint, so concrete paths would
+    give one row per resource ID. Falls back to the path when no route
+    matched (404s).
+    """
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or request.url.path
+
+
 class APIKeyAuth:
     """API Key authentication class"""
     
@@ -87,7 +100,7 @@ class APIKeyAuth:
     
     async def log_request(
         self,
-        db: AsyncSession,
+        db: Optional[AsyncSession],
         request: Request,
         response_status: int,
         response_time_ms: int,
@@ -99,7 +112,7 @@ class APIKeyAuth:
                 db=db,
                 api_key_id=auth_info["api_key_id"],
                 user_id=auth_info["user_id"],
-                endpoint=str(request.url.path),
+                endpoint=route_template(request),
                 method=request.method,
                 status_code=response_status,
                 response_time_ms=response_time_ms,
@@ -140,9 +153,12 @@ async def get_api_user(
         if isinstance(auth_info, dict) and "error" in auth_info:
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail=auth_info["error"]
+                detail=auth_info["error"],
+                headers={"Retry-After": str(math.ceil(auth_info.get("retry_after", 1)))}
             )
         
+        # Picked up by the request middleware for usage logging
+        request.state.api_auth = auth_info
         return auth_info
         
     except HTTPException:
@@ -175,16 +191,15 @@ async def require_api_permission(
         HTTPException: If permission denied
     """
     try:
-        async with async_session_maker() as db:
-            has_permission = await api_auth.check_permission(auth_info, endpoint, method)
-            
-            if not has_permission:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail=f"API key does not have permission for {method} {endpoint}"
-                )
-            
-            return auth_info
+        has_permission = await api_auth.check_permission(auth_info, endpoint, method)
+        
+        if not has_permission:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"API key does not have permission for {method} {endpoint}"
+            )
+        
+        return auth_info
             
     except HTTPException:
         raise
@@ -220,16 +235,10 @@ class APIRateLimitMiddleware:
         # Add rate limit headers if authenticated
         if auth_info and isinstance(auth_info, dict) and "api_key_id" in auth_info:
             response.headers["X-RateLimit-Limit"] = str(auth_info.get("rate_limit_per_hour", 100))
-            response.headers["X-RateLimit-Remaining"] = str(
-                auth_info.get("rate_limit_per_hour", 100) - auth_info.get("requests_this_hour", 0)
-            )
+            response.headers["X-RateLimit-Remaining"] = str(auth_info.get("rate_limit_remaining", 0))
             
-            # Calculate reset time (next hour)
-            now = datetime.now(timezone.utc)
-            reset_time = now.replace(minute=0, second=0, microsecond=0) + timezone.utc.localize(
-                datetime(now.year, now.month, now.day, now.hour + 1)
-            )
-            response.headers["X-RateLimit-Reset"] = str(int(reset_time.timestamp()))
+            # Time at which the full limit is available again
+            response.headers["X-RateLimit-Reset"] = str(auth_info.get("rate_limit_reset", int(time.time())))
         
         # Add response time header
         response.headers["X-Response-Time"] = f"{response_time_ms}ms"
@@ -255,16 +264,4 @@ def get_plan_limits(plan: str) -> Dict[str, Any]:
 def is_endpoint_allowed(plan: str, endpoint: str, method: str) -> bool:
     """Check if endpoint is allowed for plan"""
     plan_config = get_plan_limits(plan)
-    endpoints = plan_config.get("endpoints", [])
-    
-    full_endpoint = f"{method} {endpoint}"
-    
-    for allowed_endpoint in endpoints:
-        if allowed_endpoint == full_endpoint:
-            return True
-        if allowed_endpoint.endswith("*") and endpoint.startswith(allowed_endpoint[:-1]):
-            return True
-        if allowed_endpoint.startswith("*"):
-            return True
-    
-    return False
+    return compile_permissions(plan_config.get("endpoints", [])).allows(method, endpoint)
@@ -102,6 +102,37 @@ class Settings(BaseSettings):
     HEALTH_CHECK_INTERVAL: int = 300  # 5 minutes
     MAX_CONCURRENT_CHECKS: int = 10
     
+    # Notification digests
+    NOTIFICATION_DIGEST_WINDOW: int = 120  # seconds, 0 disables coalescing
+    NOTIFICATION_DIGEST_CHANNELS: List[str] = ["email", "telegram", "whatsapp", "sms", "slack"]
+    
+    # Notification delivery logs
+    NOTIFICATION_LOG_FLUSH_INTERVAL: int = 10  # seconds
+    NOTIFICATION_LOG_BATCH_SIZE: int = 500
+    
+    # Notification outbox
+    NOTIFICATION_OUTBOX_POLL_INTERVAL: int = 5  # seconds
+    NOTIFICATION_OUTBOX_BATCH_SIZE: int = 100
+    NOTIFICATION_OUTBOX_CONCURRENCY: int = 20
+    NOTIFICATION_OUTBOX_VISIBILITY_TIMEOUT: int = 300  # seconds a claimed row stays invisible
+    NOTIFICATION_OUTBOX_MAX_ATTEMPTS: int = 5
+    NOTIFICATION_OUTBOX_RETENTION_DAYS: int = 7
+    
+    # API key authentication
+    API_KEY_AUTH_LOCAL_TTL: int = 5  # seconds, per-process cache
+    API_KEY_AUTH_CACHE_TTL: int = 300  # seconds, shared Redis cache
+    API_KEY_USAGE_FLUSH_INTERVAL: int = 15  # seconds
+    API_KEY_RATE_LIMIT_PERIOD: int = 3600  # seconds, rate_limit_per_hour window
+    RATE_LIMIT_LOCAL_BLOCK_MAX_ENTRIES: int = 10000
+    API_USAGE_BUFFER_SIZE: int = 50000  # entries held in memory before dropping
+    API_USAGE_BATCH_SIZE: int = 1000
+    API_USAGE_FLUSH_INTERVAL: int = 5  # seconds
+    API_USAGE_MINUTE_RETENTION_HOURS: int = 48
+    
+    # Analytics result cache
+    ANALYTICS_CACHE_TTL: int = 60  # seconds a result is fresh
+    ANALYTICS_CACHE_STALE_TTL: int = 300  # seconds a result may be served stale while refreshing
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,6 +1,8 @@
 """
 Database configuration and session management
 """
+import asyncio
+from typing import Awaitable, TypeVar
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from app.core.config import settings
@@ -21,6 +23,9 @@ async_session_maker = async_sessionmaker(
 )
 
 
+T = TypeVar("T")
+
+
 class Base(DeclarativeBase):
     """Base class for all models"""
     pass
@@ -39,3 +44,21 @@ async def init_db():
     """Initialize database tables"""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+
+
+def run_async(coro: Awaitable[T]) -> T:
+    """
+    Run a coroutine from a synchronous Celery task
+
+    Every call gets a fresh event loop (asyncio.run). Pooled asyncpg
+    connections belong to the loop that opened them, so the pool is
+    disposed before the loop closes instead of being handed to the next
+    task's loop.
+    """
+    async def run() -> T:
+        try:
+            return await coro
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
@@ -0,0 +1,121 @@
+"""
+API key permission matching
+Endpoint patterns ("GET /api/v1/monitors/{id}", "POST /api/v1/*", "*")
+compiled into a per-method route trie
+"""
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+ANY = "*"
+
+
+class _Node:
+    """Route trie node"""
+
+    __slots__ = ("children", "param", "terminal", "wildcard")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.param: Optional["_Node"] = None  # {name} segment
+        self.terminal = False  # pattern ends here
+        self.wildcard = False  # pattern continues with "/*"
+
+
+def _is_param(segment: str) -> bool:
+    return segment.startswith("{") and segment.endswith("}")
+
+
+def _split(path: str) -> Tuple[str, ...]:
+    return tuple(segment for segment in path.split("/") if segment)
+
+
+class PermissionMatcher:
+    """
+    Compiled set of endpoint permissions
+
+    Matching walks one trie per method, so a check costs O(path segments)
+    regardless of how many patterns the key holds. A trailing "*" matches
+    one or more remaining segments; "{name}" matches any single segment.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.allow_all = False
+        self._roots: Dict[str, _Node] = {}
+        for pattern in patterns:
+            self._add(pattern.strip())
+
+    def _add(self, pattern: str) -> None:
+        if pattern == ANY:
+            self.allow_all = True
+            return
+
+        method, _, path = pattern.partition(" ")
+        if not path:
+            # Bare path: any method
+            method, path = ANY, method
+
+        node = self._roots.setdefault(method.upper(), _Node())
+        segments = _split(path)
+        for index, segment in enumerate(segments):
+            if segment == ANY and index == len(segments) - 1:
+                node.wildcard = True
+                return
+            if _is_param(segment):
+                if node.param is None:
+                    node.param = _Node()
+                node = node.param
+            else:
+                node = node.children.setdefault(segment, _Node())
+        node.terminal = True
+
+    @staticmethod
+    def _match(node: _Node, segments: Tuple[str, ...], index: int) -> bool:
+        if index == len(segments):
+            return node.terminal
+        if node.wildcard:
+            return True
+
+        segment = segments[index]
+        child = node.children.get(segment)
+        if child is not None and PermissionMatcher._match(child, segments, index + 1):
+            return True
+        if node.param is not None:
+            return PermissionMatcher._match(node.param, segments, index + 1)
+        return False
+
+    def allows(self, method: str, endpoint: str) -> bool:
+        """
+        Check if a method and endpoint are permitted
+
+        Args:
+            method: HTTP method
+            endpoint: Concrete path ("/api/v1/monitors/42") or route
+                template ("/api/v1/monitors/{id}")
+
+        Returns:
+            True if any compiled pattern matches
+        """
+        if self.allow_all:
+            return True
+
+        segments = _split(endpoint)
+        for key in (method.upper(), ANY):
+            root = self._roots.get(key)
+            if root is not None and self._match(root, segments, 0):
+                return True
+        return False
+
+
+@lru_cache(maxsize=4096)
+def _compile(patterns: Tuple[str, ...]) -> PermissionMatcher:
+    return PermissionMatcher(patterns)
+
+
+def compile_permissions(patterns: Iterable[str]) -> PermissionMatcher:
+    """
+    Get the compiled matcher for a permission list
+
+    Keys on the same plan share identical lists, so compiled matchers are
+    shared process-wide.
+    """
+    return _compile(tuple(patterns))
@@ -0,0 +1,132 @@
+"""
+Shared rate limiting
+GCRA (generic cell rate algorithm) evaluated atomically in Redis
+"""
+import time
+from typing import Dict, Any, Optional, Tuple
+from app.core.config import settings
+from app.core.redis import get_async_redis
+import logging
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] = bucket key
+# ARGV[1] = limit, ARGV[2] = period (ms), ARGV[3] = cost
+# Stores only the theoretical arrival time (TAT); uses the Redis clock so
+# replicas with skewed clocks agree. The TAT is formatted explicitly because
+# Lua would otherwise pass large floats to Redis in exponent notation.
+# Returns {allowed, remaining, retry_after_ms, reset_after_ms}
+GCRA_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local interval = period / limit
+
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+
+local new_tat = tat + interval * cost
+local allow_at = new_tat - period
+if allow_at > now then
+    return {0, 0, math.ceil(allow_at - now), math.ceil(tat - now)}
+end
+
+redis.call('SET', KEYS[1], string.format('%.3f', new_tat), 'PX', math.ceil(new_tat - now))
+return {1, math.floor((now - allow_at) / interval), 0, math.ceil(new_tat - now)}
+"""
+
+
+class RateLimiter:
+    """
+    Redis-backed rate limiter shared by all API replicas
+
+    Each check is one EVALSHA round-trip. Clients that were denied are
+    remembered locally until their retry time, so a client hammering past
+    its limit is rejected without touching Redis.
+    """
+
+    def __init__(self, prefix: str = "rate_limit"):
+        self.prefix = prefix
+        self.max_blocked = settings.RATE_LIMIT_LOCAL_BLOCK_MAX_ENTRIES
+        self._script = None
+        self._blocked: Dict[str, Tuple[float, float]] = {}
+
+    def _get_script(self):
+        if self._script is None:
+            self._script = get_async_redis().register_script(GCRA_SCRIPT)
+        return self._script
+
+    def _local_check(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._blocked.get(key)
+        if entry is None:
+            return None
+        blocked_until, reset_at = entry
+        now = time.monotonic()
+        if blocked_until <= now:
+            del self._blocked[key]
+            return None
+        return {
+            "allowed": False,
+            "remaining": 0,
+            "retry_after": blocked_until - now,
+            "reset_after": max(reset_at - now, 0.0)
+        }
+
+    def _block(self, key: str, retry_after: float, reset_after: float) -> None:
+        if len(self._blocked) >= self.max_blocked:
+            now = time.monotonic()
+            self._blocked = {k: v for k, v in self._blocked.items() if v[0] > now}
+            if len(self._blocked) >= self.max_blocked:
+                self._blocked.clear()
+        now = time.monotonic()
+        self._blocked[key] = (now + retry_after, now + reset_after)
+
+    async def hit(self, key: str, limit: int, period: int, cost: int = 1) -> Dict[str, Any]:
+        """
+        Consume capacity for a key
+
+        Args:
+            key: Client identifier (e.g. "api_key:42")
+            limit: Requests allowed per period
+            period: Period length in seconds
+            cost: Capacity consumed by this request
+
+        Returns:
+            Dict with allowed, remaining, retry_after and reset_after (seconds)
+        """
+        local = self._local_check(key)
+        if local is not None:
+            return local
+
+        try:
+            allowed, remaining, retry_after_ms, reset_after_ms = await self._get_script()(
+                keys=[f"{self.prefix}:{key}"],
+                args=[limit, period * 1000, cost]
+            )
+        except Exception as e:
+            # Fail open: a Redis outage must not take the API down
+            logger.warning(f"Rate limiter unavailable, allowing request for {key}: {e}")
+            return {"allowed": True, "remaining": limit, "retry_after": 0.0, "reset_after": 0.0}
+
+        result = {
+            "allowed": bool(allowed),
+            "remaining": int(remaining),
+            "retry_after": retry_after_ms / 1000,
+            "reset_after": reset_after_ms / 1000
+        }
+        if not result["allowed"]:
+            self._block(key, result["retry_after"], result["reset_after"])
+        return result
+
+    async def reset(self, key: str) -> None:
+        """Clear a key's state (admin use)"""
+        self._blocked.pop(key, None)
+        await get_async_redis().delete(f"{self.prefix}:{key}")
+
+
+# Global API key rate limiter instance
+api_key_rate_limiter = RateLimiter(prefix="rate_limit:api")
@@ -0,0 +1,39 @@
+"""
+Shared Redis clients
+"""
+import redis
+import redis.asyncio as aioredis
+from typing import Optional
+from app.core.config import settings
+
+_redis_client: Optional[redis.Redis] = None
+_async_redis_client: Optional[aioredis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """Get the process-wide Redis client (lazily created, pooled connections)"""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _redis_client
+
+
+def get_async_redis() -> aioredis.Redis:
+    """
+    Get the process-wide asyncio Redis client for the API event loop
+
+    Celery tasks run each invocation in a fresh event loop and should use
+    get_redis() instead.
+    """
+    global _async_redis_client
+    if _async_redis_client is None:
+        _async_redis_client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _async_redis_client
+
+
+async def close_async_redis() -> None:
+    """Close the asyncio Redis client (application shutdown)"""
+    global _async_redis_client
+    if _async_redis_client is not None:
+        await _async_redis_client.close()
+        _async_redis_client = None
@@ -11,6 +11,10 @@ import time
 
 from app.core.config import settings
 from app.core.database import init_db
+from app.core.redis import close_async_redis
+from app.core.api_auth import api_auth
+from app.services.api_key_cache import api_key_usage_recorder
+from app.services.api_usage_logger import api_usage_logger
 from app.api.v1.users.auth import router as auth_router
 from app.api.v1.endpoints.health import router as health_router
 from app.api.v1.whatsapp.contact import router as whatsapp_router
@@ -40,7 +44,10 @@ async def lifespan(app: FastAPI):
         await init_db()
         logger.info("Database initialized successfully")
         
-        # TODO: Initialize Redis connection pool
+        # Start write-behind flushing of API key usage counters
+        api_key_usage_recorder.start()
+        api_usage_logger.start()
+        
         # TODO: Initialize Celery workers
         
         logger.info("SSL Monitor Pro SaaS started successfully")
@@ -53,6 +60,9 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down SSL Monitor Pro SaaS...")
+    await api_key_usage_recorder.stop()
+    await api_usage_logger.stop()
+    await close_async_redis()
 
 
 # Create FastAPI application
@@ -90,6 +100,11 @@ async def add_process_time_header(request: Request, call_next):
     response = await call_next(request)
     process_time = time.time() - start_time
     response.headers["X-Process-Time"] = str(process_time)
+    
+    # Record API key usage (buffered, no database round-trip here)
+    api_auth_info = getattr(request.state, "api_auth", None)
+    if api_auth_info:
+        await api_auth.log_request(None, request, response.status_code, int(process_time * 1000), api_auth_info)
     return response
 
 
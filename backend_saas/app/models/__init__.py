@@ -3,7 +3,7 @@
 from .user import User
 from .subscription import Subscription
 from .monitor import Monitor
-from .notification import Notification, NotificationLog
+from .notification import Notification, NotificationLog, NotificationOutbox
 from .calendly import CalendlyEvent
-from .check_result import CheckResult
-from .api_key import APIKey, APIUsage, APIPermission
+from .check_result import MonitorCheckResult, MonitorDailyStats
+from .api_key import APIKey, APIUsage, APIUsageMinute, APIUsageHour, APIPermission
@@ -2,10 +2,11 @@
 API Key model for managing API access
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, ForeignKey, Text, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from datetime import datetime, timezone
 import secrets
 import hashlib
 
@@ -72,7 +73,7 @@ class APIKey(Base):
         """Check if the API key is expired"""
         if not self.expires_at:
             return False
-        return self.expires_at < func.now()
+        return self.expires_at < datetime.now(timezone.utc)
     
     def can_make_request(self) -> bool:
         """Check if the API key can make a request (rate limit)"""
@@ -82,7 +83,7 @@ class APIKey(Base):
         """Increment the usage counters"""
         self.total_requests += 1
         self.requests_this_hour += 1
-        self.last_used_at = func.now()
+        self.last_used_at = datetime.now(timezone.utc)
 
 
 class APIUsage(Base):
@@ -113,6 +114,45 @@ class APIUsage(Base):
     user = relationship("User")
 
 
+class APIUsageRollupMixin:
+    """Aggregated API usage for one bucket per (key, endpoint, method, status)"""
+    
+    id = Column(Integer, primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), nullable=False, index=True)
+    api_key_id = Column(Integer, ForeignKey("api_keys.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    endpoint = Column(String(200), nullable=False)
+    method = Column(String(10), nullable=False)
+    status_code = Column(Integer, nullable=False)
+    
+    # Aggregates
+    request_count = Column(Integer, default=0, nullable=False)
+    response_time_total_ms = Column(BigInteger, default=0, nullable=False)
+    response_time_samples = Column(Integer, default=0, nullable=False)  # Requests with a response time
+
+
+class APIUsageMinute(APIUsageRollupMixin, Base):
+    """Per-minute API usage rollup (short retention)"""
+    __tablename__ = "api_usage_minute"
+    __table_args__ = (
+        UniqueConstraint(
+            "bucket_start", "api_key_id", "endpoint", "method", "status_code",
+            name="uq_api_usage_minute_bucket"
+        ),
+    )
+
+
+class APIUsageHour(APIUsageRollupMixin, Base):
+    """Per-hour API usage rollup (used by usage statistics)"""
+    __tablename__ = "api_usage_hour"
+    __table_args__ = (
+        UniqueConstraint(
+            "bucket_start", "api_key_id", "endpoint", "method", "status_code",
+            name="uq_api_usage_hour_bucket"
+        ),
+    )
+
+
 class APIPermission(Base):
     """API permissions definition"""
     __tablename__ = "api_permissions"
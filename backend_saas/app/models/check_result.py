@@ -1,7 +1,7 @@
 """
 Monitor check result model
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Float, Text, JSON
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, ForeignKey, Float, Text, JSON, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -63,3 +63,44 @@ class MonitorCheckResult(Base):
         now = datetime.now(timezone.utc)
         delta = self.valid_until - now
         return delta.days
+
+
+class MonitorDailyStats(Base):
+    """Per-monitor, per-day rollup of check results (maintained as checks land)"""
+    __tablename__ = "monitor_daily_stats"
+    __table_args__ = (
+        UniqueConstraint("monitor_id", "day", name="uq_monitor_daily_stats_day"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    monitor_id = Column(Integer, ForeignKey("monitors.id"), nullable=False, index=True)
+    day = Column(Date, nullable=False, index=True)  # UTC day
+    
+    # Check counters
+    total_checks = Column(Integer, default=0, nullable=False)
+    successful_checks = Column(Integer, default=0, nullable=False)
+    
+    # Response times
+    response_time_total_ms = Column(Float, default=0, nullable=False)
+    response_time_samples = Column(Integer, default=0, nullable=False)
+    response_time_p95_ms = Column(Float, nullable=True)
+    response_time_histogram = Column(JSON, nullable=True)  # Counts per RESPONSE_TIME_BUCKETS_MS bucket
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<MonitorDailyStats(monitor_id={self.monitor_id}, day={self.day}, checks={self.total_checks})>"
+    
+    @property
+    def uptime_percentage(self) -> float:
+        """Share of successful checks for the day"""
+        if not self.total_checks:
+            return 100.0
+        return self.successful_checks / self.total_checks * 100
+    
+    @property
+    def avg_response_time_ms(self) -> float:
+        """Mean response time for the day"""
+        if not self.response_time_samples:
+            return None
+        return self.response_time_total_ms / self.response_time_samples
@@ -1,7 +1,7 @@
 """
 Notification models
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Enum, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Enum, Text, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -28,6 +28,9 @@ class NotificationTrigger(str, enum.Enum):
     WEEKLY_REPORT = "weekly_report"
     MONITOR_DOWN = "monitor_down"
     MONITOR_UP = "monitor_up"
+    SSL_CHECK_SUCCESS = "ssl_check_success"
+    SSL_CHECK_ERROR = "ssl_check_error"
+    DIGEST = "digest"
 
 
 class Notification(Base):
@@ -89,7 +92,9 @@ class NotificationLog(Base):
     error_message = Column(Text, nullable=True)
     
     # Metadata
-    metadata = Column(Text, nullable=True)  # JSON string with additional data
+    # SHA-256 of the canonical event payload; the payload itself lives in check results
+    payload_hash = Column(String(64), nullable=True, index=True)
+    metadata_json = Column("metadata", Text, nullable=True)  # Legacy JSON copy, no longer written
     
     # Relationships
     notification = relationship("Notification")
@@ -97,3 +102,46 @@ class NotificationLog(Base):
     
     def __repr__(self):
         return f"<NotificationLog(id={self.id}, type={self.type}, status={self.delivery_status})>"
+
+
+class OutboxStatus(str, enum.Enum):
+    """Outbound notification delivery status"""
+    PENDING = "pending"
+    PROCESSING = "processing"
+    SENT = "sent"
+    SKIPPED = "skipped"
+    DEAD = "dead"
+
+
+class NotificationOutbox(Base):
+    """Durable outbound notification queue"""
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        Index("ix_notification_outbox_status_available_at", "status", "available_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    idempotency_key = Column(String(64), unique=True, nullable=False)
+    notification_id = Column(Integer, ForeignKey("notifications.id"), nullable=False)
+    
+    # Delivery request
+    trigger = Column(String(50), nullable=False)
+    data = Column(JSON, nullable=False)
+    context = Column(JSON, nullable=True)  # Serialized NotificationContext
+    
+    # Delivery state
+    status = Column(Enum(OutboxStatus), default=OutboxStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=5, nullable=False)
+    available_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)  # Next visibility time
+    last_error = Column(Text, nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Relationships
+    notification = relationship("Notification")
+    
+    def __repr__(self):
+        return f"<NotificationOutbox(id={self.id}, notification_id={self.notification_id}, status={self.status})>"
@@ -59,6 +59,11 @@ class User(Base):
     def __repr__(self):
         return f"<User(id={self.id}, email={self.email}, plan={self.plan})>"
     
+    @property
+    def current_plan(self) -> str:
+        """Plan name as used by plan-keyed settings (free, starter, ...)"""
+        return self.plan.value
+    
     @property
     def is_trial_active(self) -> bool:
         """Check if user is in trial period"""
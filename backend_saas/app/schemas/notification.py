@@ -0,0 +1,58 @@
+"""
+Notification schemas
+"""
+from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel
+from app.models.monitor import SSLCertStatus
+from app.models.notification import NotificationType
+
+
+class NotificationSnapshot(BaseModel):
+    """Notification settings needed to deliver a message"""
+    id: int
+    user_id: int
+    monitor_id: Optional[int] = None
+    type: NotificationType
+    enabled: bool
+    email_address: Optional[str] = None
+    telegram_chat_id: Optional[str] = None
+    webhook_url: Optional[str] = None
+    webhook_headers: Optional[str] = None
+    whatsapp_phone: Optional[str] = None
+    phone_number: Optional[str] = None
+    channel: Optional[str] = None
+    team_id: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class MonitorSnapshot(BaseModel):
+    """Monitor state at the time the notification was triggered"""
+    id: int
+    domain: str
+    port: int
+    ssl_status: SSLCertStatus
+    valid_until: Optional[datetime] = None
+    days_until_expiry: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
+class UserSnapshot(BaseModel):
+    """Recipient details"""
+    id: int
+    email: str
+    full_name: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class NotificationContext(BaseModel):
+    """Serialized delivery context carried in notification task payloads"""
+    notification: NotificationSnapshot
+    monitor: Optional[MonitorSnapshot] = None
+    user: UserSnapshot
@@ -5,18 +5,17 @@ Provides comprehensive analytics and metrics for user dashboard
 
 import asyncio
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, func, and_, literal_column, union_all
 import logging
 
 from app.core.database import async_session_maker
-from app.models.monitor import Monitor
+from app.services.analytics_cache import analytics_cache
+from app.models.monitor import Monitor, MonitorStatus
 from app.models.notification import Notification, NotificationLog
-from app.models.check_result import CheckResult
-from app.models.user import User
-from app.models.subscription import Subscription
+from app.models.check_result import MonitorDailyStats
+from app.models.subscription import Subscription, SubscriptionStatus
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +24,14 @@ class AnalyticsService:
     """Analytics service for dashboard metrics and insights"""
     
     def __init__(self):
-        pass
+        # Average downtime cost for a business (EUR/hour), one hour per failure
+        self.avg_downtime_cost_per_hour = 1000
+        # Manual certificate renewal cost (EUR)
+        self.manual_renewal_cost = 50
+        self.plan_prices = {
+            'price_starter': 29,  # EUR
+            'price_pro': 59  # EUR
+        }
     
     async def get_user_dashboard_metrics(
         self, 
@@ -35,6 +41,9 @@ class AnalyticsService:
         """
         Get comprehensive dashboard metrics for user
         
+        Results are cached per (user, days); concurrent requests share one
+        computation and expired results are refreshed in the background.
+        
         Args:
             user_id: User ID
             days: Number of days to analyze (default 30)
@@ -42,90 +51,348 @@ class AnalyticsService:
         Returns:
             Dictionary with all dashboard metrics
         """
-        async with async_session_maker() as db:
-            try:
-                # Get all metrics in parallel
-                metrics_tasks = [
-                    self._get_monitor_metrics(db, user_id),
-                    self._get_ssl_health_metrics(db, user_id, days),
-                    self._get_notification_metrics(db, user_id, days),
-                    self._get_uptime_metrics(db, user_id, days),
-                    self._get_cost_savings_metrics(db, user_id, days),
-                    self._get_trends_metrics(db, user_id, days)
-                ]
-                
-                results = await asyncio.gather(*metrics_tasks)
-                
-                return {
-                    "monitor_overview": results[0],
-                    "ssl_health": results[1],
-                    "notifications": results[2],
-                    "uptime": results[3],
-                    "cost_savings": results[4],
-                    "trends": results[5],
-                    "generated_at": datetime.now(timezone.utc).isoformat(),
-                    "period_days": days
-                }
-                
-            except Exception as e:
-                logger.error(f"Error getting dashboard metrics: {e}")
-                return {"error": str(e)}
+        return await analytics_cache.get_or_compute(
+            user_id,
+            "dashboard",
+            {"days": days},
+            lambda: self._compute_dashboard_metrics(user_id, days)
+        )
     
-    async def _get_monitor_metrics(self, db: AsyncSession, user_id: int) -> Dict[str, Any]:
-        """Get monitor overview metrics"""
+    async def get_dashboard_section(self, user_id: int, section: str, days: int = 30) -> Dict[str, Any]:
+        """
+        Get one section of the (cached) dashboard
+        
+        Args:
+            user_id: User ID
+            section: Dashboard key, e.g. "ssl_health" or "trends"
+            days: Number of days to analyze
+        
+        Returns:
+            Section metrics, or a dict with an error
+        """
+        metrics = await self.get_user_dashboard_metrics(user_id, days)
+        if "error" in metrics:
+            return metrics
+        return metrics[section]
+    
+    async def _compute_dashboard_metrics(self, user_id: int, days: int) -> Dict[str, Any]:
+        """
+        Compute dashboard metrics from five aggregate queries, each on its
+        own pooled session so they run concurrently
+        """
         try:
-            # Total monitors
-            total_monitors_query = select(func.count(Monitor.id)).where(
-                Monitor.user_id == user_id
-            )
-            total_monitors = await db.scalar(total_monitors_query)
-            
-            # Active monitors
-            active_monitors_query = select(func.count(Monitor.id)).where(
-                and_(Monitor.user_id == user_id, Monitor.is_active == True)
+            now = datetime.now(timezone.utc)
+            monitor_rows, weekly_rows, check_rows, notification_rows, price_id = await asyncio.gather(
+                self._in_session(self._query_monitor_stats, user_id, now),
+                self._in_session(self._query_weekly_series, user_id, days, now),
+                self._in_session(self._query_daily_checks, user_id, days, now),
+                self._in_session(self._query_notification_stats, user_id, days, now),
+                self._in_session(self._query_subscription_price, user_id)
             )
-            active_monitors = await db.scalar(active_monitors_query)
-            
-            # Monitors by status
-            status_query = select(
-                Monitor.last_status,
-                func.count(Monitor.id).label('count')
-            ).where(
-                and_(Monitor.user_id == user_id, Monitor.is_active == True)
-            ).group_by(Monitor.last_status)
             
-            status_results = await db.execute(status_query)
-            status_breakdown = {row.last_status: row.count for row in status_results}
+            return {
+                "monitor_overview": self._build_monitor_metrics(monitor_rows),
+                "ssl_health": self._build_ssl_health_metrics(monitor_rows, weekly_rows),
+                "notifications": self._build_notification_metrics(notification_rows, days),
+                "uptime": self._build_uptime_metrics(check_rows),
+                "cost_savings": self._build_cost_savings_metrics(check_rows, monitor_rows, price_id),
+                "trends": self._build_trends_metrics(weekly_rows, notification_rows),
+                "generated_at": now.isoformat(),
+                "period_days": days
+            }
             
-            # Monitors expiring soon
-            expiring_soon_query = select(func.count(Monitor.id)).where(
-                and_(
-                    Monitor.user_id == user_id,
-                    Monitor.is_active == True,
-                    Monitor.expires_at <= datetime.now(timezone.utc) + timedelta(days=30),
-                    Monitor.expires_at > datetime.now(timezone.utc)
-                )
+        except Exception as e:
+            logger.error(f"Error getting dashboard metrics: {e}")
+            return {"error": str(e)}
+    
+    @staticmethod
+    async def _in_session(query, *args):
+        """Run a query helper on a dedicated pooled session"""
+        async with async_session_maker() as db:
+            return await query(db, *args)
+    
+    # ----- Queries -----
+    
+    async def _query_monitor_stats(self, db: AsyncSession, user_id: int, now: datetime) -> List[Any]:
+        """Per-SSL-status monitor counters for the user (one row per status)"""
+        active = Monitor.status != MonitorStatus.PAUSED
+        days_remaining = func.extract('epoch', Monitor.valid_until - now) / 86400
+        query = select(
+            Monitor.ssl_status,
+            func.count(Monitor.id).label('total'),
+            func.count(Monitor.id).filter(active).label('active'),
+            func.avg(days_remaining).filter(active).label('avg_days_remaining'),
+            func.count(Monitor.id).filter(
+                and_(active, Monitor.valid_until > now, Monitor.valid_until <= now + timedelta(days=30))
+            ).label('expiring_soon'),
+            func.count(Monitor.id).filter(Monitor.created_at >= now - timedelta(days=7)).label('recent')
+        ).where(Monitor.user_id == user_id).group_by(Monitor.ssl_status)
+        
+        return (await db.execute(query)).all()
+    
+    async def _query_weekly_series(self, db: AsyncSession, user_id: int, days: int, now: datetime) -> List[Any]:
+        """Weekly certificate expirations (next 90 days) and new monitors (period)"""
+        expiry_week = func.date_trunc('week', Monitor.valid_until)
+        expirations = select(
+            literal_column("'expiring'").label('series'),
+            expiry_week.label('week'),
+            func.count(Monitor.id).label('count')
+        ).where(
+            and_(
+                Monitor.user_id == user_id,
+                Monitor.status != MonitorStatus.PAUSED,
+                Monitor.valid_until >= now,
+                Monitor.valid_until <= now + timedelta(days=90)
             )
-            expiring_soon = await db.scalar(expiring_soon_query)
-            
-            # Recently added monitors (last 7 days)
-            recent_monitors_query = select(func.count(Monitor.id)).where(
-                and_(
-                    Monitor.user_id == user_id,
-                    Monitor.created_at >= datetime.now(timezone.utc) - timedelta(days=7)
-                )
+        ).group_by(expiry_week)
+        
+        created_week = func.date_trunc('week', Monitor.created_at)
+        growth = select(
+            literal_column("'growth'").label('series'),
+            created_week.label('week'),
+            func.count(Monitor.id).label('count')
+        ).where(
+            and_(
+                Monitor.user_id == user_id,
+                Monitor.created_at >= now - timedelta(days=days)
             )
-            recent_monitors = await db.scalar(recent_monitors_query)
-            
-            return {
-                "total_monitors": total_monitors or 0,
-                "active_monitors": active_monitors or 0,
-                "status_breakdown": status_breakdown,
-                "expiring_soon": expiring_soon or 0,
-                "recent_monitors": recent_monitors or 0,
-                "inactive_monitors": (total_monitors or 0) - (active_monitors or 0)
+        ).group_by(created_week)
+        
+        return (await db.execute(union_all(expirations, growth))).all()
+    
+    async def _query_daily_checks(self, db: AsyncSession, user_id: int, days: int, now: datetime) -> List[Any]:
+        """Daily check totals and successes for the user's monitors (from the daily rollup)"""
+        query = select(
+            MonitorDailyStats.day,
+            func.sum(MonitorDailyStats.total_checks).label('total_checks'),
+            func.sum(MonitorDailyStats.successful_checks).label('successful_checks')
+        ).join(
+            Monitor, MonitorDailyStats.monitor_id == Monitor.id
+        ).where(
+            and_(
+                Monitor.user_id == user_id,
+                MonitorDailyStats.day > (now - timedelta(days=days)).date()
+            )
+        ).group_by(MonitorDailyStats.day).order_by(MonitorDailyStats.day)
+        
+        return (await db.execute(query)).all()
+    
+    async def _query_notification_stats(self, db: AsyncSession, user_id: int, days: int, now: datetime) -> List[Any]:
+        """Notification log counts per (day, channel, delivery status)"""
+        day = func.date_trunc('day', NotificationLog.sent_at)
+        query = select(
+            day.label('day'),
+            NotificationLog.type,
+            NotificationLog.delivery_status,
+            func.count(NotificationLog.id).label('count')
+        ).join(
+            Notification, NotificationLog.notification_id == Notification.id
+        ).where(
+            and_(
+                Notification.user_id == user_id,
+                NotificationLog.sent_at >= now - timedelta(days=days)
+            )
+        ).group_by(day, NotificationLog.type, NotificationLog.delivery_status).order_by(day)
+        
+        return (await db.execute(query)).all()
+    
+    async def _query_subscription_price(self, db: AsyncSession, user_id: int) -> Optional[str]:
+        """Stripe price ID of the user's active subscription"""
+        query = select(Subscription.stripe_price_id).where(
+            and_(
+                Subscription.user_id == user_id,
+                Subscription.status == SubscriptionStatus.ACTIVE
+            )
+        ).limit(1)
+        
+        return await db.scalar(query)
+    
+    # ----- Sections -----
+    
+    def _build_monitor_metrics(self, monitor_rows: List[Any]) -> Dict[str, Any]:
+        """Monitor overview from per-status counters"""
+        total_monitors = sum(row.total for row in monitor_rows)
+        active_monitors = sum(row.active for row in monitor_rows)
+        
+        return {
+            "total_monitors": total_monitors,
+            "active_monitors": active_monitors,
+            "status_breakdown": {row.ssl_status.value: row.active for row in monitor_rows if row.active},
+            "expiring_soon": sum(row.expiring_soon for row in monitor_rows),
+            "recent_monitors": sum(row.recent for row in monitor_rows),
+            "inactive_monitors": total_monitors - active_monitors
+        }
+    
+    def _build_ssl_health_metrics(self, monitor_rows: List[Any], weekly_rows: List[Any]) -> Dict[str, Any]:
+        """SSL health from per-status counters and weekly expirations"""
+        health_breakdown = {}
+        total_days_remaining = 0
+        total_certificates = 0
+        
+        for row in monitor_rows:
+            if not row.active:
+                continue
+            avg_days = float(row.avg_days_remaining) if row.avg_days_remaining is not None else 0
+            health_breakdown[row.ssl_status.value] = {
+                'count': row.active,
+                'avg_days_remaining': round(avg_days, 1)
             }
-            
+            total_days_remaining += avg_days * row.active
+            total_certificates += row.active
+        
+        avg_days_remaining = total_days_remaining / total_certificates if total_certificates > 0 else 0
+        
+        expiration_timeline = [
+            {
+                'week': row.week.isoformat(),
+                'expiring_count': row.count
+            }
+            for row in sorted(weekly_rows, key=lambda r: r.week)
+            if row.series == 'expiring'
+        ]
+        
+        # SSL grade distribution (if available)
+        grade_distribution = {
+            'A+': 0,
+            'A': 0,
+            'B': 0,
+            'C': 0,
+            'D': 0,
+            'F': 0,
+            'Unknown': 0
+        }
+        
+        return {
+            "health_breakdown": health_breakdown,
+            "avg_days_remaining": round(avg_days_remaining, 1),
+            "expiration_timeline": expiration_timeline,
+            "grade_distribution": grade_distribution,
+            "total_certificates": total_certificates,
+            "healthy_certificates": health_breakdown.get('valid', {}).get('count', 0),
+            "expired_certificates": health_breakdown.get('expired', {}).get('count', 0)
+        }
+    
+    def _build_notification_metrics(self, notification_rows: List[Any], days: int) -> Dict[str, Any]:
+        """Notification metrics from per-(day, channel, status) counts"""
+        notification_types: Dict[str, int] = {}
+        success_breakdown: Dict[str, int] = {}
+        daily: Dict[datetime, int] = {}
+        
+        for row in notification_rows:
+            notification_types[row.type.value] = notification_types.get(row.type.value, 0) + row.count
+            success_breakdown[row.delivery_status] = success_breakdown.get(row.delivery_status, 0) + row.count
+            daily[row.day] = daily.get(row.day, 0) + row.count
+        
+        total_notifications = sum(success_breakdown.values())
+        successful_sent = success_breakdown.get('sent', 0)
+        success_rate = (successful_sent / total_notifications * 100) if total_notifications > 0 else 0
+        
+        return {
+            "total_notifications": total_notifications,
+            "notification_types": notification_types,
+            "success_rate": round(success_rate, 1),
+            "success_breakdown": success_breakdown,
+            "recent_activity": [
+                {'day': day.isoformat(), 'count': count}
+                for day, count in sorted(daily.items())
+            ],
+            "avg_daily_notifications": round(total_notifications / days, 1)
+        }
+    
+    def _build_uptime_metrics(self, check_rows: List[Any]) -> Dict[str, Any]:
+        """Uptime from daily check counts"""
+        total_checks = sum(row.total_checks for row in check_rows)
+        successful_checks = sum(row.successful_checks for row in check_rows)
+        failed_checks = total_checks - successful_checks
+        uptime_percentage = (successful_checks / total_checks * 100) if total_checks > 0 else 0
+        
+        daily_uptime = []
+        for row in check_rows:
+            daily_percentage = (row.successful_checks / row.total_checks * 100) if row.total_checks > 0 else 0
+            daily_uptime.append({
+                'day': row.day.isoformat(),
+                'uptime_percentage': round(daily_percentage, 2),
+                'total_checks': row.total_checks,
+                'successful_checks': row.successful_checks
+            })
+        
+        status_breakdown = {}
+        if successful_checks:
+            status_breakdown['valid'] = successful_checks
+        if failed_checks:
+            status_breakdown['failed'] = failed_checks
+        
+        return {
+            "overall_uptime": round(uptime_percentage, 2),
+            "total_checks": total_checks,
+            "successful_checks": successful_checks,
+            "failed_checks": failed_checks,
+            "daily_uptime": daily_uptime,
+            "status_breakdown": status_breakdown
+        }
+    
+    def _build_cost_savings_metrics(
+        self,
+        check_rows: List[Any],
+        monitor_rows: List[Any],
+        price_id: Optional[str]
+    ) -> Dict[str, Any]:
+        """Cost savings and ROI from failed checks, active monitors and plan price"""
+        # Failed checks are potential downtime events (one hour each)
+        downtime_hours_prevented = sum(row.total_checks - row.successful_checks for row in check_rows)
+        cost_savings = downtime_hours_prevented * self.avg_downtime_cost_per_hour
+        
+        monthly_cost = self.plan_prices.get(price_id, 0)
+        roi_percentage = ((cost_savings - monthly_cost) / monthly_cost * 100) if monthly_cost > 0 else 0
+        
+        total_monitors = sum(row.active for row in monitor_rows)
+        renewal_savings = total_monitors * self.manual_renewal_cost
+        
+        return {
+            "downtime_hours_prevented": downtime_hours_prevented,
+            "cost_savings": cost_savings,
+            "monthly_cost": monthly_cost,
+            "roi_percentage": round(roi_percentage, 1),
+            "renewal_savings": renewal_savings,
+            "total_savings": cost_savings + renewal_savings,
+            "avg_downtime_cost_per_hour": self.avg_downtime_cost_per_hour,
+            "manual_renewal_cost_per_cert": self.manual_renewal_cost
+        }
+    
+    def _build_trends_metrics(self, weekly_rows: List[Any], notification_rows: List[Any]) -> Dict[str, Any]:
+        """Weekly monitor growth and notification volume"""
+        growth_trend = [
+            {
+                'week': row.week.isoformat(),
+                'new_monitors': row.count
+            }
+            for row in sorted(weekly_rows, key=lambda r: r.week)
+            if row.series == 'growth'
+        ]
+        
+        # Roll daily notification counts up to ISO weeks (same as date_trunc('week'))
+        weekly: Dict[datetime, int] = {}
+        for row in notification_rows:
+            week = row.day - timedelta(days=row.day.weekday())
+            weekly[week] = weekly.get(week, 0) + row.count
+        notification_trend = [
+            {'week': week.isoformat(), 'notifications': count}
+            for week, count in sorted(weekly.items())
+        ]
+        
+        return {
+            "growth_trend": growth_trend,
+            "notification_trend": notification_trend,
+            "insights": self._generate_insights(growth_trend, notification_trend)
+        }
+    
+    # ----- Single-section entry points (dashboard sub-endpoints) -----
+    
+    async def _get_monitor_metrics(self, db: AsyncSession, user_id: int) -> Dict[str, Any]:
+        """Get monitor overview metrics"""
+        try:
+            monitor_rows = await self._query_monitor_stats(db, user_id, datetime.now(timezone.utc))
+            return self._build_monitor_metrics(monitor_rows)
         except Exception as e:
             logger.error(f"Error getting monitor metrics: {e}")
             return {"error": str(e)}
@@ -133,77 +400,10 @@ class AnalyticsService:
     async def _get_ssl_health_metrics(self, db: AsyncSession, user_id: int, days: int) -> Dict[str, Any]:
         """Get SSL health metrics"""
         try:
-            start_date = datetime.now(timezone.utc) - timedelta(days=days)
-            
-            # SSL certificate health distribution
-            health_query = select(
-                Monitor.last_status,
-                func.count(Monitor.id).label('count'),
-                func.avg(
-                    func.extract('epoch', Monitor.expires_at - datetime.now(timezone.utc)) / 86400
-                ).label('avg_days_remaining')
-            ).where(
-                and_(Monitor.user_id == user_id, Monitor.is_active == True)
-            ).group_by(Monitor.last_status)
-            
-            health_results = await db.execute(health_query)
-            health_breakdown = {}
-            total_days_remaining = 0
-            total_certificates = 0
-            
-            for row in health_results:
-                health_breakdown[row.last_status] = {
-                    'count': row.count,
-                    'avg_days_remaining': round(row.avg_days_remaining, 1) if row.avg_days_remaining else 0
-                }
-                total_days_remaining += row.avg_days_remaining * row.count
-                total_certificates += row.count
-            
-            avg_days_remaining = total_days_remaining / total_certificates if total_certificates > 0 else 0
-            
-            # Certificate expiration timeline
-            timeline_query = select(
-                func.date_trunc('week', Monitor.expires_at).label('week'),
-                func.count(Monitor.id).label('expiring_count')
-            ).where(
-                and_(
-                    Monitor.user_id == user_id,
-                    Monitor.is_active == True,
-                    Monitor.expires_at >= datetime.now(timezone.utc),
-                    Monitor.expires_at <= datetime.now(timezone.utc) + timedelta(days=90)
-                )
-            ).group_by(func.date_trunc('week', Monitor.expires_at)).order_by('week')
-            
-            timeline_results = await db.execute(timeline_query)
-            expiration_timeline = [
-                {
-                    'week': row.week.isoformat(),
-                    'expiring_count': row.expiring_count
-                }
-                for row in timeline_results
-            ]
-            
-            # SSL grade distribution (if available)
-            grade_distribution = {
-                'A+': 0,
-                'A': 0,
-                'B': 0,
-                'C': 0,
-                'D': 0,
-                'F': 0,
-                'Unknown': 0
-            }
-            
-            return {
-                "health_breakdown": health_breakdown,
-                "avg_days_remaining": round(avg_days_remaining, 1),
-                "expiration_timeline": expiration_timeline,
-                "grade_distribution": grade_distribution,
-                "total_certificates": total_certificates,
-                "healthy_certificates": health_breakdown.get('valid', {}).get('count', 0),
-                "expired_certificates": health_breakdown.get('expired', {}).get('count', 0)
-            }
-            
+            now = datetime.now(timezone.utc)
+            monitor_rows = await self._query_monitor_stats(db, user_id, now)
+            weekly_rows = await self._query_weekly_series(db, user_id, days, now)
+            return self._build_ssl_health_metrics(monitor_rows, weekly_rows)
         except Exception as e:
             logger.error(f"Error getting SSL health metrics: {e}")
             return {"error": str(e)}
@@ -211,78 +411,8 @@ class AnalyticsService:
     async def _get_notification_metrics(self, db: AsyncSession, user_id: int, days: int) -> Dict[str, Any]:
         """Get notification metrics"""
         try:
-            start_date = datetime.now(timezone.utc) - timedelta(days=days)
-            
-            # Total notifications sent
-            total_notifications_query = select(func.count(NotificationLog.id)).where(
-                and_(
-                    NotificationLog.created_at >= start_date,
-                    NotificationLog.notification.has(user_id=user_id)
-                )
-            )
-            total_notifications = await db.scalar(total_notifications_query)
-            
-            # Notifications by type
-            type_query = select(
-                Notification.type,
-                func.count(NotificationLog.id).label('count')
-            ).join(Notification).where(
-                and_(
-                    NotificationLog.created_at >= start_date,
-                    Notification.user_id == user_id
-                )
-            ).group_by(Notification.type)
-            
-            type_results = await db.execute(type_query)
-            notification_types = {row.type.value: row.count for row in type_results}
-            
-            # Notification success rate
-            success_query = select(
-                NotificationLog.status,
-                func.count(NotificationLog.id).label('count')
-            ).where(
-                and_(
-                    NotificationLog.created_at >= start_date,
-                    NotificationLog.notification.has(user_id=user_id)
-                )
-            ).group_by(NotificationLog.status)
-            
-            success_results = await db.execute(success_query)
-            success_breakdown = {row.status: row.count for row in success_results}
-            
-            total_sent = sum(success_breakdown.values())
-            successful_sent = success_breakdown.get('sent', 0)
-            success_rate = (successful_sent / total_sent * 100) if total_sent > 0 else 0
-            
-            # Recent notification activity
-            recent_query = select(
-                func.date_trunc('day', NotificationLog.created_at).label('day'),
-                func.count(NotificationLog.id).label('count')
-            ).where(
-                and_(
-                    NotificationLog.created_at >= start_date,
-                    NotificationLog.notification.has(user_id=user_id)
-                )
-            ).group_by(func.date_trunc('day', NotificationLog.created_at)).order_by('day')
-            
-            recent_results = await db.execute(recent_query)
-            recent_activity = [
-                {
-                    'day': row.day.isoformat(),
-                    'count': row.count
-                }
-                for row in recent_results
-            ]
-            
-            return {
-                "total_notifications": total_notifications or 0,
-                "notification_types": notification_types,
-                "success_rate": round(success_rate, 1),
-                "success_breakdown": success_breakdown,
-                "recent_activity": recent_activity,
-                "avg_daily_notifications": round((total_notifications or 0) / days, 1)
-            }
-            
+            rows = await self._query_notification_stats(db, user_id, days, datetime.now(timezone.utc))
+            return self._build_notification_metrics(rows, days)
         except Exception as e:
             logger.error(f"Error getting notification metrics: {e}")
             return {"error": str(e)}
@@ -290,59 +420,8 @@ class AnalyticsService:
     async def _get_uptime_metrics(self, db: AsyncSession, user_id: int, days: int) -> Dict[str, Any]:
         """Get uptime and availability metrics"""
         try:
-            start_date = datetime.now(timezone.utc) - timedelta(days=days)
-            
-            # Check results for uptime calculation
-            check_query = select(
-                CheckResult.status,
-                func.count(CheckResult.id).label('count')
-            ).where(
-                and_(
-                    CheckResult.checked_at >= start_date,
-                    CheckResult.monitor.has(user_id=user_id)
-                )
-            ).group_by(CheckResult.status)
-            
-            check_results = await db.execute(check_query)
-            status_breakdown = {row.status: row.count for row in check_results}
-            
-            total_checks = sum(status_breakdown.values())
-            successful_checks = status_breakdown.get('valid', 0)
-            uptime_percentage = (successful_checks / total_checks * 100) if total_checks > 0 else 0
-            
-            # Uptime by day
-            daily_query = select(
-                func.date_trunc('day', CheckResult.checked_at).label('day'),
-                func.count(CheckResult.id).label('total_checks'),
-                func.count(CheckResult.id).filter(CheckResult.status == 'valid').label('successful_checks')
-            ).where(
-                and_(
-                    CheckResult.checked_at >= start_date,
-                    CheckResult.monitor.has(user_id=user_id)
-                )
-            ).group_by(func.date_trunc('day', CheckResult.checked_at)).order_by('day')
-            
-            daily_results = await db.execute(daily_query)
-            daily_uptime = []
-            
-            for row in daily_results:
-                daily_percentage = (row.successful_checks / row.total_checks * 100) if row.total_checks > 0 else 0
-                daily_uptime.append({
-                    'day': row.day.isoformat(),
-                    'uptime_percentage': round(daily_percentage, 2),
-                    'total_checks': row.total_checks,
-                    'successful_checks': row.successful_checks
-                })
-            
-            return {
-                "overall_uptime": round(uptime_percentage, 2),
-                "total_checks": total_checks,
-                "successful_checks": successful_checks,
-                "failed_checks": total_checks - successful_checks,
-                "daily_uptime": daily_uptime,
-                "status_breakdown": status_breakdown
-            }
-            
+            check_rows = await self._query_daily_checks(db, user_id, days, datetime.now(timezone.utc))
+            return self._build_uptime_metrics(check_rows)
         except Exception as e:
             logger.error(f"Error getting uptime metrics: {e}")
             return {"error": str(e)}
@@ -350,64 +429,11 @@ class AnalyticsService:
     async def _get_cost_savings_metrics(self, db: AsyncSession, user_id: int, days: int) -> Dict[str, Any]:
         """Get cost savings and ROI metrics"""
         try:
-            # Get user subscription info
-            subscription_query = select(Subscription).where(
-                and_(
-                    Subscription.user_id == user_id,
-                    Subscription.status == 'active'
-                )
-            )
-            subscription_result = await db.execute(subscription_query)
-            subscription = subscription_result.scalar_one_or_none()
-            
-            # Calculate potential downtime cost savings
-            # Assume average downtime cost is €1000/hour for business
-            avg_downtime_cost_per_hour = 1000  # EUR
-            
-            # Get failed checks (potential downtime events)
-            failed_checks_query = select(func.count(CheckResult.id)).where(
-                and_(
-                    CheckResult.checked_at >= datetime.now(timezone.utc) - timedelta(days=days),
-                    CheckResult.status != 'valid',
-                    CheckResult.monitor.has(user_id=user_id)
-                )
-            )
-            failed_checks = await db.scalar(failed_checks_query) or 0
-            
-            # Estimate downtime prevented (assuming 1 hour per failure)
-            downtime_hours_prevented = failed_checks
-            cost_savings = downtime_hours_prevented * avg_downtime_cost_per_hour
-            
-            # Calculate ROI
-            monthly_cost = 0
-            if subscription:
-                if subscription.stripe_price_id == 'price_starter':
-                    monthly_cost = 29  # EUR
-                elif subscription.stripe_price_id == 'price_pro':
-                    monthly_cost = 59  # EUR
-            
-            roi_percentage = ((cost_savings - monthly_cost) / monthly_cost * 100) if monthly_cost > 0 else 0
-            
-            # SSL certificate renewal savings
-            # Assume manual renewal costs €50 per certificate
-            manual_renewal_cost = 50
-            total_monitors_query = select(func.count(Monitor.id)).where(
-                and_(Monitor.user_id == user_id, Monitor.is_active == True)
-            )
-            total_monitors = await db.scalar(total_monitors_query) or 0
-            renewal_savings = total_monitors * manual_renewal_cost
-            
-            return {
-                "downtime_hours_prevented": downtime_hours_prevented,
-                "cost_savings": cost_savings,
-                "monthly_cost": monthly_cost,
-                "roi_percentage": round(roi_percentage, 1),
-                "renewal_savings": renewal_savings,
-                "total_savings": cost_savings + renewal_savings,
-                "avg_downtime_cost_per_hour": avg_downtime_cost_per_hour,
-                "manual_renewal_cost_per_cert": manual_renewal_cost
-            }
-            
+            now = datetime.now(timezone.utc)
+            check_rows = await self._query_daily_checks(db, user_id, days, now)
+            monitor_rows = await self._query_monitor_stats(db, user_id, now)
+            price_id = await self._query_subscription_price(db, user_id)
+            return self._build_cost_savings_metrics(check_rows, monitor_rows, price_id)
         except Exception as e:
             logger.error(f"Error getting cost savings metrics: {e}")
             return {"error": str(e)}
@@ -415,52 +441,10 @@ class AnalyticsService:
     async def _get_trends_metrics(self, db: AsyncSession, user_id: int, days: int) -> Dict[str, Any]:
         """Get trends and insights"""
         try:
-            # Monitor growth trend
-            growth_query = select(
-                func.date_trunc('week', Monitor.created_at).label('week'),
-                func.count(Monitor.id).label('new_monitors')
-            ).where(
-                and_(
-                    Monitor.user_id == user_id,
-                    Monitor.created_at >= datetime.now(timezone.utc) - timedelta(days=days)
-                )
-            ).group_by(func.date_trunc('week', Monitor.created_at)).order_by('week')
-            
-            growth_results = await db.execute(growth_query)
-            growth_trend = [
-                {
-                    'week': row.week.isoformat(),
-                    'new_monitors': row.new_monitors
-                }
-                for row in growth_results
-            ]
-            
-            # Notification trend
-            notification_trend_query = select(
-                func.date_trunc('week', NotificationLog.created_at).label('week'),
-                func.count(NotificationLog.id).label('notifications')
-            ).where(
-                and_(
-                    NotificationLog.created_at >= datetime.now(timezone.utc) - timedelta(days=days),
-                    NotificationLog.notification.has(user_id=user_id)
-                )
-            ).group_by(func.date_trunc('week', NotificationLog.created_at)).order_by('week')
-            
-            notification_trend_results = await db.execute(notification_trend_query)
-            notification_trend = [
-                {
-                    'week': row.week.isoformat(),
-                    'notifications': row.notifications
-                }
-                for row in notification_trend_results
-            ]
-            
-            return {
-                "growth_trend": growth_trend,
-                "notification_trend": notification_trend,
-                "insights": self._generate_insights(growth_trend, notification_trend)
-            }
-            
+            now = datetime.now(timezone.utc)
+            weekly_rows = await self._query_weekly_series(db, user_id, days, now)
+            notification_rows = await self._query_notification_stats(db, user_id, days, now)
+            return self._build_trends_metrics(weekly_rows, notification_rows)
         except Exception as e:
             logger.error(f"Error getting trends metrics: {e}")
             return {"error": str(e)}
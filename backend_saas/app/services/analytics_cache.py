@@ -0,0 +1,165 @@
+"""
+Analytics result cache
+Per-user cache of computed analytics with TTL, request coalescing and
+stale-while-revalidate refresh
+"""
+import json
+import time
+import asyncio
+from typing import Dict, Any, Awaitable, Callable, Optional
+from app.core.config import settings
+from app.core.redis import get_redis, get_async_redis
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsResultCache:
+    """
+    Shared (Redis) cache of analytics results
+
+    Entries are fresh for ttl seconds and then served stale for up to
+    stale_ttl more while one background refresh runs. Concurrent misses for
+    the same key share one computation within a process, and a short Redis
+    lock keeps replicas from computing the same key at once.
+    """
+
+    def __init__(self):
+        self.ttl = settings.ANALYTICS_CACHE_TTL
+        self.stale_ttl = settings.ANALYTICS_CACHE_STALE_TTL
+        self.lock_timeout_ms = 30000
+        self.key_prefix = "analytics"
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def _key(self, user_id: int, name: str, params: Dict[str, Any]) -> str:
+        param_str = ",".join(f"{k}={params[k]}" for k in sorted(params))
+        return f"{self.key_prefix}:{user_id}:{name}:{param_str}"
+
+    def _user_keys(self, user_id: int) -> str:
+        return f"{self.key_prefix}:keys:{user_id}"
+
+    async def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            raw = await get_async_redis().get(key)
+        except Exception as e:
+            logger.warning(f"Analytics cache unavailable: {e}")
+            return None
+        return json.loads(raw) if raw else None
+
+    def _is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry["computed_at"] < self.ttl
+
+    async def get_or_compute(
+        self,
+        user_id: int,
+        name: str,
+        params: Dict[str, Any],
+        compute: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Get a cached result, computing it at most once per TTL
+
+        Args:
+            user_id: Owner of the result (used for invalidation)
+            name: Result name (e.g. "dashboard")
+            params: Parameters that distinguish results (e.g. {"days": 30})
+            compute: Coroutine factory producing the result
+
+        Returns:
+            The result; results containing an "error" key are never cached
+        """
+        key = self._key(user_id, name, params)
+        entry = await self._read(key)
+
+        if entry is not None:
+            if not self._is_fresh(entry):
+                # Serve stale and refresh in the background
+                self._start(key, user_id, compute, wait_for_peer=False)
+            return entry["value"]
+
+        task = self._start(key, user_id, compute, wait_for_peer=True)
+        # Shield so one cancelled request does not cancel the shared computation
+        return await asyncio.shield(task)
+
+    def _start(self, key: str, user_id: int, compute, wait_for_peer: bool) -> asyncio.Task:
+        """Start (or join) the in-process computation for a key"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._compute_and_store(key, user_id, compute, wait_for_peer))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def _compute_and_store(self, key: str, user_id: int, compute, wait_for_peer: bool) -> Optional[Dict[str, Any]]:
+        redis = get_async_redis()
+        lock_key = f"{key}:lock"
+        try:
+            locked = await redis.set(lock_key, "1", nx=True, px=self.lock_timeout_ms)
+        except Exception:
+            locked = True  # No Redis: compute locally
+
+        if not locked:
+            # Another replica is computing this key
+            if not wait_for_peer:
+                return None
+            for _ in range(50):
+                await asyncio.sleep(0.1)
+                entry = await self._read(key)
+                if entry is not None and self._is_fresh(entry):
+                    return entry["value"]
+
+        try:
+            value = await compute()
+        except Exception as e:
+            logger.error(f"Analytics computation failed for {key}: {e}")
+            if locked:
+                await self._release(lock_key)
+            if wait_for_peer:
+                raise
+            return None
+
+        if isinstance(value, dict) and "error" not in value:
+            try:
+                pipe = redis.pipeline(transaction=False)
+                pipe.set(
+                    key,
+                    json.dumps({"computed_at": time.time(), "value": value}, default=str),
+                    ex=self.ttl + self.stale_ttl
+                )
+                pipe.sadd(self._user_keys(user_id), key)
+                pipe.expire(self._user_keys(user_id), self.ttl + self.stale_ttl)
+                pipe.delete(lock_key)
+                await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Failed to cache analytics result {key}: {e}")
+        elif locked:
+            await self._release(lock_key)
+        return value
+
+    async def _release(self, lock_key: str) -> None:
+        try:
+            await get_async_redis().delete(lock_key)
+        except Exception:
+            pass
+
+    async def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached result for a user (e.g. after monitor changes)"""
+        try:
+            redis = get_async_redis()
+            keys = await redis.smembers(self._user_keys(user_id))
+            await redis.delete(self._user_keys(user_id), *keys)
+        except Exception as e:
+            logger.warning(f"Failed to invalidate analytics cache for user {user_id}: {e}")
+
+    def invalidate_user_sync(self, user_id: int) -> None:
+        """invalidate_user for Celery tasks (uses the sync client)"""
+        try:
+            redis = get_redis()
+            keys = redis.smembers(self._user_keys(user_id))
+            redis.delete(self._user_keys(user_id), *keys)
+        except Exception as e:
+            logger.warning(f"Failed to invalidate analytics cache for user {user_id}: {e}")
+
+
+# Global analytics cache instance
+analytics_cache = AnalyticsResultCache()
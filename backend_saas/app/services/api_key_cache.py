@@ -0,0 +1,182 @@
+"""
+API key authentication cache and write-behind usage counters
+"""
+import json
+import time
+import asyncio
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Iterable, Tuple
+from sqlalchemy import update, func, case
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.redis import get_async_redis
+from app.core.permissions import compile_permissions
+from app.models.api_key import APIKey
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class APIKeyAuthCache:
+    """
+    Two-tier cache of authenticated key info keyed by key hash
+
+    A short-lived per-process tier absorbs hot keys without any I/O; the
+    Redis tier is shared by all API replicas and is cleared whenever a key
+    or its owner changes (revoke, permissions, plan, deactivation), so the
+    change applies everywhere within the local TTL.
+    """
+
+    def __init__(self):
+        self.local_ttl = settings.API_KEY_AUTH_LOCAL_TTL
+        self.redis_ttl = settings.API_KEY_AUTH_CACHE_TTL
+        self.key_prefix = "api_key_auth"
+        self._local: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+    def _redis_key(self, key_hash: str) -> str:
+        return f"{self.key_prefix}:{key_hash}"
+
+    def _store_local(self, key_hash: str, auth_info: Dict[str, Any]) -> Dict[str, Any]:
+        # The compiled matcher lives only in the local tier (it is not JSON)
+        auth_info = {**auth_info, "permission_matcher": compile_permissions(auth_info.get("permissions", []))}
+        self._local[key_hash] = (time.monotonic() + self.local_ttl, auth_info)
+        return auth_info
+
+    async def get(self, key_hash: str) -> Optional[Dict[str, Any]]:
+        """Get cached auth info, or None on miss"""
+        entry = self._local.get(key_hash)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+        try:
+            raw = await get_async_redis().get(self._redis_key(key_hash))
+        except Exception as e:
+            logger.warning(f"API key auth cache unavailable: {e}")
+            return None
+        if not raw:
+            return None
+
+        return self._store_local(key_hash, json.loads(raw))
+
+    async def set(self, key_hash: str, auth_info: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Cache auth info in both tiers
+
+        Returns:
+            Auth info with its compiled permission matcher attached
+        """
+        cached = self._store_local(key_hash, auth_info)
+        try:
+            await get_async_redis().set(self._redis_key(key_hash), json.dumps(auth_info), ex=self.redis_ttl)
+        except Exception as e:
+            logger.warning(f"Failed to cache API key auth info: {e}")
+        return cached
+
+    async def invalidate(self, key_hash: str) -> None:
+        """Drop a key from both tiers (revocation, permission changes)"""
+        await self.invalidate_many([key_hash])
+
+    async def invalidate_many(self, key_hashes: Iterable[str]) -> None:
+        """Drop several keys from both tiers (e.g. all keys of a user)"""
+        key_hashes = list(key_hashes)
+        if not key_hashes:
+            return
+        for key_hash in key_hashes:
+            self._local.pop(key_hash, None)
+        try:
+            await get_async_redis().delete(*(self._redis_key(key_hash) for key_hash in key_hashes))
+        except Exception as e:
+            logger.warning(f"Failed to invalidate API key auth cache: {e}")
+
+
+class APIKeyUsageRecorder:
+    """Accumulates per-key request counts in memory and flushes them periodically"""
+
+    def __init__(self):
+        self.flush_interval = settings.API_KEY_USAGE_FLUSH_INTERVAL
+        self._pending: Dict[int, Tuple[int, datetime]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, api_key_id: int) -> int:
+        """
+        Count one request for a key (no I/O)
+
+        Returns:
+            Requests counted for this key since the last flush
+        """
+        count, _ = self._pending.get(api_key_id, (0, None))
+        self._pending[api_key_id] = (count + 1, datetime.now(timezone.utc))
+        return count + 1
+
+    def pending_count(self, api_key_id: int) -> int:
+        """Requests not yet flushed to the database"""
+        return self._pending.get(api_key_id, (0, None))[0]
+
+    async def flush(self) -> int:
+        """
+        Write accumulated counters to api_keys in one transaction
+
+        requests_this_hour restarts from the flushed count when the key was
+        last used in an earlier clock hour.
+
+        Returns:
+            Number of keys updated
+        """
+        if not self._pending:
+            return 0
+
+        pending, self._pending = self._pending, {}
+        try:
+            async with async_session_maker() as session:
+                for api_key_id, (count, last_used_at) in pending.items():
+                    await session.execute(
+                        update(APIKey)
+                        .where(APIKey.id == api_key_id)
+                        .values(
+                            total_requests=APIKey.total_requests + count,
+                            requests_this_hour=case(
+                                (
+                                    func.date_trunc("hour", APIKey.last_used_at) == func.date_trunc("hour", last_used_at),
+                                    APIKey.requests_this_hour + count
+                                ),
+                                else_=count
+                            ),
+                            last_used_at=func.greatest(func.coalesce(APIKey.last_used_at, last_used_at), last_used_at)
+                        )
+                    )
+                await session.commit()
+        except Exception as e:
+            # Merge the counts back so the next flush retries them
+            for api_key_id, (count, last_used_at) in pending.items():
+                current, _ = self._pending.get(api_key_id, (0, last_used_at))
+                self._pending[api_key_id] = (current + count, last_used_at)
+            logger.error(f"Failed to flush API key usage counters: {e}")
+            return 0
+
+        return len(pending)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        """Start the background flush loop (application startup)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write remaining counters (application shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+# Global instances
+api_key_auth_cache = APIKeyAuthCache()
+api_key_usage_recorder = APIKeyUsageRecorder()
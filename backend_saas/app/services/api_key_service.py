@@ -3,15 +3,20 @@ API Key Service for managing API access
 """
 
 import json
+import time
 from datetime import datetime, timezone, timedelta
 from typing import Optional, List, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, func
 from sqlalchemy.orm import selectinload
 
-from app.models.api_key import APIKey, APIUsage, APIPermission
+from app.models.api_key import APIKey, APIUsageHour, APIPermission
 from app.models.user import User
 from app.core.config import settings
+from app.core.rate_limit import api_key_rate_limiter
+from app.core.permissions import compile_permissions
+from app.services.api_key_cache import api_key_auth_cache, api_key_usage_recorder
+from app.services.api_usage_logger import api_usage_logger
 import logging
 
 logger = logging.getLogger(__name__)
@@ -211,6 +216,7 @@ class APIKeyService:
             
             api_key.is_active = False
             await db.commit()
+            await api_key_auth_cache.invalidate(api_key.key_hash)
             
             logger.info(f"Revoked API key {api_key.key_prefix}... for user {user_id}")
             
@@ -221,6 +227,16 @@ class APIKeyService:
             await db.rollback()
             return {"success": False, "error": str(e)}
     
+    async def invalidate_user_keys(self, db: AsyncSession, user_id: int) -> None:
+        """
+        Drop cached auth info for all of a user's keys
+        
+        Call after committing a change to the user that auth info carries
+        (plan, deactivation); key changes invalidate the key itself.
+        """
+        result = await db.execute(select(APIKey.key_hash).where(APIKey.user_id == user_id))
+        await api_key_auth_cache.invalidate_many(result.scalars().all())
+    
     async def authenticate_api_key(
         self, 
         db: AsyncSession, 
@@ -240,58 +256,80 @@ class APIKeyService:
             # Hash the provided key
             key_hash = APIKey.hash_key(api_key)
             
-            # Find the API key
-            query = select(APIKey).options(
-                selectinload(APIKey.user)
-            ).where(
-                and_(
-                    APIKey.key_hash == key_hash,
-                    APIKey.is_active == True
-                )
-            )
-            
-            result = await db.execute(query)
-            api_key_obj = result.scalar_one_or_none()
-            
-            if not api_key_obj:
-                return None
+            auth_info = await api_key_auth_cache.get(key_hash)
+            if auth_info is None:
+                auth_info = await self._load_auth_info(db, key_hash)
+                if auth_info is None:
+                    return None
+                auth_info = await api_key_auth_cache.set(key_hash, auth_info)
             
             # Check if expired
-            if api_key_obj.is_expired():
+            expires_at = auth_info.get("expires_at")
+            if expires_at and datetime.fromisoformat(expires_at) < datetime.now(timezone.utc):
                 return None
             
-            # Check rate limit
-            if not api_key_obj.can_make_request():
-                return {"error": "Rate limit exceeded"}
-            
-            # Update usage
-            api_key_obj.increment_usage()
-            await db.commit()
+            # Check rate limit (shared across replicas)
+            api_key_id = auth_info["api_key_id"]
+            limit = auth_info["rate_limit_per_hour"]
+            rate = await api_key_rate_limiter.hit(
+                f"api_key:{api_key_id}", limit, settings.API_KEY_RATE_LIMIT_PERIOD
+            )
+            if not rate["allowed"]:
+                return {"error": "Rate limit exceeded", "retry_after": rate["retry_after"]}
             
-            # Parse permissions
-            permissions = []
-            if api_key_obj.permissions:
-                try:
-                    permissions = json.loads(api_key_obj.permissions)
-                except json.JSONDecodeError:
-                    permissions = []
+            # Update usage (written behind by the usage recorder)
+            pending = api_key_usage_recorder.record(api_key_id)
             
             return {
-                "user_id": api_key_obj.user_id,
-                "user_email": api_key_obj.user.email,
-                "user_plan": api_key_obj.user.current_plan,
-                "api_key_id": api_key_obj.id,
-                "key_prefix": api_key_obj.key_prefix,
-                "permissions": permissions,
-                "rate_limit_per_hour": api_key_obj.rate_limit_per_hour,
-                "requests_this_hour": api_key_obj.requests_this_hour,
-                "total_requests": api_key_obj.total_requests
+                **auth_info,
+                "requests_this_hour": limit - rate["remaining"],
+                "rate_limit_remaining": rate["remaining"],
+                "rate_limit_reset": int(time.time() + rate["reset_after"]),
+                "total_requests": auth_info["total_requests"] + pending
             }
             
         except Exception as e:
             logger.error(f"Error authenticating API key: {e}")
             return None
     
+    async def _load_auth_info(self, db: AsyncSession, key_hash: str) -> Optional[Dict[str, Any]]:
+        """Load cacheable auth info for an active key from the database"""
+        query = select(APIKey).options(
+            selectinload(APIKey.user)
+        ).where(
+            and_(
+                APIKey.key_hash == key_hash,
+                APIKey.is_active == True
+            )
+        )
+        
+        result = await db.execute(query)
+        api_key_obj = result.scalar_one_or_none()
+        
+        if not api_key_obj or not api_key_obj.user.is_active:
+            return None
+        
+        # Parse permissions
+        permissions = []
+        if api_key_obj.permissions:
+            try:
+                permissions = json.loads(api_key_obj.permissions)
+            except json.JSONDecodeError:
+                permissions = []
+        
+        return {
+            "user_id": api_key_obj.user_id,
+            "user_email": api_key_obj.user.email,
+            "user_plan": api_key_obj.user.current_plan,
+            "api_key_id": api_key_obj.id,
+            "key_prefix": api_key_obj.key_prefix,
+            "permissions": permissions,
+            "rate_limit_per_hour": api_key_obj.rate_limit_per_hour,
+            "requests_this_hour": api_key_obj.requests_this_hour,
+            "total_requests": api_key_obj.total_requests,
+            "expires_at": api_key_obj.expires_at.isoformat() if api_key_obj.expires_at else None
+        }
+    
     async def check_permission(
         self, 
         auth_info: Dict[str, Any], 
@@ -303,36 +341,19 @@ class APIKeyService:
         
         Args:
             auth_info: Authentication info from authenticate_api_key
-            endpoint: API endpoint (e.g., "/api/v1/monitors")
+            endpoint: API endpoint or route template (e.g., "/api/v1/monitors/{id}")
             method: HTTP method (GET, POST, etc.)
             
         Returns:
             True if permission granted, False otherwise
         """
         try:
-            permissions = auth_info.get("permissions", [])
-            
             # Enterprise plan has access to everything
             if auth_info.get("user_plan") == "enterprise":
                 return True
             
-            # Check specific permissions
-            full_endpoint = f"{method} {endpoint}"
-            
-            for permission in permissions:
-                # Exact match
-                if permission == full_endpoint:
-                    return True
-                
-                # Wildcard match for methods
-                if permission.endswith("*") and endpoint.startswith(permission[:-1]):
-                    return True
-                
-                # Wildcard match for endpoints
-                if permission.startswith("*"):
-                    return True
-            
-            return False
+            matcher = auth_info.get("permission_matcher") or compile_permissions(auth_info.get("permissions", []))
+            return matcher.allows(method, endpoint)
             
         except Exception as e:
             logger.error(f"Error checking permission: {e}")
@@ -352,23 +373,20 @@ class APIKeyService:
         request_size: Optional[int] = None,
         response_size: Optional[int] = None
     ):
-        """Log API usage for analytics"""
+        """Log API usage for analytics (buffered; never waits on the database)"""
         try:
-            usage = APIUsage(
-                api_key_id=api_key_id,
-                user_id=user_id,
-                endpoint=endpoint,
-                method=method,
-                status_code=status_code,
-                response_time_ms=response_time_ms,
-                user_agent=user_agent,
-                ip_address=ip_address,
-                request_size_bytes=request_size,
-                response_size_bytes=response_size
-            )
-            
-            db.add(usage)
-            await db.commit()
+            api_usage_logger.log({
+                "api_key_id": api_key_id,
+                "user_id": user_id,
+                "endpoint": endpoint,
+                "method": method,
+                "status_code": status_code,
+                "response_time_ms": response_time_ms,
+                "user_agent": user_agent,
+                "ip_address": ip_address,
+                "request_size_bytes": int(request_size) if request_size is not None else None,
+                "response_size_bytes": int(response_size) if response_size is not None else None
+            })
             
         except Exception as e:
             logger.error(f"Error logging API usage: {e}")
@@ -380,59 +398,43 @@ class APIKeyService:
         user_id: int,
         days: int = 30
     ) -> Dict[str, Any]:
-        """Get API usage statistics for user"""
+        """Get API usage statistics for user (from hourly rollups)"""
         try:
             start_date = datetime.now(timezone.utc) - timedelta(days=days)
-            
-            # Total requests
-            total_query = select(func.count(APIUsage.id)).where(
-                and_(
-                    APIUsage.user_id == user_id,
-                    APIUsage.created_at >= start_date
-                )
+            in_period = and_(
+                APIUsageHour.user_id == user_id,
+                APIUsageHour.bucket_start >= start_date.replace(minute=0, second=0, microsecond=0)
             )
-            total_requests = await db.scalar(total_query) or 0
             
-            # Requests by status code
+            # Requests by status code (also gives totals)
             status_query = select(
-                APIUsage.status_code,
-                func.count(APIUsage.id).label('count')
-            ).where(
-                and_(
-                    APIUsage.user_id == user_id,
-                    APIUsage.created_at >= start_date
-                )
-            ).group_by(APIUsage.status_code)
-            
-            status_results = await db.execute(status_query)
-            status_breakdown = {row.status_code: row.count for row in status_results}
+                APIUsageHour.status_code,
+                func.sum(APIUsageHour.request_count).label('count'),
+                func.sum(APIUsageHour.response_time_total_ms).label('response_time_total'),
+                func.sum(APIUsageHour.response_time_samples).label('response_time_samples')
+            ).where(in_period).group_by(APIUsageHour.status_code)
+            
+            status_results = (await db.execute(status_query)).all()
+            status_breakdown = {row.status_code: int(row.count) for row in status_results}
+            total_requests = sum(status_breakdown.values())
             
             # Requests by endpoint
+            endpoint_total = func.sum(APIUsageHour.request_count)
             endpoint_query = select(
-                APIUsage.endpoint,
-                func.count(APIUsage.id).label('count')
-            ).where(
-                and_(
-                    APIUsage.user_id == user_id,
-                    APIUsage.created_at >= start_date
-                )
-            ).group_by(APIUsage.endpoint).order_by(func.count(APIUsage.id).desc()).limit(10)
+                APIUsageHour.endpoint,
+                endpoint_total.label('count')
+            ).where(in_period).group_by(APIUsageHour.endpoint).order_by(endpoint_total.desc()).limit(10)
             
             endpoint_results = await db.execute(endpoint_query)
             top_endpoints = [
-                {"endpoint": row.endpoint, "count": row.count}
+                {"endpoint": row.endpoint, "count": int(row.count)}
                 for row in endpoint_results
             ]
             
             # Average response time
-            avg_response_query = select(func.avg(APIUsage.response_time_ms)).where(
-                and_(
-                    APIUsage.user_id == user_id,
-                    APIUsage.created_at >= start_date,
-                    APIUsage.response_time_ms.isnot(None)
-                )
-            )
-            avg_response_time = await db.scalar(avg_response_query) or 0
+            response_time_total = sum(int(row.response_time_total or 0) for row in status_results)
+            response_time_samples = sum(int(row.response_time_samples or 0) for row in status_results)
+            avg_response_time = response_time_total / response_time_samples if response_time_samples else 0
             
             return {
                 "total_requests": total_requests,
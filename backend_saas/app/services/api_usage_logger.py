@@ -0,0 +1,180 @@
+"""
+API usage logger
+Buffers request logs in process and writes raw rows plus per-minute and
+per-hour rollups in batches, off the request path
+"""
+import asyncio
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy import insert, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.api_key import APIUsage, APIUsageMinute, APIUsageHour
+import logging
+
+logger = logging.getLogger(__name__)
+
+RollupKey = Tuple[datetime, int, int, str, str, int]
+
+
+class APIUsageLogger:
+    """Non-blocking, batching writer for APIUsage and its rollups"""
+
+    def __init__(self):
+        self.batch_size = settings.API_USAGE_BATCH_SIZE
+        self.flush_interval = settings.API_USAGE_FLUSH_INTERVAL
+        self.minute_retention = timedelta(hours=settings.API_USAGE_MINUTE_RETENTION_HOURS)
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._last_purge: Optional[datetime] = None
+        self.dropped = 0
+
+    def log(self, entry: Dict[str, Any]) -> None:
+        """
+        Queue a request log entry (never blocks; drops when the buffer is full)
+
+        Args:
+            entry: APIUsage column values
+        """
+        if self._queue is None:
+            return
+        entry.setdefault("created_at", datetime.now(timezone.utc))
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(f"API usage buffer full, dropped {self.dropped} entries so far")
+
+    @staticmethod
+    def _rollup(entries: List[Dict[str, Any]], granularity: str) -> List[Dict[str, Any]]:
+        """Aggregate entries into rollup rows for a bucket granularity (minute/hour)"""
+        drop = {"second": 0, "microsecond": 0}
+        if granularity == "hour":
+            drop["minute"] = 0
+
+        buckets: Dict[RollupKey, Dict[str, Any]] = {}
+        for entry in entries:
+            key = (
+                entry["created_at"].replace(**drop),
+                entry["api_key_id"],
+                entry["user_id"],
+                entry["endpoint"],
+                entry["method"],
+                entry["status_code"],
+            )
+            row = buckets.get(key)
+            if row is None:
+                row = buckets[key] = {
+                    "bucket_start": key[0],
+                    "api_key_id": key[1],
+                    "user_id": key[2],
+                    "endpoint": key[3],
+                    "method": key[4],
+                    "status_code": key[5],
+                    "request_count": 0,
+                    "response_time_total_ms": 0,
+                    "response_time_samples": 0,
+                }
+            row["request_count"] += 1
+            if entry.get("response_time_ms") is not None:
+                row["response_time_total_ms"] += entry["response_time_ms"]
+                row["response_time_samples"] += 1
+        return list(buckets.values())
+
+    @staticmethod
+    def _upsert(model, rows: List[Dict[str, Any]]):
+        statement = pg_insert(model).values(rows)
+        return statement.on_conflict_do_update(
+            index_elements=["bucket_start", "api_key_id", "endpoint", "method", "status_code"],
+            set_={
+                "request_count": model.request_count + statement.excluded.request_count,
+                "response_time_total_ms": model.response_time_total_ms + statement.excluded.response_time_total_ms,
+                "response_time_samples": model.response_time_samples + statement.excluded.response_time_samples,
+            }
+        )
+
+    async def write_batch(self, entries: List[Dict[str, Any]]) -> None:
+        """Insert raw rows and merge rollups in one transaction"""
+        async with async_session_maker() as session:
+            await session.execute(insert(APIUsage), entries)
+            await session.execute(self._upsert(APIUsageMinute, self._rollup(entries, "minute")))
+            await session.execute(self._upsert(APIUsageHour, self._rollup(entries, "hour")))
+            await session.commit()
+
+    async def _purge_minute_rollups(self) -> None:
+        now = datetime.now(timezone.utc)
+        if self._last_purge and now - self._last_purge < timedelta(hours=1):
+            return
+        self._last_purge = now
+        try:
+            async with async_session_maker() as session:
+                await session.execute(
+                    delete(APIUsageMinute).where(APIUsageMinute.bucket_start < now - self.minute_retention)
+                )
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Failed to purge API usage minute rollups: {e}")
+
+    async def _drain(self, first: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Collect a batch: wait up to flush_interval for it to fill"""
+        batch = [first]
+        deadline = asyncio.get_running_loop().time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        # Checks for stop between batches, so a batch being collected or
+        # written is never cancelled half way
+        while not self._stopping.is_set():
+            try:
+                first = await asyncio.wait_for(self._queue.get(), self.flush_interval)
+            except asyncio.TimeoutError:
+                continue
+            batch = await self._drain(first)
+            try:
+                await self.write_batch(batch)
+            except Exception as e:
+                logger.error(f"Failed to write {len(batch)} API usage entries: {e}")
+            await self._purge_minute_rollups()
+
+    def start(self) -> None:
+        """Create the buffer and start the writer (application startup)"""
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=settings.API_USAGE_BUFFER_SIZE)
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the writer and flush what is buffered (application shutdown)"""
+        if self._task is None:
+            return
+        self._stopping.set()
+        try:
+            await self._task
+        except Exception as e:
+            logger.error(f"API usage writer failed: {e}")
+        self._task = None
+
+        remaining = []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        self._queue = None
+        for start in range(0, len(remaining), self.batch_size):
+            try:
+                await self.write_batch(remaining[start:start + self.batch_size])
+            except Exception as e:
+                logger.error(f"Failed to flush API usage entries on shutdown: {e}")
+
+
+# Global API usage logger instance
+api_usage_logger = APIUsageLogger()
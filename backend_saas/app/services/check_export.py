@@ -0,0 +1,201 @@
+"""
+Check history export
+Streams a user's raw check results as CSV, NDJSON or Parquet using a
+server-side cursor, so memory stays constant regardless of the range
+"""
+import io
+import csv
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+from sqlalchemy import select
+from app.core.database import async_session_maker
+from app.models.monitor import Monitor
+from app.models.check_result import MonitorCheckResult
+import logging
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_ENABLED = True
+except ImportError:
+    PARQUET_ENABLED = False
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = [
+    "monitor_id",
+    "domain",
+    "port",
+    "checked_at",
+    "success",
+    "response_time_ms",
+    "connection_time_ms",
+    "handshake_time_ms",
+    "valid_from",
+    "valid_until",
+    "issuer",
+    "protocol_version",
+    "cipher_suite",
+    "error_code",
+    "error_message",
+]
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only sink whose buffered bytes are drained after each row group"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer.extend(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+class CheckHistoryExporter:
+    """Streaming exporter for MonitorCheckResult rows"""
+
+    def __init__(self, batch_size: int = 5000):
+        self.batch_size = batch_size
+
+    async def iter_batches(
+        self,
+        user_id: int,
+        start: datetime,
+        end: datetime,
+        monitor_id: Optional[int] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield check rows in batches from a server-side cursor
+
+        Args:
+            user_id: Owner of the monitors
+            start: Start of the range (inclusive)
+            end: End of the range (exclusive)
+            monitor_id: Restrict to one monitor
+        """
+        columns = [getattr(MonitorCheckResult, name) for name in EXPORT_COLUMNS if name not in ("domain", "port")]
+        query = select(
+            *columns, Monitor.domain, Monitor.port
+        ).join(
+            Monitor, MonitorCheckResult.monitor_id == Monitor.id
+        ).where(
+            Monitor.user_id == user_id,
+            MonitorCheckResult.checked_at >= start,
+            MonitorCheckResult.checked_at < end
+        ).order_by(MonitorCheckResult.monitor_id, MonitorCheckResult.checked_at)
+        if monitor_id is not None:
+            query = query.where(MonitorCheckResult.monitor_id == monitor_id)
+
+        async with async_session_maker() as session:
+            result = await session.stream(query.execution_options(yield_per=self.batch_size))
+            async for partition in result.mappings().partitions():
+                yield [dict(row) for row in partition]
+
+    async def stream(
+        self,
+        format: str,
+        user_id: int,
+        start: datetime,
+        end: datetime,
+        monitor_id: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Encode the check history in the given format (csv, ndjson, parquet)
+
+        Yields:
+            Encoded chunks, one per cursor batch
+        """
+        batches = self.iter_batches(user_id, start, end, monitor_id)
+        if format == "csv":
+            encoder = self._csv
+        elif format == "ndjson":
+            encoder = self._ndjson
+        elif format == "parquet":
+            encoder = self._parquet
+        else:
+            raise ValueError(f"Unsupported export format: {format}")
+
+        async for chunk in encoder(batches):
+            yield chunk
+
+    async def _csv(self, batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+        async for batch in batches:
+            for row in batch:
+                writer.writerow({
+                    key: value.isoformat() if isinstance(value, datetime) else value
+                    for key, value in row.items()
+                })
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    async def _ndjson(self, batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+        async for batch in batches:
+            yield "".join(
+                json.dumps({column: row[column] for column in EXPORT_COLUMNS}, default=str) + "\n"
+                for row in batch
+            ).encode()
+
+    async def _parquet(self, batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+        schema = pa.schema([
+            ("monitor_id", pa.int64()),
+            ("domain", pa.string()),
+            ("port", pa.int32()),
+            ("checked_at", pa.timestamp("us", tz="UTC")),
+            ("success", pa.bool_()),
+            ("response_time_ms", pa.float64()),
+            ("connection_time_ms", pa.float64()),
+            ("handshake_time_ms", pa.float64()),
+            ("valid_from", pa.timestamp("us", tz="UTC")),
+            ("valid_until", pa.timestamp("us", tz="UTC")),
+            ("issuer", pa.string()),
+            ("protocol_version", pa.string()),
+            ("cipher_suite", pa.string()),
+            ("error_code", pa.string()),
+            ("error_message", pa.string()),
+        ])
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema, compression="snappy")
+        try:
+            async for batch in batches:
+                # One row group per cursor batch
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+            # The footer is written on close; only a complete file gets one
+            writer.close()
+            yield sink.drain()
+        finally:
+            if writer.is_open:
+                writer.close()
+
+
+# Global check history exporter instance
+check_history_exporter = CheckHistoryExporter()
@@ -0,0 +1,191 @@
+"""
+Check rollup service
+Maintains MonitorDailyStats incrementally as check results land, with an
+exact rebuild from raw results for reconciliation
+"""
+from bisect import bisect_right
+from datetime import date, datetime
+from typing import List, Optional
+from sqlalchemy import select, func, cast, Date, Float, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import async_session_maker
+from app.models.check_result import MonitorCheckResult, MonitorDailyStats
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket lower bounds (ms); bucket i holds BOUNDS[i-1] <= t < BOUNDS[i]
+RESPONSE_TIME_BUCKETS_MS = [25, 50, 100, 150, 200, 300, 400, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000]
+
+# Transaction advisory lock: shared by incremental updates, exclusive for a
+# rebuild so it neither misses in-flight checks nor overwrites their increments
+ROLLUP_LOCK_ID = 7320415
+
+
+class CheckRollupService:
+    """Per-monitor daily check rollups"""
+
+    @staticmethod
+    def bucket_index(response_time_ms: float) -> int:
+        """Histogram bucket for a response time (same as SQL width_bucket)"""
+        return bisect_right(RESPONSE_TIME_BUCKETS_MS, response_time_ms)
+
+    @staticmethod
+    def histogram_percentile(histogram: List[int], quantile: float) -> Optional[float]:
+        """
+        Approximate a percentile from a histogram
+
+        Returns:
+            Upper bound of the bucket containing the quantile (the last bound
+            for the overflow bucket), or None for an empty histogram
+        """
+        total = sum(histogram)
+        if not total:
+            return None
+        threshold = quantile * total
+        cumulative = 0
+        for index, count in enumerate(histogram):
+            cumulative += count
+            if cumulative >= threshold:
+                return float(RESPONSE_TIME_BUCKETS_MS[min(index, len(RESPONSE_TIME_BUCKETS_MS) - 1)])
+        return float(RESPONSE_TIME_BUCKETS_MS[-1])
+
+    async def record_check(
+        self,
+        session: AsyncSession,
+        monitor_id: int,
+        checked_at: datetime,
+        success: bool,
+        response_time_ms: Optional[float]
+    ) -> None:
+        """
+        Fold one check result into its day's rollup (caller commits)
+
+        Args:
+            session: Session that also writes the raw check result
+            monitor_id: Monitor ID
+            checked_at: Check time (UTC)
+            success: Whether the check succeeded
+            response_time_ms: Measured response time
+        """
+        day = checked_at.date()
+        await session.execute(select(func.pg_advisory_xact_lock_shared(ROLLUP_LOCK_ID)))
+        empty_histogram = [0] * (len(RESPONSE_TIME_BUCKETS_MS) + 1)
+        await session.execute(
+            insert(MonitorDailyStats)
+            .values(
+                monitor_id=monitor_id,
+                day=day,
+                total_checks=0,
+                successful_checks=0,
+                response_time_total_ms=0,
+                response_time_samples=0,
+                response_time_histogram=empty_histogram,
+            )
+            .on_conflict_do_nothing(index_elements=["monitor_id", "day"])
+        )
+        result = await session.execute(
+            select(MonitorDailyStats)
+            .where(MonitorDailyStats.monitor_id == monitor_id, MonitorDailyStats.day == day)
+            .with_for_update()
+        )
+        stats = result.scalar_one()
+
+        stats.total_checks += 1
+        if success:
+            stats.successful_checks += 1
+        if response_time_ms is not None:
+            histogram = list(stats.response_time_histogram or empty_histogram)
+            histogram[self.bucket_index(response_time_ms)] += 1
+            stats.response_time_histogram = histogram
+            stats.response_time_total_ms += response_time_ms
+            stats.response_time_samples += 1
+            stats.response_time_p95_ms = self.histogram_percentile(histogram, 0.95)
+
+    async def rebuild(self, start_day: date, end_day: date) -> int:
+        """
+        Recompute rollups for a day range from raw check results
+
+        Used to reconcile the incremental counters (e.g. after retried tasks)
+        and to backfill history. The p95 is exact here rather than bucketed.
+        Days are UTC regardless of the session time zone, matching
+        record_check.
+
+        Returns:
+            Number of rollup rows written
+        """
+        day = cast(func.timezone("UTC", MonitorCheckResult.checked_at), Date)
+        in_range = (day >= start_day) & (day <= end_day)
+        bucket = func.width_bucket(
+            MonitorCheckResult.response_time_ms,
+            literal_column(f"ARRAY{RESPONSE_TIME_BUCKETS_MS}::float8[]")
+        )
+
+        async with async_session_maker() as session:
+            # Waits for in-flight record_check transactions and holds new
+            # ones off until the rebuilt rows are committed
+            await session.execute(select(func.pg_advisory_xact_lock(ROLLUP_LOCK_ID)))
+
+            totals = await session.execute(
+                select(
+                    MonitorCheckResult.monitor_id,
+                    day.label("day"),
+                    func.count(MonitorCheckResult.id).label("total_checks"),
+                    func.count(MonitorCheckResult.id).filter(MonitorCheckResult.success == True).label("successful_checks"),
+                    func.coalesce(func.sum(MonitorCheckResult.response_time_ms), 0).label("response_time_total_ms"),
+                    func.count(MonitorCheckResult.response_time_ms).label("response_time_samples"),
+                    func.percentile_cont(0.95).within_group(
+                        cast(MonitorCheckResult.response_time_ms, Float)
+                    ).label("response_time_p95_ms")
+                )
+                .where(in_range)
+                .group_by(MonitorCheckResult.monitor_id, day)
+            )
+            rows = {
+                (row.monitor_id, row.day): {
+                    **row._mapping,
+                    "response_time_histogram": [0] * (len(RESPONSE_TIME_BUCKETS_MS) + 1)
+                }
+                for row in totals
+            }
+
+            buckets = await session.execute(
+                select(
+                    MonitorCheckResult.monitor_id,
+                    day.label("day"),
+                    bucket.label("bucket"),
+                    func.count(MonitorCheckResult.id).label("count")
+                )
+                .where(in_range, MonitorCheckResult.response_time_ms.isnot(None))
+                .group_by(MonitorCheckResult.monitor_id, day, bucket)
+            )
+            for row in buckets:
+                rows[(row.monitor_id, row.day)]["response_time_histogram"][row.bucket] = row.count
+
+            if not rows:
+                return 0
+
+            statement = insert(MonitorDailyStats).values(list(rows.values()))
+            await session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["monitor_id", "day"],
+                    set_={
+                        column: statement.excluded[column]
+                        for column in (
+                            "total_checks",
+                            "successful_checks",
+                            "response_time_total_ms",
+                            "response_time_samples",
+                            "response_time_p95_ms",
+                            "response_time_histogram",
+                        )
+                    }
+                )
+            )
+            await session.commit()
+            return len(rows)
+
+
+# Global check rollup service instance
+check_rollup_service = CheckRollupService()
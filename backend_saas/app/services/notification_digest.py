@@ -0,0 +1,133 @@
+"""
+Notification digest service
+Coalesces alert events per (user, channel) into a single digest message
+"""
+import json
+from datetime import datetime, timezone
+from typing import Dict, Any, List
+from app.core.config import settings
+from app.core.redis import get_redis
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationDigestService:
+    """Buffers notification events in Redis for a short coalescing window"""
+
+    def __init__(self):
+        self.window = settings.NOTIFICATION_DIGEST_WINDOW
+        self.channels = set(settings.NOTIFICATION_DIGEST_CHANNELS)
+        self.key_prefix = "notification_digest"
+
+    def is_enabled_for(self, channel: str) -> bool:
+        """Check if events for this channel should be coalesced"""
+        return self.window > 0 and channel in self.channels
+
+    def _key(self, user_id: int, channel: str) -> str:
+        return f"{self.key_prefix}:{user_id}:{channel}"
+
+    def _flush_key(self, user_id: int, channel: str) -> str:
+        return f"{self.key_prefix}:{user_id}:{channel}:flush"
+
+    def add_event(self, user_id: int, channel: str, event: Dict[str, Any]) -> bool:
+        """
+        Buffer an event for the (user, channel) window
+
+        Args:
+            user_id: Recipient user ID
+            channel: Notification channel (NotificationType value)
+            event: Event payload
+
+        Returns:
+            True if no flush is pending for the window and one must be scheduled
+        """
+        key = self._key(user_id, channel)
+        pipe = get_redis().pipeline(transaction=True)
+        pipe.rpush(key, json.dumps(event, default=str))
+        # Safety net: buffered events expire if no flush ever runs
+        pipe.expire(key, self.window * 10)
+        # The marker outlives the window only briefly, so a lost flush task
+        # is rescheduled by the next event instead of stranding the buffer
+        pipe.set(self._flush_key(user_id, channel), "1", nx=True, ex=self.window * 2)
+        _, _, scheduled = pipe.execute()
+        return bool(scheduled)
+
+    def drain(self, user_id: int, channel: str) -> List[Dict[str, Any]]:
+        """
+        Atomically take all buffered events for the (user, channel) window
+
+        Clears the flush marker in the same transaction, so the next event
+        opens a new window.
+
+        Returns:
+            List of buffered events in arrival order
+        """
+        key = self._key(user_id, channel)
+        pipe = get_redis().pipeline(transaction=True)
+        pipe.lrange(key, 0, -1)
+        pipe.delete(key, self._flush_key(user_id, channel))
+        raw_events, _ = pipe.execute()
+
+        events = []
+        for raw in raw_events:
+            try:
+                events.append(json.loads(raw))
+            except json.JSONDecodeError:
+                logger.warning(f"Dropping malformed digest event for user {user_id} ({channel})")
+        return events
+
+    @staticmethod
+    def group_by_destination(events: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Group events by delivery destination (chat, phone, channel, address)"""
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for event in events:
+            groups.setdefault(str(event.get("destination")), []).append(event)
+        return groups
+
+    def format_digest(self, events: List[Dict[str, Any]], channel: str) -> Dict[str, str]:
+        """
+        Format a digest message for a channel
+
+        Args:
+            events: Buffered events
+            channel: Notification channel
+
+        Returns:
+            Dict with subject and message
+        """
+        # Most urgent first: expired, then fewest days left
+        ordered = sorted(
+            events,
+            key=lambda e: (
+                e.get("trigger") != "expired",
+                e.get("days_until_expiry") if e.get("days_until_expiry") is not None else 10 ** 6
+            )
+        )
+        domains = len({e.get("domain") for e in ordered})
+        subject = f"SSL Monitor Digest - {len(ordered)} alerts for {domains} domains"
+
+        if channel == "sms":
+            # Keep SMS to a single segment where possible
+            names = ", ".join(sorted({e.get("domain") or "unknown" for e in ordered})[:3])
+            more = f" +{domains - 3} more" if domains > 3 else ""
+            return {
+                "subject": subject,
+                "message": f"SSL Monitor: {len(ordered)} alerts for {names}{more}. Check your dashboard."
+            }
+
+        bold = "*{}*" if channel in ("telegram", "whatsapp", "slack") else "{}"
+        lines = [bold.format(subject), ""]
+        for event in ordered:
+            line = f"- {event.get('domain') or 'unknown'}: {event.get('trigger')}"
+            if event.get("days_until_expiry") is not None:
+                line += f" ({event['days_until_expiry']} days left)"
+            lines.append(line)
+        lines.append("")
+        lines.append(f"Time: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')}")
+
+        return {"subject": subject, "message": "\n".join(lines)}
+
+
+# Global notification digest service instance
+notification_digest_service = NotificationDigestService()
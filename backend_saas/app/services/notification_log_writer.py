@@ -0,0 +1,129 @@
+"""
+Notification log writer
+Buffers delivery logs in Redis and bulk-inserts them off the delivery path
+"""
+import json
+import hashlib
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy import insert
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.redis import get_redis
+from app.models.notification import NotificationLog, NotificationType, NotificationTrigger
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationLogWriter:
+    """Write-behind buffer for NotificationLog rows"""
+
+    def __init__(self):
+        self.buffer_key = "notification_logs:buffer"
+        self.batch_size = settings.NOTIFICATION_LOG_BATCH_SIZE
+
+    @staticmethod
+    def payload_hash(data: Dict[str, Any]) -> str:
+        """SHA-256 of the canonical JSON form of an event payload"""
+        canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def enqueue(
+        self,
+        notification_id: int,
+        monitor_id: Optional[int],
+        type: str,
+        trigger: str,
+        result: Dict[str, Any],
+        data: Dict[str, Any]
+    ) -> None:
+        """
+        Buffer a delivery log entry (a single Redis RPUSH)
+
+        Entries whose type or trigger the notification_logs enums cannot
+        store are rejected here, with the offending value logged, rather
+        than dropped later by the flush.
+
+        Args:
+            notification_id: Notification configuration ID
+            monitor_id: Monitor the event relates to
+            type: Notification type value
+            trigger: Notification trigger value
+            result: Channel send result
+            data: Event payload (stored as a hash only)
+        """
+        try:
+            NotificationType(type)
+            NotificationTrigger(trigger)
+        except ValueError as e:
+            logger.error(f"Not logging notification {notification_id}: {e}")
+            return
+
+        entry = {
+            "notification_id": notification_id,
+            "monitor_id": monitor_id,
+            "type": type,
+            "trigger": trigger,
+            "subject": result.get("subject"),
+            "message": result.get("message") or "",
+            "sent_at": datetime.now(timezone.utc).isoformat(),
+            "delivery_status": result.get("status", "sent"),
+            "error_message": result.get("error"),
+            "payload_hash": self.payload_hash(data),
+        }
+        try:
+            get_redis().rpush(self.buffer_key, json.dumps(entry))
+        except Exception as e:
+            logger.warning(f"Failed to buffer log for notification {notification_id}: {e}")
+
+    def _take_batch(self) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """Atomically pop up to batch_size buffered entries"""
+        pipe = get_redis().pipeline(transaction=True)
+        pipe.lrange(self.buffer_key, 0, self.batch_size - 1)
+        pipe.ltrim(self.buffer_key, self.batch_size, -1)
+        raw_entries, _ = pipe.execute()
+
+        rows = []
+        for raw in raw_entries:
+            try:
+                entry = json.loads(raw)
+                entry["type"] = NotificationType(entry["type"])
+                entry["trigger"] = NotificationTrigger(entry["trigger"])
+                entry["sent_at"] = datetime.fromisoformat(entry["sent_at"])
+                rows.append(entry)
+            except (ValueError, KeyError) as e:
+                logger.warning(f"Dropping malformed notification log entry: {e}")
+        return raw_entries, rows
+
+    async def flush(self, max_batches: int = 20) -> int:
+        """
+        Bulk-insert buffered entries
+
+        Args:
+            max_batches: Upper bound on batches written per call
+
+        Returns:
+            Number of rows written
+        """
+        written = 0
+        for _ in range(max_batches):
+            raw_entries, rows = self._take_batch()
+            if not raw_entries:
+                break
+            if not rows:
+                continue
+            try:
+                async with async_session_maker() as session:
+                    await session.execute(insert(NotificationLog), rows)
+                    await session.commit()
+            except Exception:
+                # Put the batch back at the head of the buffer for the next flush
+                get_redis().lpush(self.buffer_key, *reversed(raw_entries))
+                raise
+            written += len(rows)
+        return written
+
+
+# Global notification log writer instance
+notification_log_writer = NotificationLogWriter()
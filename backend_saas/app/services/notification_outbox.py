@@ -0,0 +1,166 @@
+"""
+Notification outbox service
+Durable, idempotent queue of outbound notifications with visibility
+timeouts, retry backoff and dead-lettering
+"""
+import json
+import uuid
+import hashlib
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, List, Optional
+from sqlalchemy import select, update, delete, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.notification import NotificationOutbox, OutboxStatus
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationOutboxService:
+    """Postgres-backed outbox drained by the notification consumer"""
+
+    def __init__(self):
+        self.batch_size = settings.NOTIFICATION_OUTBOX_BATCH_SIZE
+        self.visibility_timeout = settings.NOTIFICATION_OUTBOX_VISIBILITY_TIMEOUT
+        self.max_attempts = settings.NOTIFICATION_OUTBOX_MAX_ATTEMPTS
+        self.retention_days = settings.NOTIFICATION_OUTBOX_RETENTION_DAYS
+
+    @staticmethod
+    def idempotency_key(notification_id: int, trigger: str, event_id: str) -> str:
+        """
+        Key identifying a delivery: a source event (check result, task run)
+        is delivered once per notification and trigger, however often it is
+        retried. Repeat events with the same payload are separate events.
+        """
+        return hashlib.sha256(f"{notification_id}:{trigger}:{event_id}".encode()).hexdigest()
+
+    async def enqueue(
+        self,
+        session: AsyncSession,
+        notification_id: int,
+        trigger: str,
+        data: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None,
+        event_id: Optional[str] = None
+    ) -> Optional[int]:
+        """
+        Add a delivery to the outbox (caller commits)
+
+        Args:
+            event_id: ID of the source event; retries of the same event are
+                queued once. Deliveries without one are never deduplicated.
+
+        Returns:
+            Outbox row ID, or None if the event was already queued
+        """
+        # Round-trip through JSON so datetimes and enums are stored as strings
+        data = json.loads(json.dumps(data, default=str))
+        result = await session.execute(
+            insert(NotificationOutbox)
+            .values(
+                idempotency_key=self.idempotency_key(notification_id, trigger, event_id or uuid.uuid4().hex),
+                notification_id=notification_id,
+                trigger=trigger,
+                data=data,
+                context=context,
+                status=OutboxStatus.PENDING,
+                max_attempts=self.max_attempts,
+            )
+            .on_conflict_do_nothing(index_elements=["idempotency_key"])
+            .returning(NotificationOutbox.id)
+        )
+        return result.scalar_one_or_none()
+
+    async def claim_batch(self, limit: Optional[int] = None) -> List[NotificationOutbox]:
+        """
+        Claim visible pending rows (and rows whose visibility timeout lapsed)
+
+        Claimed rows are hidden for visibility_timeout seconds; a consumer that
+        crashes mid-delivery simply lets them become visible again.
+        """
+        now = datetime.now(timezone.utc)
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(NotificationOutbox)
+                .where(
+                    or_(
+                        NotificationOutbox.status == OutboxStatus.PENDING,
+                        NotificationOutbox.status == OutboxStatus.PROCESSING
+                    ),
+                    NotificationOutbox.available_at <= now
+                )
+                .order_by(NotificationOutbox.available_at)
+                .limit(limit or self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            rows = result.scalars().all()
+            for row in rows:
+                row.status = OutboxStatus.PROCESSING
+                row.attempts += 1
+                row.available_at = now + timedelta(seconds=self.visibility_timeout)
+            await session.commit()
+            return rows
+
+    async def record_results(self, outcomes: List[Dict[str, Any]]) -> None:
+        """
+        Persist delivery outcomes for a claimed batch
+
+        Args:
+            outcomes: Dicts with id, attempts, max_attempts, status
+                (sent/skipped/failed/dead) and optional error
+        """
+        now = datetime.now(timezone.utc)
+        async with async_session_maker() as session:
+            for outcome in outcomes:
+                values: Dict[str, Any] = {"last_error": outcome.get("error")}
+                if outcome["status"] in ("sent", "skipped"):
+                    values["status"] = OutboxStatus(outcome["status"])
+                    values["sent_at"] = now
+                elif outcome["status"] == "dead" or outcome["attempts"] >= outcome["max_attempts"]:
+                    values["status"] = OutboxStatus.DEAD
+                    logger.error(f"Outbox entry {outcome['id']} dead-lettered: {outcome.get('error')}")
+                else:
+                    values["status"] = OutboxStatus.PENDING
+                    values["available_at"] = now + timedelta(seconds=60 * (2 ** (outcome["attempts"] - 1)))
+                await session.execute(
+                    update(NotificationOutbox)
+                    .where(NotificationOutbox.id == outcome["id"])
+                    .values(**values)
+                )
+            await session.commit()
+
+    async def requeue_dead(self, outbox_ids: Optional[List[int]] = None) -> int:
+        """Move dead-lettered entries back to pending (all when no IDs given)"""
+        async with async_session_maker() as session:
+            query = update(NotificationOutbox).where(NotificationOutbox.status == OutboxStatus.DEAD)
+            if outbox_ids:
+                query = query.where(NotificationOutbox.id.in_(outbox_ids))
+            result = await session.execute(
+                query.values(
+                    status=OutboxStatus.PENDING,
+                    attempts=0,
+                    available_at=datetime.now(timezone.utc)
+                )
+            )
+            await session.commit()
+            return result.rowcount
+
+    async def purge(self) -> int:
+        """Delete delivered entries older than the retention period"""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+        async with async_session_maker() as session:
+            result = await session.execute(
+                delete(NotificationOutbox).where(
+                    NotificationOutbox.status.in_([OutboxStatus.SENT, OutboxStatus.SKIPPED]),
+                    NotificationOutbox.created_at < cutoff
+                )
+            )
+            await session.commit()
+            return result.rowcount
+
+
+# Global notification outbox service instance
+notification_outbox_service = NotificationOutboxService()
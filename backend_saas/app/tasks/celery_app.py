@@ -51,6 +51,10 @@ celery_app.conf.update(
             "task": "app.tasks.periodic_tasks.send_weekly_reports",
             "schedule": 7 * 24 * 60 * 60,  # 7 days in seconds
         },
+        "rebuild-monitor-daily-stats": {
+            "task": "app.tasks.periodic_tasks.rebuild_monitor_daily_stats",
+            "schedule": 24 * 60 * 60,  # 24 hours in seconds
+        },
         "cleanup-old-check-results": {
             "task": "app.tasks.periodic_tasks.cleanup_old_check_results",
             "schedule": 24 * 60 * 60,  # 24 hours in seconds
@@ -59,6 +63,18 @@ celery_app.conf.update(
             "task": "app.tasks.periodic_tasks.sync_calendly_events",
             "schedule": 30 * 60,  # 30 minutes in seconds
         },
+        "drain-notification-outbox": {
+            "task": "app.tasks.notification_tasks.drain_notification_outbox",
+            "schedule": settings.NOTIFICATION_OUTBOX_POLL_INTERVAL,  # seconds
+        },
+        "purge-notification-outbox": {
+            "task": "app.tasks.notification_tasks.purge_notification_outbox",
+            "schedule": 24 * 60 * 60,  # 24 hours in seconds
+        },
+        "flush-notification-logs": {
+            "task": "app.tasks.notification_tasks.flush_notification_logs",
+            "schedule": settings.NOTIFICATION_LOG_FLUSH_INTERVAL,  # seconds
+        },
     },
 )
 
@@ -2,114 +2,68 @@
 Notification tasks
 """
 import json
+import asyncio
+import hashlib
 import httpx
 from datetime import datetime, timezone
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from celery import current_task
 from app.tasks.celery_app import celery_app
-from app.core.database import async_session_maker
+from app.core.database import async_session_maker, run_async
 from app.core.config import settings
-from app.models.notification import Notification, NotificationLog, NotificationType, NotificationTrigger
+from app.models.notification import Notification, NotificationOutbox, NotificationType, NotificationTrigger
 from app.models.monitor import Monitor
 from app.models.user import User
+from app.schemas.notification import NotificationContext, NotificationSnapshot, MonitorSnapshot, UserSnapshot
 from sqlalchemy import select
+from sqlalchemy.orm import joinedload
 import logging
 
 # Import notification services
 from app.services.whatsapp import whatsapp_service
-from app.services.telegram import telegram_service
 from app.services.sms import sms_service
 from app.services.slack import slack_service
+from app.services.notification_digest import notification_digest_service
+from app.services.notification_log_writer import notification_log_writer
+from app.services.notification_outbox import notification_outbox_service
 
 logger = logging.getLogger(__name__)
 
 
 @celery_app.task(bind=True, max_retries=3)
-def send_notification(self, notification_id: int, trigger: str, data: Dict[str, Any]) -> Dict[str, Any]:
+def send_notification(
+    self,
+    notification_id: int,
+    trigger: str,
+    data: Dict[str, Any],
+    context: Optional[Dict[str, Any]] = None,
+    event_id: Optional[str] = None
+) -> Dict[str, Any]:
     """
-    Send a notification
+    Queue a notification in the durable outbox
+    
+    Delivery, retries and dead-lettering are handled by drain_notification_outbox.
     
     Args:
         notification_id: ID of the notification configuration
         trigger: Notification trigger type
         data: Data for the notification
+        context: Serialized NotificationContext captured by trigger_notifications;
+            when omitted it is loaded with a single joined query at delivery time
+        event_id: ID of the source event (defaults to this task's ID, so
+            retries and redeliveries are queued once)
         
     Returns:
-        Dict with send result
+        Dict with outbox enqueue result
     """
     try:
-        logger.info(f"Sending notification {notification_id} with trigger {trigger}")
-        
-        async with async_session_maker() as session:
-            # Get notification configuration
-            result = await session.execute(
-                select(Notification).where(Notification.id == notification_id)
-            )
-            notification = result.scalar_one_or_none()
-            
-            if not notification:
-                logger.error(f"Notification {notification_id} not found")
-                return {"error": "Notification not found"}
-            
-            if not notification.enabled:
-                logger.info(f"Notification {notification_id} is disabled")
-                return {"skipped": "Notification disabled"}
-            
-            # Get monitor and user info
-            monitor = None
-            if notification.monitor_id:
-                monitor_result = await session.execute(
-                    select(Monitor).where(Monitor.id == notification.monitor_id)
-                )
-                monitor = monitor_result.scalar_one_or_none()
-            
-            user_result = await session.execute(
-                select(User).where(User.id == notification.user_id)
-            )
-            user = user_result.scalar_one_or_none()
-            
-            if not user:
-                logger.error(f"User {notification.user_id} not found")
-                return {"error": "User not found"}
-            
-            # Send notification based on type
-            if notification.type == NotificationType.EMAIL:
-                result = await _send_email_notification(notification, user, monitor, trigger, data)
-            elif notification.type == NotificationType.TELEGRAM:
-                result = await _send_telegram_notification(notification, user, monitor, trigger, data)
-            elif notification.type == NotificationType.WEBHOOK:
-                result = await _send_webhook_notification(notification, user, monitor, trigger, data)
-            elif notification.type == NotificationType.WHATSAPP:
-                result = await _send_whatsapp_notification(notification, user, monitor, trigger, data)
-            elif notification.type == NotificationType.SMS:
-                result = await _send_sms_notification(notification, user, monitor, trigger, data)
-            elif notification.type == NotificationType.SLACK:
-                result = await _send_slack_notification(notification, user, monitor, trigger, data)
-            else:
-                logger.error(f"Unknown notification type: {notification.type}")
-                return {"error": "Unknown notification type"}
-            
-            # Log notification
-            notification_log = NotificationLog(
-                notification_id=notification_id,
-                monitor_id=notification.monitor_id,
-                type=notification.type,
-                trigger=NotificationTrigger(trigger),
-                subject=result.get("subject"),
-                message=result.get("message"),
-                delivery_status=result.get("status", "sent"),
-                error_message=result.get("error"),
-                metadata=json.dumps(data)
-            )
-            
-            session.add(notification_log)
-            await session.commit()
-            
-            logger.info(f"Notification {notification_id} sent successfully")
-            return result
+        logger.info(f"Queueing notification {notification_id} with trigger {trigger}")
+        return run_async(_enqueue_notifications(
+            [(notification_id, trigger, data, context, event_id or self.request.id)]
+        ))[0]
             
     except Exception as exc:
-        logger.error(f"Failed to send notification {notification_id}: {exc}")
+        logger.error(f"Failed to queue notification {notification_id}: {exc}")
         
         # Retry the task
         if self.request.retries < self.max_retries:
@@ -119,77 +73,420 @@ def send_notification(self, notification_id: int, trigger: str, data: Dict[str,
         return {"error": str(exc)}
 
 
+async def _enqueue_notifications(
+    deliveries: List[Tuple[int, str, Dict[str, Any], Optional[Dict[str, Any]], Optional[str]]]
+) -> List[Dict[str, Any]]:
+    """Insert (notification_id, trigger, data, context, event_id) deliveries into the outbox in one transaction"""
+    results = []
+    async with async_session_maker() as session:
+        for notification_id, trigger, data, context, event_id in deliveries:
+            outbox_id = await notification_outbox_service.enqueue(
+                session, notification_id, trigger, data, context, event_id=event_id
+            )
+            results.append({
+                "notification_id": notification_id,
+                "outbox_id": outbox_id,
+                "status": "queued" if outbox_id else "duplicate"
+            })
+        await session.commit()
+    return results
+
+
+@celery_app.task
+def drain_notification_outbox(max_batches: int = 10) -> Dict[str, Any]:
+    """
+    Deliver pending outbox entries
+    
+    Claims batches with SELECT ... FOR UPDATE SKIP LOCKED, so several workers
+    can drain concurrently, and delivers each batch with bounded concurrency.
+    
+    Args:
+        max_batches: Upper bound on batches processed per run
+        
+    Returns:
+        Dict with delivery counts
+    """
+    try:
+        return run_async(_drain_notification_outbox(max_batches))
+        
+    except Exception as exc:
+        logger.error(f"Failed to drain notification outbox: {exc}")
+        return {"error": str(exc)}
+
+
+async def _drain_notification_outbox(max_batches: int) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(settings.NOTIFICATION_OUTBOX_CONCURRENCY)
+    
+    async def deliver(entry: NotificationOutbox) -> Dict[str, Any]:
+        async with semaphore:
+            outcome = {"id": entry.id, "attempts": entry.attempts, "max_attempts": entry.max_attempts}
+            try:
+                result = await _send_notification(entry.notification_id, entry.trigger, entry.data, entry.context)
+            except Exception as e:
+                return {**outcome, "status": "failed", "error": str(e)}
+            
+            if result.get("skipped"):
+                return {**outcome, "status": "skipped"}
+            if result.get("status") == "failed":
+                return {**outcome, "status": "failed", "error": result.get("error")}
+            if result.get("error"):
+                # Missing notification/user or unknown channel: retrying cannot help
+                return {**outcome, "status": "dead", "error": result.get("error")}
+            return {**outcome, "status": "sent"}
+    
+    counts = {"sent": 0, "skipped": 0, "failed": 0, "dead": 0}
+    for _ in range(max_batches):
+        entries = await notification_outbox_service.claim_batch()
+        if not entries:
+            break
+        outcomes = await asyncio.gather(*(deliver(entry) for entry in entries))
+        await notification_outbox_service.record_results(outcomes)
+        for outcome in outcomes:
+            counts[outcome["status"]] += 1
+    
+    if any(counts.values()):
+        logger.info(f"Notification outbox drained: {counts}")
+    return counts
+
+
 @celery_app.task
-def trigger_notifications(monitor_id: int, trigger: str, data: Dict[str, Any]) -> Dict[str, Any]:
+def purge_notification_outbox() -> Dict[str, Any]:
+    """
+    Delete delivered outbox entries past the retention period
+    
+    Returns:
+        Dict with number of rows deleted
+    """
+    try:
+        deleted = run_async(notification_outbox_service.purge())
+        logger.info(f"Purged {deleted} delivered outbox entries")
+        return {"deleted": deleted}
+        
+    except Exception as exc:
+        logger.error(f"Failed to purge notification outbox: {exc}")
+        return {"error": str(exc)}
+
+
+async def _load_notification_context(notification_id: int) -> Optional[NotificationContext]:
+    """Load notification, monitor and user in one round-trip"""
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(Notification)
+            .options(joinedload(Notification.user), joinedload(Notification.monitor))
+            .where(Notification.id == notification_id)
+        )
+        notification = result.scalar_one_or_none()
+        if not notification:
+            return None
+        return build_notification_context(notification, notification.monitor, notification.user)
+
+
+def build_notification_context(
+    notification: Notification,
+    monitor: Optional[Monitor],
+    user: User
+) -> NotificationContext:
+    """Snapshot ORM objects into a serializable delivery context"""
+    return NotificationContext(
+        notification=NotificationSnapshot.model_validate(notification),
+        monitor=MonitorSnapshot.model_validate(monitor) if monitor else None,
+        user=UserSnapshot.model_validate(user)
+    )
+
+
+async def _send_notification(
+    notification_id: int,
+    trigger: str,
+    data: Dict[str, Any],
+    context: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Deliver a notification through its channel and log the result"""
+    if context:
+        notification_context = NotificationContext.model_validate(context)
+    else:
+        notification_context = await _load_notification_context(notification_id)
+    
+    if not notification_context:
+        logger.error(f"Notification {notification_id} not found")
+        return {"error": "Notification not found"}
+    
+    notification = notification_context.notification
+    monitor = notification_context.monitor
+    user = notification_context.user
+    
+    if not notification.enabled:
+        logger.info(f"Notification {notification_id} is disabled")
+        return {"skipped": "Notification disabled"}
+    
+    # Send notification based on type
+    if notification.type == NotificationType.EMAIL:
+        result = await _send_email_notification(notification, user, monitor, trigger, data)
+    elif notification.type == NotificationType.TELEGRAM:
+        result = await _send_telegram_notification(notification, user, monitor, trigger, data)
+    elif notification.type == NotificationType.WEBHOOK:
+        result = await _send_webhook_notification(notification, user, monitor, trigger, data)
+    elif notification.type == NotificationType.WHATSAPP:
+        result = await _send_whatsapp_notification(notification, user, monitor, trigger, data)
+    elif notification.type == NotificationType.SMS:
+        result = await _send_sms_notification(notification, user, monitor, trigger, data)
+    elif notification.type == NotificationType.SLACK:
+        result = await _send_slack_notification(notification, user, monitor, trigger, data)
+    else:
+        logger.error(f"Unknown notification type: {notification.type}")
+        return {"error": "Unknown notification type"}
+    
+    # Log notification (buffered, bulk-inserted by flush_notification_logs)
+    notification_log_writer.enqueue(
+        notification_id=notification_id,
+        monitor_id=monitor.id if monitor else notification.monitor_id,
+        type=notification.type.value,
+        trigger=trigger,
+        result=result,
+        data=data
+    )
+    
+    logger.info(f"Notification {notification_id} sent successfully")
+    return result
+
+
+@celery_app.task
+def trigger_notifications(
+    monitor_id: int,
+    trigger: str,
+    data: Dict[str, Any],
+    event_id: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Trigger notifications for a monitor event
     
+    Events for channels with digests enabled are buffered per (user, channel)
+    and delivered by flush_notification_digest once the window closes.
+    
     Args:
         monitor_id: ID of the monitor
         trigger: Event trigger
         data: Event data
+        event_id: ID of the source event, e.g. "check:<result id>" (defaults
+            to this task's ID, which is stable across redeliveries)
         
     Returns:
         Dict with trigger results
     """
     try:
         logger.info(f"Triggering notifications for monitor {monitor_id} with trigger {trigger}")
+        return run_async(_trigger_notifications(monitor_id, trigger, data, event_id or _current_task_id()))
+            
+    except Exception as exc:
+        logger.error(f"Failed to trigger notifications for monitor {monitor_id}: {exc}")
+        return {"error": str(exc)}
+
+
+async def _trigger_notifications(
+    monitor_id: int,
+    trigger: str,
+    data: Dict[str, Any],
+    event_id: Optional[str]
+) -> Dict[str, Any]:
+    """Select notifications subscribed to the trigger and queue or buffer them"""
+    async with async_session_maker() as session:
+        monitor_result = await session.execute(
+            select(Monitor).options(joinedload(Monitor.user)).where(Monitor.id == monitor_id)
+        )
+        monitor = monitor_result.scalar_one_or_none()
+        
+        if not monitor:
+            logger.error(f"Monitor {monitor_id} not found")
+            return {"error": "Monitor not found"}
         
-        async with async_session_maker() as session:
-            # Get all enabled notifications for this monitor and user
-            result = await session.execute(
-                select(Notification).where(
-                    (Notification.monitor_id == monitor_id) | (Notification.monitor_id.is_(None)),
-                    Notification.enabled == True
-                )
+        # Get all enabled notifications for this monitor and its owner's global settings
+        result = await session.execute(
+            select(Notification).where(
+                Notification.user_id == monitor.user_id,
+                (Notification.monitor_id == monitor_id) | (Notification.monitor_id.is_(None)),
+                Notification.enabled == True
             )
-            notifications = result.scalars().all()
-            
-            # Filter notifications by trigger
-            triggered_notifications = []
-            for notification in notifications:
-                try:
-                    triggers = json.loads(notification.triggers) if notification.triggers else []
-                    if trigger in triggers:
-                        triggered_notifications.append(notification)
-                except json.JSONDecodeError:
-                    logger.warning(f"Invalid triggers JSON for notification {notification.id}")
-                    continue
-            
-            # Send notifications
-            results = []
-            for notification in triggered_notifications:
-                try:
-                    task_result = send_notification.delay(notification.id, trigger, data)
+        )
+        notifications = result.scalars().all()
+        
+        # Filter notifications by trigger
+        triggered_notifications = []
+        for notification in notifications:
+            try:
+                triggers = json.loads(notification.triggers) if notification.triggers else []
+                if trigger in triggers:
+                    triggered_notifications.append(notification)
+            except json.JSONDecodeError:
+                logger.warning(f"Invalid triggers JSON for notification {notification.id}")
+                continue
+        
+        # Send or buffer notifications
+        results = []
+        for notification in triggered_notifications:
+            channel = notification.type.value
+            context = build_notification_context(notification, monitor, monitor.user).model_dump(mode="json")
+            try:
+                if notification_digest_service.is_enabled_for(channel):
+                    flush_needed = notification_digest_service.add_event(
+                        notification.user_id,
+                        channel,
+                        {
+                            "notification_id": notification.id,
+                            "destination": _notification_destination(notification),
+                            "monitor_id": monitor_id,
+                            "event_id": event_id,
+                            "domain": monitor.domain,
+                            "trigger": trigger,
+                            "days_until_expiry": data.get("days_until_expiry"),
+                            "data": data,
+                            "context": context,
+                        }
+                    )
+                    if flush_needed:
+                        flush_notification_digest.apply_async(
+                            (notification.user_id, channel),
+                            countdown=notification_digest_service.window
+                        )
                     results.append({
                         "notification_id": notification.id,
                         "type": notification.type,
-                        "task_id": task_result.id,
-                        "status": "queued"
+                        "status": "buffered"
                     })
-                except Exception as e:
+                else:
+                    outbox_id = await notification_outbox_service.enqueue(
+                        session, notification.id, trigger, data, context, event_id=event_id
+                    )
                     results.append({
                         "notification_id": notification.id,
                         "type": notification.type,
-                        "error": str(e),
-                        "status": "failed"
+                        "outbox_id": outbox_id,
+                        "status": "queued" if outbox_id else "duplicate"
                     })
-            
-            logger.info(f"Triggered {len(results)} notifications for monitor {monitor_id}")
-            return {
-                "monitor_id": monitor_id,
-                "trigger": trigger,
-                "total_notifications": len(results),
-                "queued": len([r for r in results if r.get("status") == "queued"]),
-                "failed": len([r for r in results if r.get("status") == "failed"]),
-                "results": results
-            }
-            
+            except Exception as e:
+                results.append({
+                    "notification_id": notification.id,
+                    "type": notification.type,
+                    "error": str(e),
+                    "status": "failed"
+                })
+        
+        await session.commit()
+        
+        logger.info(f"Triggered {len(results)} notifications for monitor {monitor_id}")
+        return {
+            "monitor_id": monitor_id,
+            "trigger": trigger,
+            "total_notifications": len(results),
+            "queued": len([r for r in results if r.get("status") == "queued"]),
+            "buffered": len([r for r in results if r.get("status") == "buffered"]),
+            "duplicate": len([r for r in results if r.get("status") == "duplicate"]),
+            "failed": len([r for r in results if r.get("status") == "failed"]),
+            "results": results
+        }
+
+
+@celery_app.task
+def flush_notification_digest(user_id: int, channel: str) -> Dict[str, Any]:
+    """
+    Deliver events buffered for a (user, channel) window
+    
+    A destination with a single buffered event receives the original
+    notification; otherwise all its events are sent as one digest.
+    
+    Args:
+        user_id: Recipient user ID
+        channel: Notification channel
+        
+    Returns:
+        Dict with flush results
+    """
+    try:
+        events = notification_digest_service.drain(user_id, channel)
+        if not events:
+            return {"user_id": user_id, "channel": channel, "events": 0, "messages": 0}
+        
+        deliveries = []
+        for destination_events in notification_digest_service.group_by_destination(events).values():
+            first = destination_events[0]
+            if len(destination_events) == 1:
+                deliveries.append((
+                    first["notification_id"],
+                    first["trigger"],
+                    first.get("data") or {},
+                    first.get("context"),
+                    first.get("event_id")
+                ))
+            else:
+                deliveries.append((
+                    first["notification_id"],
+                    NotificationTrigger.DIGEST.value,
+                    {
+                        "events": [
+                            {k: v for k, v in e.items() if k not in ("data", "context")}
+                            for e in destination_events
+                        ]
+                    },
+                    first.get("context"),
+                    _digest_event_id(destination_events)
+                ))
+        run_async(_enqueue_notifications(deliveries))
+        
+        logger.info(f"Flushed {len(events)} events for user {user_id} ({channel}) into {len(deliveries)} messages")
+        return {"user_id": user_id, "channel": channel, "events": len(events), "messages": len(deliveries)}
+        
     except Exception as exc:
-        logger.error(f"Failed to trigger notifications for monitor {monitor_id}: {exc}")
+        logger.error(f"Failed to flush notification digest for user {user_id} ({channel}): {exc}")
+        return {"error": str(exc)}
+
+
+@celery_app.task
+def flush_notification_logs() -> Dict[str, Any]:
+    """
+    Bulk-insert buffered notification delivery logs
+    
+    Returns:
+        Dict with number of rows written
+    """
+    try:
+        written = run_async(notification_log_writer.flush())
+        if written:
+            logger.info(f"Flushed {written} notification logs")
+        return {"written": written}
+        
+    except Exception as exc:
+        logger.error(f"Failed to flush notification logs: {exc}")
         return {"error": str(exc)}
 
 
+def _current_task_id() -> Optional[str]:
+    """ID of the running Celery task (stable across retries and redeliveries)"""
+    return current_task.request.id if current_task else None
+
+
+def _digest_event_id(events: List[Dict[str, Any]]) -> Optional[str]:
+    """Event ID of a digest: derived from the IDs of the events it covers"""
+    event_ids = [str(e.get("event_id")) for e in events if e.get("event_id")]
+    if not event_ids:
+        return None
+    return "digest:" + hashlib.sha256(":".join(sorted(event_ids)).encode()).hexdigest()
+
+
+def _notification_destination(notification: Notification) -> Optional[str]:
+    """Get the delivery address a notification resolves to"""
+    if notification.type == NotificationType.EMAIL:
+        return notification.email_address
+    if notification.type == NotificationType.TELEGRAM:
+        return notification.telegram_chat_id or settings.TELEGRAM_CHAT_ID
+    if notification.type == NotificationType.WEBHOOK:
+        return notification.webhook_url
+    if notification.type == NotificationType.WHATSAPP:
+        return notification.whatsapp_phone
+    if notification.type == NotificationType.SMS:
+        return notification.phone_number
+    if notification.type == NotificationType.SLACK:
+        return notification.channel
+    return None
+
+
 async def _send_email_notification(
     notification: Notification,
     user: User,
@@ -201,8 +498,12 @@ async def _send_email_notification(
     try:
         # TODO: Implement email sending with fastapi-mail
         # For now, just log the notification
-        subject = f"SSL Monitor Alert - {trigger}"
-        message = f"SSL certificate alert for {monitor.domain if monitor else 'your domains'}"
+        if trigger == NotificationTrigger.DIGEST.value:
+            digest = notification_digest_service.format_digest(data["events"], "email")
+            subject, message = digest["subject"], digest["message"]
+        else:
+            subject = f"SSL Monitor Alert - {trigger}"
+            message = f"SSL certificate alert for {monitor.domain if monitor else 'your domains'}"
         
         logger.info(f"Email notification would be sent to {notification.email_address}")
         
@@ -249,17 +550,20 @@ async def _send_telegram_notification(
             "weekly_report": "📊"
         }
         
-        emoji = emoji_map.get(trigger, "🔔")
-        message = f"{emoji} *SSL Monitor Alert*\n\n"
-        
-        if monitor:
-            message += f"Domain: `{monitor.domain}`\n"
-            message += f"Status: {monitor.ssl_status.value}\n"
-            if monitor.days_until_expiry is not None:
-                message += f"Expires in: {monitor.days_until_expiry} days\n"
-        
-        message += f"Trigger: {trigger}\n"
-        message += f"Time: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')}"
+        if trigger == NotificationTrigger.DIGEST.value:
+            message = "📋 " + notification_digest_service.format_digest(data["events"], "telegram")["message"]
+        else:
+            emoji = emoji_map.get(trigger, "🔔")
+            message = f"{emoji} *SSL Monitor Alert*\n\n"
+            
+            if monitor:
+                message += f"Domain: `{monitor.domain}`\n"
+                message += f"Status: {monitor.ssl_status.value}\n"
+                if monitor.days_until_expiry is not None:
+                    message += f"Expires in: {monitor.days_until_expiry} days\n"
+            
+            message += f"Trigger: {trigger}\n"
+            message += f"Time: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')}"
         
         # Send message
         async with httpx.AsyncClient() as client:
@@ -372,7 +676,9 @@ async def _send_whatsapp_notification(
             return {"status": "failed", "error": "WhatsApp phone number not configured"}
         
         # Format message based on trigger
-        if trigger.startswith("expires_"):
+        if trigger == NotificationTrigger.DIGEST.value:
+            message = notification_digest_service.format_digest(data["events"], "whatsapp")["message"]
+        elif trigger.startswith("expires_"):
             days_until_expiry = data.get("days_until_expiry", 0)
             message = whatsapp_service.get_ssl_alert_message(
                 monitor.domain if monitor else "your domain",
@@ -420,27 +726,22 @@ def send_bulk_notifications(notification_ids: List[int], trigger: str, data: Dic
     Returns:
         Dict with bulk send results
     """
-    results = []
-    
-    for notification_id in notification_ids:
-        try:
-            task_result = send_notification.delay(notification_id, trigger, data)
-            results.append({
-                "notification_id": notification_id,
-                "task_id": task_result.id,
-                "status": "queued"
-            })
-        except Exception as e:
-            results.append({
-                "notification_id": notification_id,
-                "error": str(e),
-                "status": "failed"
-            })
+    try:
+        event_id = _current_task_id()
+        results = run_async(_enqueue_notifications(
+            [(notification_id, trigger, data, None, event_id) for notification_id in notification_ids]
+        ))
+    except Exception as e:
+        results = [
+            {"notification_id": notification_id, "error": str(e), "status": "failed"}
+            for notification_id in notification_ids
+        ]
     
     return {
         "trigger": trigger,
         "total_notifications": len(notification_ids),
         "queued": len([r for r in results if r.get("status") == "queued"]),
+        "duplicate": len([r for r in results if r.get("status") == "duplicate"]),
         "failed": len([r for r in results if r.get("status") == "failed"]),
         "results": results
     }
@@ -460,7 +761,9 @@ async def _send_sms_notification(
             return {"status": "failed", "error": "SMS phone number not configured"}
         
         # Format message based on trigger
-        if trigger.startswith("expires_"):
+        if trigger == NotificationTrigger.DIGEST.value:
+            message = notification_digest_service.format_digest(data["events"], "sms")["message"]
+        elif trigger.startswith("expires_"):
             days_until_expiry = data.get("days_until_expiry", 0)
             domain = monitor.domain if monitor else "your domain"
             message = f"SSL Alert: {domain} expires in {days_until_expiry} days. Renew now!"
@@ -496,3 +799,48 @@ async def _send_sms_notification(
             "status": "failed",
             "error": str(e)
         }
+
+
+async def _send_slack_notification(
+    notification: Notification,
+    user: User,
+    monitor: Optional[Monitor],
+    trigger: str,
+    data: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Send Slack notification"""
+    try:
+        if not notification.channel:
+            return {"status": "failed", "error": "Slack channel not configured"}
+        
+        if trigger == NotificationTrigger.DIGEST.value:
+            message = notification_digest_service.format_digest(data["events"], "slack")["message"]
+            result = await slack_service.send_message(notification.channel, message)
+        elif trigger.startswith("expires_") or trigger == "expired":
+            domain = monitor.domain if monitor else "your domain"
+            alert_type = "expired" if trigger == "expired" else "expires_soon"
+            result = await slack_service.send_ssl_alert(
+                notification.channel,
+                domain,
+                alert_type,
+                days_remaining=data.get("days_until_expiry")
+            )
+            message = f"SSL {alert_type} alert for {domain}"
+        else:
+            message = f"🔔 *SSL Monitor Pro Alert*: {trigger}"
+            if monitor:
+                message += f" for {monitor.domain}"
+            result = await slack_service.send_message(notification.channel, message)
+        
+        return {
+            "status": "sent" if result.get("success") else "failed",
+            "message": message,
+            "channel": notification.channel,
+            "error": result.get("error")
+        }
+        
+    except Exception as e:
+        return {
+            "status": "failed",
+            "error": str(e)
+        }
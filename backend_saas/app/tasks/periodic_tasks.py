@@ -5,14 +5,15 @@ from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, List
 from celery import current_task
 from app.tasks.celery_app import celery_app
-from app.core.database import async_session_maker
-from app.models.monitor import Monitor
-from app.models.check_result import MonitorCheckResult
+from app.core.database import async_session_maker, run_async
+from app.models.monitor import Monitor, MonitorStatus, SSLCertStatus
+from app.models.check_result import MonitorCheckResult, MonitorDailyStats
 from app.models.user import User
 from app.models.calendly import CalendlyEvent
 from app.tasks.ssl_tasks import check_ssl_certificate
 from app.tasks.notification_tasks import send_bulk_notifications
-from sqlalchemy import select, delete, func
+from app.services.check_rollup import check_rollup_service
+from sqlalchemy import select, update, delete, func, cast, Numeric
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,47 +30,50 @@ def check_all_ssl_certificates() -> Dict[str, Any]:
     try:
         logger.info("Starting periodic SSL certificate checks")
         
-        async with async_session_maker() as session:
-            # Get monitors that need checking
-            now = datetime.now(timezone.utc)
-            result = await session.execute(
-                select(Monitor).where(
-                    Monitor.status == "active",
-                    Monitor.last_checked_at.is_(None) | 
-                    (Monitor.last_checked_at <= now - timedelta(seconds=Monitor.check_interval))
-                ).limit(100)  # Process in batches
-            )
-            monitors = result.scalars().all()
-            
-            if not monitors:
-                logger.info("No monitors need checking")
-                return {"message": "No monitors need checking", "processed": 0}
-            
-            # Queue SSL checks
-            task_ids = []
-            for monitor in monitors:
-                try:
-                    task = check_ssl_certificate.delay(monitor.id)
-                    task_ids.append({
-                        "monitor_id": monitor.id,
-                        "domain": monitor.domain,
-                        "task_id": task.id
-                    })
-                except Exception as e:
-                    logger.error(f"Failed to queue SSL check for monitor {monitor.id}: {e}")
-            
-            logger.info(f"Queued SSL checks for {len(task_ids)} monitors")
-            return {
-                "message": f"Queued SSL checks for {len(task_ids)} monitors",
-                "processed": len(task_ids),
-                "task_ids": task_ids
-            }
-            
+        monitors = run_async(_get_monitors_due())
+        if not monitors:
+            logger.info("No monitors need checking")
+            return {"message": "No monitors need checking", "processed": 0}
+        
+        # Queue SSL checks
+        task_ids = []
+        for monitor in monitors:
+            try:
+                task = check_ssl_certificate.delay(monitor.id)
+                task_ids.append({
+                    "monitor_id": monitor.id,
+                    "domain": monitor.domain,
+                    "task_id": task.id
+                })
+            except Exception as e:
+                logger.error(f"Failed to queue SSL check for monitor {monitor.id}: {e}")
+        
+        logger.info(f"Queued SSL checks for {len(task_ids)} monitors")
+        return {
+            "message": f"Queued SSL checks for {len(task_ids)} monitors",
+            "processed": len(task_ids),
+            "task_ids": task_ids
+        }
+        
     except Exception as exc:
         logger.error(f"Failed to check SSL certificates: {exc}")
         return {"error": str(exc)}
 
 
+async def _get_monitors_due() -> List[Monitor]:
+    """Get active monitors whose check interval has elapsed"""
+    async with async_session_maker() as session:
+        now = datetime.now(timezone.utc)
+        result = await session.execute(
+            select(Monitor).where(
+                Monitor.status == MonitorStatus.ACTIVE,
+                Monitor.last_checked_at.is_(None) | 
+                (Monitor.last_checked_at <= now - func.make_interval(0, 0, 0, 0, 0, 0, Monitor.check_interval))
+            ).limit(100)  # Process in batches
+        )
+        return result.scalars().all()
+
+
 @celery_app.task
 def send_weekly_reports() -> Dict[str, Any]:
     """
@@ -80,87 +84,98 @@ def send_weekly_reports() -> Dict[str, Any]:
     """
     try:
         logger.info("Starting weekly reports generation")
+        return run_async(_send_weekly_reports())
         
-        async with async_session_maker() as session:
-            # Get all active users with monitors
-            result = await session.execute(
-                select(User).where(
-                    User.is_active == True,
-                    User.monitors.any()
-                )
+    except Exception as exc:
+        logger.error(f"Failed to send weekly reports: {exc}")
+        return {"error": str(exc)}
+
+
+async def _send_weekly_reports() -> Dict[str, Any]:
+    """Build weekly reports from monitor counters and the daily check rollup"""
+    async with async_session_maker() as session:
+        # Get all active users with monitors
+        result = await session.execute(
+            select(User.id).where(
+                User.is_active == True,
+                User.monitors.any()
             )
-            users = result.scalars().all()
-            
-            if not users:
-                logger.info("No users found for weekly reports")
-                return {"message": "No users found", "processed": 0}
+        )
+        user_ids = result.scalars().all()
+        
+        if not user_ids:
+            logger.info("No users found for weekly reports")
+            return {"message": "No users found", "processed": 0}
+        
+        # Monitor counters per user
+        monitor_stats = await session.execute(
+            select(
+                Monitor.user_id,
+                func.count(Monitor.id).label("total_monitors"),
+                func.count(Monitor.id).filter(Monitor.status == MonitorStatus.ACTIVE).label("active_monitors"),
+                func.count(Monitor.id).filter(Monitor.ssl_status == SSLCertStatus.EXPIRED).label("expired_certs"),
+                func.count(Monitor.id).filter(Monitor.ssl_status == SSLCertStatus.EXPIRING_SOON).label("expiring_soon")
+            ).where(Monitor.user_id.in_(user_ids)).group_by(Monitor.user_id)
+        )
+        monitors_by_user = {row.user_id: row for row in monitor_stats}
+        
+        # Check counters per user for the last 7 days
+        week_ago = (datetime.now(timezone.utc) - timedelta(days=7)).date()
+        check_stats = await session.execute(
+            select(
+                Monitor.user_id,
+                func.sum(MonitorDailyStats.total_checks).label("total_checks"),
+                func.sum(MonitorDailyStats.successful_checks).label("successful_checks")
+            ).join(
+                Monitor, MonitorDailyStats.monitor_id == Monitor.id
+            ).where(
+                Monitor.user_id.in_(user_ids),
+                MonitorDailyStats.day > week_ago
+            ).group_by(Monitor.user_id)
+        )
+        checks_by_user = {row.user_id: row for row in check_stats}
+    
+    # Generate reports for each user
+    reports_sent = 0
+    for user_id in user_ids:
+        try:
+            monitors = monitors_by_user.get(user_id)
+            if not monitors:
+                continue
             
-            # Generate reports for each user
-            reports_sent = 0
-            for user in users:
-                try:
-                    # Get user's monitors and their stats
-                    monitors_result = await session.execute(
-                        select(Monitor).where(Monitor.user_id == user.id)
-                    )
-                    monitors = monitors_result.scalars().all()
-                    
-                    if not monitors:
-                        continue
-                    
-                    # Calculate stats
-                    total_monitors = len(monitors)
-                    active_monitors = len([m for m in monitors if m.status == "active"])
-                    expired_certs = len([m for m in monitors if m.ssl_status == "expired"])
-                    expiring_soon = len([m for m in monitors if m.ssl_status == "expiring_soon"])
-                    
-                    # Get recent check results
-                    week_ago = datetime.now(timezone.utc) - timedelta(days=7)
-                    checks_result = await session.execute(
-                        select(MonitorCheckResult).join(Monitor).where(
-                            Monitor.user_id == user.id,
-                            MonitorCheckResult.checked_at >= week_ago
-                        )
-                    )
-                    recent_checks = checks_result.scalars().all()
-                    
-                    # Calculate uptime
-                    successful_checks = len([c for c in recent_checks if c.success])
-                    total_checks = len(recent_checks)
-                    uptime = (successful_checks / total_checks * 100) if total_checks > 0 else 100
-                    
-                    # Prepare report data
-                    report_data = {
-                        "user_id": user.id,
-                        "total_monitors": total_monitors,
-                        "active_monitors": active_monitors,
-                        "expired_certificates": expired_certs,
-                        "expiring_soon": expiring_soon,
-                        "total_checks_this_week": total_checks,
-                        "successful_checks": successful_checks,
-                        "uptime_percentage": round(uptime, 2),
-                        "report_period": "7 days",
-                        "generated_at": datetime.now(timezone.utc).isoformat()
-                    }
-                    
-                    # Send report notification
-                    # TODO: Implement email report sending
-                    logger.info(f"Weekly report generated for user {user.id}: {report_data}")
-                    reports_sent += 1
-                    
-                except Exception as e:
-                    logger.error(f"Failed to generate report for user {user.id}: {e}")
+            checks = checks_by_user.get(user_id)
+            total_checks = int(checks.total_checks) if checks else 0
+            successful_checks = int(checks.successful_checks) if checks else 0
+            uptime = (successful_checks / total_checks * 100) if total_checks > 0 else 100
             
-            logger.info(f"Weekly reports sent to {reports_sent} users")
-            return {
-                "message": f"Weekly reports sent to {reports_sent} users",
-                "processed": reports_sent,
-                "total_users": len(users)
+            # Prepare report data
+            report_data = {
+                "user_id": user_id,
+                "total_monitors": monitors.total_monitors,
+                "active_monitors": monitors.active_monitors,
+                "expired_certificates": monitors.expired_certs,
+                "expiring_soon": monitors.expiring_soon,
+                "total_checks_this_week": total_checks,
+                "successful_checks": successful_checks,
+                "uptime_percentage": round(uptime, 2),
+                "report_period": "7 days",
+                "generated_at": datetime.now(timezone.utc).isoformat()
             }
             
-    except Exception as exc:
-        logger.error(f"Failed to send weekly reports: {exc}")
-        return {"error": str(exc)}
+            # Send report notification
+            # TODO: Implement email report sending
+            logger.info(f"Weekly report generated for user {user_id}: {report_data}")
+            reports_sent += 1
+            
+        except Exception as e:
+            logger.error(f"Failed to generate report for user {user_id}: {e}")
+    
+    logger.info(f"Weekly reports sent to {reports_sent} users")
+    return {
+        "message": f"Weekly reports sent to {reports_sent} users",
+        "processed": reports_sent,
+        "total_users": len(user_ids)
+    }
 
 
 @celery_app.task
@@ -173,45 +188,49 @@ def cleanup_old_check_results() -> Dict[str, Any]:
     """
     try:
         logger.info("Starting cleanup of old check results")
+        return run_async(_cleanup_old_check_results())
         
-        async with async_session_maker() as session:
-            # Delete check results older than 90 days
-            cutoff_date = datetime.now(timezone.utc) - timedelta(days=90)
-            
-            result = await session.execute(
-                select(func.count(MonitorCheckResult.id)).where(
-                    MonitorCheckResult.checked_at < cutoff_date
-                )
-            )
-            old_results_count = result.scalar()
-            
-            if old_results_count == 0:
-                logger.info("No old check results to clean up")
-                return {"message": "No old results found", "deleted": 0}
-            
-            # Delete old results
-            delete_result = await session.execute(
-                delete(MonitorCheckResult).where(
-                    MonitorCheckResult.checked_at < cutoff_date
-                )
-            )
-            
-            await session.commit()
-            
-            deleted_count = delete_result.rowcount
-            logger.info(f"Cleaned up {deleted_count} old check results")
-            
-            return {
-                "message": f"Cleaned up {deleted_count} old check results",
-                "deleted": deleted_count,
-                "cutoff_date": cutoff_date.isoformat()
-            }
-            
     except Exception as exc:
         logger.error(f"Failed to cleanup old check results: {exc}")
         return {"error": str(exc)}
 
 
+async def _cleanup_old_check_results() -> Dict[str, Any]:
+    """Delete raw check results older than 90 days (daily rollups are kept)"""
+    async with async_session_maker() as session:
+        # Delete check results older than 90 days
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=90)
+        
+        result = await session.execute(
+            select(func.count(MonitorCheckResult.id)).where(
+                MonitorCheckResult.checked_at < cutoff_date
+            )
+        )
+        old_results_count = result.scalar()
+        
+        if old_results_count == 0:
+            logger.info("No old check results to clean up")
+            return {"message": "No old results found", "deleted": 0}
+        
+        # Delete old results
+        delete_result = await session.execute(
+            delete(MonitorCheckResult).where(
+                MonitorCheckResult.checked_at < cutoff_date
+            )
+        )
+        
+        await session.commit()
+        
+        deleted_count = delete_result.rowcount
+        logger.info(f"Cleaned up {deleted_count} old check results")
+        
+        return {
+            "message": f"Cleaned up {deleted_count} old check results",
+            "deleted": deleted_count,
+            "cutoff_date": cutoff_date.isoformat()
+        }
+
+
 @celery_app.task
 def sync_calendly_events() -> Dict[str, Any]:
     """
@@ -247,53 +266,86 @@ def update_monitor_statistics() -> Dict[str, Any]:
     """
     try:
         logger.info("Starting monitor statistics update")
+        return run_async(_update_monitor_statistics())
         
-        async with async_session_maker() as session:
-            # Get all active monitors
-            result = await session.execute(
-                select(Monitor).where(Monitor.status == "active")
-            )
-            monitors = result.scalars().all()
-            
-            updated_count = 0
-            for monitor in monitors:
-                try:
-                    # Calculate uptime for the last 24 hours
-                    day_ago = datetime.now(timezone.utc) - timedelta(hours=24)
-                    
-                    checks_result = await session.execute(
-                        select(MonitorCheckResult).where(
-                            MonitorCheckResult.monitor_id == monitor.id,
-                            MonitorCheckResult.checked_at >= day_ago
-                        )
-                    )
-                    recent_checks = checks_result.scalars().all()
-                    
-                    if recent_checks:
-                        successful_checks = len([c for c in recent_checks if c.success])
-                        uptime = (successful_checks / len(recent_checks)) * 100
-                        
-                        # Update monitor uptime
-                        monitor.uptime_percentage = round(uptime, 2)
-                        updated_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Failed to update statistics for monitor {monitor.id}: {e}")
-            
-            await session.commit()
-            
-            logger.info(f"Updated statistics for {updated_count} monitors")
-            return {
-                "message": f"Updated statistics for {updated_count} monitors",
-                "updated": updated_count,
-                "total_monitors": len(monitors)
-            }
-            
     except Exception as exc:
         logger.error(f"Failed to update monitor statistics: {exc}")
         return {"error": str(exc)}
 
 
+async def _update_monitor_statistics() -> Dict[str, Any]:
+    """
+    Set each active monitor's uptime from the daily rollup
+    
+    Uptime covers the current and previous UTC day, the closest whole-day
+    window to the last 24 hours.
+    """
+    since = (datetime.now(timezone.utc) - timedelta(hours=24)).date()
+    
+    async with async_session_maker() as session:
+        stats = select(
+            MonitorDailyStats.monitor_id,
+            func.sum(MonitorDailyStats.total_checks).label("total_checks"),
+            func.sum(MonitorDailyStats.successful_checks).label("successful_checks")
+        ).where(
+            MonitorDailyStats.day >= since
+        ).group_by(MonitorDailyStats.monitor_id).subquery()
+        
+        result = await session.execute(
+            update(Monitor)
+            .where(
+                Monitor.id == stats.c.monitor_id,
+                Monitor.status == MonitorStatus.ACTIVE,
+                stats.c.total_checks > 0
+            )
+            .values(
+                uptime_percentage=func.round(
+                    cast(stats.c.successful_checks * 100.0 / stats.c.total_checks, Numeric), 2
+                )
+            )
+            .execution_options(synchronize_session=False)
+        )
+        updated_count = result.rowcount
+        
+        total_monitors = await session.scalar(
+            select(func.count(Monitor.id)).where(Monitor.status == MonitorStatus.ACTIVE)
+        )
+        await session.commit()
+    
+    logger.info(f"Updated statistics for {updated_count} monitors")
+    return {
+        "message": f"Updated statistics for {updated_count} monitors",
+        "updated": updated_count,
+        "total_monitors": total_monitors
+    }
+
+
+@celery_app.task
+def rebuild_monitor_daily_stats(days: int = 2) -> Dict[str, Any]:
+    """
+    Recompute recent daily rollups from raw check results
+    
+    The incremental counters can drift (e.g. a task retried after its
+    commit); this reconciles them and also backfills history when run
+    with a larger window.
+    
+    Args:
+        days: Number of most recent UTC days to rebuild
+        
+    Returns:
+        Dict with number of rollup rows written
+    """
+    try:
+        today = datetime.now(timezone.utc).date()
+        written = run_async(check_rollup_service.rebuild(today - timedelta(days=days - 1), today))
+        logger.info(f"Rebuilt {written} monitor daily stats rows")
+        return {"rebuilt": written, "days": days}
+        
+    except Exception as exc:
+        logger.error(f"Failed to rebuild monitor daily stats: {exc}")
+        return {"error": str(exc)}
+
+
 @celery_app.task
 def health_check_task() -> Dict[str, Any]:
     """
@@ -313,9 +365,8 @@ def health_check_task() -> Dict[str, Any]:
         
         # Check database connection
         try:
-            async with async_session_maker() as session:
-                await session.execute(select(1))
-                health_status["checks"]["database"] = "healthy"
+            run_async(_ping_database())
+            health_status["checks"]["database"] = "healthy"
         except Exception as e:
             health_status["checks"]["database"] = f"unhealthy: {str(e)}"
             health_status["status"] = "unhealthy"
@@ -350,3 +401,8 @@ def health_check_task() -> Dict[str, Any]:
     except Exception as exc:
         logger.error(f"Health check task failed: {exc}")
         return {"error": str(exc), "status": "unhealthy"}
+
+
+async def _ping_database() -> None:
+    async with async_session_maker() as session:
+        await session.execute(select(1))
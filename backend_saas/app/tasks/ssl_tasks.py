@@ -7,10 +7,14 @@ from datetime import datetime, timezone
 from typing import Dict, Any, Optional
 from celery import current_task
 from app.tasks.celery_app import celery_app
-from app.core.database import async_session_maker
+from app.core.database import async_session_maker, run_async
 from app.models.monitor import Monitor, SSLCertStatus
 from app.models.check_result import MonitorCheckResult
+from app.models.notification import NotificationTrigger
+from app.services.check_rollup import check_rollup_service
+from app.services.analytics_cache import analytics_cache
 from app.tasks.notification_tasks import trigger_notifications
+from sqlalchemy import select
 import logging
 
 logger = logging.getLogger(__name__)
@@ -28,91 +32,8 @@ def check_ssl_certificate(self, monitor_id: int) -> Dict[str, Any]:
         Dict with check results
     """
     try:
-        logger.info(f"Starting SSL check for monitor {monitor_id}")
+        return run_async(_check_and_record(monitor_id))
         
-        # Get monitor from database
-        from sqlalchemy import select
-        async with async_session_maker() as session:
-            result = await session.execute(
-                select(Monitor).where(Monitor.id == monitor_id)
-            )
-            monitor = result.scalar_one_or_none()
-            
-            if not monitor:
-                logger.error(f"Monitor {monitor_id} not found")
-                return {"error": "Monitor not found"}
-            
-            # Check SSL certificate
-            check_result = await _check_ssl_certificate(monitor)
-            
-            # Save check result to database
-            check_result_db = MonitorCheckResult(
-                monitor_id=monitor_id,
-                check_type="ssl_cert",
-                success=check_result["success"],
-                issuer=check_result.get("issuer"),
-                subject=check_result.get("subject"),
-                serial_number=check_result.get("serial_number"),
-                fingerprint=check_result.get("fingerprint"),
-                valid_from=check_result.get("valid_from"),
-                valid_until=check_result.get("valid_until"),
-                response_time_ms=check_result.get("response_time_ms"),
-                connection_time_ms=check_result.get("connection_time_ms"),
-                handshake_time_ms=check_result.get("handshake_time_ms"),
-                error_code=check_result.get("error_code"),
-                error_message=check_result.get("error_message"),
-                certificate_chain_length=check_result.get("certificate_chain_length"),
-                cipher_suite=check_result.get("cipher_suite"),
-                protocol_version=check_result.get("protocol_version"),
-            )
-            
-            session.add(check_result_db)
-            
-            # Update monitor with latest check info
-            monitor.last_checked_at = datetime.now(timezone.utc)
-            
-            if check_result["success"]:
-                monitor.last_successful_check = datetime.now(timezone.utc)
-                monitor.consecutive_errors = 0
-                monitor.last_error = None
-                
-                # Update SSL status
-                days_until_expiry = check_result.get("days_until_expiry", 0)
-                if days_until_expiry < 0:
-                    monitor.ssl_status = SSLCertStatus.EXPIRED
-                elif days_until_expiry <= monitor.alert_before_days:
-                    monitor.ssl_status = SSLCertStatus.EXPIRING_SOON
-                else:
-                    monitor.ssl_status = SSLCertStatus.VALID
-                    
-                # Update certificate info
-                monitor.issuer = check_result.get("issuer")
-                monitor.subject = check_result.get("subject")
-                monitor.serial_number = check_result.get("serial_number")
-                monitor.fingerprint = check_result.get("fingerprint")
-                monitor.valid_from = check_result.get("valid_from")
-                monitor.valid_until = check_result.get("valid_until")
-                monitor.response_time_ms = check_result.get("response_time_ms")
-                
-            else:
-                monitor.consecutive_errors += 1
-                monitor.last_error = check_result.get("error_message")
-                
-                if monitor.consecutive_errors >= monitor.max_consecutive_errors:
-                    monitor.status = "error"
-                    monitor.ssl_status = SSLCertStatus.INVALID
-            
-            await session.commit()
-            
-            # Trigger notifications if needed
-            if check_result["success"]:
-                trigger_notifications.delay(monitor_id, "ssl_check_success", check_result)
-            else:
-                trigger_notifications.delay(monitor_id, "ssl_check_error", check_result)
-            
-            logger.info(f"SSL check completed for monitor {monitor_id}")
-            return check_result
-            
     except Exception as exc:
         logger.error(f"SSL check failed for monitor {monitor_id}: {exc}")
         
@@ -124,6 +45,111 @@ def check_ssl_certificate(self, monitor_id: int) -> Dict[str, Any]:
         return {"error": str(exc)}
 
 
+async def _check_and_record(monitor_id: int) -> Dict[str, Any]:
+    """Run the check, store the result and fold it into the daily rollup"""
+    logger.info(f"Starting SSL check for monitor {monitor_id}")
+    
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(Monitor).where(Monitor.id == monitor_id)
+        )
+        monitor = result.scalar_one_or_none()
+        
+        if not monitor:
+            logger.error(f"Monitor {monitor_id} not found")
+            return {"error": "Monitor not found"}
+        
+        # Check SSL certificate
+        check_result = await _check_ssl_certificate(monitor)
+        checked_at = datetime.now(timezone.utc)
+        
+        # Save check result to database
+        check_result_db = MonitorCheckResult(
+            monitor_id=monitor_id,
+            check_type="ssl_cert",
+            success=check_result["success"],
+            issuer=check_result.get("issuer"),
+            subject=check_result.get("subject"),
+            serial_number=check_result.get("serial_number"),
+            fingerprint=check_result.get("fingerprint"),
+            valid_from=check_result.get("valid_from"),
+            valid_until=check_result.get("valid_until"),
+            response_time_ms=check_result.get("response_time_ms"),
+            connection_time_ms=check_result.get("connection_time_ms"),
+            handshake_time_ms=check_result.get("handshake_time_ms"),
+            error_code=check_result.get("error_code"),
+            error_message=check_result.get("error_message"),
+            certificate_chain_length=check_result.get("certificate_chain_length"),
+            cipher_suite=check_result.get("cipher_suite"),
+            protocol_version=check_result.get("protocol_version"),
+            checked_at=checked_at,
+        )
+        
+        session.add(check_result_db)
+        
+        # Update the daily rollup in the same transaction
+        await check_rollup_service.record_check(
+            session,
+            monitor_id,
+            checked_at,
+            check_result["success"],
+            check_result.get("response_time_ms")
+        )
+        
+        # Update monitor with latest check info
+        monitor.last_checked_at = checked_at
+        
+        if check_result["success"]:
+            monitor.last_successful_check = checked_at
+            monitor.consecutive_errors = 0
+            monitor.last_error = None
+            
+            # Update SSL status
+            days_until_expiry = check_result.get("days_until_expiry", 0)
+            if days_until_expiry < 0:
+                monitor.ssl_status = SSLCertStatus.EXPIRED
+            elif days_until_expiry <= monitor.alert_before_days:
+                monitor.ssl_status = SSLCertStatus.EXPIRING_SOON
+            else:
+                monitor.ssl_status = SSLCertStatus.VALID
+                
+            # Update certificate info
+            monitor.issuer = check_result.get("issuer")
+            monitor.subject = check_result.get("subject")
+            monitor.serial_number = check_result.get("serial_number")
+            monitor.fingerprint = check_result.get("fingerprint")
+            monitor.valid_from = check_result.get("valid_from")
+            monitor.valid_until = check_result.get("valid_until")
+            monitor.response_time_ms = check_result.get("response_time_ms")
+            
+        else:
+            monitor.consecutive_errors += 1
+            monitor.last_error = check_result.get("error_message")
+            
+            if monitor.consecutive_errors >= monitor.max_consecutive_errors:
+                monitor.status = "error"
+                monitor.ssl_status = SSLCertStatus.INVALID
+        
+        await session.commit()
+        
+        # The user's cached analytics now miss this check
+        analytics_cache.invalidate_user_sync(monitor.user_id)
+        
+        # Trigger notifications if needed (one delivery per stored check result)
+        event_id = f"check:{check_result_db.id}"
+        if check_result["success"]:
+            trigger_notifications.delay(
+                monitor_id, NotificationTrigger.SSL_CHECK_SUCCESS.value, check_result, event_id=event_id
+            )
+        else:
+            trigger_notifications.delay(
+                monitor_id, NotificationTrigger.SSL_CHECK_ERROR.value, check_result, event_id=event_id
+            )
+        
+        logger.info(f"SSL check completed for monitor {monitor_id}")
+        return check_result
+
+
 async def _check_ssl_certificate(monitor: Monitor) -> Dict[str, Any]:
     """
     Perform SSL certificate check
@@ -161,8 +187,8 @@ async def _check_ssl_certificate(monitor: Monitor) -> Dict[str, Any]:
                 
                 # Parse certificate dates
                 from datetime import datetime
-                valid_from = datetime.strptime(cert["notBefore"], "%b %d %H:%M:%S %Y %Z")
-                valid_until = datetime.strptime(cert["notAfter"], "%b %d %H:%M:%S %Y %Z")
+                valid_from = datetime.strptime(cert["notBefore"], "%b %d %H:%M:%S %Y %Z").replace(tzinfo=timezone.utc)
+                valid_until = datetime.strptime(cert["notAfter"], "%b %d %H:%M:%S %Y %Z").replace(tzinfo=timezone.utc)
                 
                 # Calculate days until expiry
                 now = datetime.now(timezone.utc)
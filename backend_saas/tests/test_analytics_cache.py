@@ -0,0 +1,98 @@
+"""
+Tests for the analytics result cache
+"""
+import asyncio
+
+import pytest
+from fakeredis import FakeServer, aioredis
+
+from app.services import analytics_cache as analytics_cache_module
+from app.services.analytics_cache import AnalyticsResultCache
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = aioredis.FakeRedis(server=FakeServer())
+    monkeypatch.setattr(analytics_cache_module, "get_async_redis", lambda: fake)
+    return fake
+
+
+def _counting(value):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return value
+
+    return compute, calls
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_computation(redis):
+    cache = AnalyticsResultCache()
+    compute, calls = _counting({"total": 3})
+
+    results = await asyncio.gather(*[
+        cache.get_or_compute(1, "dashboard", {"days": 30}, compute) for _ in range(5)
+    ])
+
+    assert results == [{"total": 3}] * 5
+    assert len(calls) == 1
+    # Served from Redis afterwards
+    assert await cache.get_or_compute(1, "dashboard", {"days": 30}, compute) == {"total": 3}
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_params_are_part_of_the_key(redis):
+    cache = AnalyticsResultCache()
+    compute, calls = _counting({"total": 3})
+
+    await cache.get_or_compute(1, "dashboard", {"days": 30, "tz": "UTC"}, compute)
+    await cache.get_or_compute(1, "dashboard", {"tz": "UTC", "days": 30}, compute)
+    await cache.get_or_compute(1, "dashboard", {"days": 7}, compute)
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_error_results_are_not_cached(redis):
+    cache = AnalyticsResultCache()
+    compute, calls = _counting({"error": "database unavailable"})
+
+    await cache.get_or_compute(1, "dashboard", {}, compute)
+    await cache.get_or_compute(1, "dashboard", {}, compute)
+
+    assert len(calls) == 2
+    assert await redis.keys("analytics:1:*") == []
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_while_refreshing(redis):
+    cache = AnalyticsResultCache()
+    compute, calls = _counting({"total": 1})
+    await cache.get_or_compute(1, "dashboard", {}, compute)
+
+    cache.ttl = 0  # Everything cached is now stale
+    refreshed, refresh_calls = _counting({"total": 2})
+    assert await cache.get_or_compute(1, "dashboard", {}, refreshed) == {"total": 1}
+
+    await asyncio.gather(*cache._inflight.values())
+    assert len(refresh_calls) == 1
+    cache.ttl = 60
+    assert await cache.get_or_compute(1, "dashboard", {}, refreshed) == {"total": 2}
+
+
+@pytest.mark.asyncio
+async def test_invalidate_user_drops_only_their_results(redis):
+    cache = AnalyticsResultCache()
+    compute, calls = _counting({"total": 1})
+    await cache.get_or_compute(1, "dashboard", {}, compute)
+    await cache.get_or_compute(2, "dashboard", {}, compute)
+
+    await cache.invalidate_user(1)
+    await cache.get_or_compute(1, "dashboard", {}, compute)
+    await cache.get_or_compute(2, "dashboard", {}, compute)
+
+    assert len(calls) == 3
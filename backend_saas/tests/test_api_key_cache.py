@@ -0,0 +1,112 @@
+"""
+Tests for the API key auth cache and usage counters
+"""
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services import api_key_cache as api_key_cache_module
+from app.services.api_key_cache import APIKeyAuthCache, APIKeyUsageRecorder
+
+
+class FakeAsyncRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+class FakeSession:
+    def __init__(self, statements, fail=False):
+        self.statements = statements
+        self.fail = fail
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        self.statements.append(statement)
+
+    async def commit(self):
+        pass
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeAsyncRedis()
+    monkeypatch.setattr(api_key_cache_module, "get_async_redis", lambda: fake)
+    return fake
+
+
+AUTH_INFO = {"api_key_id": 1, "user_plan": "pro", "permissions": ["GET:/monitors/*"]}
+
+
+@pytest.mark.asyncio
+async def test_auth_info_is_shared_through_redis(redis):
+    await APIKeyAuthCache().set("hash-1", AUTH_INFO)
+
+    # Another replica, cold local tier
+    cached = await APIKeyAuthCache().get("hash-1")
+    assert cached["user_plan"] == "pro"
+    assert cached["permission_matcher"] is not None
+
+
+@pytest.mark.asyncio
+async def test_invalidate_many_clears_both_tiers(redis):
+    cache = APIKeyAuthCache()
+    await cache.set("hash-1", AUTH_INFO)
+    await cache.set("hash-2", AUTH_INFO)
+    await cache.set("hash-3", AUTH_INFO)
+
+    await cache.invalidate_many(["hash-1", "hash-2"])
+
+    assert await cache.get("hash-1") is None
+    assert await cache.get("hash-2") is None
+    assert await cache.get("hash-3") is not None
+
+
+def test_recorder_counts_without_io():
+    recorder = APIKeyUsageRecorder()
+    recorder.record(1)
+    recorder.record(1)
+    recorder.record(2)
+    assert recorder.pending_count(1) == 2
+    assert recorder.pending_count(2) == 1
+    assert recorder.pending_count(3) == 0
+
+
+@pytest.mark.asyncio
+async def test_flush_resets_hourly_counter_on_a_new_hour(monkeypatch):
+    statements = []
+    monkeypatch.setattr(api_key_cache_module, "async_session_maker", lambda: FakeSession(statements))
+    recorder = APIKeyUsageRecorder()
+    recorder.record(1)
+
+    assert await recorder.flush() == 1
+    assert recorder.pending_count(1) == 0
+    sql = str(statements[0].compile(dialect=postgresql.dialect()))
+    assert "requests_this_hour=CASE WHEN (date_trunc(" in sql
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_counts(monkeypatch):
+    monkeypatch.setattr(api_key_cache_module, "async_session_maker", lambda: FakeSession([], fail=True))
+    recorder = APIKeyUsageRecorder()
+    recorder.record(1)
+    recorder.record(1)
+
+    assert await recorder.flush() == 0
+    recorder.record(1)
+    assert recorder.pending_count(1) == 3
@@ -0,0 +1,94 @@
+"""
+Tests for the batching API usage logger
+"""
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.core.api_auth import route_template
+from app.services.api_usage_logger import APIUsageLogger
+
+
+def _entry(minute, endpoint="/api/v1/monitors/{monitor_id}", response_time_ms=10):
+    return {
+        "created_at": datetime(2026, 10, 19, 9, minute, 30, tzinfo=timezone.utc),
+        "api_key_id": 1,
+        "user_id": 2,
+        "endpoint": endpoint,
+        "method": "GET",
+        "status_code": 200,
+        "response_time_ms": response_time_ms,
+    }
+
+
+def test_rollup_buckets_by_granularity():
+    entries = [_entry(1), _entry(1, response_time_ms=None), _entry(2)]
+
+    minutes = APIUsageLogger._rollup(entries, "minute")
+    hours = APIUsageLogger._rollup(entries, "hour")
+
+    assert sorted(row["request_count"] for row in minutes) == [1, 2]
+    first = next(row for row in minutes if row["bucket_start"].minute == 1)
+    assert first["response_time_total_ms"] == 10
+    assert first["response_time_samples"] == 1
+
+    assert len(hours) == 1
+    assert hours[0]["bucket_start"] == datetime(2026, 10, 19, 9, tzinfo=timezone.utc)
+    assert hours[0]["request_count"] == 3
+    assert hours[0]["response_time_samples"] == 2
+
+
+@pytest.mark.asyncio
+async def test_stop_lets_the_current_batch_finish(monkeypatch):
+    usage_logger = APIUsageLogger()
+    usage_logger.flush_interval = 0.05
+    written = []
+    writing = asyncio.Event()
+
+    async def slow_write(entries):
+        writing.set()
+        await asyncio.sleep(0.05)
+        written.extend(entries)
+
+    async def no_purge():
+        pass
+
+    monkeypatch.setattr(usage_logger, "write_batch", slow_write)
+    monkeypatch.setattr(usage_logger, "_purge_minute_rollups", no_purge)
+
+    usage_logger.start()
+    usage_logger.log(_entry(1))
+    await writing.wait()
+    usage_logger.log(_entry(2))
+    await usage_logger.stop()
+
+    # The in-flight batch completed and the later entry was flushed on shutdown
+    assert [entry["created_at"].minute for entry in written] == [1, 2]
+    assert usage_logger._task is None
+
+
+def test_route_template_is_logged_instead_of_the_path():
+    app = FastAPI()
+    seen = {}
+
+    @app.middleware("http")
+    async def capture(request: Request, call_next):
+        response = await call_next(request)
+        seen[request.url.path] = route_template(request)
+        return response
+
+    @app.get("/api/v1/monitors/{monitor_id}")
+    async def get_monitor(monitor_id: int):
+        return {"id": monitor_id}
+
+    client = TestClient(app)
+    client.get("/api/v1/monitors/42")
+    client.get("/unknown/7")
+
+    assert seen == {
+        "/api/v1/monitors/42": "/api/v1/monitors/{monitor_id}",
+        "/unknown/7": "/unknown/7",
+    }
@@ -0,0 +1,74 @@
+"""
+Tests for the streaming check history export encoders
+"""
+import io
+import csv
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services.check_export import CheckHistoryExporter, EXPORT_COLUMNS
+
+
+def _row(monitor_id, success=True):
+    row = {column: None for column in EXPORT_COLUMNS}
+    row.update(
+        monitor_id=monitor_id,
+        domain="example.com",
+        port=443,
+        checked_at=datetime(2026, 10, 19, 9, 0, tzinfo=timezone.utc),
+        success=success,
+        response_time_ms=120.5,
+    )
+    return row
+
+
+async def _batches():
+    yield [_row(1), _row(1, success=False)]
+    yield [_row(2)]
+
+
+async def _collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+@pytest.mark.asyncio
+async def test_csv_yields_header_once_and_a_chunk_per_batch():
+    chunks = await _collect(CheckHistoryExporter()._csv(_batches()))
+
+    assert len(chunks) == 2
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+    assert [row["monitor_id"] for row in rows] == ["1", "1", "2"]
+    assert rows[0]["checked_at"] == "2026-10-19T09:00:00+00:00"
+    assert rows[1]["success"] == "False"
+
+
+@pytest.mark.asyncio
+async def test_ndjson_keeps_column_order():
+    chunks = await _collect(CheckHistoryExporter()._ndjson(_batches()))
+
+    lines = b"".join(chunks).decode().splitlines()
+    assert len(lines) == 3
+    assert list(json.loads(lines[0])) == EXPORT_COLUMNS
+
+
+@pytest.mark.asyncio
+async def test_parquet_file_is_complete():
+    pq = pytest.importorskip("pyarrow.parquet")
+    chunks = await _collect(CheckHistoryExporter()._parquet(_batches()))
+
+    table = pq.read_table(io.BytesIO(b"".join(chunks)))
+    assert table.num_rows == 3
+    assert table.column_names == EXPORT_COLUMNS
+    assert pq.ParquetFile(io.BytesIO(b"".join(chunks))).num_row_groups == 2
+
+
+@pytest.mark.asyncio
+async def test_parquet_closed_early_yields_no_footer():
+    pytest.importorskip("pyarrow")
+    stream = CheckHistoryExporter()._parquet(_batches())
+
+    await stream.__anext__()
+    # Client went away: closing must not try to yield the footer
+    await stream.aclose()
@@ -0,0 +1,73 @@
+"""
+Tests for the per-monitor daily check rollups
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services import check_rollup as check_rollup_module
+from app.services.check_rollup import CheckRollupService, RESPONSE_TIME_BUCKETS_MS
+
+
+class FakeSession:
+    def __init__(self, statements):
+        self.statements = statements
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return []
+
+    async def commit(self):
+        pass
+
+
+def _sql(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.parametrize("response_time_ms, expected", [
+    (0, 0),
+    (24.9, 0),
+    (25, 1),
+    (99, 2),
+    (100, 3),
+    (9999, 14),
+    (10000, 15),
+    (60000, 15),
+])
+def test_bucket_index_matches_width_bucket(response_time_ms, expected):
+    # width_bucket(t, bounds) returns 0 below the first bound and
+    # len(bounds) at or above the last one
+    assert CheckRollupService.bucket_index(response_time_ms) == expected
+
+
+def test_histogram_percentile():
+    histogram = [0] * (len(RESPONSE_TIME_BUCKETS_MS) + 1)
+    assert CheckRollupService.histogram_percentile(histogram, 0.95) is None
+
+    histogram[1] = 90  # 25-50ms
+    histogram[4] = 10  # 150-200ms
+    assert CheckRollupService.histogram_percentile(histogram, 0.5) == 50.0
+    assert CheckRollupService.histogram_percentile(histogram, 0.95) == 200.0
+
+    histogram[-1] = 1000  # overflow bucket reports the last bound
+    assert CheckRollupService.histogram_percentile(histogram, 0.95) == float(RESPONSE_TIME_BUCKETS_MS[-1])
+
+
+@pytest.mark.asyncio
+async def test_rebuild_locks_out_increments_and_buckets_by_utc_day(monkeypatch):
+    statements = []
+    monkeypatch.setattr(check_rollup_module, "async_session_maker", lambda: FakeSession(statements))
+
+    written = await CheckRollupService().rebuild(date(2026, 10, 18), date(2026, 10, 19))
+
+    assert written == 0
+    assert "pg_advisory_xact_lock(" in _sql(statements[0])
+    assert "timezone(" in _sql(statements[1])
@@ -0,0 +1,42 @@
+"""
+Tests for running task coroutines against the shared engine
+"""
+import asyncio
+
+import pytest
+
+from app.core import database
+
+
+class FakeEngine:
+    def __init__(self):
+        self.disposed_in = []
+
+    async def dispose(self):
+        self.disposed_in.append(asyncio.get_running_loop())
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    fake = FakeEngine()
+    monkeypatch.setattr(database, "engine", fake)
+    return fake
+
+
+def test_run_async_disposes_pool_in_each_loop(engine):
+    async def task(value):
+        return value
+
+    assert database.run_async(task(1)) == 1
+    assert database.run_async(task(2)) == 2
+    assert len(engine.disposed_in) == 2
+    assert engine.disposed_in[0] is not engine.disposed_in[1]
+
+
+def test_run_async_disposes_pool_on_error(engine):
+    async def failing():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        database.run_async(failing())
+    assert len(engine.disposed_in) == 1
@@ -0,0 +1,52 @@
+"""
+Tests for the notification delivery context snapshot
+"""
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from app.models.monitor import SSLCertStatus
+from app.models.notification import NotificationType
+from app.schemas.notification import NotificationContext
+from app.tasks.notification_tasks import build_notification_context
+
+
+def make_notification(**overrides):
+    fields = dict(
+        id=7, user_id=3, monitor_id=None, type=NotificationType.TELEGRAM, enabled=True,
+        email_address=None, telegram_chat_id="12345", webhook_url=None, webhook_headers=None,
+        whatsapp_phone=None, phone_number=None, channel=None, team_id=None
+    )
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+def make_monitor():
+    return SimpleNamespace(
+        id=11, domain="example.com", port=443, ssl_status=SSLCertStatus.EXPIRING_SOON,
+        valid_until=datetime(2030, 1, 1, tzinfo=timezone.utc), days_until_expiry=5
+    )
+
+
+def make_user():
+    return SimpleNamespace(id=3, email="owner@example.com", full_name="Owner")
+
+
+def test_context_survives_task_serialization():
+    context = build_notification_context(make_notification(), make_monitor(), make_user())
+
+    # Celery payloads are JSON
+    payload = json.loads(json.dumps(context.model_dump(mode="json")))
+    restored = NotificationContext.model_validate(payload)
+
+    assert restored == context
+    assert restored.notification.type is NotificationType.TELEGRAM
+    assert restored.monitor.ssl_status is SSLCertStatus.EXPIRING_SOON
+    assert restored.monitor.valid_until == datetime(2030, 1, 1, tzinfo=timezone.utc)
+    assert restored.user.email == "owner@example.com"
+
+
+def test_context_without_monitor():
+    context = build_notification_context(make_notification(), None, make_user())
+    restored = NotificationContext.model_validate(context.model_dump(mode="json"))
+    assert restored.monitor is None
@@ -0,0 +1,81 @@
+"""
+Tests for notification digest buffering and formatting
+"""
+import pytest
+
+from app.services import notification_digest
+from app.services.notification_digest import NotificationDigestService
+
+
+@pytest.fixture
+def redis(monkeypatch, fake_redis):
+    monkeypatch.setattr(notification_digest, "get_redis", lambda: fake_redis)
+    return fake_redis
+
+
+@pytest.fixture
+def service():
+    return NotificationDigestService()
+
+
+def test_first_event_schedules_flush(redis, service):
+    assert service.add_event(1, "email", {"domain": "a.com"}) is True
+    assert service.add_event(1, "email", {"domain": "b.com"}) is False
+    # Other windows are independent
+    assert service.add_event(2, "email", {"domain": "a.com"}) is True
+    assert service.add_event(1, "slack", {"domain": "a.com"}) is True
+
+
+def test_lost_flush_is_rescheduled(redis, service):
+    service.add_event(1, "email", {"domain": "a.com"})
+    # The flush marker expired without a flush running
+    redis.delete(service._flush_key(1, "email"))
+
+    assert service.add_event(1, "email", {"domain": "b.com"}) is True
+    assert [e["domain"] for e in service.drain(1, "email")] == ["a.com", "b.com"]
+
+
+def test_drain_returns_events_in_order_and_reopens_window(redis, service):
+    for domain in ("a.com", "b.com", "c.com"):
+        service.add_event(1, "email", {"domain": domain})
+
+    assert [e["domain"] for e in service.drain(1, "email")] == ["a.com", "b.com", "c.com"]
+    assert service.drain(1, "email") == []
+    assert service.add_event(1, "email", {"domain": "d.com"}) is True
+
+
+def test_drain_skips_malformed_events(redis, service):
+    redis.rpush(service._key(1, "email"), "not json", '{"domain": "a.com"}')
+    assert service.drain(1, "email") == [{"domain": "a.com"}]
+
+
+def test_group_by_destination():
+    events = [
+        {"destination": "chat-1", "domain": "a.com"},
+        {"destination": "chat-2", "domain": "b.com"},
+        {"destination": "chat-1", "domain": "c.com"},
+    ]
+    groups = NotificationDigestService.group_by_destination(events)
+    assert [e["domain"] for e in groups["chat-1"]] == ["a.com", "c.com"]
+    assert [e["domain"] for e in groups["chat-2"]] == ["b.com"]
+
+
+def test_format_digest_puts_most_urgent_first(service):
+    events = [
+        {"domain": "later.com", "trigger": "expiring_30_days", "days_until_expiry": 25},
+        {"domain": "unknown-days.com", "trigger": "check_failed", "days_until_expiry": None},
+        {"domain": "soon.com", "trigger": "expiring_7_days", "days_until_expiry": 3},
+        {"domain": "gone.com", "trigger": "expired", "days_until_expiry": -1},
+    ]
+    digest = service.format_digest(events, "email")
+
+    assert digest["subject"] == "SSL Monitor Digest - 4 alerts for 4 domains"
+    lines = [line for line in digest["message"].splitlines() if line.startswith("- ")]
+    assert [line.split(":")[0][2:] for line in lines] == ["gone.com", "soon.com", "later.com", "unknown-days.com"]
+    assert lines[1] == "- soon.com: expiring_7_days (3 days left)"
+
+
+def test_format_digest_sms_is_short(service):
+    events = [{"domain": f"d{i}.com", "trigger": "expired"} for i in range(5)]
+    digest = service.format_digest(events, "sms")
+    assert digest["message"] == "SSL Monitor: 5 alerts for d0.com, d1.com, d2.com +2 more. Check your dashboard."
@@ -0,0 +1,115 @@
+"""
+Tests for the buffered notification log writer
+"""
+import json
+
+import pytest
+
+from app.models.notification import NotificationTrigger, NotificationType
+from app.services import notification_log_writer as log_writer_module
+from app.services.notification_log_writer import NotificationLogWriter
+
+
+@pytest.fixture
+def redis(monkeypatch, fake_redis):
+    monkeypatch.setattr(log_writer_module, "get_redis", lambda: fake_redis)
+    return fake_redis
+
+
+@pytest.fixture
+def writer():
+    return NotificationLogWriter()
+
+
+class FakeSession:
+    def __init__(self, inserted, fail=False):
+        self.inserted = inserted
+        self.fail = fail
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, rows):
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        self.inserted.extend(rows)
+
+    async def commit(self):
+        pass
+
+
+def enqueue(writer, trigger="expired", notification_id=1):
+    writer.enqueue(
+        notification_id=notification_id,
+        monitor_id=2,
+        type="telegram",
+        trigger=trigger,
+        result={"status": "sent", "message": "hello"},
+        data={"days_until_expiry": 0}
+    )
+
+
+def test_payload_hash_ignores_key_order():
+    assert NotificationLogWriter.payload_hash({"a": 1, "b": 2}) == NotificationLogWriter.payload_hash({"b": 2, "a": 1})
+    assert NotificationLogWriter.payload_hash({"a": 1}) != NotificationLogWriter.payload_hash({"a": 2})
+
+
+@pytest.mark.parametrize("trigger", [t.value for t in NotificationTrigger])
+def test_every_trigger_is_buffered_and_parsed(redis, writer, trigger):
+    enqueue(writer, trigger)
+    _, rows = writer._take_batch()
+
+    assert len(rows) == 1
+    assert rows[0]["trigger"] is NotificationTrigger(trigger)
+    assert rows[0]["type"] is NotificationType.TELEGRAM
+    assert rows[0]["payload_hash"] == NotificationLogWriter.payload_hash({"days_until_expiry": 0})
+
+
+def test_ssl_check_triggers_are_stored():
+    # Fired by ssl_tasks for every check
+    assert NotificationTrigger("ssl_check_success") is NotificationTrigger.SSL_CHECK_SUCCESS
+    assert NotificationTrigger("ssl_check_error") is NotificationTrigger.SSL_CHECK_ERROR
+
+
+def test_unknown_trigger_is_rejected_at_enqueue(redis, writer):
+    enqueue(writer, "not_a_trigger")
+    assert redis.lrange(writer.buffer_key, 0, -1) == []
+
+
+def test_take_batch_respects_batch_size(redis, writer):
+    writer.batch_size = 2
+    for notification_id in range(1, 6):
+        enqueue(writer, notification_id=notification_id)
+
+    _, rows = writer._take_batch()
+    assert [row["notification_id"] for row in rows] == [1, 2]
+    assert len(redis.lrange(writer.buffer_key, 0, -1)) == 3
+
+
+@pytest.mark.asyncio
+async def test_flush_inserts_all_batches(monkeypatch, redis, writer):
+    inserted = []
+    monkeypatch.setattr(log_writer_module, "async_session_maker", lambda: FakeSession(inserted))
+    writer.batch_size = 2
+    for notification_id in range(1, 6):
+        enqueue(writer, notification_id=notification_id)
+
+    assert await writer.flush() == 5
+    assert [row["notification_id"] for row in inserted] == [1, 2, 3, 4, 5]
+    assert redis.lrange(writer.buffer_key, 0, -1) == []
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_puts_batch_back_in_order(monkeypatch, redis, writer):
+    monkeypatch.setattr(log_writer_module, "async_session_maker", lambda: FakeSession([], fail=True))
+    writer.batch_size = 2
+    for notification_id in range(1, 4):
+        enqueue(writer, notification_id=notification_id)
+
+    with pytest.raises(RuntimeError):
+        await writer.flush()
+    buffered = [json.loads(raw)["notification_id"] for raw in redis.lrange(writer.buffer_key, 0, -1)]
+    assert buffered == [1, 2, 3]
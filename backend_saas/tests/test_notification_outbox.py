@@ -0,0 +1,73 @@
+"""
+Tests for outbox delivery idempotency
+"""
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.notification_outbox import NotificationOutboxService
+from app.tasks.notification_tasks import _digest_event_id
+
+
+class CapturingSession:
+    """Records the idempotency key of each outbox insert"""
+
+    def __init__(self):
+        self.keys = []
+
+    async def execute(self, statement):
+        params = statement.compile(dialect=postgresql.dialect()).params
+        self.keys.append(params["idempotency_key"])
+
+        class Result:
+            def scalar_one_or_none(self):
+                return 1
+        return Result()
+
+
+def test_same_event_has_same_key():
+    key = NotificationOutboxService.idempotency_key(1, "expired", "check:42")
+    assert key == NotificationOutboxService.idempotency_key(1, "expired", "check:42")
+    assert len(key) == 64
+
+
+def test_key_differs_per_event_notification_and_trigger():
+    keys = {
+        NotificationOutboxService.idempotency_key(1, "expired", "check:42"),
+        NotificationOutboxService.idempotency_key(1, "expired", "check:43"),
+        NotificationOutboxService.idempotency_key(2, "expired", "check:42"),
+        NotificationOutboxService.idempotency_key(1, "ssl_check_error", "check:42"),
+    }
+    assert len(keys) == 4
+
+
+@pytest.mark.asyncio
+async def test_repeat_event_with_same_payload_is_not_a_duplicate():
+    service = NotificationOutboxService()
+    session = CapturingSession()
+    data = {"success": False, "error_message": "connection refused"}
+
+    # Retry of the same check result, then a later failing check with an identical payload
+    await service.enqueue(session, 1, "ssl_check_error", data, event_id="check:1")
+    await service.enqueue(session, 1, "ssl_check_error", data, event_id="check:1")
+    await service.enqueue(session, 1, "ssl_check_error", data, event_id="check:2")
+
+    assert session.keys[0] == session.keys[1]
+    assert session.keys[2] != session.keys[0]
+
+
+@pytest.mark.asyncio
+async def test_deliveries_without_event_are_never_deduplicated():
+    service = NotificationOutboxService()
+    session = CapturingSession()
+
+    await service.enqueue(session, 1, "expired", {})
+    await service.enqueue(session, 1, "expired", {})
+
+    assert session.keys[0] != session.keys[1]
+
+
+def test_digest_event_id_depends_only_on_covered_events():
+    events = [{"event_id": "check:1"}, {"event_id": "check:2"}]
+    assert _digest_event_id(events) == _digest_event_id(list(reversed(events)))
+    assert _digest_event_id(events) != _digest_event_id(events[:1])
+    assert _digest_event_id([{"domain": "a.com"}]) is None
@@ -0,0 +1,62 @@
+"""
+Tests for API key permission matching
+"""
+from app.core.permissions import compile_permissions
+
+
+def test_allow_all():
+    matcher = compile_permissions(["*"])
+
+    assert matcher.allows("DELETE", "/api/v1/anything/at/all")
+
+
+def test_method_is_part_of_the_pattern():
+    matcher = compile_permissions(["GET /api/v1/monitors"])
+
+    assert matcher.allows("get", "/api/v1/monitors")
+    assert matcher.allows("GET", "/api/v1/monitors/")
+    assert not matcher.allows("POST", "/api/v1/monitors")
+    assert not matcher.allows("GET", "/api/v1/monitors/42")
+
+
+def test_bare_path_allows_any_method():
+    matcher = compile_permissions(["/api/v1/status"])
+
+    assert matcher.allows("GET", "/api/v1/status")
+    assert matcher.allows("POST", "/api/v1/status")
+
+
+def test_param_matches_one_segment():
+    matcher = compile_permissions(["GET /api/v1/monitors/{id}"])
+
+    assert matcher.allows("GET", "/api/v1/monitors/42")
+    assert matcher.allows("GET", "/api/v1/monitors/{monitor_id}")
+    assert not matcher.allows("GET", "/api/v1/monitors")
+    assert not matcher.allows("GET", "/api/v1/monitors/42/checks")
+
+
+def test_trailing_wildcard_matches_remaining_segments():
+    matcher = compile_permissions(["POST /api/v1/*"])
+
+    assert matcher.allows("POST", "/api/v1/monitors")
+    assert matcher.allows("POST", "/api/v1/monitors/42/checks")
+    assert not matcher.allows("POST", "/api/v1")
+    assert not matcher.allows("POST", "/api/v2/monitors")
+
+
+def test_literal_falls_back_to_param():
+    matcher = compile_permissions([
+        "GET /api/v1/monitors/stats/summary",
+        "GET /api/v1/monitors/{id}/checks",
+    ])
+
+    # "stats" takes the literal branch first, then backtracks into {id}
+    assert matcher.allows("GET", "/api/v1/monitors/stats/checks")
+    assert matcher.allows("GET", "/api/v1/monitors/stats/summary")
+    assert not matcher.allows("GET", "/api/v1/monitors/42/summary")
+
+
+def test_compiled_matchers_are_shared():
+    patterns = ["GET /api/v1/monitors", "POST /api/v1/*"]
+
+    assert compile_permissions(patterns) is compile_permissions(list(patterns))
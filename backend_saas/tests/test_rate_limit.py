@@ -0,0 +1,76 @@
+"""
+Tests for the GCRA rate limiter script
+"""
+import pytest
+from fakeredis import aioredis
+
+from app.core import rate_limit
+from app.core.rate_limit import RateLimiter
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = aioredis.FakeRedis()
+    monkeypatch.setattr(rate_limit, "get_async_redis", lambda: fake)
+    return fake
+
+
+@pytest.mark.asyncio
+async def test_burst_up_to_limit_then_denied(redis):
+    limiter = RateLimiter(prefix="test")
+    results = [await limiter.hit("client", limit=5, period=3600) for _ in range(6)]
+
+    assert [r["allowed"] for r in results] == [True] * 5 + [False]
+    assert [r["remaining"] for r in results[:5]] == [4, 3, 2, 1, 0]
+    # One request's worth of capacity (period / limit) comes back at a time
+    assert 700 < results[5]["retry_after"] <= 720
+    assert results[5]["reset_after"] <= 3600
+
+
+@pytest.mark.asyncio
+async def test_denied_client_is_rejected_locally(redis):
+    limiter = RateLimiter(prefix="test")
+    await limiter.hit("client", limit=1, period=60)
+    await limiter.hit("client", limit=1, period=60)
+
+    await redis.flushall()
+    # Still blocked until retry_after without asking Redis
+    result = await limiter.hit("client", limit=1, period=60)
+    assert result["allowed"] is False
+
+
+@pytest.mark.asyncio
+async def test_keys_are_independent_and_shared_across_replicas(redis):
+    first, second = RateLimiter(prefix="test"), RateLimiter(prefix="test")
+
+    assert (await first.hit("a", limit=2, period=60))["remaining"] == 1
+    assert (await second.hit("a", limit=2, period=60))["remaining"] == 0
+    assert (await second.hit("a", limit=2, period=60))["allowed"] is False
+    assert (await first.hit("b", limit=2, period=60))["remaining"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cost_consumes_several_requests(redis):
+    limiter = RateLimiter(prefix="test")
+    assert (await limiter.hit("client", limit=10, period=60, cost=4))["remaining"] == 6
+    assert (await limiter.hit("client", limit=10, period=60, cost=7))["allowed"] is False
+
+
+@pytest.mark.asyncio
+async def test_reset_clears_state(redis):
+    limiter = RateLimiter(prefix="test")
+    await limiter.hit("client", limit=1, period=60)
+    await limiter.hit("client", limit=1, period=60)
+
+    await limiter.reset("client")
+    assert (await limiter.hit("client", limit=1, period=60))["allowed"] is True
+
+
+@pytest.mark.asyncio
+async def test_fails_open_without_redis(monkeypatch):
+    def unavailable():
+        raise ConnectionError("redis down")
+    monkeypatch.setattr(rate_limit, "get_async_redis", unavailable)
+
+    result = await RateLimiter(prefix="test").hit("client", limit=3, period=60)
+    assert result == {"allowed": True, "remaining": 3, "retry_after": 0.0, "reset_after": 0.0}
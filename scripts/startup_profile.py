@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Cold-start profiler for SSL Monitor Pro entry points
+
+Imports each entry point in fresh interpreters under `-X importtime`,
+aggregates per-package import cost, optionally runs the app's startup
+(lifespan) and compares the results against a baseline with budgets.
+
+Usage:
+    python scripts/startup_profile.py report [--entry backend-api] [--lifespan]
+    python scripts/startup_profile.py record       # write the baseline
+    python scripts/startup_profile.py check        # exit 1 on regression
+
+Measurements are medians over --runs fresh processes. Run record and
+check on the same kind of machine and with the same environment (e.g.
+FAST_STARTUP); the numbers are only comparable to each other.
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "scripts", "startup_baseline.json")
+
+# name -> where and what to import; app is the ASGI app attribute for --lifespan
+ENTRY_POINTS = {
+    "backend-api": {"cwd": "backend", "module": "app.main", "app": "app"},
+    "celery-worker": {"cwd": "backend", "module": "celery_worker", "app": None},
+    "saas-api": {"cwd": "backend_saas", "module": "app.main", "app": "app"},
+}
+
+# Regression thresholds (overridable in the baseline file)
+DEFAULT_TOLERANCE = 0.20        # 20% over baseline
+DEFAULT_MIN_REGRESSION_MS = 25  # ignore smaller absolute changes
+TOP_PACKAGES = 15
+
+# Runs inside the profiled interpreter; prints one JSON line
+CHILD = r"""
+import importlib, json, sys, time
+started = time.perf_counter()
+module = importlib.import_module(sys.argv[1])
+result = {"import_ms": (time.perf_counter() - started) * 1000}
+if sys.argv[2]:
+    import asyncio
+    app = getattr(module, sys.argv[2])
+    async def run():
+        started = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            result["lifespan_ms"] = (time.perf_counter() - started) * 1000
+    asyncio.run(run())
+timer = getattr(sys.modules.get("app.startup"), "startup_timer", None)
+if timer is not None:
+    result["phases_ms"] = timer.as_dict()["phases_ms"]
+print("STARTUP_PROFILE " + json.dumps(result))
+"""
+
+
+def parse_importtime(stderr: str) -> Dict[str, float]:
+    """Self import time per top-level package in ms from -X importtime output"""
+    packages: Dict[str, float] = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, _, name = line[len("import time:"):].split("|", 2)
+            packages[name.strip().split(".")[0]] += int(self_us) / 1000
+        except ValueError:
+            continue
+    return packages
+
+
+def profile_once(entry: Dict, lifespan: bool, env: Dict[str, str]) -> Dict:
+    """Import an entry point in a fresh interpreter"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD, entry["module"], (entry["app"] or "") if lifespan else ""],
+        cwd=os.path.join(ROOT, entry["cwd"]),
+        env={**os.environ, **env},
+        capture_output=True,
+        text=True,
+        timeout=300
+    )
+    marker = [line for line in completed.stdout.splitlines() if line.startswith("STARTUP_PROFILE ")]
+    if completed.returncode != 0 or not marker:
+        errors = [line for line in completed.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError("\n".join(errors[-20:]) or f"exit code {completed.returncode}")
+    result = json.loads(marker[-1][len("STARTUP_PROFILE "):])
+    result["packages_ms"] = parse_importtime(completed.stderr)
+    return result
+
+
+def _median_dict(dicts: List[Dict[str, float]]) -> Dict[str, float]:
+    keys = set().union(*dicts)
+    return {key: round(statistics.median(d.get(key, 0.0) for d in dicts), 2) for key in keys}
+
+
+def profile(name: str, runs: int, lifespan: bool, env: Dict[str, str]) -> Dict:
+    """Median cold-start profile of an entry point over several processes"""
+    results = [profile_once(ENTRY_POINTS[name], lifespan, env) for _ in range(runs)]
+    packages = _median_dict([r["packages_ms"] for r in results])
+    summary = {
+        "import_ms": round(statistics.median(r["import_ms"] for r in results), 2),
+        "packages_ms": dict(sorted(packages.items(), key=lambda item: -item[1])),
+    }
+    if lifespan and all("lifespan_ms" in r for r in results):
+        summary["lifespan_ms"] = round(statistics.median(r["lifespan_ms"] for r in results), 2)
+    phases = [r["phases_ms"] for r in results if "phases_ms" in r]
+    if phases:
+        summary["phases_ms"] = _median_dict(phases)
+    return summary
+
+
+def print_report(name: str, summary: Dict) -> None:
+    print(f"\n{name}: import {summary['import_ms']:.0f}ms", end="")
+    if "lifespan_ms" in summary:
+        print(f", lifespan {summary['lifespan_ms']:.0f}ms", end="")
+    print()
+    for phase, ms in summary.get("phases_ms", {}).items():
+        print(f"  phase {phase:<26} {ms:>9.1f}ms")
+    for package, ms in list(summary["packages_ms"].items())[:TOP_PACKAGES]:
+        print(f"  {package:<32} {ms:>9.1f}ms")
+
+
+def _regressed(current: float, baseline: float, tolerance: float, min_ms: float) -> bool:
+    return current - baseline > max(baseline * tolerance, min_ms)
+
+
+def check(name: str, summary: Dict, baseline: Dict, tolerance: float, min_ms: float) -> List[str]:
+    """Regressions of one entry point against its baseline and budget"""
+    problems = []
+    expected = baseline.get("entry_points", {}).get(name)
+    if expected is None:
+        return [f"{name}: no baseline (run `record`)"]
+
+    budget = expected.get("budget_ms")
+    total = summary["import_ms"] + summary.get("lifespan_ms", 0.0)
+    if budget is not None and total > budget:
+        problems.append(f"{name}: cold start {total:.0f}ms is over the {budget:.0f}ms budget")
+    if _regressed(summary["import_ms"], expected["import_ms"], tolerance, min_ms):
+        problems.append(f"{name}: import {summary['import_ms']:.0f}ms vs baseline {expected['import_ms']:.0f}ms")
+    if "lifespan_ms" in summary and "lifespan_ms" in expected \
+            and _regressed(summary["lifespan_ms"], expected["lifespan_ms"], tolerance, min_ms):
+        problems.append(f"{name}: lifespan {summary['lifespan_ms']:.0f}ms vs baseline {expected['lifespan_ms']:.0f}ms")
+
+    baseline_packages = expected.get("packages_ms", {})
+    for package, ms in summary["packages_ms"].items():
+        if _regressed(ms, baseline_packages.get(package, 0.0), tolerance, min_ms):
+            previous = baseline_packages.get(package)
+            detail = f"baseline {previous:.0f}ms" if previous is not None else "new import"
+            problems.append(f"{name}: package {package} {ms:.0f}ms ({detail})")
+    return problems
+
+
+def load_baseline(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["report", "record", "check"])
+    parser.add_argument("--entry", action="append", choices=sorted(ENTRY_POINTS),
+                        help="Entry point to profile (repeatable, default: all)")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per entry point")
+    parser.add_argument("--lifespan", action="store_true",
+                        help="Also run app startup/shutdown (needs the app's services reachable)")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra environment for the profiled processes")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--budget-ms", type=float, help="Cold-start budget to store with record")
+    args = parser.parse_args(argv)
+
+    env = dict(item.split("=", 1) for item in args.env)
+    names = args.entry or list(ENTRY_POINTS)
+    baseline = load_baseline(args.baseline) or {}
+
+    if args.command == "check" and not baseline:
+        print(f"No baseline at {args.baseline}; run `record` first", file=sys.stderr)
+        return 2
+
+    summaries = {}
+    for name in names:
+        try:
+            summaries[name] = profile(name, args.runs, args.lifespan, env)
+        except Exception as e:
+            print(f"{name}: failed to start: {e}", file=sys.stderr)
+            return 2
+        print_report(name, summaries[name])
+
+    if args.command == "record":
+        entry_points = baseline.setdefault("entry_points", {})
+        baseline.setdefault("tolerance", DEFAULT_TOLERANCE)
+        baseline.setdefault("min_regression_ms", DEFAULT_MIN_REGRESSION_MS)
+        for name, summary in summaries.items():
+            budget = args.budget_ms or entry_points.get(name, {}).get("budget_ms")
+            entry_points[name] = {**summary, "budget_ms": budget, "env": env}
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if args.command == "check":
+        tolerance = baseline.get("tolerance", DEFAULT_TOLERANCE)
+        min_ms = baseline.get("min_regression_ms", DEFAULT_MIN_REGRESSION_MS)
+        problems = [p for name, s in summaries.items() for p in check(name, s, baseline, tolerance, min_ms)]
+        if problems:
+            print("\n❌ Startup regressions:")
+            for problem in problems:
+                print(f"  - {problem}")
+            return 1
+        print("\n✅ Startup within baseline and budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
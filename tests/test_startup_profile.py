@@ -0,0 +1,82 @@
+"""
+Tests for the cold-start profiler's parsing and regression check
+"""
+import os
+import sys
+
+# Add scripts directory to path
+scripts_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+sys.path.insert(0, scripts_path)
+
+import startup_profile
+from startup_profile import check, parse_importtime
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2000 |       2000 |     numpy.core._multiarray_umath
+import time:      3000 |       5000 |   numpy
+import time:  bad line
+some other stderr output
+import time:       500 |        500 | app.main
+"""
+
+
+def _baseline(**entry):
+    return {"entry_points": {"backend-api": {"import_ms": 1000.0, "packages_ms": {"numpy": 100.0}, **entry}}}
+
+
+def test_parse_importtime_sums_self_time_per_top_level_package():
+    packages = parse_importtime(IMPORTTIME)
+
+    assert packages == {"_io": 0.12, "numpy": 5.0, "app": 0.5}
+
+
+def test_within_tolerance_is_not_a_regression():
+    summary = {"import_ms": 1150.0, "packages_ms": {"numpy": 110.0}}
+
+    assert check("backend-api", summary, _baseline(), tolerance=0.2, min_ms=25) == []
+
+
+def test_import_and_package_regressions_are_reported():
+    summary = {"import_ms": 1300.0, "packages_ms": {"numpy": 200.0, "pandas": 80.0, "tiny": 10.0}}
+
+    problems = check("backend-api", summary, _baseline(), tolerance=0.2, min_ms=25)
+
+    assert problems == [
+        "backend-api: import 1300ms vs baseline 1000ms",
+        "backend-api: package numpy 200ms (baseline 100ms)",
+        "backend-api: package pandas 80ms (new import)",
+    ]
+
+
+def test_small_absolute_changes_are_ignored():
+    # +100% but only 10ms
+    assert not startup_profile._regressed(20.0, 10.0, tolerance=0.2, min_ms=25)
+    assert startup_profile._regressed(40.0, 10.0, tolerance=0.2, min_ms=25)
+
+
+def test_budget_counts_import_and_lifespan():
+    summary = {"import_ms": 900.0, "lifespan_ms": 300.0, "packages_ms": {}}
+
+    problems = check("backend-api", summary, _baseline(budget_ms=1000.0), tolerance=0.2, min_ms=25)
+
+    assert problems == ["backend-api: cold start 1200ms is over the 1000ms budget"]
+
+
+def test_missing_baseline():
+    assert check("saas-api", {"import_ms": 1.0, "packages_ms": {}}, _baseline(), 0.2, 25) == [
+        "saas-api: no baseline (run `record`)"
+    ]
+
+
+def test_check_command_exits_1_on_regression(tmp_path, monkeypatch, capsys):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text('{"entry_points": {"backend-api": {"import_ms": 100.0, "packages_ms": {}}}}')
+    monkeypatch.setattr(
+        startup_profile, "profile",
+        lambda name, runs, lifespan, env: {"import_ms": 500.0, "packages_ms": {}}
+    )
+
+    assert startup_profile.main(["check", "--entry", "backend-api", "--baseline", str(baseline)]) == 1
+    assert "import 500ms vs baseline 100ms" in capsys.readouterr().out